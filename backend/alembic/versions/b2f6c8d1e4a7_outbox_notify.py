@@ -0,0 +1,47 @@
+"""outbox_notify — NOTIFY investigation_outbox on outbox insert
+
+Lets OutboxRelay(listen=True) wake as soon as an outbox transaction commits
+instead of waiting out its poll interval. Statement-level so a multi-row
+insert sends one notification; Postgres also folds identical notifications
+raised inside one transaction.
+
+Revision ID: b2f6c8d1e4a7
+Revises: a7e3f1b8c2d9
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f6c8d1e4a7'
+down_revision: Union[str, None] = 'a7e3f1b8c2d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION investigation_outbox_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('investigation_outbox', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER investigation_outbox_notify
+        AFTER INSERT ON investigation_outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION investigation_outbox_notify()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS investigation_outbox_notify ON investigation_outbox")
+    op.execute("DROP FUNCTION IF EXISTS investigation_outbox_notify()")
@@ -0,0 +1,6 @@
+"""Standalone micro-benchmarks for backend hot paths.
+
+Run from ``backend/``::
+
+    python -m benchmarks.<module> [--help]
+"""
@@ -0,0 +1,94 @@
+"""Biflow table churn: 1M distinct 5-tuples through a MAX_BIFLOWS-bounded table.
+
+Every tuple is new, so once the table is full each stitch also evicts. The
+legacy dict + ``min(last_seen)`` table is timed on a shorter run (it is
+O(n) per eviction) and reported at the same per-flow rate.
+
+    python -m benchmarks.bench_biflow_churn --tuples 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timezone
+
+from src.network.flow_receiver import FlowAggregator
+from src.network.metrics_store import FlowRecord
+
+_NOW = datetime(2024, 3, 5, tzinfo=timezone.utc)
+
+
+def _flows(n: int, seed: int = 11) -> list[FlowRecord]:
+    rng = random.Random(seed)
+    return [
+        FlowRecord(
+            src_ip=f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}",
+            dst_ip=f"172.16.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            src_port=rng.randint(1024, 65535), dst_port=rng.choice((80, 443, 53)),
+            protocol=6, bytes=rng.randint(40, 1500), packets=1,
+            start_time=_NOW, end_time=_NOW,
+        )
+        for i in range(n)
+    ]
+
+
+class _LegacyTable:
+    """The pre-rewrite dict-of-dicts table with min() eviction."""
+
+    MAX_BIFLOWS = FlowAggregator.MAX_BIFLOWS
+
+    def __init__(self) -> None:
+        self._biflows: dict[tuple, dict] = {}
+
+    def stitch_biflow(self, flow: FlowRecord) -> None:
+        key = FlowAggregator._biflow_key(None, flow)
+        now = time.time()
+        if key not in self._biflows:
+            if len(self._biflows) >= self.MAX_BIFLOWS:
+                oldest_key = min(self._biflows, key=lambda k: self._biflows[k]["last_seen"])
+                del self._biflows[oldest_key]
+            self._biflows[key] = {
+                "src_ip": key[0], "src_port": key[1], "dst_ip": key[2],
+                "dst_port": key[3], "protocol": key[4],
+                "forward_bytes": 0, "forward_packets": 0,
+                "reverse_bytes": 0, "reverse_packets": 0,
+                "first_seen": now, "last_seen": now,
+            }
+        bf = self._biflows[key]
+        bf["last_seen"] = now
+        bf["forward_bytes"] += flow.bytes
+        bf["forward_packets"] += flow.packets
+
+
+def _rate(table, flows: list[FlowRecord]) -> float:
+    stitch = table.stitch_biflow
+    t0 = time.perf_counter()
+    for f in flows:
+        stitch(f)
+    return len(flows) / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--tuples", type=int, default=1_000_000)
+    ap.add_argument("--legacy-tuples", type=int, default=FlowAggregator.MAX_BIFLOWS + 2_000)
+    args = ap.parse_args()
+
+    flows = _flows(max(args.tuples, args.legacy_tuples))
+    agg = FlowAggregator(biflow_timeout=3600)
+    rate = _rate(agg, flows[:args.tuples])
+    t0 = time.perf_counter()
+    expired = agg._biflows.expire(time.time() + 1)
+    expire_s = time.perf_counter() - t0
+
+    legacy_rate = _rate(_LegacyTable(), flows[:args.legacy_tuples])
+
+    print(f"ordered table  {args.tuples:>9,} tuples  {rate:>12,.0f} stitches/s")
+    print(f"legacy table   {args.legacy_tuples:>9,} tuples  {legacy_rate:>12,.0f} stitches/s")
+    print(f"expire {expired:,} entries in {expire_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""ICMP probe throughput against loopback targets.
+
+Every address in 127/8 answers on Linux loopback, so ``--targets``
+distinct addresses stand in for a device fleet without touching the
+network. The engine pings all of them through one socket; the legacy path
+ran one icmplib ``async_ping`` per device (a socket and a task each) and
+is timed on the first ``--legacy-targets`` addresses. Needs
+``ping_group_range`` membership or ``CAP_NET_RAW``.
+
+    python -m benchmarks.bench_icmp_engine --targets 5000 --count 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from src.network.icmp_engine import ICMPEngine
+
+
+def loopback_targets(count: int) -> list[str]:
+    return [f"127.{1 + i // 62500}.{i // 250 % 250}.{i % 250 + 1}" for i in range(count)]
+
+
+async def _legacy(targets: list[str], count: int, interval: float, timeout: float) -> int:
+    from icmplib import async_ping
+
+    hosts = await asyncio.gather(*(
+        async_ping(ip, count=count, interval=interval, timeout=timeout) for ip in targets
+    ), return_exceptions=True)
+    return sum(1 for h in hosts if not isinstance(h, BaseException) and h.is_alive)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    targets = loopback_targets(args.targets)
+    engine = ICMPEngine()
+    try:
+        await engine.ping_many(targets[:10], count=1, timeout=args.timeout)  # open the socket
+        t0 = time.perf_counter()
+        results = await engine.ping_many(targets, count=args.count, interval=args.interval, timeout=args.timeout)
+        engine_s = time.perf_counter() - t0
+    finally:
+        engine.close()
+    alive = sum(1 for r in results.values() if r.is_alive)
+    replies = sum(r.received for r in results.values())
+    rtts = sorted(rtt for r in results.values() for rtt in r.rtts)
+    p99 = rtts[int(len(rtts) * 0.99) - 1] if rtts else 0.0
+    print(f"engine  {len(targets):>7,} targets x {args.count}  {engine_s:6.2f} s  "
+          f"{len(targets) / engine_s:10,.0f} targets/s  "
+          f"({alive:,} alive, {replies:,}/{len(targets) * args.count:,} replies, p99 rtt {p99:.2f} ms)")
+
+    if args.legacy_targets:
+        subset = targets[:args.legacy_targets]
+        t0 = time.perf_counter()
+        legacy_alive = await _legacy(subset, args.count, args.interval, args.timeout)
+        legacy_s = time.perf_counter() - t0
+        print(f"legacy  {len(subset):>7,} targets x {args.count}  {legacy_s:6.2f} s  "
+              f"{len(subset) / legacy_s:10,.0f} targets/s  ({legacy_alive:,} alive)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--targets", type=int, default=5_000)
+    ap.add_argument("--count", type=int, default=3)
+    ap.add_argument("--interval", type=float, default=0.2)
+    ap.add_argument("--timeout", type=float, default=2.0)
+    ap.add_argument("--legacy-targets", type=int, default=500)
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""Template mining: messages/s and grouping fidelity vs the regex pipeline.
+
+Runs the legacy ``re.sub`` chains (syslog template, app-log pattern key)
+and ``TemplateMiner`` over the same corpus. Fidelity is reported as
+pair-counting precision/recall against the legacy grouping: recall < 1
+means the miner split a legacy group, precision < 1 means it merged two.
+For the built-in sample, both are also scored against the true template
+each message was generated from.
+
+Pass captured corpora (one message per line) or use the built-in sample:
+
+    python -m benchmarks.bench_log_templates --syslog syslog.txt --applog app.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import re
+import time
+from collections import Counter
+from typing import Callable
+
+from src.utils.log_templates import APP_LOG_MASKS, SYSLOG_MASKS, TemplateMiner
+
+# -- Legacy pipelines (as they were before the miner) ------------------------
+
+_IP_RE = re.compile(r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b")
+_NUM_RE = re.compile(r"\b\d{2,}\b")
+_HEX_RE = re.compile(r"\b0x[0-9a-fA-F]+\b")
+_IFACE_RE = re.compile(
+    r"\b(GigabitEthernet|FastEthernet|TenGigE|Ethernet|eth|ens|enp|ge-|xe-|et-)[\w/.:]+\b"
+)
+
+
+def legacy_syslog_template(message: str) -> str:
+    tpl = _IP_RE.sub("<IP>", message)
+    tpl = _HEX_RE.sub("<HEX>", tpl)
+    tpl = _IFACE_RE.sub("<IFACE>", tpl)
+    return _NUM_RE.sub("<NUM>", tpl)
+
+
+def legacy_pattern_key(message: str) -> str:
+    normalized = re.sub(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}[.\d]*[Z]?', '<TIMESTAMP>', message)
+    normalized = re.sub(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', '<UUID>', normalized)
+    normalized = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+\b', '<IP:PORT>', normalized)
+    normalized = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', '<IP>', normalized)
+    normalized = re.sub(r':\d{2,5}\b', ':<PORT>', normalized)
+    normalized = re.sub(r'/[a-zA-Z0-9/_.-]+', '/<PATH>', normalized)
+    normalized = re.sub(r'"[^"]{4,}"', '"<STR>"', normalized)
+    normalized = re.sub(r"'[^']{4,}'", "'<STR>'", normalized)
+    normalized = re.sub(r'\b0x[0-9a-fA-F]+\b', '<HEX>', normalized)
+    normalized = re.sub(r'\b[0-9a-f]{8,}\b', '<HEX>', normalized)
+    normalized = re.sub(r'\b\d+\b', '<NUM>', normalized)
+    exc_match = re.search(r'([A-Z][a-zA-Z]*(?:Exception|Error|Timeout|Failure))', message)
+    if exc_match:
+        return exc_match.group(1)
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+# -- Sample corpora -----------------------------------------------------------
+
+_SYSLOG_TEMPLATES = [
+    "%LINK-3-UPDOWN: Interface GigabitEthernet0/{a} changed state to {state}",
+    "%BGP-5-ADJCHANGE: neighbor {ip} Down BGP Notification sent",
+    "%BGP-5-ADJCHANGE: neighbor {ip} Up",
+    "sshd[{pid}]: Accepted publickey for {user} from {ip} port {port} ssh2",
+    "sshd[{pid}]: Failed password for invalid user {user} from {ip} port {port} ssh2",
+    "%SYS-5-CONFIG_I: Configured from console by {user} on vty{a} ({ip})",
+    "kernel: eth{a}: link up, 1000Mbps, full-duplex",
+    "%OSPF-5-ADJCHG: Process 1, Nbr {ip} on Vlan{vlan} from FULL to DOWN, Neighbor Down: Dead timer expired",
+    "CRON[{pid}]: ({user}) CMD (/usr/lib/sa/sa1 1 1)",
+    "%SEC-6-IPACCESSLOGP: list {acl} denied tcp {ip}({port}) -> {ip2}({port2}), {n} packets",
+    "memory usage at {pct} percent on slot {a} pool 0x{hex}",
+]
+
+_APP_TEMPLATES = [
+    "ConnectError: connection refused to {ip}:{port}",
+    "Request {uuid} to /api/v1/orders/{n} failed with status 503",
+    "Timeout waiting for response from payment-service after {ms}ms",
+    "User {n} checkout completed in {ms} ms",
+    'Cache miss for key "session:{hex}" in region {region}',
+    "Failed to deserialize message at offset {n} on partition {a}",
+    "RedisTimeout: GET session:{hex} exceeded 200ms",
+    "Retrying call to inventory (attempt {a}/5) at {ts}",
+    "Payment authorised for order {n} amount {amt} {cur}",
+    "Payment declined for order {n} reason insufficient_funds",
+    "NullPointerException in OrderMapper.toDto line {a}",
+]
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        a=rng.randint(0, 9), state=rng.choice(["up", "down"]),
+        ip=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        ip2=f"192.168.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+        pid=rng.randint(100, 65000), user=rng.choice(["alice", "bob", "root", "deploy"]),
+        port=rng.randint(1024, 65535), port2=rng.choice([22, 443, 8080]),
+        vlan=rng.randint(10, 4000), acl=rng.randint(100, 199), n=rng.randint(1, 10**6),
+        pct=rng.randint(50, 99), hex=f"{rng.getrandbits(32):08x}",
+        uuid=f"{rng.getrandbits(32):08x}-{rng.getrandbits(16):04x}-4{rng.getrandbits(12):03x}-"
+             f"a{rng.getrandbits(12):03x}-{rng.getrandbits(48):012x}",
+        ms=rng.randint(1, 30000), region=rng.choice(["eu", "us", "ap"]),
+        ts=f"2026-03-{rng.randint(10, 28)}T{rng.randint(10, 23)}:{rng.randint(10, 59)}:00Z",
+        amt=f"{rng.randint(1, 999)}.{rng.randint(10, 99)}", cur=rng.choice(["EUR", "USD"]),
+    )
+
+
+def _sample(templates: list[str], n: int, seed: int) -> tuple[list[str], list[int]]:
+    """Return ``(messages, template index per message)``."""
+    rng = random.Random(seed)
+
+    def one() -> tuple[str, int]:
+        i = rng.randrange(len(templates))
+        return _fill(templates[i], rng), i
+
+    # Skewed mix with exact repeats, like a real capture.
+    pool = [one() for _ in range(max(1, n // 4))]
+    rows = [rng.choice(pool) if rng.random() < 0.5 else one() for _ in range(n)]
+    return [m for m, _ in rows], [i for _, i in rows]
+
+
+# -- Measurement --------------------------------------------------------------
+
+def _rate(fn: Callable[[str], object], corpus: list[str]) -> tuple[float, list]:
+    t0 = time.perf_counter()
+    keys = [fn(m) for m in corpus]
+    return len(corpus) / (time.perf_counter() - t0), keys
+
+
+def _pairs(counter: Counter) -> int:
+    return sum(c * (c - 1) // 2 for c in counter.values())
+
+
+def pair_fidelity(reference: list, candidate: list) -> tuple[float, float]:
+    """Pair-counting (precision, recall) of *candidate* against *reference*."""
+    both = _pairs(Counter(zip(reference, candidate)))
+    ref_pairs = _pairs(Counter(reference))
+    cand_pairs = _pairs(Counter(candidate))
+    precision = both / cand_pairs if cand_pairs else 1.0
+    recall = both / ref_pairs if ref_pairs else 1.0
+    return precision, recall
+
+
+def _report(name: str, corpus: list[str], truth: list[int] | None,
+            legacy: Callable[[str], object], miner_key: Callable[[str], object]) -> None:
+    legacy_rate, legacy_keys = _rate(legacy, corpus)
+    miner_rate, miner_keys = _rate(miner_key, corpus)
+    print(f"{name}: {len(corpus):,} messages")
+    print(f"  legacy regex  {legacy_rate:>12,.0f} msg/s  {len(set(legacy_keys)):>6} groups")
+    print(f"  miner         {miner_rate:>12,.0f} msg/s  {len(set(miner_keys)):>6} groups")
+    precision, recall = pair_fidelity(legacy_keys, miner_keys)
+    print(f"  miner vs legacy   precision={precision:.3f} recall={recall:.3f}")
+    if truth is not None:
+        for label, keys in (("legacy", legacy_keys), ("miner", miner_keys)):
+            precision, recall = pair_fidelity(truth, keys)
+            print(f"  {label:<6} vs truth   precision={precision:.3f} recall={recall:.3f}")
+
+
+def _load(path: str | None, templates: list[str], n: int,
+          seed: int) -> tuple[list[str], list[int] | None]:
+    if path:
+        with open(path, encoding="utf-8", errors="replace") as fh:
+            return [line.rstrip("\n") for line in fh if line.strip()], None
+    return _sample(templates, n, seed)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--syslog", help="captured syslog messages, one per line")
+    ap.add_argument("--applog", help="captured application log messages, one per line")
+    ap.add_argument("--messages", type=int, default=200_000,
+                    help="sample size when no corpus file is given")
+    args = ap.parse_args()
+
+    syslog, truth = _load(args.syslog, _SYSLOG_TEMPLATES, args.messages, 1)
+    syslog_miner = TemplateMiner(SYSLOG_MASKS)
+    _report("syslog", syslog, truth, legacy_syslog_template,
+            lambda m: syslog_miner.add(m).template_id)
+
+    applog, truth = _load(args.applog, _APP_TEMPLATES, args.messages, 2)
+    app_miner = TemplateMiner(APP_LOG_MASKS, sim_threshold=0.6)
+    exc_re = re.compile(r'([A-Z][a-zA-Z]*(?:Exception|Error|Timeout|Failure))')
+
+    def app_key(message: str) -> str:
+        m = exc_re.search(message)
+        return m.group(1) if m else app_miner.add(message).template_id
+
+    _report("app logs", applog, truth, legacy_pattern_key, app_key)
+
+
+if __name__ == "__main__":
+    main()
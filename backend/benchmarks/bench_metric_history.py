@@ -0,0 +1,159 @@
+"""Metric history ingest and read costs, partitioned store vs the old table.
+
+One billion samples a week is ~1,650 samples/s sustained, e.g. 16,500
+series sampled every 10 s. The benchmark writes ``--series`` series at
+that density (one sample per ``--interval`` seconds for ``--days`` days)
+in monitor-sized batches, then times the reads the monitor API makes:
+
+- a 1 h raw window;
+- 24 h and 7 d chart windows, read from the rollups;
+- current values for every device;
+- dropping a day of retention.
+
+It reports sustained ingest as a multiple of the 1B/week rate, and the
+on-disk bytes per sample. The legacy single ``metric_history`` table (ISO
+strings, one index, raw rows through ``lttb_downsample``) is timed on the
+first ``--legacy-samples`` samples.
+
+    python -m benchmarks.bench_metric_history --series 100 --interval 10 --days 7
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from src.network.metric_history_store import MetricHistoryStore, auto_step
+from src.utils.lttb import lttb_downsample
+
+BILLION_PER_WEEK = 1e9 / (7 * 86400)
+METRICS = ("latency_ms", "packet_loss", "cpu_pct", "mem_pct")
+
+
+def samples(series: int, interval: float, start: float, end: float):
+    """One sample per series every ``interval`` seconds, in time order."""
+    rounds = int((end - start) / interval)
+    for r in range(rounds):
+        for s in range(series):
+            yield ("device", f"d{s // len(METRICS)}", METRICS[s % len(METRICS)],
+                   float((r + s) % 97), start + r * interval + s * interval / series)
+
+
+def _timed(fn, repeat: int = 5) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def _open(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _db_size(conn: sqlite3.Connection, path: str) -> int:
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return os.path.getsize(path)
+
+
+def _legacy(path: str, args: argparse.Namespace, start: float, end: float, devices: list[str]) -> None:
+    conn = _open(path)
+    conn.executescript("""
+        CREATE TABLE metric_history (id INTEGER PRIMARY KEY AUTOINCREMENT, entity_type TEXT NOT NULL,
+            entity_id TEXT NOT NULL, metric TEXT NOT NULL, value REAL NOT NULL, recorded_at TEXT NOT NULL);
+        CREATE INDEX idx_metric_history_entity ON metric_history(entity_type, entity_id, recorded_at);
+    """)
+    insert = "INSERT INTO metric_history (entity_type, entity_id, metric, value, recorded_at) VALUES (?,?,?,?,?)"
+    batch, count, t0 = [], 0, time.perf_counter()
+    for entity_type, entity_id, metric, value, ts in samples(args.series, args.interval, start, end):
+        batch.append((entity_type, entity_id, metric, value,
+                      datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()))
+        if len(batch) == args.batch:
+            conn.executemany(insert, batch)
+            conn.commit()
+            count += len(batch)
+            batch.clear()
+    conn.executemany(insert, batch)
+    conn.commit()
+    count += len(batch)
+    ingest = count / (time.perf_counter() - t0)
+
+    since = datetime.fromtimestamp(start, tz=timezone.utc).isoformat()
+    until = datetime.fromtimestamp(end, tz=timezone.utc).isoformat()
+
+    def chart():
+        rows = conn.execute(
+            "SELECT recorded_at, value FROM metric_history WHERE entity_type='device' AND entity_id='d0' "
+            "AND metric='latency_ms' AND recorded_at>=? AND recorded_at<? ORDER BY recorded_at",
+            (since, until),
+        ).fetchall()
+        lttb_downsample([(datetime.fromisoformat(ts).timestamp(), v) for ts, v in rows])
+
+    current = _timed(lambda: conn.execute(
+        "SELECT entity_id, metric, value FROM metric_history WHERE id IN (SELECT MAX(id) FROM metric_history "
+        f"WHERE entity_type='device' AND entity_id IN ({','.join('?' * len(devices))}) "
+        "AND metric IN ('cpu_pct', 'mem_pct') GROUP BY entity_id, metric)",
+        devices).fetchall(), repeat=1)
+    chart_ms = _timed(chart)
+    size = _db_size(conn, path)
+    conn.close()
+    print(f"legacy {count:>12,} samples  ingest {ingest:>9,.0f}/s  {size / count:6.1f} B/sample")
+    print(f"       {(end - start) / 3600:.0f}h chart {chart_ms:8.2f} ms  current, all devices {current:8.2f} ms")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--series", type=int, default=100)
+    ap.add_argument("--interval", type=float, default=10.0, help="seconds between samples of a series")
+    ap.add_argument("--days", type=int, default=7)
+    ap.add_argument("--batch", type=int, default=5_000, help="samples per write (MetricSink max_pending)")
+    ap.add_argument("--legacy-samples", type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    end = time.time()
+    end -= end % 86400
+    start = end - args.days * 86400
+    devices = [f"d{i}" for i in range(-(-args.series // len(METRICS)))]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "store.db")
+        conn = _open(path)
+        store = MetricHistoryStore(lambda: conn, lambda _: None)
+        batch, count, t0 = [], 0, time.perf_counter()
+        for sample in samples(args.series, args.interval, start, end):
+            batch.append(sample)
+            if len(batch) == args.batch:
+                count += store.append(batch)
+                batch = []
+        count += store.append(batch)
+        ingest = count / (time.perf_counter() - t0)
+        size = _db_size(conn, path)
+
+        key = ("device", "d0", "latency_ms")
+        raw_hour = _timed(lambda: store.query(*key, end - 3600, end))
+        day = _timed(lambda: store.rollup(*key, end - 86400, end, auto_step(end - 86400, end)))
+        week = _timed(lambda: store.rollup(*key, start, end, auto_step(start, end)))
+        current = _timed(lambda: store.latest("device", devices, ["cpu_pct", "mem_pct"]))
+        legacy_end = start + args.legacy_samples / args.series * args.interval
+        legacy_window = _timed(lambda: store.rollup(*key, start, legacy_end, auto_step(start, legacy_end)))
+        t0 = time.perf_counter()
+        store.prune(older_than_days=args.days - 1)
+        prune = (time.perf_counter() - t0) * 1000
+
+        print(f"store  {count:>12,} samples  ingest {ingest:>9,.0f}/s ({ingest / BILLION_PER_WEEK:.0f}x the "
+              f"1B/week rate)  {size / count:6.1f} B/sample (~{size / count:.0f} GB per 1B)")
+        print(f"       1h raw {raw_hour:6.2f} ms  24h chart {day:6.2f} ms  7d chart {week:6.2f} ms  "
+              f"{(legacy_end - start) / 3600:.0f}h chart {legacy_window:6.2f} ms")
+        print(f"       current, all devices {current:6.2f} ms  drop a day {prune:6.2f} ms")
+        conn.close()
+
+        if args.legacy_samples:
+            _legacy(os.path.join(tmp, "legacy.db"), args, start, legacy_end, devices)
+
+
+if __name__ == "__main__":
+    main()
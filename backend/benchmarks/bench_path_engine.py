@@ -0,0 +1,121 @@
+"""Reachability matrix over a synthetic ~10k-node enterprise topology.
+
+Each site is a zone: an HA core pair, distribution and access switches and
+hosts, with the cores joined to an MPLS WAN mesh and a few sites behind
+VPN tunnels. The legacy path rebuilt the cost graph and ran a k-shortest
+enumeration for every zone pair; it is timed on the first
+``--legacy-zones`` zones and reported per pair.
+
+    python -m benchmarks.bench_path_engine --sites 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import networkx as nx
+
+from src.agents.network.reachability_matrix import compute_reachability_matrix
+from src.network.knowledge_graph import NetworkKnowledgeGraph
+from src.network.path_engine import MAX_PATH_DEPTH, MAX_PATH_ENUMERATION, edge_cost
+from src.network.topology_store import TopologyStore
+
+
+def _link(graph, a: str, b: str, confidence: float, edge_type: str = "layer2_link") -> None:
+    graph.add_edge(a, b, edge_type=edge_type, confidence=confidence)
+    graph.add_edge(b, a, edge_type=edge_type, confidence=confidence)
+
+
+def build_topology(kg: NetworkKnowledgeGraph, sites: int, hosts_per_site: int, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    graph = kg.graph
+    for s in range(sites):
+        zone = f"zone-{s}"
+        cores = [f"s{s}-core{i}" for i in range(2)]
+        dists = [f"s{s}-dist{i}" for i in range(4)]
+        access = [f"s{s}-acc{i}" for i in range(20)]
+        for node in cores + dists + access:
+            graph.add_node(node, node_type="device", device_type="switch", zone_id=zone)
+        _link(graph, cores[0], cores[1], 1.0, "ha_peer")
+        for d in dists:
+            for c in cores:
+                _link(graph, d, c, rng.choice((0.9, 1.0)), "layer3_link")
+        for i, a in enumerate(access):
+            _link(graph, a, dists[i % 4], 0.9)
+            _link(graph, a, dists[(i + 1) % 4], 0.7)
+        for h in range(hosts_per_site):
+            host = f"s{s}-h{h}"
+            graph.add_node(host, node_type="device", device_type="host", zone_id=zone)
+            _link(graph, host, access[h % len(access)], 0.95)
+    # MPLS WAN: each site core to its ring neighbours, plus random chords
+    for s in range(sites):
+        _link(graph, f"s{s}-core0", f"s{(s + 1) % sites}-core0", 0.95, "mpls_path")
+        _link(graph, f"s{s}-core1", f"s{rng.randrange(sites)}-core1", 0.85, "mpls_path")
+    for s in range(0, sites, 7):
+        _link(graph, f"s{s}-core1", f"s{(s + 3) % sites}-core0", 0.9, "tunnel_to")
+
+
+def _legacy_find_k_shortest_paths(graph, src, dst, k):
+    """Pre-engine behaviour: build the cost graph, then enumerate."""
+    cost_graph = nx.DiGraph()
+    for u, v, data in graph.edges(data=True):
+        cost = edge_cost(data)
+        if not cost_graph.has_edge(u, v) or cost < cost_graph[u][v]["weight"]:
+            cost_graph.add_edge(u, v, weight=cost)
+    try:
+        paths = itertools.islice(
+            nx.shortest_simple_paths(cost_graph, src, dst, weight="weight"), MAX_PATH_ENUMERATION,
+        )
+        return [p for p in itertools.islice((p for p in paths if len(p) <= MAX_PATH_DEPTH), k)]
+    except (nx.NetworkXNoPath, nx.NodeNotFound):
+        return []
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--sites", type=int, default=50)
+    ap.add_argument("--hosts-per-site", type=int, default=174)
+    ap.add_argument("--legacy-zones", type=int, default=6)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kg = NetworkKnowledgeGraph(TopologyStore(db_path=str(Path(tmp) / "bench.db")))
+        build_topology(kg, args.sites, args.hosts_per_site)
+        zones = [f"zone-{s}" for s in range(args.sites)]
+        print(f"topology: {kg.node_count:,} nodes, {kg.edge_count:,} edges, {len(zones)} zones")
+
+        t0 = time.perf_counter()
+        result = compute_reachability_matrix(kg, zones)
+        cold_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        compute_reachability_matrix(kg, zones)
+        warm_s = time.perf_counter() - t0
+        pairs = len(result["matrix"])
+        reachable = sum(1 for row in result["matrix"] if row["reachable"] == "yes")
+
+        # One link flap: only that pair's cost is recomputed
+        kg.graph.add_edge("s0-acc0", "s0-dist0", edge_type="layer2_link", confidence=0.2)
+        t0 = time.perf_counter()
+        kg.find_k_shortest_paths("s0-h0", f"s{args.sites // 2}-h0", k=3)
+        flap_s = time.perf_counter() - t0
+
+        reps = [f"s{s}-core0" for s in range(args.legacy_zones)]
+        legacy_pairs = [(a, b) for a in reps for b in reps if a != b]
+        t0 = time.perf_counter()
+        for a, b in legacy_pairs:
+            _legacy_find_k_shortest_paths(kg.graph, a, b, 1)
+        legacy_per_pair = (time.perf_counter() - t0) / len(legacy_pairs)
+
+    print(f"engine matrix   {pairs:>6,} pairs  cold {cold_s:8.2f} s  warm {warm_s:8.2f} s  ({reachable:,} reachable)")
+    print(f"legacy matrix   {len(legacy_pairs):>6,} pairs  {legacy_per_pair * 1000:8.1f} ms/pair"
+          f"  -> ~{legacy_per_pair * pairs:,.0f} s for {pairs:,} pairs")
+    print(f"k=3 query after one edge change  {flap_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
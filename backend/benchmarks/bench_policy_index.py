@@ -0,0 +1,95 @@
+"""First-match firewall verdicts over a synthetic 20k-rule rulebase.
+
+Rules mix host and /24 objects with shared /16 and /8 groups and a tail
+of broad rules, the shape of a large enterprise policy. The legacy path
+re-sorted the snapshot and re-parsed every pattern per flow; it is timed
+on the first ``--legacy-flows`` flows and reported per flow.
+
+    python -m benchmarks.bench_policy_index --rules 20000 --flows 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from src.network.adapters.base import FirewallAdapter
+from src.network.models import FirewallRule, PolicyAction
+from src.network.policy_index import PolicyIndex
+
+
+def _host(rng: random.Random) -> str:
+    return f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}"
+
+
+def build_rules(count: int, seed: int = 3) -> list[FirewallRule]:
+    rng = random.Random(seed)
+    groups = [f"10.{rng.randrange(256)}.0.0/16" for _ in range(40)] + ["10.0.0.0/8", "172.16.0.0/12"]
+    rules = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            src, dst = [_host(rng)], [_host(rng), _host(rng)]
+        elif kind < 0.9:
+            src = [rng.choice(groups)]
+            dst = [f"10.{rng.randrange(256)}.{rng.randrange(256)}.0/24"]
+        else:
+            src, dst = ["any"], [rng.choice(groups)]
+        rules.append(FirewallRule(
+            id=f"r{i}", device_id="fw", rule_name=f"r{i}", src_ips=src, dst_ips=dst,
+            ports=rng.sample([22, 53, 80, 443, 8080, 8443], rng.randrange(1, 3)),
+            protocol=rng.choice(("tcp", "udp", "any")),
+            action=rng.choice((PolicyAction.ALLOW, PolicyAction.DENY)), order=i,
+        ))
+    return rules
+
+
+def _legacy_first_match(rules, src_ip, dst_ip, port, protocol):
+    for rule in sorted(rules, key=lambda r: r.order):
+        if (FirewallAdapter._match_ip(None, src_ip, rule.src_ips)
+                and FirewallAdapter._match_ip(None, dst_ip, rule.dst_ips)
+                and FirewallAdapter._match_port(port, rule.ports)
+                and (rule.protocol.lower() in (protocol.lower(), "any") or protocol.lower() == "any")):
+            return rule
+    return None
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--rules", type=int, default=20_000)
+    ap.add_argument("--flows", type=int, default=5_000)
+    ap.add_argument("--legacy-flows", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = random.Random(9)
+    rules = build_rules(args.rules)
+    flows = [(_host(rng), _host(rng), rng.choice((22, 80, 443, 8443)), rng.choice(("tcp", "udp")))
+             for _ in range(args.flows)]
+
+    t0 = time.perf_counter()
+    index = PolicyIndex(rules)
+    compile_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batch = index.first_match_many(flows)
+    batch_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for flow in flows[:args.legacy_flows]:
+        index.first_match(*flow)
+    single_s = (time.perf_counter() - t0) / min(args.legacy_flows, len(flows))
+
+    t0 = time.perf_counter()
+    legacy = [_legacy_first_match(rules, *flow) for flow in flows[:args.legacy_flows]]
+    legacy_s = (time.perf_counter() - t0) / len(legacy)
+    assert legacy == batch[:len(legacy)], "compiled index disagrees with the linear scan"
+
+    matched = sum(1 for r in batch if r is not None)
+    print(f"rulebase {len(rules):,} rules  compile {compile_s:.2f} s")
+    print(f"compiled batch   {len(flows):>6,} flows  {batch_s * 1000:8.1f} ms  "
+          f"({batch_s / len(flows) * 1e6:.1f} us/flow, {matched:,} matched)")
+    print(f"compiled single  {single_s * 1e6:8.1f} us/flow")
+    print(f"legacy scan      {legacy_s * 1000:8.1f} ms/flow  -> ~{legacy_s * len(flows):,.0f} s for {len(flows):,} flows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""WorkflowExecutor scheduling overhead on wide and deep synthetic DAGs.
+
+Workflows are built directly as ``CompiledWorkflow`` (bypassing the
+compiler's MAX_TOTAL_STEPS_PER_RUN cap) and every step runs a no-op
+runner, so the timings are scheduler + bookkeeping cost only:
+
+- wide:    root -> N parallel fan-out steps -> join
+- deep:    chain of N steps
+- layered: N steps in layers of ``--width``, each step depending on two
+           steps of the previous layer
+
+    python -m benchmarks.bench_workflow_scheduler --steps 1000 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from src.workflows.compiler import CompiledStep, CompiledWorkflow
+from src.workflows.executor import WorkflowExecutor
+from src.workflows.runners.registry import AgentRunnerRegistry
+
+
+class _NoopRunner:
+    async def run(self, inputs: dict, *, context: dict) -> dict:
+        return {"v": context["step_id"]}
+
+
+def _step(sid: str, upstream: list[str]) -> CompiledStep:
+    return CompiledStep(
+        id=sid,
+        agent="noop",
+        agent_version=1,
+        inputs={},
+        when=None,
+        on_failure="fail",
+        fallback_step_id=None,
+        parallel_group=None,
+        concurrency_group=None,
+        timeout_seconds=30.0,
+        retry_on=[],
+        upstream_ids=upstream,
+    )
+
+
+def _workflow(edges: list[tuple[str, list[str]]]) -> CompiledWorkflow:
+    return CompiledWorkflow(
+        topo_order=[sid for sid, _ in edges],
+        steps={sid: _step(sid, ups) for sid, ups in edges},
+        inputs_schema={},
+    )
+
+
+def wide_dag(n: int) -> CompiledWorkflow:
+    fan = [f"f{i:05d}" for i in range(n)]
+    return _workflow([("root", [])] + [(f, ["root"]) for f in fan] + [("join", fan)])
+
+
+def deep_dag(n: int) -> CompiledWorkflow:
+    return _workflow([(f"s{i:05d}", [f"s{i - 1:05d}"] if i else []) for i in range(n)])
+
+
+def layered_dag(n: int, width: int) -> CompiledWorkflow:
+    edges: list[tuple[str, list[str]]] = []
+    for i in range(n):
+        layer, pos = divmod(i, width)
+        ups = []
+        if layer:
+            prev = (layer - 1) * width
+            ups = sorted({f"s{prev + pos:05d}", f"s{prev + (pos + 1) % width:05d}"})
+        edges.append((f"s{i:05d}", ups))
+    return _workflow(edges)
+
+
+async def _time_run(compiled: CompiledWorkflow, max_concurrent: int) -> float:
+    runners = AgentRunnerRegistry()
+    runners.register("noop", 1, _NoopRunner())
+    executor = WorkflowExecutor(runners, max_concurrent_steps=max_concurrent)
+    t0 = time.perf_counter()
+    result = await executor.run(compiled, inputs={})
+    elapsed = time.perf_counter() - t0
+    assert result.status == "SUCCESS", result.error
+    return elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--steps", type=int, nargs="+", default=[1000, 5000])
+    ap.add_argument("--width", type=int, default=100)
+    ap.add_argument("--max-concurrent", type=int, default=64)
+    args = ap.parse_args()
+
+    for n in args.steps:
+        for name, compiled in (
+            ("wide", wide_dag(n)),
+            ("deep", deep_dag(n)),
+            ("layered", layered_dag(n, args.width)),
+        ):
+            elapsed = asyncio.run(_time_run(compiled, args.max_concurrent))
+            steps = len(compiled.steps)
+            print(f"{name:<8} {steps:>7,} steps  {elapsed:8.3f} s  "
+                  f"{elapsed / steps * 1e6:8.1f} us/step  {steps / elapsed:10,.0f} steps/s")
+
+
+if __name__ == "__main__":
+    main()
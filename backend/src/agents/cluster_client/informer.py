@@ -0,0 +1,480 @@
+"""Watch-based informer cache for the Kubernetes cluster client.
+
+Every ``list_*`` call used to re-list the cluster and deserialize the
+response into kubernetes-client model objects. An ``Informer`` instead
+lists a resource kind once (raw JSON, continue-token paged), then follows
+a watch from the returned ``resourceVersion`` and applies
+ADDED/MODIFIED/DELETED events to a local store. Reads are served from
+memory.
+
+The store keeps the raw JSON dicts and secondary indexes:
+
+- ``namespace``: ``metadata.namespace``
+- ``owner``:     ``metadata.ownerReferences[*].uid``
+- ``node``:      ``spec.nodeName`` (pods only)
+
+``InformerGroup`` holds one informer per kind for one cluster identity.
+``acquire_group`` shares groups across ``KubernetesClient`` instances, so
+concurrent diagnostics against the same cluster share one list+watch per
+kind instead of each multiplying API-server load. A group whose last
+client released it is stopped after ``IDLE_TTL`` seconds.
+
+The kubernetes client is synchronous, so each watch runs on its own
+daemon thread; the store is guarded by a lock and reads return
+snapshots (lists of references to the stored dicts, which callers must
+treat as read-only).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Server-side watch timeout. The watch returns after this long and is
+# re-opened from the last seen resourceVersion, which also bounds how long
+# a stop request waits for the thread.
+WATCH_TIMEOUT_SECONDS = 240
+
+# Unused groups are kept this long so back-to-back diagnostics reuse them.
+IDLE_TTL = 300.0
+
+# When the watch is forbidden or keeps failing, reads re-list after this.
+UNWATCHED_TTL = 60.0
+
+_MAX_BACKOFF = 30.0
+
+Indexer = Callable[[dict], Iterable[str]]
+
+
+def _index_namespace(obj: dict) -> Iterable[str]:
+    ns = (obj.get("metadata") or {}).get("namespace")
+    return (ns,) if ns else ()
+
+
+def _index_owner(obj: dict) -> Iterable[str]:
+    refs = (obj.get("metadata") or {}).get("ownerReferences") or []
+    return tuple(r["uid"] for r in refs if r.get("uid"))
+
+
+def _index_node(obj: dict) -> Iterable[str]:
+    node = (obj.get("spec") or {}).get("nodeName")
+    return (node,) if node else ()
+
+
+DEFAULT_INDEXERS: dict[str, Indexer] = {
+    "namespace": _index_namespace,
+    "owner": _index_owner,
+}
+
+POD_INDEXERS: dict[str, Indexer] = {**DEFAULT_INDEXERS, "node": _index_node}
+
+
+def object_key(obj: dict) -> str:
+    meta = obj.get("metadata") or {}
+    ns = meta.get("namespace")
+    return f"{ns}/{meta.get('name')}" if ns else str(meta.get("name"))
+
+
+class WatchExpired(Exception):
+    """The watch resourceVersion is too old (HTTP 410 Gone); re-list."""
+
+
+def _decode(response: Any) -> dict:
+    """Decode a ``_preload_content=False`` response (or a dict) to JSON."""
+    if isinstance(response, dict):
+        return response
+    data = response.data
+    release = getattr(response, "release_conn", None)
+    if release is not None:
+        release()
+    return json.loads(data)
+
+
+def _iter_events(response: Any) -> Iterator[dict]:
+    """Yield watch events from a streaming response.
+
+    The API server sends one JSON object per line. Fakes may return any
+    iterable of already-decoded event dicts instead.
+    """
+    if not hasattr(response, "stream"):
+        yield from response
+        return
+    buf = b""
+    try:
+        for chunk in response.stream(amt=None, decode_content=False):
+            buf += chunk
+            while b"\n" in buf:
+                line, buf = buf.split(b"\n", 1)
+                if line.strip():
+                    yield json.loads(line)
+        if buf.strip():
+            yield json.loads(buf)
+    finally:
+        response.close()
+        release = getattr(response, "release_conn", None)
+        if release is not None:
+            release()
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    return getattr(exc, "status", None)
+
+
+class Informer:
+    """List+watch cache for one resource kind.
+
+    Parameters
+    ----------
+    kind : str
+        Name used in logs and by ``InformerGroup``.
+    list_fn : callable
+        Raw list call, e.g. ``CoreV1Api.list_pod_for_all_namespaces``. It is
+        called with ``limit``/``_continue`` for listing and with
+        ``watch=True``/``resource_version``/``timeout_seconds`` for watching,
+        always with ``_preload_content=False``.
+    indexers : dict
+        Index name -> function returning the index values of an object.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        list_fn: Callable[..., Any],
+        *,
+        indexers: Optional[dict[str, Indexer]] = None,
+        page_size: int = 500,
+        watch_timeout: int = WATCH_TIMEOUT_SECONDS,
+    ) -> None:
+        self.kind = kind
+        self._list_fn = list_fn
+        self._indexers = dict(DEFAULT_INDEXERS if indexers is None else indexers)
+        self._page_size = page_size
+        self._watch_timeout = watch_timeout
+
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._items: dict[str, dict] = {}
+        self._indexes: dict[str, dict[str, set[str]]] = {name: {} for name in self._indexers}
+        self._resource_version = ""
+        self._revision = 0
+        self._synced = False
+        self._watching = False
+        self._listed_at = 0.0
+        self._forbidden: Optional[tuple[float, BaseException]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ── Store ───────────────────────────────────────────────────────────
+
+    def _index_add(self, key: str, obj: dict) -> None:
+        for name, fn in self._indexers.items():
+            index = self._indexes[name]
+            for value in fn(obj):
+                index.setdefault(value, set()).add(key)
+
+    def _index_remove(self, key: str, obj: dict) -> None:
+        for name, fn in self._indexers.items():
+            index = self._indexes[name]
+            for value in fn(obj):
+                keys = index.get(value)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del index[value]
+
+    def _upsert(self, obj: dict) -> None:
+        key = object_key(obj)
+        old = self._items.get(key)
+        if old is not None:
+            self._index_remove(key, old)
+        self._items[key] = obj
+        self._index_add(key, obj)
+
+    def _delete(self, obj: dict) -> None:
+        key = object_key(obj)
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._index_remove(key, old)
+
+    def _replace(self, items: list[dict], resource_version: str) -> None:
+        with self._lock:
+            self._items = {}
+            self._indexes = {name: {} for name in self._indexers}
+            for obj in items:
+                self._upsert(obj)
+            self._resource_version = resource_version
+            self._revision += 1
+            self._listed_at = time.monotonic()
+            self._synced = True
+
+    @property
+    def revision(self) -> int:
+        """Counter bumped on every change to the store."""
+        return self._revision
+
+    @property
+    def resource_version(self) -> str:
+        return self._resource_version
+
+    @property
+    def synced(self) -> bool:
+        return self._synced
+
+    def items(self, namespace: str = "") -> list[dict]:
+        """Snapshot of stored objects, optionally limited to one namespace."""
+        if namespace:
+            return self.by_index("namespace", namespace)
+        with self._lock:
+            return list(self._items.values())
+
+    def by_index(self, index: str, value: str) -> list[dict]:
+        with self._lock:
+            keys = self._indexes[index].get(value, ())
+            return [self._items[k] for k in keys]
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._items.get(key)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    # ── List + watch ────────────────────────────────────────────────────
+
+    def _list(self) -> None:
+        items: list[dict] = []
+        cont: Optional[str] = None
+        while True:
+            kwargs: dict[str, Any] = {"limit": self._page_size, "_preload_content": False}
+            if cont:
+                kwargs["_continue"] = cont
+            page = _decode(self._list_fn(**kwargs))
+            items.extend(page.get("items") or [])
+            metadata = page.get("metadata") or {}
+            cont = metadata.get("continue")
+            if not cont:
+                self._replace(items, metadata.get("resourceVersion") or "")
+                return
+
+    def _apply(self, event: dict) -> None:
+        etype = event.get("type")
+        obj = event.get("object") or {}
+        if etype == "ERROR":
+            if obj.get("code") == 410:
+                raise WatchExpired(obj.get("message", ""))
+            raise RuntimeError(f"watch error for {self.kind}: {obj.get('message', obj)}")
+        rv = (obj.get("metadata") or {}).get("resourceVersion")
+        with self._lock:
+            if etype in ("ADDED", "MODIFIED"):
+                self._upsert(obj)
+                self._revision += 1
+            elif etype == "DELETED":
+                self._delete(obj)
+                self._revision += 1
+            if rv:
+                self._resource_version = rv
+
+    def _watch_once(self) -> None:
+        response = self._list_fn(
+            watch=True,
+            resource_version=self._resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=self._watch_timeout,
+            _preload_content=False,
+        )
+        for event in _iter_events(response):
+            if self._stop.is_set():
+                return
+            self._apply(event)
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                self._watch_once()
+                backoff = 1.0
+            except WatchExpired:
+                logger.debug("%s watch expired at rv=%s, re-listing", self.kind, self._resource_version)
+                try:
+                    self._list()
+                except Exception as e:
+                    logger.warning("%s re-list failed: %s", self.kind, e)
+                    self._stop.wait(backoff)
+                    backoff = min(backoff * 2, _MAX_BACKOFF)
+            except Exception as e:
+                if _status_code(e) == 410:
+                    try:
+                        self._list()
+                        continue
+                    except Exception as le:
+                        e = le
+                if _status_code(e) == 403:
+                    # Listing is allowed but watching is not: fall back to
+                    # re-listing on read once the data is UNWATCHED_TTL old.
+                    logger.info("%s watch forbidden; serving periodic re-lists", self.kind)
+                    break
+                logger.warning("%s watch failed: %s (retry in %.0fs)", self.kind, e, backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF)
+        self._watching = False
+
+    def start(self) -> None:
+        """List synchronously (first call only) and start the watch thread.
+
+        Blocking; concurrent callers wait for the first one's list. Errors
+        from the initial list (e.g. ``ApiException`` 403) propagate.
+        """
+        with self._start_lock:
+            if self._stop.is_set():
+                raise RuntimeError(f"{self.kind} informer is stopped")
+            now = time.monotonic()
+            if self._synced and (self._watching or now - self._listed_at < UNWATCHED_TTL):
+                return
+            # Remember a forbidden list so callers falling back to namespaced
+            # reads don't re-probe the API server on every call.
+            if self._forbidden is not None and now - self._forbidden[0] < UNWATCHED_TTL:
+                raise self._forbidden[1]
+            try:
+                self._list()
+            except Exception as e:
+                if _status_code(e) == 403:
+                    self._forbidden = (now, e)
+                raise
+            self._forbidden = None
+            if not self._watching:
+                self._watching = True
+                self._thread = threading.Thread(
+                    target=self._run, name=f"k8s-informer-{self.kind}", daemon=True
+                )
+                self._thread.start()
+
+    async def ensure_synced(self) -> "Informer":
+        if not (self._synced and self._watching):
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.start)
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+class InformerGroup:
+    """Informers for one cluster identity, created lazily per kind."""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        # Transport owned by the group (e.g. a kubernetes ApiClient), so it
+        # outlives the client that created it. Closed on stop().
+        self.api_client: Any = None
+        self._informers: dict[str, Informer] = {}
+        self._lock = threading.Lock()
+        self._refs = 0
+        self._idle_since: Optional[float] = time.monotonic()
+
+    def informer(
+        self,
+        kind: str,
+        list_fn: Callable[..., Any],
+        indexers: Optional[dict[str, Indexer]] = None,
+    ) -> Informer:
+        with self._lock:
+            inf = self._informers.get(kind)
+            if inf is None:
+                inf = Informer(kind, list_fn, indexers=indexers)
+                self._informers[kind] = inf
+            return inf
+
+    async def get(
+        self,
+        kind: str,
+        list_fn: Callable[..., Any],
+        indexers: Optional[dict[str, Indexer]] = None,
+    ) -> Informer:
+        return await self.informer(kind, list_fn, indexers).ensure_synced()
+
+    def revisions(self, *kinds: str) -> tuple:
+        """Store revisions of ``kinds`` (-1 for kinds not started yet)."""
+        with self._lock:
+            return tuple(
+                self._informers[k].revision if k in self._informers else -1
+                for k in kinds
+            )
+
+    def idle_expired(self, now: float) -> bool:
+        return self._refs == 0 and self._idle_since is not None and now - self._idle_since > IDLE_TTL
+
+    def stop(self) -> None:
+        with self._lock:
+            for inf in self._informers.values():
+                inf.stop()
+            self._informers.clear()
+            api_client, self.api_client = self.api_client, None
+        close = getattr(api_client, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+
+_registry_lock = threading.Lock()
+_groups: dict[str, InformerGroup] = {}
+
+
+def acquire_group(key: str) -> InformerGroup:
+    """Return the shared group for ``key`` and take a reference to it."""
+    now = time.monotonic()
+    with _registry_lock:
+        for k in [k for k, g in _groups.items() if k != key and g.idle_expired(now)]:
+            _groups.pop(k).stop()
+        group = _groups.get(key)
+        if group is None:
+            group = InformerGroup(key)
+            _groups[key] = group
+        group._refs += 1
+        group._idle_since = None
+        return group
+
+
+def release_group(group: InformerGroup) -> None:
+    with _registry_lock:
+        group._refs = max(0, group._refs - 1)
+        if group._refs == 0:
+            group._idle_since = time.monotonic()
+
+
+def stop_all() -> None:
+    """Stop every informer group (shutdown and tests)."""
+    with _registry_lock:
+        for group in _groups.values():
+            group.stop()
+        _groups.clear()
+
+
+def _field_value(obj: dict, path: str) -> str:
+    cur: Any = obj
+    for part in path.split("."):
+        if not isinstance(cur, dict):
+            return ""
+        cur = cur.get(part)
+    return "" if cur is None else str(cur)
+
+
+def match_field_selector(obj: dict, selector: str) -> bool:
+    """Evaluate a field selector (``a.b=x,c!=y``) against a raw object."""
+    for term in filter(None, (t.strip() for t in selector.split(","))):
+        if "!=" in term:
+            path, value = term.split("!=", 1)
+            if _field_value(obj, path.strip()) == value.strip():
+                return False
+        else:
+            path, _, value = term.replace("==", "=").partition("=")
+            if _field_value(obj, path.strip()) != value.strip():
+                return False
+    return True
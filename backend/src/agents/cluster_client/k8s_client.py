@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
 import time
 from datetime import datetime, timezone
@@ -10,6 +12,13 @@ from functools import partial
 from typing import Any, Optional
 
 from src.agents.cluster_client.base import ClusterClient, QueryResult, OBJECT_CAPS
+from src.agents.cluster_client.informer import (
+    POD_INDEXERS,
+    InformerGroup,
+    acquire_group,
+    match_field_selector,
+    release_group,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +47,29 @@ class KubernetesClient(ClusterClient):
         Path to kubeconfig file (used if api_url/token not provided)
     """
 
-    # Cache topology for 60 seconds
+    # Reuse a topology snapshot for up to 60 seconds while the informer
+    # stores it was built from are unchanged.
     _TOPOLOGY_TTL = 60
 
+    _TOPOLOGY_KINDS = ("nodes", "pods", "deployments", "replicasets")
+
+    # Kinds served from the shared informer cache:
+    # kind -> (api, all-namespaces list method, namespaced list method)
+    _INFORMER_KINDS: dict[str, tuple[str, str, str]] = {
+        "namespaces": ("core", "list_namespace", ""),
+        "nodes": ("core", "list_node", ""),
+        "pods": ("core", "list_pod_for_all_namespaces", "list_namespaced_pod"),
+        "events": ("core", "list_event_for_all_namespaces", "list_namespaced_event"),
+        "pvcs": ("core", "list_persistent_volume_claim_for_all_namespaces",
+                 "list_namespaced_persistent_volume_claim"),
+        "services": ("core", "list_service_for_all_namespaces", "list_namespaced_service"),
+        "endpoints": ("core", "list_endpoints_for_all_namespaces", "list_namespaced_endpoints"),
+        "deployments": ("apps", "list_deployment_for_all_namespaces", "list_namespaced_deployment"),
+        "replicasets": ("apps", "list_replica_set_for_all_namespaces", "list_namespaced_replica_set"),
+        "statefulsets": ("apps", "list_stateful_set_for_all_namespaces", "list_namespaced_stateful_set"),
+        "daemonsets": ("apps", "list_daemon_set_for_all_namespaces", "list_namespaced_daemon_set"),
+    }
+
     def __init__(
         self,
         api_url: str = "",
@@ -63,6 +92,8 @@ class KubernetesClient(ClusterClient):
         self._platform: Optional[str] = None
         self._topology_cache: Optional[Any] = None
         self._topology_cache_ts: float = 0
+        self._topology_cache_rev: tuple = ()
+        self._informers: Optional[InformerGroup] = None
 
     def _ensure_client(self) -> None:
         """Lazily initialize the K8s API client."""
@@ -93,6 +124,64 @@ class KubernetesClient(ClusterClient):
         loop = asyncio.get_running_loop()
         return await loop.run_in_executor(None, partial(func, *args, **kwargs))
 
+    def _cluster_key(self) -> str:
+        """Identity the informer cache is shared under: API server + credentials."""
+        cfg = self._api_client.configuration
+        ident = "|".join(str(v or "") for v in (
+            cfg.host,
+            (cfg.api_key or {}).get("authorization"),
+            cfg.cert_file,
+            cfg.key_file,
+            cfg.username,
+        ))
+        return hashlib.sha256(ident.encode()).hexdigest()
+
+    def _informer_group(self) -> InformerGroup:
+        self._ensure_client()
+        if self._informers is None:
+            group = acquire_group(self._cluster_key())
+            if group.api_client is None:
+                group.api_client = client.ApiClient(self._api_client.configuration)
+            self._informers = group
+        return self._informers
+
+    @staticmethod
+    def _api(api_name: str, api_client: Any) -> Any:
+        if api_name == "apps":
+            return client.AppsV1Api(api_client)
+        return client.CoreV1Api(api_client)
+
+    async def _list_raw(self, kind: str, namespace: str = "", field_selector: str = "") -> list[dict]:
+        """Raw JSON objects of ``kind``, served from the shared informer cache.
+
+        An identity that may not list across all namespaces gets a 403 from
+        the informer; namespaced reads then fall back to a direct, paged
+        raw list of that namespace.
+        """
+        api_name, method, namespaced_method = self._INFORMER_KINDS[kind]
+        group = self._informer_group()
+        try:
+            informer = await group.get(
+                kind,
+                getattr(self._api(api_name, group.api_client), method),
+                POD_INDEXERS if kind == "pods" else None,
+            )
+            items = informer.items(namespace)
+        except ApiException as e:
+            if e.status != 403 or not namespace or not namespaced_method:
+                raise
+            from src.agents.k8s_pagination import list_all
+            list_fn = getattr(self._api(api_name, self._api_client), namespaced_method)
+
+            async def _page(**kwargs):
+                resp = await self._run_sync(list_fn, namespace, _preload_content=False, **kwargs)
+                return json.loads(resp.data)
+
+            items = await list_all(_page, limit=500)
+        if field_selector:
+            items = [o for o in items if match_field_selector(o, field_selector)]
+        return items
+
     async def detect_platform(self) -> dict[str, str]:
         self._ensure_client()
         try:
@@ -120,10 +209,9 @@ class KubernetesClient(ClusterClient):
             return {"platform": "kubernetes", "version": "unknown"}
 
     async def list_namespaces(self) -> QueryResult:
-        self._ensure_client()
         try:
-            result = await self._run_sync(self._core_api.list_namespace)
-            ns_names = [ns.metadata.name for ns in result.items]
+            items = await self._list_raw("namespaces")
+            ns_names = [ns["metadata"]["name"] for ns in items]
             return QueryResult(
                 data=ns_names,
                 total_available=len(ns_names),
@@ -136,31 +224,33 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_nodes(self) -> QueryResult:
-        self._ensure_client()
         try:
-            result = await self._run_sync(self._core_api.list_node)
+            items = await self._list_raw("nodes")
             cap = OBJECT_CAPS["nodes"]
             nodes = []
-            for node in result.items[:cap]:
-                conditions = {c.type: c.status for c in (node.status.conditions or [])}
+            for node in items[:cap]:
+                meta = node["metadata"]
+                status = node.get("status") or {}
+                conditions = {c["type"]: c["status"] for c in (status.get("conditions") or [])}
+                capacity = status.get("capacity") or {}
                 nodes.append({
-                    "name": node.metadata.name,
+                    "name": meta["name"],
                     "status": "Ready" if conditions.get("Ready") == "True" else "NotReady",
                     "roles": ",".join(
                         k.replace("node-role.kubernetes.io/", "")
-                        for k in (node.metadata.labels or {})
+                        for k in (meta.get("labels") or {})
                         if k.startswith("node-role.kubernetes.io/")
                     ) or "worker",
-                    "version": node.status.node_info.kubelet_version if node.status.node_info else "",
-                    "cpu_capacity": node.status.capacity.get("cpu", "") if node.status.capacity else "",
-                    "memory_capacity": node.status.capacity.get("memory", "") if node.status.capacity else "",
+                    "version": (status.get("nodeInfo") or {}).get("kubeletVersion", ""),
+                    "cpu_capacity": capacity.get("cpu", ""),
+                    "memory_capacity": capacity.get("memory", ""),
                     "disk_pressure": conditions.get("DiskPressure") == "True",
                     "memory_pressure": conditions.get("MemoryPressure") == "True",
                 })
-            truncated = len(result.items) > cap
+            truncated = len(items) > cap
             return QueryResult(
                 data=nodes,
-                total_available=len(result.items),
+                total_available=len(items),
                 returned=len(nodes),
                 truncated=truncated,
             )
@@ -170,82 +260,74 @@ class KubernetesClient(ClusterClient):
                 return QueryResult(permission_denied=True, denied_resource="nodes")
             return QueryResult()
 
+    @staticmethod
+    def _pod_phase(pod: dict) -> str:
+        """Pod phase, overridden by the first waiting container's reason."""
+        status = pod.get("status") or {}
+        phase = status.get("phase") or "Unknown"
+        for cs in (status.get("containerStatuses") or []):
+            waiting = (cs.get("state") or {}).get("waiting")
+            if waiting:
+                return waiting.get("reason") or phase
+        return phase
+
     async def list_pods(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            # K.8 extension — list_all walks every continue-token page so
-            # large clusters aren't silently truncated to the default
-            # 500-item per-call limit. OBJECT_CAPS still applies at the
+            # Served from the informer cache, which holds every pod (no
+            # 500-item page truncation). OBJECT_CAPS still applies at the
             # return layer (after priority-sort) so the shape clients
             # receive is unchanged.
-            from src.agents.k8s_pagination import list_all
-            if namespace:
-                all_items = await list_all(
-                    self._core_api.list_namespaced_pod,
-                    limit=500,
-                    namespace=namespace,
-                )
-            else:
-                all_items = await list_all(
-                    self._core_api.list_pod_for_all_namespaces,
-                    limit=500,
-                )
+            all_items = await self._list_raw("pods", namespace)
             cap = OBJECT_CAPS["pods"]
             # Prioritize unhealthy pods before truncation
             _STATUS_PRIORITY = {
                 "CrashLoopBackOff": 0, "Error": 0, "Failed": 0, "OOMKilled": 0,
                 "ImagePullBackOff": 1, "Pending": 2, "Running": 3, "Succeeded": 4,
             }
-            def _pod_sort_key(p):
-                phase = p.status.phase or "Unknown"
-                for cs in (p.status.container_statuses or []):
-                    if cs.state and cs.state.waiting:
-                        phase = cs.state.waiting.reason or phase
-                        break
-                return _STATUS_PRIORITY.get(phase, 3)
-            sorted_items = sorted(all_items, key=_pod_sort_key)
+            phased = sorted(
+                ((self._pod_phase(p), p) for p in all_items),
+                key=lambda pp: _STATUS_PRIORITY.get(pp[0], 3),
+            )
             pods = []
-            for pod in sorted_items[:cap]:
-                container_statuses = pod.status.container_statuses or []
-                restarts = sum(cs.restart_count for cs in container_statuses)
-                # Determine effective status
-                phase = pod.status.phase or "Unknown"
-                for cs in container_statuses:
-                    if cs.state and cs.state.waiting:
-                        phase = cs.state.waiting.reason or phase
-                        break
+            for phase, pod in phased[:cap]:
+                meta = pod["metadata"]
+                spec = pod.get("spec") or {}
+                container_statuses = (pod.get("status") or {}).get("containerStatuses") or []
+                restarts = sum(cs.get("restartCount", 0) for cs in container_statuses)
                 # Aggregate resource requests/limits across all containers
                 total_requests: dict[str, str] = {"cpu": "", "memory": ""}
                 total_limits: dict[str, str] = {"cpu": "", "memory": ""}
                 has_requests = False
                 has_limits = False
-                for container in (pod.spec.containers or []):
-                    if container.resources:
-                        if container.resources.requests:
-                            has_requests = True
-                            total_requests["cpu"] = container.resources.requests.get("cpu", "") or total_requests["cpu"]
-                            total_requests["memory"] = container.resources.requests.get("memory", "") or total_requests["memory"]
-                        if container.resources.limits:
-                            has_limits = True
-                            total_limits["cpu"] = container.resources.limits.get("cpu", "") or total_limits["cpu"]
-                            total_limits["memory"] = container.resources.limits.get("memory", "") or total_limits["memory"]
+                for container in (spec.get("containers") or []):
+                    resources = container.get("resources") or {}
+                    requests = resources.get("requests")
+                    limits = resources.get("limits")
+                    if requests:
+                        has_requests = True
+                        total_requests["cpu"] = requests.get("cpu", "") or total_requests["cpu"]
+                        total_requests["memory"] = requests.get("memory", "") or total_requests["memory"]
+                    if limits:
+                        has_limits = True
+                        total_limits["cpu"] = limits.get("cpu", "") or total_limits["cpu"]
+                        total_limits["memory"] = limits.get("memory", "") or total_limits["memory"]
 
                 pods.append({
-                    "name": pod.metadata.name,
-                    "namespace": pod.metadata.namespace,
+                    "name": meta["name"],
+                    "namespace": meta.get("namespace", ""),
                     "status": phase,
-                    "node": pod.spec.node_name or "",
+                    "node": spec.get("nodeName") or "",
                     "restarts": restarts,
-                    "age": pod.metadata.creation_timestamp.isoformat() if pod.metadata.creation_timestamp else "",
+                    "age": meta.get("creationTimestamp") or "",
                     "resources": {
                         "requests": total_requests if has_requests else {},
                         "limits": total_limits if has_limits else {},
                     },
                 })
-            truncated = len(result.items) > cap
+            truncated = len(all_items) > cap
             return QueryResult(
                 data=pods,
-                total_available=len(result.items),
+                total_available=len(all_items),
                 returned=len(pods),
                 truncated=truncated,
             )
@@ -256,43 +338,33 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_events(self, namespace: str = "", field_selector: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            kwargs = {}
-            if field_selector:
-                kwargs["field_selector"] = field_selector
-            if namespace:
-                result = await self._run_sync(
-                    self._core_api.list_namespaced_event, namespace, **kwargs
-                )
-            else:
-                result = await self._run_sync(
-                    self._core_api.list_event_for_all_namespaces, **kwargs
-                )
+            items = await self._list_raw("events", namespace, field_selector)
             cap = OBJECT_CAPS["events"]
             # Prioritize: Warning events first, then Normal, sorted by timestamp
             sorted_events = sorted(
-                result.items,
+                items,
                 key=lambda e: (
-                    0 if e.type == "Warning" else 1,
-                    e.last_timestamp.isoformat() if e.last_timestamp else "",
+                    0 if e.get("type") == "Warning" else 1,
+                    e.get("lastTimestamp") or "",
                 ),
             )
             events = []
             for ev in sorted_events[:cap]:
+                involved = ev.get("involvedObject")
                 events.append({
-                    "type": ev.type or "Normal",
-                    "reason": ev.reason or "",
-                    "message": ev.message or "",
-                    "namespace": ev.metadata.namespace or "",
-                    "involved_object": f"{ev.involved_object.kind}/{ev.involved_object.name}" if ev.involved_object else "",
-                    "count": ev.count or 1,
-                    "last_timestamp": ev.last_timestamp.isoformat() if ev.last_timestamp else "",
+                    "type": ev.get("type") or "Normal",
+                    "reason": ev.get("reason") or "",
+                    "message": ev.get("message") or "",
+                    "namespace": ev["metadata"].get("namespace") or "",
+                    "involved_object": f"{involved.get('kind')}/{involved.get('name')}" if involved else "",
+                    "count": ev.get("count") or 1,
+                    "last_timestamp": ev.get("lastTimestamp") or "",
                 })
-            truncated = len(result.items) > cap
+            truncated = len(items) > cap
             return QueryResult(
                 data=events,
-                total_available=len(result.items),
+                total_available=len(items),
                 returned=len(events),
                 truncated=truncated,
             )
@@ -303,31 +375,25 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_pvcs(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            if namespace:
-                result = await self._run_sync(
-                    self._core_api.list_namespaced_persistent_volume_claim, namespace
-                )
-            else:
-                result = await self._run_sync(
-                    self._core_api.list_persistent_volume_claim_for_all_namespaces
-                )
+            items = await self._list_raw("pvcs", namespace)
             cap = OBJECT_CAPS["pvcs"]
             pvcs = []
-            for pvc in result.items[:cap]:
+            for pvc in items[:cap]:
+                spec = pvc.get("spec") or {}
+                status = pvc.get("status")
                 pvcs.append({
-                    "name": pvc.metadata.name,
-                    "namespace": pvc.metadata.namespace,
-                    "status": pvc.status.phase if pvc.status else "Unknown",
-                    "capacity": (pvc.status.capacity or {}).get("storage", "") if pvc.status else "",
-                    "storage_class": pvc.spec.storage_class_name or "",
-                    "access_modes": pvc.spec.access_modes or [],
+                    "name": pvc["metadata"]["name"],
+                    "namespace": pvc["metadata"].get("namespace", ""),
+                    "status": status.get("phase") if status else "Unknown",
+                    "capacity": (status.get("capacity") or {}).get("storage", "") if status else "",
+                    "storage_class": spec.get("storageClassName") or "",
+                    "access_modes": spec.get("accessModes") or [],
                 })
-            truncated = len(result.items) > cap
+            truncated = len(items) > cap
             return QueryResult(
                 data=pvcs,
-                total_available=len(result.items),
+                total_available=len(items),
                 returned=len(pvcs),
                 truncated=truncated,
             )
@@ -337,32 +403,35 @@ class KubernetesClient(ClusterClient):
                 return QueryResult(permission_denied=True, denied_resource="persistentvolumeclaims")
             return QueryResult()
 
+    @staticmethod
+    def _conditions(status: dict) -> dict[str, dict[str, str]]:
+        return {
+            c["type"]: {"status": c.get("status"), "reason": c.get("reason") or "", "message": c.get("message") or ""}
+            for c in (status.get("conditions") or [])
+        }
+
     async def list_deployments(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            if namespace:
-                result = await self._run_sync(self._apps_api.list_namespaced_deployment, namespace)
-            else:
-                result = await self._run_sync(self._apps_api.list_deployment_for_all_namespaces)
+            items = await self._list_raw("deployments", namespace)
             deployments = []
-            for dep in result.items:
-                ready = dep.status.ready_replicas or 0
-                desired = dep.spec.replicas or 0
-                conditions = {
-                    c.type: {"status": c.status, "reason": c.reason or "", "message": c.message or ""}
-                    for c in (dep.status.conditions or [])
-                }
+            for dep in items:
+                meta = dep["metadata"]
+                spec = dep.get("spec") or {}
+                status = dep.get("status") or {}
+                ready = status.get("readyReplicas") or 0
+                desired = spec.get("replicas") or 0
+                conditions = self._conditions(status)
                 deployments.append({
-                    "name": dep.metadata.name,
-                    "namespace": dep.metadata.namespace,
+                    "name": meta["name"],
+                    "namespace": meta.get("namespace", ""),
                     "replicas_desired": desired,
                     "replicas_ready": ready,
-                    "replicas_available": dep.status.available_replicas or 0,
-                    "replicas_updated": dep.status.updated_replicas or 0,
-                    "strategy": dep.spec.strategy.type if dep.spec.strategy else "RollingUpdate",
+                    "replicas_available": status.get("availableReplicas") or 0,
+                    "replicas_updated": status.get("updatedReplicas") or 0,
+                    "strategy": (spec.get("strategy") or {}).get("type") or "RollingUpdate",
                     "conditions": conditions,
                     "stuck_rollout": ready < desired and conditions.get("Progressing", {}).get("status") == "False",
-                    "age": dep.metadata.creation_timestamp.isoformat() if dep.metadata.creation_timestamp else "",
+                    "age": meta.get("creationTimestamp") or "",
                 })
             return QueryResult(data=deployments, total_available=len(deployments), returned=len(deployments))
         except ApiException as e:
@@ -372,31 +441,26 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_statefulsets(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            if namespace:
-                result = await self._run_sync(self._apps_api.list_namespaced_stateful_set, namespace)
-            else:
-                result = await self._run_sync(self._apps_api.list_stateful_set_for_all_namespaces)
+            items = await self._list_raw("statefulsets", namespace)
             statefulsets = []
-            for sts in result.items:
-                ready = sts.status.ready_replicas or 0
-                desired = sts.spec.replicas or 0
-                conditions = {
-                    c.type: {"status": c.status, "reason": c.reason or "", "message": c.message or ""}
-                    for c in (sts.status.conditions or [])
-                }
+            for sts in items:
+                meta = sts["metadata"]
+                spec = sts.get("spec") or {}
+                status = sts.get("status") or {}
+                ready = status.get("readyReplicas") or 0
+                desired = spec.get("replicas") or 0
                 statefulsets.append({
-                    "name": sts.metadata.name,
-                    "namespace": sts.metadata.namespace,
+                    "name": meta["name"],
+                    "namespace": meta.get("namespace", ""),
                     "replicas_desired": desired,
                     "replicas_ready": ready,
-                    "replicas_current": sts.status.current_replicas or 0,
-                    "replicas_updated": sts.status.updated_replicas or 0,
-                    "ordinal_start": sts.spec.ordinals.start if sts.spec.ordinals else 0,
-                    "conditions": conditions,
+                    "replicas_current": status.get("currentReplicas") or 0,
+                    "replicas_updated": status.get("updatedReplicas") or 0,
+                    "ordinal_start": (spec.get("ordinals") or {}).get("start", 0),
+                    "conditions": self._conditions(status),
                     "stuck_rollout": ready < desired,
-                    "age": sts.metadata.creation_timestamp.isoformat() if sts.metadata.creation_timestamp else "",
+                    "age": meta.get("creationTimestamp") or "",
                 })
             return QueryResult(data=statefulsets, total_available=len(statefulsets), returned=len(statefulsets))
         except ApiException as e:
@@ -406,25 +470,21 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_daemonsets(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            if namespace:
-                result = await self._run_sync(self._apps_api.list_namespaced_daemon_set, namespace)
-            else:
-                result = await self._run_sync(self._apps_api.list_daemon_set_for_all_namespaces)
+            items = await self._list_raw("daemonsets", namespace)
             daemonsets = []
-            for ds in result.items:
-                desired = ds.status.desired_number_scheduled or 0
-                ready = ds.status.number_ready or 0
+            for ds in items:
+                meta = ds["metadata"]
+                status = ds.get("status") or {}
                 daemonsets.append({
-                    "name": ds.metadata.name,
-                    "namespace": ds.metadata.namespace,
-                    "desired_number_scheduled": desired,
-                    "number_ready": ready,
-                    "number_unavailable": ds.status.number_unavailable or 0,
-                    "number_misscheduled": ds.status.number_misscheduled or 0,
-                    "updated_number_scheduled": ds.status.updated_number_scheduled or 0,
-                    "age": ds.metadata.creation_timestamp.isoformat() if ds.metadata.creation_timestamp else "",
+                    "name": meta["name"],
+                    "namespace": meta.get("namespace", ""),
+                    "desired_number_scheduled": status.get("desiredNumberScheduled") or 0,
+                    "number_ready": status.get("numberReady") or 0,
+                    "number_unavailable": status.get("numberUnavailable") or 0,
+                    "number_misscheduled": status.get("numberMisscheduled") or 0,
+                    "updated_number_scheduled": status.get("updatedNumberScheduled") or 0,
+                    "age": meta.get("creationTimestamp") or "",
                 })
             return QueryResult(data=daemonsets, total_available=len(daemonsets), returned=len(daemonsets))
         except ApiException as e:
@@ -520,40 +580,35 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_services(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            if namespace:
-                result = await self._run_sync(
-                    self._core_api.list_namespaced_service, namespace
-                )
-            else:
-                result = await self._run_sync(
-                    self._core_api.list_service_for_all_namespaces
-                )
+            items = await self._list_raw("services", namespace)
             services = []
-            for svc in result.items:
+            for svc in items:
+                spec = svc.get("spec") or {}
                 ports = []
-                for p in (svc.spec.ports or []):
+                for p in (spec.get("ports") or []):
+                    target_port = p.get("targetPort")
                     ports.append({
-                        "port": p.port,
-                        "target_port": str(p.target_port) if p.target_port else "",
-                        "protocol": p.protocol or "TCP",
-                        "name": p.name or "",
+                        "port": p.get("port"),
+                        "target_port": str(target_port) if target_port else "",
+                        "protocol": p.get("protocol") or "TCP",
+                        "name": p.get("name") or "",
                     })
                 external_ip = ""
-                if svc.spec.type == "LoadBalancer" and svc.status and svc.status.load_balancer:
-                    ingress_list = svc.status.load_balancer.ingress or []
+                load_balancer = (svc.get("status") or {}).get("loadBalancer")
+                if spec.get("type") == "LoadBalancer" and load_balancer is not None:
+                    ingress_list = load_balancer.get("ingress") or []
                     if ingress_list:
-                        external_ip = ingress_list[0].ip or ingress_list[0].hostname or ""
+                        external_ip = ingress_list[0].get("ip") or ingress_list[0].get("hostname") or ""
                     else:
                         external_ip = "<Pending>"
                 services.append({
-                    "name": svc.metadata.name,
-                    "namespace": svc.metadata.namespace,
-                    "type": svc.spec.type or "ClusterIP",
-                    "cluster_ip": svc.spec.cluster_ip or "",
+                    "name": svc["metadata"]["name"],
+                    "namespace": svc["metadata"].get("namespace", ""),
+                    "type": spec.get("type") or "ClusterIP",
+                    "cluster_ip": spec.get("clusterIP") or "",
                     "ports": ports,
-                    "selector": dict(svc.spec.selector) if svc.spec.selector else {},
+                    "selector": dict(spec.get("selector") or {}),
                     "external_ip": external_ip,
                 })
             return QueryResult(
@@ -568,34 +623,24 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def list_endpoints(self, namespace: str = "") -> QueryResult:
-        self._ensure_client()
         try:
-            if namespace:
-                result = await self._run_sync(
-                    self._core_api.list_namespaced_endpoints, namespace
-                )
-            else:
-                result = await self._run_sync(
-                    self._core_api.list_endpoints_for_all_namespaces
-                )
+            items = await self._list_raw("endpoints", namespace)
             endpoints = []
-            for ep in result.items:
+            for ep in items:
                 subsets_info = []
-                for subset in (ep.subsets or []):
-                    addresses_count = len(subset.addresses or [])
-                    not_ready_count = len(subset.not_ready_addresses or [])
+                for subset in (ep.get("subsets") or []):
                     ports = [
-                        {"port": p.port, "protocol": p.protocol or "TCP", "name": p.name or ""}
-                        for p in (subset.ports or [])
+                        {"port": p.get("port"), "protocol": p.get("protocol") or "TCP", "name": p.get("name") or ""}
+                        for p in (subset.get("ports") or [])
                     ]
                     subsets_info.append({
-                        "addresses_count": addresses_count,
-                        "not_ready_addresses_count": not_ready_count,
+                        "addresses_count": len(subset.get("addresses") or []),
+                        "not_ready_addresses_count": len(subset.get("notReadyAddresses") or []),
                         "ports": ports,
                     })
                 endpoints.append({
-                    "name": ep.metadata.name,
-                    "namespace": ep.metadata.namespace,
+                    "name": ep["metadata"]["name"],
+                    "namespace": ep["metadata"].get("namespace", ""),
                     "subsets": subsets_info,
                     "total_ready_addresses": sum(s["addresses_count"] for s in subsets_info),
                     "total_not_ready_addresses": sum(s["not_ready_addresses_count"] for s in subsets_info),
@@ -1245,20 +1290,20 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def get_node_os_info(self) -> QueryResult:
-        self._ensure_client()
         try:
-            result = await self._run_sync(self._core_api.list_node)
+            items = await self._list_raw("nodes")
             nodes = []
-            for node in result.items:
-                info = node.status.node_info if node.status else None
+            for node in items:
+                meta = node["metadata"]
+                info = (node.get("status") or {}).get("nodeInfo") or {}
                 nodes.append({
-                    "name": node.metadata.name,
-                    "kernel_version": info.kernel_version if info else "",
-                    "os_image": info.os_image if info else "",
-                    "container_runtime": info.container_runtime_version if info else "",
-                    "kubelet_version": info.kubelet_version if info else "",
-                    "creation_timestamp": node.metadata.creation_timestamp.isoformat() if node.metadata.creation_timestamp else "",
-                    "labels": dict(node.metadata.labels or {}),
+                    "name": meta["name"],
+                    "kernel_version": info.get("kernelVersion", ""),
+                    "os_image": info.get("osImage", ""),
+                    "container_runtime": info.get("containerRuntimeVersion", ""),
+                    "kubelet_version": info.get("kubeletVersion", ""),
+                    "creation_timestamp": meta.get("creationTimestamp") or "",
+                    "labels": dict(meta.get("labels") or {}),
                 })
             return QueryResult(data=nodes, total_available=len(nodes), returned=len(nodes))
         except ApiException as e:
@@ -1305,9 +1350,19 @@ class KubernetesClient(ClusterClient):
             return QueryResult()
 
     async def build_topology_snapshot(self) -> "TopologySnapshot":
-        """Build resource topology from live cluster state with TTL caching."""
+        """Build resource topology from the informer cache.
+
+        The snapshot is rebuilt when any informer store it reads has changed
+        (and at least every ``_TOPOLOGY_TTL`` seconds, for OpenShift
+        operators which are not watched).
+        """
         now = time.monotonic()
-        if self._topology_cache and (now - self._topology_cache_ts) < self._TOPOLOGY_TTL:
+        group = self._informer_group()
+        if (
+            self._topology_cache
+            and self._topology_cache_rev == group.revisions(*self._TOPOLOGY_KINDS)
+            and (now - self._topology_cache_ts) < self._TOPOLOGY_TTL
+        ):
             return self._topology_cache
 
         from src.agents.cluster.state import TopologySnapshot, TopologyNode, TopologyEdge
@@ -1338,27 +1393,36 @@ class KubernetesClient(ClusterClient):
                     from_key=f"node/{node_name}", to_key=key, relation="hosts"
                 ))
 
-        # Deployments -> ReplicaSets -> Pods (if apps API available)
+        # Deployments -> ReplicaSets -> Pods via the owner-reference index
         try:
-            deploy_result = await self._run_sync(
-                self._apps_api.list_deployment_for_all_namespaces
+            api = self._api("apps", group.api_client)
+            deployments = await group.get(
+                "deployments", api.list_deployment_for_all_namespaces
+            )
+            replicasets = await group.get(
+                "replicasets", api.list_replica_set_for_all_namespaces
+            )
+            pods = group.informer(
+                "pods", self._api("core", group.api_client).list_pod_for_all_namespaces, POD_INDEXERS
             )
-            for dep in deploy_result.items:
-                ns = dep.metadata.namespace
-                key = f"deployment/{ns}/{dep.metadata.name}"
-                ready = dep.status.ready_replicas or 0
-                desired = dep.spec.replicas or 0
+            for dep in deployments.items():
+                meta = dep["metadata"]
+                ns = meta.get("namespace", "")
+                key = f"deployment/{ns}/{meta['name']}"
+                ready = (dep.get("status") or {}).get("readyReplicas") or 0
+                desired = (dep.get("spec") or {}).get("replicas") or 0
                 status = "Available" if ready >= desired else "Degraded"
                 topo_nodes[key] = TopologyNode(
-                    kind="deployment", name=dep.metadata.name,
+                    kind="deployment", name=meta["name"],
                     namespace=ns, status=status,
                 )
-                # Link deployment to its pods via label selector
-                for pod_key, pod_node in topo_nodes.items():
-                    if pod_node.kind == "pod" and pod_node.namespace == ns:
-                        edges.append(TopologyEdge(
-                            from_key=key, to_key=pod_key, relation="manages"
-                        ))
+                for rs in replicasets.by_index("owner", meta.get("uid", "")):
+                    for pod in pods.by_index("owner", rs["metadata"].get("uid", "")):
+                        pod_key = f"pod/{ns}/{pod['metadata']['name']}"
+                        if pod_key in topo_nodes:
+                            edges.append(TopologyEdge(
+                                from_key=key, to_key=pod_key, relation="manages"
+                            ))
         except Exception:
             pass  # Apps API may not be available
 
@@ -1381,9 +1445,13 @@ class KubernetesClient(ClusterClient):
         )
         self._topology_cache = snapshot
         self._topology_cache_ts = now
+        self._topology_cache_rev = group.revisions(*self._TOPOLOGY_KINDS)
         return snapshot
 
     async def close(self) -> None:
+        if self._informers is not None:
+            release_group(self._informers)
+            self._informers = None
         if self._api_client:
             try:
                 await self._run_sync(self._api_client.close)
@@ -1,11 +1,10 @@
 import json
 import re
-import hashlib
 from collections import defaultdict
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-import requests
+import httpx
 
 from src.models.schemas import (
     ErrorPattern, LogEvidence, LogAnalysisResult,
@@ -13,6 +12,9 @@ from src.models.schemas import (
 )
 from src.utils.llm_client import AnthropicClient
 from src.utils.event_emitter import EventEmitter
+from src.agents.log_pattern_index import PatternIndex
+from src.integrations import http_clients
+from src.utils.log_templates import APP_LOG_MASKS, TemplateMiner
 from src.utils.logger import get_logger
 from src.prompts.sanitize import quote_user_text
 from src.agents.critic_agent import StructuredOutputRequired
@@ -23,6 +25,8 @@ logger = get_logger(__name__)
 
 ES_MAX_RESULTS = int(os.getenv("ES_MAX_RESULTS", "5000"))
 
+_EXCEPTION_NAME_RE = re.compile(r'([A-Z][a-zA-Z]*(?:Exception|Error|Timeout|Failure))')
+
 
 # Task 1.10: structured output via Anthropic tool-use. Replaces the
 # regex `\{[\s\S]*\}` extraction path, which silently defaulted to
@@ -153,6 +157,11 @@ class LogAnalysisAgent:
         self._raw_logs: list[dict] = []
         self._seen_log_ids: set[str] = set()
         self._patterns: list[dict] = []
+        # Fed by _search_elasticsearch as each response page arrives.
+        self._pattern_index = PatternIndex(self._pattern_key_for)
+        # (list object, count) of the _raw_logs prefix already in the index.
+        self._pattern_cursor: tuple[list[dict], int] = (self._raw_logs, 0)
+        self._template_miner = TemplateMiner(APP_LOG_MASKS, sim_threshold=0.6)
         self._service_flow: list[dict] = []
         self._event_emitter: EventEmitter | None = None
         # TracingAgent handoff — populated by `_apply_tracing_handoff()` when
@@ -246,6 +255,15 @@ class LogAnalysisAgent:
             headers["Authorization"] = f"Basic {base64.b64encode(credentials.encode()).decode()}"
         return headers
 
+    async def _es_request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send on the shared Elasticsearch pool, behind its concurrency gate."""
+        return await http_clients.request(
+            "elasticsearch", method, f"{self.es_url}{path}",
+            headers=self._es_headers,
+            verify=self._verify_ssl,
+            **kwargs,
+        )
+
     def _get_field(self, source: dict, *keys: str, join_list: bool = False):
         """Check multiple field names, supporting dot-notation for nested dicts.
 
@@ -537,7 +555,9 @@ class LogAnalysisAgent:
                     "Grouping logs into error patterns...",
                     details={"tool": "analyze_patterns"},
                 )
-            self._patterns = self._parse_patterns_from_logs(self._raw_logs)
+            # Search pages were indexed as they arrived; only logs placed in
+            # _raw_logs some other way still need adding.
+            self._patterns = self._summarize_patterns(self._sync_pattern_index())
             logger.info("Patterns grouped", extra={"agent_name": self.agent_name, "action": "patterns_grouped", "extra": {"pattern_count": len(self._patterns), "total_logs": len(self._raw_logs)}})
             self.add_breadcrumb(
                 action="analyzed_patterns",
@@ -676,6 +696,10 @@ class LogAnalysisAgent:
                     details={"tool": "search_elasticsearch", "index": "*"},
                 )
             raw_log_count_before = len(self._raw_logs)
+            primary_index = self._sync_pattern_index()
+            # Blast radius hits go into a throwaway index, not the primary one.
+            self._pattern_index = PatternIndex(self._pattern_key_for)
+            self._pattern_cursor = (self._raw_logs, raw_log_count_before)
             await self._search_elasticsearch({
                 "index": "*",
                 "query": "*",
@@ -687,6 +711,9 @@ class LogAnalysisAgent:
             # Slice off blast radius logs from _raw_logs to avoid polluting primary data
             all_blast_logs = self._raw_logs[raw_log_count_before:]
             self._raw_logs = self._raw_logs[:raw_log_count_before]
+            # The new list is exactly the prefix primary_index was fed from.
+            self._pattern_index = primary_index
+            self._pattern_cursor = (self._raw_logs, raw_log_count_before)
 
             # Filter out target service logs from blast radius
             target_lower = target_service.lower() if target_service else ""
@@ -868,12 +895,7 @@ class LogAnalysisAgent:
     async def _check_index_exists(self, index: str) -> bool:
         """Check if an index exists in Elasticsearch."""
         try:
-            resp = requests.head(
-                f"{self.es_url}/{index}",
-                headers=self._es_headers,
-                timeout=10,
-                verify=self._verify_ssl,
-            )
+            resp = await self._es_request("HEAD", f"/{index}", timeout=10)
             return resp.status_code == 200
         except Exception:
             return False
@@ -1599,12 +1621,8 @@ Respond with JSON only. No markdown fences."""
             return json.dumps({"error": f"unsafe_elk_query: {e}", "total": 0, "logs": []})
 
         try:
-            resp = requests.post(
-                f"{self.es_url}/{index}/_search",
-                json=es_query,
-                headers=self._es_headers,
-                timeout=30,
-                verify=self._verify_ssl,
+            resp = await self._es_request(
+                "POST", f"/{index}/_search", json=es_query, timeout=30,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -1629,6 +1647,7 @@ Respond with JSON only. No markdown fences."""
                 log_entry = self._extract_log_entry(hit)
                 logs.append(log_entry)
                 self._raw_logs.append(log_entry)
+                self._sync_pattern_index()
 
             self.add_breadcrumb(
                 action=f"searched_elasticsearch_{level_filter}",
@@ -1650,7 +1669,7 @@ Respond with JSON only. No markdown fences."""
                 result_text += f"\n[Showing newest {ES_MAX_RESULTS} of ~{total_hits} matching logs. Sorted newest-first.]"
             return result_text
 
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             logger.warning("ES connection failed", extra={"agent_name": self.agent_name, "action": "es_error", "extra": f"Cannot connect to {self.es_url}"})
             if self._event_emitter:
                 await self._event_emitter.emit(
@@ -1712,12 +1731,8 @@ Respond with JSON only. No markdown fences."""
             return json.dumps({"error": f"unsafe_elk_query: {e}", "total": 0, "logs": []})
 
         try:
-            resp = requests.post(
-                f"{self.es_url}/{index}/_search",
-                json=es_query,
-                headers=self._es_headers,
-                timeout=30,
-                verify=self._verify_ssl,
+            resp = await self._es_request(
+                "POST", f"/{index}/_search", json=es_query, timeout=30,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -1914,12 +1929,8 @@ Respond with JSON only. No markdown fences."""
                 es_query["query"]["bool"]["should"].append({"match": {"traceId": tid}})
 
         try:
-            resp = requests.post(
-                f"{self.es_url}/{index}/_search",
-                json=es_query,
-                headers=self._es_headers,
-                timeout=30,
-                verify=self._verify_ssl,
+            resp = await self._es_request(
+                "POST", f"/{index}/_search", json=es_query, timeout=30,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -1947,12 +1958,10 @@ Respond with JSON only. No markdown fences."""
         """List Elasticsearch indices matching a pattern."""
         pattern = params.get("pattern", "*")
         try:
-            resp = requests.get(
-                f"{self.es_url}/_cat/indices/{pattern}",
+            resp = await self._es_request(
+                "GET", f"/_cat/indices/{pattern}",
                 params={"format": "json", "h": "index,docs.count,store.size,health,status"},
-                headers=self._es_headers,
                 timeout=15,
-                verify=self._verify_ssl,
             )
             resp.raise_for_status()
             indices = resp.json()
@@ -1972,7 +1981,7 @@ Respond with JSON only. No markdown fences."""
                 "indices": visible[:50],
             })
 
-        except requests.exceptions.ConnectionError:
+        except httpx.ConnectError:
             logger.warning("ES connection failed", extra={"agent_name": self.agent_name, "action": "es_error", "extra": f"Cannot connect to {self.es_url}"})
             if self._event_emitter:
                 await self._event_emitter.emit(
@@ -1983,99 +1992,74 @@ Respond with JSON only. No markdown fences."""
         except Exception as e:
             return json.dumps({"error": str(e)})
 
-    # ─── Pattern Detection (unchanged) ─────────────────────────────────────
+    # ─── Pattern Detection ─────────────────────────────────────────────────
+
+    def _pattern_key_for(self, log: dict) -> str:
+        """Group key: the structured error_type, else the message fingerprint."""
+        error_type = log.get("error_type", "")
+        return error_type if error_type else self._extract_pattern_key(log.get("message", ""))
+
+    def _sync_pattern_index(self) -> PatternIndex:
+        """Index the ``_raw_logs`` entries not yet in ``_pattern_index``.
+
+        The cursor remembers which list object was indexed and how far.
+        When ``_raw_logs`` has been replaced (reset, filtered, re-fetched)
+        or has shrunk, the index is rebuilt from the current list instead
+        of trusting positions from the old one.
+        """
+        logs = self._raw_logs
+        source, indexed = self._pattern_cursor
+        if source is not logs or indexed > len(logs):
+            self._pattern_index = PatternIndex(self._pattern_key_for)
+            indexed = 0
+        self._pattern_index.extend(logs[indexed:])
+        self._pattern_cursor = (logs, len(logs))
+        return self._pattern_index
 
     def _parse_patterns_from_logs(self, logs: list[dict]) -> list[dict]:
         """Group logs by exception type and similar error messages."""
-        pattern_groups: dict[str, list[dict]] = defaultdict(list)
-
-        for log in logs:
-            message = log.get("message", "")
-            error_type = log.get("error_type", "")
-            key = error_type if error_type else self._extract_pattern_key(message)
-            pattern_groups[key].append(log)
+        index = PatternIndex(self._pattern_key_for)
+        index.extend(logs)
+        return self._summarize_patterns(index)
 
+    def _summarize_patterns(self, index: PatternIndex) -> list[dict]:
+        """Build pattern dicts from an index's running per-group state."""
         patterns = []
-        for key, group_logs in pattern_groups.items():
-            first_log = group_logs[0]
+        for group in index.groups():
+            first_log = group.first_log
             # Use structured error_type from extracted log entry if available
             structured_source = {"error": {"type": first_log["error_type"]}} if first_log.get("error_type") else None
             exception_type = self._extract_exception_type(first_log.get("message", ""), source=structured_source)
-            services = list(set(l.get("service", "unknown") for l in group_logs))
-
-            # Collect timestamps for first_seen/last_seen
-            timestamps = sorted(l.get("timestamp", "") for l in group_logs if l.get("timestamp"))
-
-            # Collect unique stack traces (deduplicated, max 3)
-            stack_traces = []
-            seen_stacks: set[str] = set()
-            for l in group_logs:
-                st = l.get("raw_stack_trace") or l.get("stack_trace", "")
-                if st and st not in seen_stacks:
-                    seen_stacks.add(st)
-                    stack_traces.append(st[:10000])
-                    if len(stack_traces) >= 3:
-                        break
+            stack_traces = group.stack_traces
 
-            # Collect unique correlation/trace IDs
-            correlation_ids = list(set(
-                l.get("trace_id", "") for l in group_logs if l.get("trace_id")
-            ))[:10]
-
-            # Sample log IDs for linking back
-            sample_log_ids = [l.get("id", "") for l in group_logs[:5] if l.get("id")]
-
-            # Collect 3 log lines immediately preceding the first error in this pattern group
-            sorted_group = sorted(group_logs, key=lambda l: l.get("timestamp", ""))
-            preceding_context = []
-            first_error_idx = next(
-                (i for i, l in enumerate(sorted_group)
-                 if (l.get("level") or "").upper() in ("ERROR", "FATAL", "CRITICAL")),
-                None
-            )
-            if first_error_idx is not None and first_error_idx > 0:
-                start = max(0, first_error_idx - 3)
-                for ctx_log in sorted_group[start:first_error_idx]:
-                    safe_msg = quote_user_text((ctx_log.get('message', '') or '')[:10000])
-                    preceding_context.append(
-                        f"[{ctx_log.get('level', '?')}] {safe_msg}"
-                    )
-
-            # Per-service breakdown: count, first_seen, last_seen per service
-            per_service_breakdown: dict[str, dict] = {}
-            for log in group_logs:
-                svc = log.get("service", "unknown") or "unknown"
-                log_ts = log.get("timestamp", "")
-                if svc not in per_service_breakdown:
-                    per_service_breakdown[svc] = {"count": 0, "first_seen": log_ts, "last_seen": log_ts}
-                per_service_breakdown[svc]["count"] += 1
-                if log_ts:
-                    if not per_service_breakdown[svc]["first_seen"] or log_ts < per_service_breakdown[svc]["first_seen"]:
-                        per_service_breakdown[svc]["first_seen"] = log_ts
-                    if not per_service_breakdown[svc]["last_seen"] or log_ts > per_service_breakdown[svc]["last_seen"]:
-                        per_service_breakdown[svc]["last_seen"] = log_ts
+            # Log lines immediately preceding the first error in this group
+            preceding_context = [
+                f"[{ctx_log.get('level', '?')}] "
+                f"{quote_user_text((ctx_log.get('message', '') or '')[:10000])}"
+                for ctx_log in group.preceding_context
+            ]
 
             patterns.append({
-                "pattern_key": key,
+                "pattern_key": group.key,
                 "exception_type": exception_type,
-                "error_message": group_logs[0].get("message", "")[:10000],
-                "frequency": len(group_logs),
-                "affected_components": services,
-                "sample_log": group_logs[0],
+                "error_message": first_log.get("message", "")[:10000],
+                "frequency": group.count,
+                "affected_components": list(group.services),
+                "sample_log": first_log,
                 # Enrichment fields
-                "first_seen": timestamps[0] if timestamps else "",
-                "last_seen": timestamps[-1] if timestamps else "",
-                "stack_traces": stack_traces,
+                "first_seen": group.first_seen,
+                "last_seen": group.last_seen,
+                "stack_traces": list(stack_traces),
                 "filtered_stack_trace": self._filter_stack_trace(stack_traces[0]) if stack_traces else "",
-                "correlation_ids": correlation_ids,
-                "sample_log_ids": sample_log_ids,
+                "correlation_ids": list(group.correlation_ids),
+                "sample_log_ids": list(group.sample_log_ids),
                 "preceding_context": preceding_context,
-                "per_service_breakdown": per_service_breakdown,
+                "per_service_breakdown": group.per_service,
             })
 
             # Inline stack trace extraction fallback
             if not stack_traces:
-                for l in group_logs[:5]:
+                for l in group.head_logs:
                     inline = self._extract_inline_stack_trace(l.get("message", ""))
                     if inline:
                         patterns[-1]["inline_stack_trace"] = self._filter_stack_trace(inline)
@@ -2294,27 +2278,10 @@ Respond with JSON only. No markdown fences."""
 
     def _extract_pattern_key(self, message: str) -> str:
         """Extract a fingerprint from a log message for grouping."""
-        normalized = re.sub(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}[.\d]*[Z]?', '<TIMESTAMP>', message)
-        normalized = re.sub(r'[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}', '<UUID>', normalized)
-        # IP:port combos (e.g., "10.244.0.1:55050") — before standalone IP
-        normalized = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+\b', '<IP:PORT>', normalized)
-        # IP addresses (v4)
-        normalized = re.sub(r'\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b', '<IP>', normalized)
-        # Standalone port numbers after colon (e.g., ":55050", ":8080") — before generic NUM
-        normalized = re.sub(r':\d{2,5}\b', ':<PORT>', normalized)
-        # HTTP paths (e.g., "/api/v1/orders/12345")
-        normalized = re.sub(r'/[a-zA-Z0-9/_.-]+', '/<PATH>', normalized)
-        # Quoted strings (e.g., "some dynamic value")
-        normalized = re.sub(r'"[^"]{4,}"', '"<STR>"', normalized)
-        normalized = re.sub(r"'[^']{4,}'", "'<STR>'", normalized)
-        # Hex strings (8+ chars, e.g. 0x7f3a2b4c, a1b2c3d4e5f6)
-        normalized = re.sub(r'\b0x[0-9a-fA-F]+\b', '<HEX>', normalized)
-        normalized = re.sub(r'\b[0-9a-f]{8,}\b', '<HEX>', normalized)
-        normalized = re.sub(r'\b\d+\b', '<NUM>', normalized)
-        exc_match = re.search(r'([A-Z][a-zA-Z]*(?:Exception|Error|Timeout|Failure))', message)
+        exc_match = _EXCEPTION_NAME_RE.search(message)
         if exc_match:
             return exc_match.group(1)
-        return hashlib.md5(normalized.encode()).hexdigest()[:12]
+        return self._template_miner.add(message).template_id
 
     # ─── Severity Classification ─────────────────────────────────────────
 
@@ -2578,35 +2545,25 @@ class ElasticsearchClient:
 
     async def search(self, index: str, body: dict, timeout: int = 30) -> dict:
         """Execute an Elasticsearch search asynchronously. Returns parsed JSON."""
-        import asyncio
-        import functools
-        return await asyncio.to_thread(self._search_sync, index, body, timeout)
-
-    def _search_sync(self, index: str, body: dict, timeout: int = 30) -> dict:
-        """Execute a synchronous Elasticsearch search. Returns parsed JSON."""
-        resp = requests.post(
-            f"{self.url}/{index}/_search",
-            json=body,
+        resp = await self._request("POST", f"/{index}/_search", json=body, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send on the shared Elasticsearch pool, behind its concurrency gate."""
+        return await http_clients.request(
+            "elasticsearch", method, f"{self.url}{path}",
             headers=self._headers,
-            timeout=timeout,
             verify=self._verify_ssl,
+            **kwargs,
         )
-        resp.raise_for_status()
-        return resp.json()
 
     # ── K.7 — PIT-paginated search (Phase-3 ``paginate_search``) ────────
 
     async def open_pit(self, *, index: str, keep_alive: str = "1m") -> dict:
         """POST /{index}/_pit — returns {'id': '<pit_id>'}."""
-        import asyncio
-        return await asyncio.to_thread(self._open_pit_sync, index, keep_alive)
-
-    def _open_pit_sync(self, index: str, keep_alive: str) -> dict:
-        resp = requests.post(
-            f"{self.url}/{index}/_pit?keep_alive={keep_alive}",
-            headers=self._headers,
-            timeout=10,
-            verify=self._verify_ssl,
+        resp = await self._request(
+            "POST", f"/{index}/_pit", params={"keep_alive": keep_alive}, timeout=10,
         )
         resp.raise_for_status()
         return resp.json()
@@ -2614,18 +2571,9 @@ class ElasticsearchClient:
     async def close_pit(self, *, pit_id: str) -> None:
         """DELETE /_pit — idempotent; swallows 404 so callers using
         try/finally don't mask the original exception."""
-        import asyncio
-        await asyncio.to_thread(self._close_pit_sync, pit_id)
-
-    def _close_pit_sync(self, pit_id: str) -> None:
         try:
-            requests.delete(
-                f"{self.url}/_pit",
-                json={"id": pit_id},
-                headers=self._headers,
-                timeout=5,
-                verify=self._verify_ssl,
-            )
+            # httpx's delete() takes no body; go through request().
+            await self._request("DELETE", "/_pit", json={"id": pit_id}, timeout=5)
         except Exception:
             pass
 
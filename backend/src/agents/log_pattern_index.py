@@ -0,0 +1,156 @@
+"""Streaming pattern index for LogAnalysisAgent.
+
+Logs are fed one at a time (as Elasticsearch search pages arrive) and each
+pattern group keeps only running state: counts, min/max timestamps, a few
+unique stack traces, bounded trace ids, per-service counters and a small
+preceding-context buffer. Every update is O(1) per log, so group summaries
+are ready as soon as the last page has been consumed, without re-scanning
+or sorting the group.
+"""
+from __future__ import annotations
+
+from bisect import insort
+from typing import Any, Callable, Iterable
+
+ERROR_LEVELS = frozenset({"ERROR", "FATAL", "CRITICAL"})
+
+MAX_STACK_TRACES = 3
+MAX_CORRELATION_IDS = 10
+MAX_SAMPLE_LOGS = 5
+CONTEXT_LINES = 3
+# Non-error logs kept as context candidates. Context is exact when logs
+# arrive in timestamp order (either direction); for arbitrary orders it
+# stays exact unless more than this many candidates get displaced by a
+# later-arriving earlier error.
+CONTEXT_CANDIDATES = 32
+
+
+class PatternGroup:
+    """Running aggregates for the logs sharing one pattern key."""
+
+    __slots__ = (
+        "key", "first_log", "head_logs", "count", "first_seen", "last_seen",
+        "services", "stack_traces", "_seen_stacks", "correlation_ids",
+        "sample_log_ids", "per_service", "_first_error", "_context",
+    )
+
+    def __init__(self, key: str, first_log: dict) -> None:
+        self.key = key
+        self.first_log = first_log
+        self.head_logs: list[dict] = []
+        self.count = 0
+        self.first_seen = ""
+        self.last_seen = ""
+        self.services: dict[Any, None] = {}
+        self.stack_traces: list[str] = []
+        self._seen_stacks: set[str] = set()
+        self.correlation_ids: dict[str, None] = {}
+        self.sample_log_ids: list[str] = []
+        self.per_service: dict[str, dict] = {}
+        # (timestamp, arrival) of the earliest error, and the latest
+        # non-error logs before it as sorted (timestamp, arrival, log).
+        self._first_error: tuple[str, int] | None = None
+        self._context: list[tuple[str, int, dict]] = []
+
+    def add(self, log: dict, seq: int) -> None:
+        self.count += 1
+        if len(self.head_logs) < MAX_SAMPLE_LOGS:
+            self.head_logs.append(log)
+            log_id = log.get("id", "")
+            if log_id:
+                self.sample_log_ids.append(log_id)
+
+        ts = log.get("timestamp", "")
+        if ts:
+            if not self.first_seen or ts < self.first_seen:
+                self.first_seen = ts
+            if ts > self.last_seen:
+                self.last_seen = ts
+
+        self.services[log.get("service", "unknown")] = None
+
+        if len(self.stack_traces) < MAX_STACK_TRACES:
+            st = log.get("raw_stack_trace") or log.get("stack_trace", "")
+            if st and st not in self._seen_stacks:
+                self._seen_stacks.add(st)
+                self.stack_traces.append(st[:10000])
+
+        trace_id = log.get("trace_id", "")
+        if trace_id and len(self.correlation_ids) < MAX_CORRELATION_IDS:
+            self.correlation_ids[trace_id] = None
+
+        svc = log.get("service", "unknown") or "unknown"
+        entry = self.per_service.get(svc)
+        if entry is None:
+            entry = self.per_service[svc] = {"count": 0, "first_seen": ts, "last_seen": ts}
+        entry["count"] += 1
+        if ts:
+            if not entry["first_seen"] or ts < entry["first_seen"]:
+                entry["first_seen"] = ts
+            if not entry["last_seen"] or ts > entry["last_seen"]:
+                entry["last_seen"] = ts
+
+        self._track_context(log, ts, seq)
+
+    def _track_context(self, log: dict, ts: str, seq: int) -> None:
+        order = (ts, seq)
+        if (log.get("level") or "").upper() in ERROR_LEVELS:
+            if self._first_error is None or order < self._first_error:
+                self._first_error = order
+                while self._context and self._context[-1][:2] > order:
+                    self._context.pop()
+            return
+        if self._first_error is not None and order > self._first_error:
+            return
+        if len(self._context) >= CONTEXT_CANDIDATES:
+            if order < self._context[0][:2]:
+                return
+            self._context.pop(0)
+        insort(self._context, (ts, seq, log), key=lambda item: item[:2])
+
+    @property
+    def preceding_context(self) -> list[dict]:
+        """Up to ``CONTEXT_LINES`` logs immediately before the first error."""
+        if self._first_error is None:
+            return []
+        return [log for _, _, log in self._context[-CONTEXT_LINES:]]
+
+
+class PatternIndex:
+    """Pattern groups keyed by ``key_fn(log)``, in first-seen order.
+
+    Usage::
+
+        index = PatternIndex(agent._pattern_key_for)
+        for hit in page["hits"]["hits"]:
+            index.add(agent._extract_log_entry(hit))
+        groups = index.groups()
+    """
+
+    def __init__(self, key_fn: Callable[[dict], str]) -> None:
+        self._key_fn = key_fn
+        self._groups: dict[str, PatternGroup] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    @property
+    def log_count(self) -> int:
+        return self._seq
+
+    def add(self, log: dict) -> PatternGroup:
+        key = self._key_fn(log)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = PatternGroup(key, log)
+        group.add(log, self._seq)
+        self._seq += 1
+        return group
+
+    def extend(self, logs: Iterable[dict]) -> None:
+        for log in logs:
+            self.add(log)
+
+    def groups(self) -> list[PatternGroup]:
+        return list(self._groups.values())
@@ -5,15 +5,19 @@ import statistics
 from datetime import datetime, timezone
 from typing import Any
 
+import httpx
 import requests
 
+from src.agents import spike_engine
 from src.agents.react_base import ReActAgent
+from src.integrations import http_clients
 from src.agents.baseline import (
     DEFAULT_BASELINE_THRESHOLD_PCT,
     apply_baseline_filter_dicts,
 )
 from src.models.schemas import MetricAnomaly, DataPoint, TimeRange, MetricsAnalysisResult, TokenUsage
 from src.tools.promql_safety import UnsafeQuery, validate_promql
+from src.tools.range_query_cache import get_range_cache
 from src.utils.event_emitter import EventEmitter
 from src.utils.logger import get_logger
 
@@ -37,6 +41,11 @@ def _parse_step_seconds(step: Any) -> int:
 
 logger = get_logger(__name__)
 
+# Spike baselines: the opt-in trailing window (an hour at the default 60s
+# step), and the same window one day earlier for key metrics.
+ROLLING_WINDOW_POINTS = 60
+SEASONAL_OFFSET_S = 24 * 3600
+
 
 class MetricsAgent(ReActAgent):
     """ReAct agent for Prometheus metrics analysis with spike detection."""
@@ -54,6 +63,10 @@ class MetricsAgent(ReActAgent):
         else:
             self.prometheus_url = os.getenv("PROMETHEUS_URL", "http://localhost:9090")
         self._time_series_cache: dict[str, list[dict]] = {}
+        # Raw matrix results (and the same window a day earlier, where
+        # fetched) per metric key, for per-series spike detection.
+        self._matrix_cache: dict[str, list[dict]] = {}
+        self._seasonal_cache: dict[str, list[dict]] = {}
 
     async def _define_tools(self) -> list[dict]:
         return [
@@ -90,6 +103,7 @@ class MetricsAgent(ReActAgent):
                     "properties": {
                         "metric_name": {"type": "string", "description": "Name of the metric to analyze (must have been queried before)"},
                         "threshold_stddev": {"type": "number", "description": "Number of standard deviations from mean to consider a spike", "default": 2.0},
+                        "rolling_baseline": {"type": "boolean", "description": "Compare each point to the trailing hour instead of the whole range (for ranges with level shifts)", "default": False},
                     },
                     "required": ["metric_name"],
                 },
@@ -358,8 +372,25 @@ OUTPUT FORMAT — Final answer as JSON:
 
     @staticmethod
     async def _async_get(url: str, params: dict = None, timeout: int = 30):
-        """Run requests.get in a thread pool to avoid blocking the event loop."""
-        return await asyncio.to_thread(requests.get, url, params=params, timeout=timeout)
+        """GET on the shared Prometheus pool, queued behind its concurrency gate."""
+        return await http_clients.request("prometheus", "GET", url, params=params, timeout=timeout)
+
+    async def _cached_query_range(self, query: str, start: float, end: float, step_s: float) -> dict:
+        """Range query through the process-wide step-aligned chunk cache."""
+        url = f"{self.prometheus_url}/api/v1/query_range"
+
+        async def _fetch(chunk_start: float, chunk_end: float) -> dict:
+            resp = await self._async_get(
+                url,
+                params={"query": query, "start": chunk_start, "end": chunk_end, "step": step_s},
+                timeout=30,
+            )
+            resp.raise_for_status()
+            return resp.json()
+
+        return await get_range_cache().query_range(
+            self.prometheus_url, query, start, end, step_s, _fetch,
+        )
 
     async def _query_range(self, params: dict) -> str:
         query = params["query"]
@@ -377,13 +408,7 @@ OUTPUT FORMAT — Final answer as JSON:
             return json.dumps({"error": f"unsafe_promql: {e}"})
 
         try:
-            resp = await self._async_get(
-                f"{self.prometheus_url}/api/v1/query_range",
-                params={"query": query, "start": start, "end": end, "step": step},
-                timeout=30,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            data = await self._cached_query_range(query, start, end, step_s)
 
             if data.get("status") != "success":
                 return json.dumps({"error": data.get("error", "Unknown error")})
@@ -407,6 +432,9 @@ OUTPUT FORMAT — Final answer as JSON:
 
             metric_key = query[:80]
             self._time_series_cache[metric_key] = all_points
+            self._matrix_cache[metric_key] = results
+            if params.get("seasonal"):
+                await self._fetch_seasonal(metric_key, query, start, end, step_s)
 
             self.add_breadcrumb(
                 action="queried_prometheus_range",
@@ -426,11 +454,24 @@ OUTPUT FORMAT — Final answer as JSON:
             }
             return json.dumps(summary, default=str)
 
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, httpx.ConnectError):
             return json.dumps({"error": f"Cannot connect to Prometheus at {self.prometheus_url}"})
         except Exception as e:
             return json.dumps({"error": str(e)})
 
+    async def _fetch_seasonal(self, metric_key: str, query: str,
+                              start: float, end: float, step_s: float) -> None:
+        """Cache the same window 24h earlier as the seasonal spike baseline."""
+        try:
+            data = await self._cached_query_range(
+                query, start - SEASONAL_OFFSET_S, end - SEASONAL_OFFSET_S, step_s,
+            )
+        except Exception as e:
+            logger.debug("Seasonal baseline fetch failed for %s: %s", metric_key, e)
+            return
+        if data.get("status") == "success":
+            self._seasonal_cache[metric_key] = data.get("data", {}).get("result", [])
+
     async def _query_instant(self, params: dict) -> str:
         query = params["query"]
         # Task 1.11: instant queries still need namespace/length/year bounds.
@@ -476,7 +517,11 @@ OUTPUT FORMAT — Final answer as JSON:
             return json.dumps({"error": f"No cached data for metric '{metric_name}'. Run query_prometheus_range first."})
 
         data_points = self._time_series_cache[matching_key]
-        spikes = self._detect_spikes(data_points, threshold)
+        if matching_key in self._matrix_cache:
+            rolling = ROLLING_WINDOW_POINTS if params.get("rolling_baseline") else None
+            spikes = self._matrix_spikes(matching_key, threshold, rolling_window=rolling)
+        else:
+            spikes = self._detect_spikes(data_points, threshold)
 
         return json.dumps({
             "metric": metric_name,
@@ -529,7 +574,7 @@ OUTPUT FORMAT — Final answer as JSON:
                 "metrics": matching[:100],
             })
 
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, httpx.ConnectError):
             return json.dumps({"error": f"Cannot connect to Prometheus at {self.prometheus_url}"})
         except Exception as e:
             return json.dumps({"error": str(e)})
@@ -552,7 +597,9 @@ OUTPUT FORMAT — Final answer as JSON:
             resp_now.raise_for_status()
             now_results = resp_now.json().get("data", {}).get("result", [])
 
-            # Baseline value at N hours ago (using time parameter instead of PromQL offset)
+            # Baseline value at N hours ago (using time parameter instead of
+            # PromQL offset). This is a single sample, so it stays an instant
+            # query at the exact instant rather than a cached range chunk.
             resp_base = await self._async_get(
                 f"{self.prometheus_url}/api/v1/query",
                 params={"query": query, "time": baseline_ts},
@@ -587,7 +634,7 @@ OUTPUT FORMAT — Final answer as JSON:
                 "direction": direction,
             })
 
-        except requests.exceptions.ConnectionError:
+        except (requests.exceptions.ConnectionError, httpx.ConnectError):
             return json.dumps({"error": f"Cannot connect to Prometheus at {self.prometheus_url}"})
         except Exception as e:
             return json.dumps({"error": str(e)})
@@ -756,110 +803,32 @@ OUTPUT FORMAT — Final answer as JSON:
         return out
 
     def _detect_spikes(self, data_points: list[dict], baseline_threshold: float = 2.0) -> list[dict]:
-        """Detect anomalous spikes in time-series data using median + MAD (robust to outliers)."""
-        if len(data_points) < 3:
-            return []
-
-        values = [p["value"] for p in data_points]
-        mean_val = statistics.mean(values)
-        median_val = statistics.median(values)
-        # Use MAD (median absolute deviation) for robust outlier detection
-        abs_devs = [abs(v - median_val) for v in values]
-        mad = statistics.median(abs_devs)
-
-        stddev_val = statistics.stdev(values) if len(values) > 1 else 0
-        # Use MAD-based detection only when there's meaningful variance;
-        # for low-variance data, fall back to stddev which is less sensitive
-        coefficient_of_variation = stddev_val / abs(mean_val) if mean_val != 0 else 0
-
-        if mad == 0 or coefficient_of_variation < 0.2:
-            # Low variance data - use stddev-based detection
-            baseline_center = mean_val
-            spread = stddev_val
-            if spread == 0:
-                return []
-        else:
-            # High variance data - use MAD for robust outlier detection
-            # (1.4826 converts MAD to approximate stddev for normal distributions)
-            baseline_center = median_val
-            spread = mad * 1.4826
-
-        threshold = baseline_center + (baseline_threshold * spread)
-
-        spikes = []
-        in_spike = False
-        spike_start = None
-        spike_peak = 0
-        spike_peak_ts = None
-
-        for point in data_points:
-            if point["value"] > threshold:
-                if not in_spike:
-                    in_spike = True
-                    spike_start = point["timestamp"]
-                    spike_peak = point["value"]
-                    spike_peak_ts = point["timestamp"]
-                elif point["value"] > spike_peak:
-                    spike_peak = point["value"]
-                    spike_peak_ts = point["timestamp"]
-            else:
-                if in_spike:
-                    deviation_factor = round((spike_peak - baseline_center) / spread, 2) if spread > 0 else 0
-                    confidence = min(95, int(50 + (deviation_factor * 10)))
-                    spikes.append({
-                        "spike_start": spike_start,
-                        "spike_end": point["timestamp"],
-                        "peak_value": spike_peak,
-                        "peak_timestamp": spike_peak_ts,
-                        "baseline_mean": round(mean_val, 2),
-                        "baseline_stddev": round(spread, 2),
-                        "deviation_factor": deviation_factor,
-                        "confidence_score": confidence,
-                    })
-                    in_spike = False
-
-        # Handle spike at end of data
-        if in_spike:
-            deviation_factor = round((spike_peak - baseline_center) / spread, 2) if spread > 0 else 0
-            confidence = min(95, int(50 + (deviation_factor * 10)))
-            spikes.append({
-                "spike_start": spike_start,
-                "spike_end": data_points[-1]["timestamp"],
-                "peak_value": spike_peak,
-                "peak_timestamp": spike_peak_ts,
-                "baseline_mean": round(mean_val, 2),
-                "baseline_stddev": round(spread, 2),
-                "deviation_factor": deviation_factor,
-                "confidence_score": confidence,
-            })
+        """Detect anomalous spikes in time-series data using median + MAD (robust to outliers).
 
-        return spikes
-
-    def _detect_spikes_with_baseline(self, current_window: list[dict],
-                                      previous_day_window: list[dict],
-                                      threshold: float = 2.0) -> list[dict]:
-        """Filter cyclical false-positive spikes by comparing against same-hour-yesterday baseline."""
-        if not previous_day_window:
-            return self._detect_spikes(current_window, threshold)
-
-        prev_values = [p["value"] for p in previous_day_window if p.get("value") is not None]
-        if not prev_values:
-            return self._detect_spikes(current_window, threshold)
-
-        prev_mean = sum(prev_values) / len(prev_values)
-        prev_std = (sum((v - prev_mean) ** 2 for v in prev_values) / len(prev_values)) ** 0.5
-
-        raw_spikes = self._detect_spikes(current_window, threshold)
-        filtered = []
-        for spike in raw_spikes:
-            spike_value = spike.get("peak_value", spike.get("value", 0))
-            if prev_std > 0:
-                prev_zscore = (spike_value - prev_mean) / prev_std
-                if prev_zscore >= threshold:
-                    # Spike value was also a spike yesterday — cyclical pattern
-                    continue
-            filtered.append(spike)
-        return filtered
+        Low-variance series (MAD of 0 or CV < 0.2) fall back to mean + stddev.
+        See ``spike_engine`` for the vectorised implementation.
+        """
+        return spike_engine.detect_spikes(data_points, baseline_threshold)
+
+    def _matrix_spikes(
+        self, metric_key: str, threshold: float = 2.0, rolling_window: int | None = None,
+    ) -> list[dict]:
+        """Per-series spikes for a cached range result, in one vectorised pass.
+
+        Each series gets its own whole-range baseline, with the same
+        ``_detect_spikes`` rules (MAD, or mean + stddev for flat series).
+        ``rolling_window`` opts into a trailing baseline of that many
+        points instead. Spikes that also show up in the same window
+        yesterday are dropped as cyclical. Each spike carries its series
+        labels under ``series``.
+        """
+        result = self._matrix_cache.get(metric_key, [])
+        found = spike_engine.detect_matrix_spikes(
+            result, threshold,
+            rolling_window=rolling_window,
+            previous=self._seasonal_cache.get(metric_key),
+        )
+        return [{**spike, "series": entry["metric"]} for entry in found for spike in entry["spikes"]]
 
     # ══════════════════════════════════════════════════════════════════════
     #  Two-Pass Mode (1 LLM call)
@@ -977,6 +946,10 @@ OUTPUT FORMAT — Final answer as JSON:
         start_time = time_window.get("start", "now-3h")
         end_time = time_window.get("end", "now")
 
+        # Key metrics (CPU, memory, error_rate, latency) also get offset
+        # comparisons and a same-window-yesterday baseline for spike detection.
+        key_metric_names = {"cpu_usage", "memory_usage", "error_rate", "latency_p99"}
+
         # Range queries
         async def _exec_range_query(q: dict) -> tuple[str, str]:
             name = q.get("name", "unknown")
@@ -985,11 +958,10 @@ OUTPUT FORMAT — Final answer as JSON:
                 "start": start_time,
                 "end": end_time,
                 "step": "60s",
+                "seasonal": name in key_metric_names,
             })
             return name, result
 
-        # Offset queries (for top-4 key metrics: CPU, memory, error_rate, latency)
-        key_metric_names = {"cpu_usage", "memory_usage", "error_rate", "latency_p99"}
         offset_queries = [q for q in all_queries if q.get("name") in key_metric_names]
 
         async def _exec_offset_query(q: dict) -> tuple[str, str]:
@@ -1017,9 +989,10 @@ OUTPUT FORMAT — Final answer as JSON:
                     pass
 
         # ── Phase 0c: Run spike detection on all cached time series ──────
+        # Per series, one vectorised pass per query's matrix result.
         spike_results: dict[str, list] = {}
-        for metric_key in list(self._time_series_cache.keys()):
-            spikes = self._detect_spikes(self._time_series_cache[metric_key], baseline_threshold=2.0)
+        for metric_key in self._matrix_cache:
+            spikes = self._matrix_spikes(metric_key, threshold=2.0)
             if spikes:
                 spike_results[metric_key] = spikes
 
@@ -1157,8 +1130,10 @@ OUTPUT FORMAT — Final answer as JSON:
             for metric_key, spikes in spike_results.items():
                 parts.append(f"\n### {metric_key}: {len(spikes)} spike(s)")
                 for s in spikes:
+                    series = s.get("series")
+                    labels = f" [{', '.join(f'{k}={v}' for k, v in sorted(series.items()))}]" if series else ""
                     parts.append(
-                        f"  - Peak: {s['peak_value']} (baseline mean: {s['baseline_mean']}, "
+                        f"  - Peak{labels}: {s['peak_value']} (baseline mean: {s['baseline_mean']}, "
                         f"deviation: {s['deviation_factor']}x stddev), "
                         f"confidence: {s['confidence_score']}%"
                     )
@@ -1189,36 +1164,23 @@ class PrometheusClient:
 
     async def query_instant(self, promql: str, timeout: int = 15) -> dict:
         """Execute an instant PromQL query. Returns parsed JSON from Prometheus."""
-        import asyncio
-        import requests as _requests
-
-        def _do():
-            return _requests.get(
-                f"{self.url}/api/v1/query",
-                params={"query": promql},
-                headers=self._headers,
-                timeout=timeout,
-                verify=self._verify_ssl,
-            )
-
-        resp = await asyncio.to_thread(_do)
-        resp.raise_for_status()
-        return resp.json()
+        return await self._get("/api/v1/query", {"query": promql}, timeout)
 
     async def query_range(self, promql: str, start: float, end: float, step: str = "60s", timeout: int = 30) -> dict:
         """Execute a PromQL range query. Returns parsed JSON from Prometheus."""
-        import asyncio
-        import requests as _requests
-
-        def _do():
-            return _requests.get(
-                f"{self.url}/api/v1/query_range",
-                params={"query": promql, "start": start, "end": end, "step": step},
-                headers=self._headers,
-                timeout=timeout,
-                verify=self._verify_ssl,
-            )
+        return await self._get(
+            "/api/v1/query_range",
+            {"query": promql, "start": start, "end": end, "step": step},
+            timeout,
+        )
 
-        resp = await asyncio.to_thread(_do)
+    async def _get(self, path: str, params: dict, timeout: int) -> dict:
+        resp = await http_clients.request(
+            "prometheus", "GET", f"{self.url}{path}",
+            params=params,
+            headers=self._headers,
+            timeout=timeout,
+            verify=self._verify_ssl,
+        )
         resp.raise_for_status()
         return resp.json()
@@ -29,8 +29,11 @@ def graph_pathfinder(state: dict, *, kg: NetworkKnowledgeGraph) -> dict:
     # Build dynamic route edges
     kg.build_route_edges(src_ip, dst_ip)
 
-    # Find K shortest paths
-    paths = kg.find_k_shortest_paths(src_device_id, dst_device_id, k=3)
+    # Find K shortest paths (route edges above only touch their own cost pairs)
+    paths = kg.paths.k_shortest_paths(
+        src_device_id, dst_device_id, k=3,
+        max_depth=kg.MAX_PATH_DEPTH, max_enumeration=kg.MAX_PATH_ENUMERATION,
+    )
 
     if not paths:
         return {
@@ -1,7 +1,7 @@
 """NACL evaluator node — stateless rule evaluation for NACLs in path."""
-import ipaddress
+from typing import Optional
 from src.network.topology_store import TopologyStore
-from src.network.models import NACLDirection, PolicyAction
+from src.network.models import NACLDirection, NACLRule, PolicyAction
 
 
 def nacl_evaluator(state: dict, *, store: TopologyStore) -> dict:
@@ -9,7 +9,8 @@ def nacl_evaluator(state: dict, *, store: TopologyStore) -> dict:
 
     NACLs are stateless: rules are evaluated in order (lowest rule_number first).
     Both INBOUND and OUTBOUND must be checked. First match wins.
-    No match = implicit deny.
+    No match = implicit deny. Rules come precompiled from the store's
+    per-NACL policy cache.
     """
     nacls = state.get("nacls_in_path", [])
     src_ip = state.get("src_ip", "")
@@ -23,15 +24,11 @@ def nacl_evaluator(state: dict, *, store: TopologyStore) -> dict:
     verdicts = []
     for nacl_info in nacls:
         nacl_id = nacl_info.get("device_id", "")
-        rules = store.list_nacl_rules(nacl_id)
+        policy = store.get_nacl_policy(nacl_id)
 
-        inbound_result = _evaluate_rules(
-            [r for r in rules if r.direction == NACLDirection.INBOUND],
-            src_ip, dst_ip, port, protocol,
-        )
-        outbound_result = _evaluate_rules(
-            [r for r in rules if r.direction == NACLDirection.OUTBOUND],
-            dst_ip, src_ip, port, protocol,  # Outbound: reverse src/dst perspective
+        inbound_result = _result(policy.evaluate(NACLDirection.INBOUND, src_ip, dst_ip, port, protocol))
+        outbound_result = _result(  # Outbound: reverse src/dst perspective
+            policy.evaluate(NACLDirection.OUTBOUND, dst_ip, src_ip, port, protocol),
         )
 
         overall = "allow" if inbound_result["action"] == "allow" and outbound_result["action"] == "allow" else "deny"
@@ -52,28 +49,13 @@ def nacl_evaluator(state: dict, *, store: TopologyStore) -> dict:
     }
 
 
-def _evaluate_rules(rules: list, src_ip: str, dst_ip: str, port: int, protocol: str) -> dict:
-    """Evaluate ordered NACL rules. First match wins."""
-    for rule in sorted(rules, key=lambda r: r.rule_number):
-        if rule.protocol != "-1" and rule.protocol != protocol:
-            continue
-        if not _ip_matches(src_ip, rule.cidr) and not _ip_matches(dst_ip, rule.cidr):
-            continue
-        if rule.protocol != "-1" and not (rule.port_range_from <= port <= rule.port_range_to):
-            continue
-        return {
-            "action": rule.action.value,
-            "rule_number": rule.rule_number,
-            "matched_rule_id": rule.id,
-        }
-    # Implicit deny
-    return {"action": "deny", "rule_number": -1, "matched_rule_id": "implicit_deny"}
-
+def _result(rule: Optional[NACLRule]) -> dict:
+    if rule is None:
+        # Implicit deny
+        return {"action": "deny", "rule_number": -1, "matched_rule_id": "implicit_deny"}
+    return {
+        "action": rule.action.value,
+        "rule_number": rule.rule_number,
+        "matched_rule_id": rule.id,
+    }
 
-def _ip_matches(ip: str, cidr: str) -> bool:
-    if cidr == "0.0.0.0/0":
-        return True
-    try:
-        return ipaddress.ip_address(ip) in ipaddress.ip_network(cidr, strict=False)
-    except ValueError:
-        return False
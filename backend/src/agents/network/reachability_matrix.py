@@ -19,6 +19,18 @@ def compute_reachability_matrix(
         if z in zone_ids:
             zone_devices.setdefault(z, []).append(node_id)
 
+    # Test with first representative device from each zone; one Dijkstra
+    # per source zone answers every destination zone.
+    pairs = [
+        (zone_devices[src_zone][0], zone_devices[dst_zone][0])
+        for src_zone in zone_ids
+        for dst_zone in zone_ids
+        if src_zone != dst_zone and zone_devices.get(src_zone) and zone_devices.get(dst_zone)
+    ]
+    paths_by_pair = kg.paths.k_shortest_paths_many(
+        pairs, k=1, max_depth=kg.MAX_PATH_DEPTH, max_enumeration=kg.MAX_PATH_ENUMERATION,
+    )
+
     matrix = []
     for src_zone in zone_ids:
         for dst_zone in zone_ids:
@@ -35,8 +47,7 @@ def compute_reachability_matrix(
                     "confidence": 0.0,
                 })
                 continue
-            # Test with first representative device from each zone
-            paths = kg.find_k_shortest_paths(src_devs[0], dst_devs[0], k=1)
+            paths = paths_by_pair[(src_devs[0], dst_devs[0])]
             matrix.append({
                 "src_zone": src_zone,
                 "dst_zone": dst_zone,
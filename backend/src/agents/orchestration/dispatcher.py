@@ -11,12 +11,20 @@ Parallelism contract:
   - Each spec has a hard per-agent timeout via ``asyncio.wait_for``.
   - Failures are contained: a timeout, exception, or cancellation is
     reported via ``StepResult(status=...)``; the other agents keep going.
+
+``StreamingDispatcher`` drops the round barrier: specs are submitted as
+they become eligible, run under a per-backend concurrency budget, and
+``next_result`` hands back whichever agent finishes first so the caller
+can replan immediately. It also records per-agent timings and which
+completion unblocked each agent, from which ``critical_path`` rebuilds
+the chain that determined time-to-diagnosis.
 """
 from __future__ import annotations
 
 import asyncio
 import time
-from dataclasses import dataclass, field
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass, field
 from typing import Any, Awaitable, Callable, Literal, Optional
 
 
@@ -97,3 +105,164 @@ class Dispatcher:
                 started_at=started_at,
                 elapsed_s=time.monotonic() - started_at,
             )
+
+
+# Which external backend each agent leans on. Agents sharing a backend
+# share its concurrency budget in ``StreamingDispatcher``; unknown agents
+# get a backend of their own.
+AGENT_BACKENDS: dict[str, str] = {
+    "log_agent": "elasticsearch",
+    "metrics_agent": "prometheus",
+    "k8s_agent": "kubernetes",
+    "tracing_agent": "tracing",
+    "code_agent": "github",
+    "change_agent": "github",
+}
+
+
+@dataclass(frozen=True)
+class AgentTiming:
+    """When one dispatched agent waited, ran and finished.
+
+    Offsets are seconds since the dispatcher was created. ``unblocked_by``
+    is the agent whose completion made this one eligible (None for agents
+    submitted before anything finished).
+    """
+
+    agent: str
+    status: StepStatus
+    unblocked_by: Optional[str]
+    submitted_s: float
+    started_s: float
+    finished_s: float
+    queued_s: float
+    elapsed_s: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class _Submitted:
+    spec: AgentSpec
+    backend: str
+    unblocked_by: Optional[str]
+    submitted_at: float
+
+
+class StreamingDispatcher(Dispatcher):
+    """Runs agents as soon as they are submitted, within per-backend budgets.
+
+    Timeout and error containment are inherited from ``Dispatcher``; the
+    difference is that there is no round: ``next_result`` returns the first
+    agent to finish and the caller may ``submit`` more while others run.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        *,
+        timeout_per_agent_s: float = 60.0,
+        default_budget: int = 2,
+        budgets: Optional[dict[str, int]] = None,
+        backends: Optional[dict[str, str]] = None,
+    ) -> None:
+        super().__init__(executor, timeout_per_agent_s=timeout_per_agent_s)
+        self._default_budget = max(1, default_budget)
+        self._budgets = dict(budgets or {})
+        self._backends = AGENT_BACKENDS if backends is None else backends
+        self._t0 = time.monotonic()
+        self._running: dict[str, int] = defaultdict(int)
+        self._waiting: dict[str, deque[_Submitted]] = defaultdict(deque)
+        self._tasks: dict[asyncio.Task, _Submitted] = {}
+        self._done: asyncio.Queue[asyncio.Task] = asyncio.Queue()
+        self.timings: list[AgentTiming] = []
+
+    @property
+    def in_flight(self) -> set[str]:
+        """Agents submitted but not yet returned by ``next_result``."""
+        names = {sub.spec.agent for sub in self._tasks.values()}
+        for queue in self._waiting.values():
+            names.update(sub.spec.agent for sub in queue)
+        return names
+
+    def submit(self, spec: AgentSpec, *, unblocked_by: Optional[str] = None) -> None:
+        backend = self._backends.get(spec.agent, spec.agent)
+        sub = _Submitted(spec, backend, unblocked_by, time.monotonic())
+        if self._running[backend] < self._budgets.get(backend, self._default_budget):
+            self._launch(sub)
+        else:
+            self._waiting[backend].append(sub)
+
+    def _launch(self, sub: _Submitted) -> None:
+        self._running[sub.backend] += 1
+        task = asyncio.create_task(self._run_one(sub.spec))
+        self._tasks[task] = sub
+        task.add_done_callback(self._done.put_nowait)
+
+    async def next_result(self) -> StepResult:
+        """Wait for the next agent to finish and return its result.
+
+        Raises ``LookupError`` when nothing is in flight.
+        """
+        if not self._tasks:
+            raise LookupError("no agents in flight")
+        task = await self._done.get()
+        sub = self._tasks.pop(task)
+        self._running[sub.backend] -= 1
+        waiting = self._waiting[sub.backend]
+        if waiting:
+            self._launch(waiting.popleft())
+
+        result = task.result()
+        finished_at = result.started_at + result.elapsed_s
+        self.timings.append(
+            AgentTiming(
+                agent=result.agent,
+                status=result.status,
+                unblocked_by=sub.unblocked_by,
+                submitted_s=round(sub.submitted_at - self._t0, 3),
+                started_s=round(result.started_at - self._t0, 3),
+                finished_s=round(finished_at - self._t0, 3),
+                queued_s=round(result.started_at - sub.submitted_at, 3),
+                elapsed_s=round(result.elapsed_s, 3),
+            )
+        )
+        return result
+
+    async def cancel_all(self) -> list[str]:
+        """Cancel running agents and drop queued ones; return their names."""
+        names = sorted(self.in_flight)
+        self._waiting.clear()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._running.clear()
+        self._done = asyncio.Queue()
+        return names
+
+    def critical_path(self) -> list[AgentTiming]:
+        """Chain of completions ending at the last agent to finish.
+
+        Walks ``unblocked_by`` back from the latest finisher, picking for
+        each predecessor its most recent completion that landed before the
+        dependent agent was queued.
+        """
+        if not self.timings:
+            return []
+        node = max(self.timings, key=lambda t: t.finished_s)
+        path = [node]
+        while node.unblocked_by is not None:
+            prior = [
+                t for t in self.timings
+                if t.agent == node.unblocked_by and t.finished_s <= node.submitted_s
+            ]
+            if not prior:
+                break
+            node = max(prior, key=lambda t: t.finished_s)
+            path.append(node)
+        path.reverse()
+        return path
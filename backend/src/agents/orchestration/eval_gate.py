@@ -47,6 +47,11 @@ class EvalGate:
     _SUFFICIENT_COVERAGE: float = 0.75
     _STALL_ROUNDS: int = 2
 
+    def __init__(self, round_scale: int = 1) -> None:
+        # Gate "rounds" per planning round. Streaming dispatch counts each
+        # agent completion as a round, so the stall window widens to match.
+        self._stall_rounds = self._STALL_ROUNDS * round_scale
+
     def is_done(self, s: EvalGateInputs) -> GateDecision:
         if s.rounds >= s.max_rounds:
             return GateDecision(True, "max_rounds_reached")
@@ -55,7 +60,7 @@ class EvalGate:
         if (
             s.confidence > self._SUFFICIENT_CONFIDENCE
             and s.coverage_ratio > self._SUFFICIENT_COVERAGE
-            and s.rounds_since_new_signal >= self._STALL_ROUNDS
+            and s.rounds_since_new_signal >= self._stall_rounds
         ):
             return GateDecision(True, "coverage_saturated_no_new_signal")
         return GateDecision(False, "continue")
@@ -0,0 +1,283 @@
+"""Vectorised spike detection over many metric series at once.
+
+``MetricsAgent._detect_spikes`` used to walk one Python list of points at
+a time with the ``statistics`` module. Here a whole Prometheus matrix
+result becomes a ``(series, time)`` float array with NaN for missing
+samples, and every step runs over all series at once:
+
+* robust baselines: per series mean, median, MAD and sample stddev.
+  MAD is used when it is non-zero and the coefficient of variation is
+  at least 0.2; otherwise the mean and stddev are used, as before.
+* optional rolling baselines: the same statistics over the previous
+  ``window`` points, via a strided window view.
+* above-threshold runs found by diffing a padded mask. Each run's peak
+  (first occurrence wins), its start and its end come from ``reduceat``.
+* optional seasonal filter: a run whose peak is also a ``threshold``
+  z-score spike against the same window yesterday is dropped as
+  cyclical.
+
+A missing sample neither starts nor ends a spike. Spike dicts match the
+``_detect_spikes`` schema exactly.
+"""
+from __future__ import annotations
+
+import warnings
+from typing import Any, Sequence
+
+import numpy as np
+
+MAD_TO_STDDEV = 1.4826
+MIN_POINTS = 3
+LOW_VARIATION_CV = 0.2
+
+
+# ── Building arrays ──────────────────────────────────────────────────────
+
+
+def points_to_matrix(series: Sequence[Sequence[dict]]) -> tuple[np.ndarray, list[list]]:
+    """Stack ``[{"timestamp", "value"}, ...]`` lists into a NaN-padded array.
+
+    Returns ``(values, timestamps)`` where ``timestamps[i]`` is the original
+    timestamp list of row ``i`` (kept as-is so output matches the input).
+    """
+    width = max((len(points) for points in series), default=0)
+    values = np.full((len(series), width), np.nan)
+    timestamps: list[list] = []
+    for row, points in enumerate(series):
+        values[row, :len(points)] = [p["value"] for p in points]
+        timestamps.append([p["timestamp"] for p in points])
+    return values, timestamps
+
+
+def matrix_result_to_array(result: list[dict]) -> tuple[np.ndarray, np.ndarray, list[dict]]:
+    """Align a Prometheus ``matrix`` result on the union of its timestamps.
+
+    Returns ``(values, timestamps, metrics)`` with ``values`` shaped
+    ``(len(result), len(timestamps))`` and NaN where a series has no sample.
+    """
+    per_series = [
+        (np.array([float(p[0]) for p in s.get("values", [])]),
+         np.array([float(p[1]) for p in s.get("values", [])]))
+        for s in result
+    ]
+    if per_series:
+        timestamps = np.unique(np.concatenate([ts for ts, _ in per_series]))
+    else:
+        timestamps = np.array([], dtype=float)
+    values = np.full((len(result), len(timestamps)), np.nan)
+    for row, (ts, vals) in enumerate(per_series):
+        values[row, np.searchsorted(timestamps, ts)] = vals
+    return values, timestamps, [s.get("metric", {}) for s in result]
+
+
+# ── Baselines ────────────────────────────────────────────────────────────
+
+
+def robust_baselines(values: np.ndarray) -> dict[str, np.ndarray]:
+    """Per-row ``center``, ``spread`` and ``mean`` (NaN where unusable)."""
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=1)
+    usable = count >= MIN_POINTS
+    center = np.full(len(values), np.nan)
+    spread = np.full(len(values), np.nan)
+    mean = np.full(len(values), np.nan)
+    if not usable.any():
+        return {"center": center, "spread": spread, "mean": mean}
+
+    rows = values[usable]
+    row_mean = np.nanmean(rows, axis=1)
+    median = np.nanmedian(rows, axis=1)
+    mad = np.nanmedian(np.abs(rows - median[:, None]), axis=1)
+    stddev = np.nanstd(rows, axis=1, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.where(row_mean != 0, stddev / np.abs(row_mean), 0.0)
+    use_stddev = (mad == 0) | (cv < LOW_VARIATION_CV)
+
+    center[usable] = np.where(use_stddev, row_mean, median)
+    spread[usable] = np.where(use_stddev, stddev, mad * MAD_TO_STDDEV)
+    mean[usable] = row_mean
+    return {"center": center, "spread": spread, "mean": mean}
+
+
+def rolling_baselines(values: np.ndarray, window: int) -> dict[str, np.ndarray]:
+    """Per-point ``center``/``spread`` from the previous ``window`` points.
+
+    Median and MAD over a trailing window, falling back to mean/stddev
+    where the MAD is zero or the window is nearly flat (CV below
+    ``LOW_VARIATION_CV``), like ``robust_baselines``. Points with fewer than ``MIN_POINTS`` valid
+    predecessors get NaN (never flagged).
+    """
+    n_rows, width = values.shape
+    padded = np.concatenate([np.full((n_rows, window), np.nan), values], axis=1)
+    # windows[:, t] holds the ``window`` points before t.
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)[:, :width]
+    count = (~np.isnan(windows)).sum(axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        # All-NaN windows are expected at the start of each row.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(windows, axis=2)
+        mad = np.nanmedian(np.abs(windows - median[..., None]), axis=2)
+        mean = np.nanmean(windows, axis=2)
+        stddev = np.nanstd(windows, axis=2, ddof=1)
+        cv = np.where(mean != 0, stddev / np.abs(mean), 0.0)
+    use_stddev = (mad == 0) | (cv < LOW_VARIATION_CV)
+    center = np.where(use_stddev, mean, median)
+    spread = np.where(use_stddev, stddev, mad * MAD_TO_STDDEV)
+    short = count < MIN_POINTS
+    center[short] = np.nan
+    spread[short] = np.nan
+    return {"center": center, "spread": spread, "mean": mean}
+
+
+# ── Detection ────────────────────────────────────────────────────────────
+
+
+def detect_spikes_array(
+    values: np.ndarray,
+    timestamps: Sequence[Sequence[Any]] | np.ndarray,
+    threshold: float = 2.0,
+    *,
+    rolling_window: int | None = None,
+    previous: np.ndarray | None = None,
+) -> list[list[dict]]:
+    """Spikes for every row of ``values``; one spike list per row.
+
+    ``timestamps`` is either one shared 1-D array or a per-row list (as
+    returned by ``points_to_matrix``). ``rolling_window`` switches from a
+    whole-window baseline to a trailing one. ``previous`` (same row
+    order, e.g. the same window yesterday) drops spikes whose peak is
+    also a ``threshold`` z-score excursion there.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2 or values.size == 0:
+        return [[] for _ in range(len(values))]
+    n_rows, width = values.shape
+
+    stats = robust_baselines(values)
+    if rolling_window:
+        rolling = rolling_baselines(values, rolling_window)
+        center, spread = rolling["center"], rolling["spread"]
+    else:
+        center = np.broadcast_to(stats["center"][:, None], values.shape)
+        spread = np.broadcast_to(stats["spread"][:, None], values.shape)
+
+    valid = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        limit = center + threshold * spread
+        above = valid & (values > limit) & (spread > 0)
+
+    # Missing samples keep the previous state: forward-fill ``above``
+    # over NaN gaps, starting from "not in a spike".
+    state_src = np.concatenate([np.zeros((n_rows, 1), bool), above], axis=1)
+    has_state = np.concatenate([np.ones((n_rows, 1), bool), valid], axis=1)
+    idx = np.where(has_state, np.arange(width + 1), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    in_spike = np.take_along_axis(state_src, idx, axis=1)[:, 1:]
+
+    edges = np.diff(np.pad(in_spike.astype(np.int8), ((0, 0), (1, 1))), axis=1)
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # exclusive; row-major order pairs them
+    if not len(starts):
+        return [[] for _ in range(n_rows)]
+
+    # Gather each run's samples into one flat array (runs back to back),
+    # then take the peak and its first position with ``reduceat``.
+    flat = np.where(valid, values, -np.inf).ravel()
+    lengths = ends - starts
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    run_ids = np.repeat(np.arange(len(starts)), lengths)
+    within = np.arange(lengths.sum()) - offsets[run_ids]
+    positions = (start_rows * width + starts)[run_ids] + within
+    samples = flat[positions]
+    peaks = np.maximum.reduceat(samples, offsets)
+    first_hit = np.where(samples == peaks[run_ids], within, width)
+    peak_cols = starts + np.minimum.reduceat(first_hit, offsets)
+
+    # Run centre/spread at the peak (constant per row for global baselines).
+    run_center = center[start_rows, peak_cols]
+    run_spread = spread[start_rows, peak_cols]
+
+    keep = np.ones(len(starts), dtype=bool)
+    if previous is not None:
+        prev = np.asarray(previous, dtype=float)
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            prev_mean = np.nanmean(prev, axis=1)
+            prev_std = np.nanstd(prev, axis=1)
+        pm, ps = prev_mean[start_rows], prev_std[start_rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cyclical = (ps > 0) & ((peaks - pm) / ps >= threshold)
+        keep &= ~cyclical
+
+    per_row_ts = not isinstance(timestamps, np.ndarray) or np.ndim(timestamps) == 2
+    last_valid = width - 1 - np.argmax(valid[:, ::-1], axis=1)
+
+    out: list[list[dict]] = [[] for _ in range(n_rows)]
+    for i in np.nonzero(keep)[0]:
+        row = int(start_rows[i])
+        ts = timestamps[row] if per_row_ts else timestamps
+        end_col = int(ends[i]) if ends[i] < width else int(last_valid[row])
+        spike_spread = float(run_spread[i])
+        spike_center = float(run_center[i])
+        peak = float(peaks[i])
+        deviation_factor = round((peak - spike_center) / spike_spread, 2) if spike_spread > 0 else 0
+        out[row].append({
+            "spike_start": _ts(ts, int(starts[i])),
+            "spike_end": _ts(ts, end_col),
+            "peak_value": peak,
+            "peak_timestamp": _ts(ts, int(peak_cols[i])),
+            "baseline_mean": round(float(stats["mean"][row]), 2),
+            "baseline_stddev": round(spike_spread, 2),
+            "deviation_factor": deviation_factor,
+            "confidence_score": min(95, int(50 + (deviation_factor * 10))),
+        })
+    return out
+
+
+def _ts(timestamps: Sequence[Any] | np.ndarray, col: int) -> Any:
+    value = timestamps[col]
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def detect_spikes(data_points: list[dict], threshold: float = 2.0) -> list[dict]:
+    """Single-series convenience wrapper with the ``_detect_spikes`` contract."""
+    if len(data_points) < MIN_POINTS:
+        return []
+    values, timestamps = points_to_matrix([data_points])
+    return detect_spikes_array(values, timestamps, threshold)[0]
+
+
+def detect_matrix_spikes(
+    result: list[dict],
+    threshold: float = 2.0,
+    *,
+    rolling_window: int | None = None,
+    previous: list[dict] | None = None,
+) -> list[dict]:
+    """Spikes for a whole Prometheus matrix result.
+
+    Returns ``[{"metric": {...}, "spikes": [...]}, ...]`` for series with
+    at least one spike. ``previous`` is the matrix result for the seasonal
+    window; its series are matched to ``result`` by label set.
+    """
+    values, timestamps, metrics = matrix_result_to_array(result)
+    prev_values = None
+    if previous is not None:
+        prev_arr, _, prev_metrics = matrix_result_to_array(previous)
+        by_labels = {_labels_key(m): row for row, m in enumerate(prev_metrics)}
+        prev_values = np.full((len(metrics), max(prev_arr.shape[1], 1)), np.nan)
+        for row, metric in enumerate(metrics):
+            match = by_labels.get(_labels_key(metric))
+            if match is not None:
+                prev_values[row, :prev_arr.shape[1]] = prev_arr[match]
+    spikes = detect_spikes_array(
+        values, timestamps, threshold, rolling_window=rolling_window, previous=prev_values,
+    )
+    return [
+        {"metric": metric, "spikes": found}
+        for metric, found in zip(metrics, spikes) if found
+    ]
+
+
+def _labels_key(metric: dict) -> tuple:
+    return tuple(sorted(metric.items()))
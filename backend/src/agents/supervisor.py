@@ -5,7 +5,7 @@ import time
 import secrets
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime, timezone
 
 from src.models.schemas import (
@@ -62,8 +62,10 @@ from src.agents.causal_engine import (
 )
 from src.agents.orchestration.dispatcher import (
     AgentSpec,
+    AgentTiming,
     Dispatcher,
     StepResult,
+    StreamingDispatcher,
 )
 from src.agents.orchestration.eval_gate import EvalGate
 from src.agents.orchestration.confidence_adapter import (
@@ -109,6 +111,10 @@ logger = get_logger(__name__)
 # exception messages which can be unbounded, so we truncate.
 MAX_GAP_REASON_LEN = 240
 
+# Streaming dispatch feeds EvalGate one completion at a time; round mode
+# typically completes two agents per round.
+_COMPLETIONS_PER_ROUND = 2
+
 
 def record_coverage_gap(state, agent_name: str, reason: str) -> None:
     """Append ``<agent_name>: <reason>`` to ``state.coverage_gaps``,
@@ -124,6 +130,17 @@ def record_coverage_gap(state, agent_name: str, reason: str) -> None:
         state.coverage_gaps.append(entry)
 
 
+def _legacy_agent_result(sr: StepResult) -> tuple[str, Any]:
+    """Map a StepResult back to the ``(name, value_or_exc)`` shape the
+    result-handling code expects. A timeout surfaces as an
+    asyncio.TimeoutError; a general error stays an Exception."""
+    if sr.status == "ok":
+        return sr.agent, sr.value
+    if sr.status == "timeout":
+        return sr.agent, asyncio.TimeoutError(sr.error or "timed out")
+    return sr.agent, RuntimeError(sr.error or "dispatch failed")
+
+
 def update_confidence_ledger(ledger: ConfidenceLedger, pins: list[EvidencePin]) -> None:
     """Update ledger from evidence pins. Average confidence per type, then compute weighted final."""
     type_map: dict[str, list[float]] = {
@@ -499,6 +516,20 @@ class SupervisorAgent:
         planner = Planner()
         rounds_since_new_signal = 0
         round_num = 0
+
+        # Streaming dispatch is opt-in via DIAGNOSTIC_DISPATCH_MODE=streaming:
+        # replan on every agent completion instead of waiting for the slowest
+        # agent of a round. Mocked demo runs keep the paced round loop.
+        _dispatch_mode = os.getenv("DIAGNOSTIC_DISPATCH_MODE", "rounds").strip().lower()
+        _mock_run = [a.strip() for a in os.getenv("MOCK_AGENTS", "").split(",") if a.strip()]
+        if _dispatch_mode == "streaming" and not _mock_run:
+            return await self._run_streaming(
+                state,
+                event_emitter,
+                max_rounds=max_rounds,
+                max_re_investigations=max_re_investigations,
+            )
+
         while True:
             gate_decision = gate.is_done(
                 eval_gate_inputs(
@@ -527,121 +558,7 @@ class SupervisorAgent:
 
             if not next_agents:
                 state.diagnosis_stop_reason = state.diagnosis_stop_reason or "planner_empty"
-                # Add synthesis delay for mocked demo pacing
-                import os as _os_synth
-                _mock_synth = [a.strip() for a in _os_synth.getenv("MOCK_AGENTS", "").split(",") if a.strip()]
-                if _mock_synth:
-                    await event_emitter.emit("supervisor", "progress", "Synthesizing findings across all agents...")
-                    await asyncio.sleep(3.0)
-
-                # Run impact analysis before marking complete
-                await self._run_impact_analysis(state, event_emitter)
-
-                # Query memory store for similar past incidents
-                await self._query_past_incidents(state, event_emitter)
-
-                # Final hypothesis decision
-                if state.hypotheses:
-                    state.hypothesis_result = pick_winner_or_inconclusive(state.hypotheses)
-                    state.hypothesis_result.evidence_timeline = sorted(
-                        self._all_signals,
-                        key=lambda s: s.timestamp or datetime.min.replace(tzinfo=timezone.utc),
-                    )
-                    # Stage I — winning_agents closes the /feedback priors
-                    # loop. Follow-up refinement: derive precise agents
-                    # from winner.evidence_for[*].source_agent (each
-                    # evidence signal carries the agent that produced it).
-                    # Falls back to agents_completed when no winner is
-                    # picked (inconclusive hypothesis_result).
-                    winner = getattr(state.hypothesis_result, "winner", None)
-                    if winner is not None and getattr(winner, "evidence_for", None):
-                        precise_agents = [
-                            getattr(sig, "source_agent", None)
-                            for sig in winner.evidence_for
-                            if getattr(sig, "source_agent", None)
-                        ]
-                        state.winning_agents = list(dict.fromkeys(precise_agents)) or (
-                            list(dict.fromkeys(state.agents_completed))
-                        )
-                    else:
-                        state.winning_agents = list(
-                            dict.fromkeys(state.agents_completed)
-                        )
-                    try:
-                        await self._persist_winning_agents(state)
-                    except Exception as exc:
-                        logger.warning(
-                            "persist winning_agents failed (non-fatal): %s", exc
-                        )
-                    if event_emitter:
-                        if state.hypothesis_result.status == "resolved" and state.hypothesis_result.winner:
-                            w = state.hypothesis_result.winner
-                            await event_emitter.emit(
-                                "supervisor", "hypothesis_winner",
-                                f"Winner: {w.category} (confidence: {w.confidence:.0f}%)",
-                                details={"hypothesis_id": w.hypothesis_id, "category": w.category,
-                                         "confidence": w.confidence},
-                            )
-                        else:
-                            await event_emitter.emit(
-                                "supervisor", "hypothesis_inconclusive",
-                                "Investigation inconclusive — competing hypotheses or insufficient evidence",
-                                details={"recommendations": state.hypothesis_result.recommendations},
-                            )
-
-                state.phase = DiagnosticPhase.DIAGNOSIS_COMPLETE
-                logger.info("Diagnosis complete", extra={"session_id": state.session_id, "agent_name": "supervisor", "action": "diagnosis_complete", "extra": {"overall_confidence": state.overall_confidence, "total_findings": len(state.all_findings)}})
-                await event_emitter.emit("supervisor", "success", "Diagnosis complete")
-
-                # Check if auto-approval applies (high confidence, no critic challenges)
-                critic_has_challenges = any(
-                    cv.verdict == "challenged" and cv.confidence_in_verdict > 80
-                    for cv in state.critic_verdicts
-                )
-                if self._should_auto_approve(state.overall_confidence, critic_has_challenges):
-                    await event_emitter.emit(
-                        "supervisor", "auto_approved",
-                        "Findings auto-approved (high confidence, no critic challenges)",
-                        details={
-                            "gate_type": "discovery_complete",
-                            "findings_count": len(state.all_findings),
-                            "confidence": state.overall_confidence,
-                        }
-                    )
-                    self._attestation_acknowledged = True
-                else:
-                    await event_emitter.emit(
-                        "supervisor", "attestation_required",
-                        "Human attestation required before proceeding to remediation",
-                        details={
-                            "gate_type": "discovery_complete",
-                            "findings_count": len(state.all_findings),
-                            "confidence": state.overall_confidence,
-                            "proposed_action": "Proceed to remediation phase",
-                        }
-                    )
-
-                    # Save PendingAction to Redis so the front-end can resume later
-                    from src.models.pending_action import PendingAction
-                    from datetime import timedelta
-
-                    pending = PendingAction(
-                        type="attestation_required",
-                        blocking=True,
-                        actions=["approve", "reject", "details"],
-                        expires_at=datetime.now(timezone.utc) + timedelta(
-                            seconds=int(os.getenv("ATTESTATION_TIMEOUT_S", "600"))
-                        ),
-                        context={
-                            "findings_count": len(state.all_findings),
-                            "confidence": state.overall_confidence,
-                            "proposed_action": "Proceed to remediation phase",
-                        },
-                        version=1,
-                    )
-                    if self._session_store and self._session_id:
-                        await self._session_store.save_pending_action(self._session_id, pending)
-
+                await self._finish_diagnosis(state, event_emitter)
                 return  # Clean exit — no coroutine held open
 
             state.agents_pending = next_agents
@@ -672,21 +589,7 @@ class SupervisorAgent:
                 )
                 specs = [AgentSpec(agent=n) for n in next_agents]
                 step_results = await dispatcher.dispatch_round(specs)
-                # Map StepResult back to the legacy ``(name, value_or_exc)``
-                # shape downstream code expects. A timeout surfaces as an
-                # asyncio.TimeoutError; a general error stays an Exception.
-                agent_results = []
-                for sr in step_results:
-                    if sr.status == "ok":
-                        agent_results.append((sr.agent, sr.value))
-                    elif sr.status == "timeout":
-                        agent_results.append(
-                            (sr.agent, asyncio.TimeoutError(sr.error or "timed out"))
-                        )
-                    else:
-                        agent_results.append(
-                            (sr.agent, RuntimeError(sr.error or "dispatch failed"))
-                        )
+                agent_results = [_legacy_agent_result(sr) for sr in step_results]
             else:
                 # Sequential dispatch — one at a time (always for single agent, forced for mocked)
                 agent_results = []
@@ -729,120 +632,20 @@ class SupervisorAgent:
             # Legacy per-agent running-average is computed inside
             # _update_state_with_result; when the deterministic flag is set
             # we recompute from state as a whole *after* the result loop.
-            # The override lands below so _update_state_with_result has
-            # already filled in any typed-state fields the formula reads.
-            for agent_name, agent_result in agent_results:
-                if isinstance(agent_result, Exception):
-                    logger.error("Agent raised exception", extra={"agent_name": agent_name, "extra": str(agent_result)})
-                    # C2: Mark failed agent as completed to prevent infinite re-dispatch
-                    state.agents_completed.append(agent_name)
-                    # Task 1.14: surface the failure to downstream consumers.
-                    record_coverage_gap(state, agent_name, str(agent_result) or type(agent_result).__name__)
-                    if event_emitter:
-                        await event_emitter.emit(agent_name, "error", f"Agent failed: {str(agent_result)}")
-                    continue
-                if agent_result:
-                    await self._update_state_with_result(state, agent_name, agent_result, event_emitter)
-                    self._stamp_prompt_version(state, agent_name)
-                    state.agents_completed.append(agent_name)
-
-                    # Evaluate hypotheses after each agent
-                    if state.hypotheses:
-                        await self._evaluate_hypotheses_after_agent(
-                            state, agent_name, agent_result, event_emitter
-                        )
-
-                    # Emit agent summary
-                    summary = self._build_agent_summary(agent_name, agent_result, state)
-                    await event_emitter.emit(
-                        agent_name, "summary",
-                        summary,
-                        details={"confidence": state.overall_confidence, "findings_count": len(state.all_findings)}
-                    )
-
-                    # Run Critic validation on major findings
-                    for finding in state.all_findings:
-                        if finding.critic_verdict is None:
-                            # Build agent contexts for cross-validation
-                            metrics_ctx = {}
-                            if state.metrics_analysis:
-                                for a in state.metrics_analysis.anomalies:
-                                    metrics_ctx[a.metric_name] = {"value": a.peak_value, "status": a.severity}
-                            k8s_ctx = {}
-                            if state.k8s_analysis:
-                                k8s_ctx["oom_kills"] = sum(1 for p in state.k8s_analysis.pod_statuses if p.oom_killed)
-                                k8s_ctx["memory_percent"] = 0
-                                k8s_ctx["crashloop"] = state.k8s_analysis.is_crashloop
-                            # Stage G — env-gated critic path. Default legacy
-                            # single-role CriticAgent; ensemble is opt-in via
-                            # DIAGNOSTIC_CRITIC_MODE=ensemble. Ensemble output
-                            # is mapped back to the CriticVerdict shape the UI
-                            # + re-investigation branch below expect.
-                            verdict = await self._run_critic_on_finding(
-                                finding,
-                                metrics_context=metrics_ctx,
-                                k8s_context=k8s_ctx,
-                                state=state,
-                            )
-                            finding.critic_verdict = verdict
-                            state.critic_verdicts.append(verdict)
-                            logger.info("Critic validation", extra={"session_id": state.session_id, "agent_name": "critic", "action": "verdict", "extra": {"finding": finding.summary[:80], "verdict": verdict.verdict, "confidence": verdict.confidence_in_verdict}})
-
-                            if verdict.verdict == "challenged" and verdict.confidence_in_verdict > 80:
-                                await event_emitter.emit(
-                                    "critic", "warning",
-                                    f"Challenged: {finding.summary} — {verdict.reasoning}"
-                                )
-                                if re_investigation_count < max_re_investigations:
-                                    reset_cross_check_state_for_reinvestigation(state)
-                                    state.phase = DiagnosticPhase.RE_INVESTIGATING
-                                    re_investigation_count += 1
-                                else:
-                                    logger.warning("Max re-investigations reached, proceeding to diagnosis", extra={
-                                        "session_id": state.session_id, "agent_name": "supervisor",
-                                        "action": "re_investigation_capped",
-                                        "extra": {"re_investigation_count": re_investigation_count}
-                                    })
-
-            # Stage F — deterministic confidence override (env-flagged).
-            # Runs after _update_state_with_result has mutated state for
-            # each agent so the ConfidenceInputs reflect the newest round.
-            if state_confidence_mode() == "deterministic":
-                try:
-                    det_conf = compute_state_confidence(state)
-                    # compute_state_confidence returns 0..1; overall_confidence
-                    # is 0..100.
-                    state.overall_confidence = round(max(0.0, min(det_conf, 1.0)) * 100)
-                except Exception as _conf_exc:
-                    logger.warning(
-                        "deterministic confidence failed; retaining legacy value: %s",
-                        _conf_exc,
-                    )
-
-            old_phase = state.phase
-            self._update_phase(state, event_emitter)
-
-            # Add phase transition delay for mocked demo pacing
-            if _any_mocked and state.phase != old_phase:
-                await asyncio.sleep(2.0)
+            # The override lands in _post_round_updates so
+            # _update_state_with_result has already filled in any
+            # typed-state fields the formula reads.
+            re_investigation_count = await self._apply_agent_results(
+                state,
+                agent_results,
+                event_emitter,
+                re_investigation_count=re_investigation_count,
+                max_re_investigations=max_re_investigations,
+            )
 
-            # Enrich reasoning chain after metrics analysis completes (skip if mocked — no point reasoning over fixture data)
-            import os as _os
-            _mock_agents = [a.strip() for a in _os.getenv("MOCK_AGENTS", "").split(",") if a.strip()]
-            if "metrics_agent" in [n for n, _ in agent_results if not isinstance(_, Exception)] and "metrics_agent" not in _mock_agents:
-                await self._enrich_reasoning_chain(state, event_emitter)
-
-            # Human-in-the-loop: ask user to confirm repos before dispatching change_agent
-            if (
-                "change_agent" in self._agents
-                and "change_agent" not in state.agents_completed
-                and "metrics_agent" in state.agents_completed
-            ):
-                await self._request_repo_confirmation(state, event_emitter)
-                # Ensure change_agent is marked complete regardless of outcome
-                # (timeout, skip, no affected services) to prevent re-dispatch
-                if "change_agent" not in state.agents_completed:
-                    state.agents_completed.append("change_agent")
+            await self._post_round_updates(
+                state, agent_results, event_emitter, mocked=_any_mocked
+            )
 
             round_num += 1
 
@@ -918,6 +721,490 @@ class SupervisorAgent:
 
         return state
 
+    async def _run_streaming(
+        self,
+        state: DiagnosticState,
+        event_emitter: EventEmitter,
+        *,
+        max_rounds: int,
+        max_re_investigations: int,
+    ) -> Optional[DiagnosticState]:
+        """Dependency-driven dispatch: replan whenever any agent finishes.
+
+        Each completion is folded into state exactly as a one-agent round
+        would be; the planner then runs again and newly eligible agents
+        launch straight away under a per-backend budget
+        (``AGENT_BACKEND_CONCURRENCY``, default 2) rather than waiting
+        behind the slowest agent of a round. Agents whose prerequisites are
+        missing are resolved inline so they never hold a slot.
+
+        EvalGate treats every completion as a round, with the cap and the
+        no-new-signal window both scaled by ``_COMPLETIONS_PER_ROUND`` so
+        the budgets match two-agent rounds. When the gate stops
+        the run, agents still in flight are cancelled and recorded as
+        coverage gaps. Return values mirror ``run``.
+
+        The repo confirmation for change_agent waits on the user, so it
+        runs as a separate task while completions keep draining; the run
+        only finishes once it is settled.
+        """
+        reducer = Reducer()
+        gate = EvalGate(round_scale=_COMPLETIONS_PER_ROUND)
+        planner = Planner()
+        planner_mode = os.getenv("DIAGNOSTIC_PLANNER_MODE", "legacy").strip().lower()
+        dispatcher = StreamingDispatcher(
+            executor=lambda spec: self._dispatch_agent(spec.agent, state, event_emitter),
+            timeout_per_agent_s=float(os.getenv("AGENT_DISPATCH_TIMEOUT_S", "120.0")),
+            default_budget=int(os.getenv("AGENT_BACKEND_CONCURRENCY", "2")),
+        )
+        re_investigation_count = 0
+        rounds_since_new_signal = 0
+        completions = 0
+        unblocked_by: Optional[str] = None
+        confirm_task: Optional[asyncio.Task] = None
+        try:
+            while True:
+                gate_decision = gate.is_done(
+                    eval_gate_inputs(
+                        state,
+                        round_num=completions,
+                        rounds_since_new_signal=rounds_since_new_signal,
+                        max_rounds=_COMPLETIONS_PER_ROUND * max_rounds,
+                        max_agents=len(self._agents) or 6,
+                    )
+                )
+                if gate_decision.is_done:
+                    state.diagnosis_stop_reason = gate_decision.reason
+                    for agent_name in await dispatcher.cancel_all():
+                        record_coverage_gap(
+                            state, agent_name, f"cancelled: {gate_decision.reason}"
+                        )
+                    break
+
+                confirming = confirm_task is not None and not confirm_task.done()
+                await self._launch_eligible(
+                    state, dispatcher, event_emitter,
+                    planner=planner, planner_mode=planner_mode,
+                    unblocked_by=unblocked_by,
+                    reserved={"change_agent"} if confirming else set(),
+                )
+                state.agents_pending = sorted(dispatcher.in_flight)
+
+                if not state.agents_pending and confirm_task is not None:
+                    # Nothing else to drain: settle the confirmation, then
+                    # replan with whatever change_agent found.
+                    await confirm_task
+                    confirm_task = None
+                    continue
+
+                if not state.agents_pending:
+                    state.diagnosis_stop_reason = state.diagnosis_stop_reason or "planner_empty"
+                    await self._record_critical_path(state, dispatcher, event_emitter)
+                    await self._finish_diagnosis(state, event_emitter)
+                    return None
+
+                result = await dispatcher.next_result()
+                await self._emit_agent_timing(state, dispatcher.timings[-1], event_emitter)
+                unblocked_by = result.agent
+                completions += 1
+
+                if reducer.reduce([result]).new_signal:
+                    rounds_since_new_signal = 0
+                else:
+                    rounds_since_new_signal += 1
+
+                agent_results = [_legacy_agent_result(result)]
+                re_investigation_count = await self._apply_agent_results(
+                    state,
+                    agent_results,
+                    event_emitter,
+                    re_investigation_count=re_investigation_count,
+                    max_re_investigations=max_re_investigations,
+                )
+                # An empty result would otherwise leave the agent eligible and
+                # relaunch it on every completion.
+                if result.value is None and result.agent not in state.agents_completed:
+                    state.agents_completed.append(result.agent)
+                await self._post_round_updates(
+                    state, agent_results, event_emitter, confirm_repos=False
+                )
+                if confirm_task is None and self._needs_repo_confirmation(
+                    state, dispatcher.in_flight
+                ):
+                    confirm_task = asyncio.create_task(self._confirm_repos(state, event_emitter))
+
+            if confirm_task is not None:
+                await confirm_task
+        finally:
+            # No-op on the normal paths; on cancellation of the run it stops
+            # agents that would otherwise outlive the investigation.
+            if confirm_task is not None and not confirm_task.done():
+                confirm_task.cancel()
+                self._pending_repo_confirmation = False
+            await dispatcher.cancel_all()
+
+        await self._record_critical_path(state, dispatcher, event_emitter)
+        state.token_usage.append(self.llm_client.get_total_usage())
+        state.token_usage.append(self._critic.get_token_usage())
+        return state
+
+    async def _launch_eligible(
+        self,
+        state: DiagnosticState,
+        dispatcher: StreamingDispatcher,
+        event_emitter: EventEmitter,
+        *,
+        planner: Planner,
+        planner_mode: str,
+        unblocked_by: Optional[str],
+        reserved: set[str] = frozenset(),
+    ) -> None:
+        """Submit every agent the planner now considers eligible.
+
+        Agents already in flight (or ``reserved`` by work running outside
+        the dispatcher) are never submitted twice, and completed
+        agents only come back while re-investigating. An agent failing
+        ``_check_prerequisites`` is skipped inline (``_dispatch_agent``
+        records the gap and marks it completed); since that can advance the
+        phase, planning repeats until a pass skips nothing.
+        """
+        while True:
+            in_flight = dispatcher.in_flight | reserved
+            if planner_mode == "deterministic":
+                inputs = planner_inputs(state, registered_agents=set(self._agents.keys()))
+                inputs.agents_completed.extend(sorted(in_flight))
+                candidates = planner.next(inputs)
+            else:
+                redispatch = state.phase == DiagnosticPhase.RE_INVESTIGATING
+                candidates = [
+                    a for a in self._decide_next_agents(state)
+                    if a not in in_flight
+                    and (redispatch or a not in state.agents_completed)
+                ]
+
+            skipped = False
+            for agent_name in candidates:
+                if (
+                    self._investigation_executor is None
+                    and self._check_prerequisites(agent_name, state)
+                ):
+                    await self._dispatch_agent(agent_name, state, event_emitter)
+                    skipped = True
+                    continue
+                logger.info("Agent dispatched", extra={"session_id": state.session_id, "agent_name": agent_name, "action": "dispatch", "extra": {"phase": state.phase.value, "unblocked_by": unblocked_by}})
+                await event_emitter.emit("supervisor", "progress", f"Dispatching {agent_name}")
+                dispatcher.submit(AgentSpec(agent=agent_name), unblocked_by=unblocked_by)
+            if not skipped:
+                return
+            self._update_phase(state, event_emitter)
+
+    async def _emit_agent_timing(
+        self, state: DiagnosticState, timing: AgentTiming, event_emitter: EventEmitter
+    ) -> None:
+        logger.info("Agent timing", extra={"session_id": state.session_id, "agent_name": timing.agent, "action": "agent_timing", "extra": timing.as_dict(), "duration_ms": round(timing.elapsed_s * 1000)})
+        await event_emitter.emit(
+            "supervisor", "progress",
+            f"{timing.agent} finished at +{timing.finished_s:.1f}s "
+            f"(ran {timing.elapsed_s:.1f}s, queued {timing.queued_s:.1f}s)",
+            details={"agent_timing": timing.as_dict()},
+        )
+
+    async def _record_critical_path(
+        self, state: DiagnosticState, dispatcher: StreamingDispatcher, event_emitter: EventEmitter
+    ) -> None:
+        path = dispatcher.critical_path()
+        state.critical_path = [t.as_dict() for t in path]
+        if not path:
+            return
+        chain = " → ".join(t.agent for t in path)
+        logger.info("Critical path", extra={"session_id": state.session_id, "agent_name": "supervisor", "action": "critical_path", "extra": state.critical_path, "duration_ms": round(path[-1].finished_s * 1000)})
+        await event_emitter.emit(
+            "supervisor", "progress",
+            f"Critical path: {chain} ({path[-1].finished_s:.1f}s)",
+            details={"critical_path": state.critical_path},
+        )
+
+    async def _finish_diagnosis(self, state: DiagnosticState, event_emitter: EventEmitter) -> None:
+        """Close out a run whose planner has nothing left to dispatch.
+
+        Impact analysis, past-incident lookup, the final hypothesis pick and
+        the discovery attestation gate — shared by round and streaming
+        dispatch.
+        """
+        # Add synthesis delay for mocked demo pacing
+        import os as _os_synth
+        _mock_synth = [a.strip() for a in _os_synth.getenv("MOCK_AGENTS", "").split(",") if a.strip()]
+        if _mock_synth:
+            await event_emitter.emit("supervisor", "progress", "Synthesizing findings across all agents...")
+            await asyncio.sleep(3.0)
+
+        # Run impact analysis before marking complete
+        await self._run_impact_analysis(state, event_emitter)
+
+        # Query memory store for similar past incidents
+        await self._query_past_incidents(state, event_emitter)
+
+        # Final hypothesis decision
+        if state.hypotheses:
+            state.hypothesis_result = pick_winner_or_inconclusive(state.hypotheses)
+            state.hypothesis_result.evidence_timeline = sorted(
+                self._all_signals,
+                key=lambda s: s.timestamp or datetime.min.replace(tzinfo=timezone.utc),
+            )
+            # Stage I — winning_agents closes the /feedback priors
+            # loop. Follow-up refinement: derive precise agents
+            # from winner.evidence_for[*].source_agent (each
+            # evidence signal carries the agent that produced it).
+            # Falls back to agents_completed when no winner is
+            # picked (inconclusive hypothesis_result).
+            winner = getattr(state.hypothesis_result, "winner", None)
+            if winner is not None and getattr(winner, "evidence_for", None):
+                precise_agents = [
+                    getattr(sig, "source_agent", None)
+                    for sig in winner.evidence_for
+                    if getattr(sig, "source_agent", None)
+                ]
+                state.winning_agents = list(dict.fromkeys(precise_agents)) or (
+                    list(dict.fromkeys(state.agents_completed))
+                )
+            else:
+                state.winning_agents = list(
+                    dict.fromkeys(state.agents_completed)
+                )
+            try:
+                await self._persist_winning_agents(state)
+            except Exception as exc:
+                logger.warning(
+                    "persist winning_agents failed (non-fatal): %s", exc
+                )
+            if event_emitter:
+                if state.hypothesis_result.status == "resolved" and state.hypothesis_result.winner:
+                    w = state.hypothesis_result.winner
+                    await event_emitter.emit(
+                        "supervisor", "hypothesis_winner",
+                        f"Winner: {w.category} (confidence: {w.confidence:.0f}%)",
+                        details={"hypothesis_id": w.hypothesis_id, "category": w.category,
+                                 "confidence": w.confidence},
+                    )
+                else:
+                    await event_emitter.emit(
+                        "supervisor", "hypothesis_inconclusive",
+                        "Investigation inconclusive — competing hypotheses or insufficient evidence",
+                        details={"recommendations": state.hypothesis_result.recommendations},
+                    )
+
+        state.phase = DiagnosticPhase.DIAGNOSIS_COMPLETE
+        logger.info("Diagnosis complete", extra={"session_id": state.session_id, "agent_name": "supervisor", "action": "diagnosis_complete", "extra": {"overall_confidence": state.overall_confidence, "total_findings": len(state.all_findings)}})
+        await event_emitter.emit("supervisor", "success", "Diagnosis complete")
+
+        # Check if auto-approval applies (high confidence, no critic challenges)
+        critic_has_challenges = any(
+            cv.verdict == "challenged" and cv.confidence_in_verdict > 80
+            for cv in state.critic_verdicts
+        )
+        if self._should_auto_approve(state.overall_confidence, critic_has_challenges):
+            await event_emitter.emit(
+                "supervisor", "auto_approved",
+                "Findings auto-approved (high confidence, no critic challenges)",
+                details={
+                    "gate_type": "discovery_complete",
+                    "findings_count": len(state.all_findings),
+                    "confidence": state.overall_confidence,
+                }
+            )
+            self._attestation_acknowledged = True
+        else:
+            await event_emitter.emit(
+                "supervisor", "attestation_required",
+                "Human attestation required before proceeding to remediation",
+                details={
+                    "gate_type": "discovery_complete",
+                    "findings_count": len(state.all_findings),
+                    "confidence": state.overall_confidence,
+                    "proposed_action": "Proceed to remediation phase",
+                }
+            )
+
+            # Save PendingAction to Redis so the front-end can resume later
+            from src.models.pending_action import PendingAction
+            from datetime import timedelta
+
+            pending = PendingAction(
+                type="attestation_required",
+                blocking=True,
+                actions=["approve", "reject", "details"],
+                expires_at=datetime.now(timezone.utc) + timedelta(
+                    seconds=int(os.getenv("ATTESTATION_TIMEOUT_S", "600"))
+                ),
+                context={
+                    "findings_count": len(state.all_findings),
+                    "confidence": state.overall_confidence,
+                    "proposed_action": "Proceed to remediation phase",
+                },
+                version=1,
+            )
+            if self._session_store and self._session_id:
+                await self._session_store.save_pending_action(self._session_id, pending)
+
+    async def _apply_agent_results(
+        self,
+        state: DiagnosticState,
+        agent_results: list[tuple[str, Any]],
+        event_emitter: EventEmitter,
+        *,
+        re_investigation_count: int,
+        max_re_investigations: int,
+    ) -> int:
+        """Fold ``(agent, value_or_exc)`` results into state.
+
+        Failures become coverage gaps; successes update typed state, feed
+        hypothesis evaluation and run the critic over fresh findings. A
+        confident challenge flips the phase to RE_INVESTIGATING while the
+        re-investigation budget lasts. Returns the updated re-investigation
+        count.
+        """
+        for agent_name, agent_result in agent_results:
+            if isinstance(agent_result, Exception):
+                logger.error("Agent raised exception", extra={"agent_name": agent_name, "extra": str(agent_result)})
+                # C2: Mark failed agent as completed to prevent infinite re-dispatch
+                state.agents_completed.append(agent_name)
+                # Task 1.14: surface the failure to downstream consumers.
+                record_coverage_gap(state, agent_name, str(agent_result) or type(agent_result).__name__)
+                if event_emitter:
+                    await event_emitter.emit(agent_name, "error", f"Agent failed: {str(agent_result)}")
+                continue
+            if agent_result:
+                await self._update_state_with_result(state, agent_name, agent_result, event_emitter)
+                self._stamp_prompt_version(state, agent_name)
+                state.agents_completed.append(agent_name)
+
+                # Evaluate hypotheses after each agent
+                if state.hypotheses:
+                    await self._evaluate_hypotheses_after_agent(
+                        state, agent_name, agent_result, event_emitter
+                    )
+
+                # Emit agent summary
+                summary = self._build_agent_summary(agent_name, agent_result, state)
+                await event_emitter.emit(
+                    agent_name, "summary",
+                    summary,
+                    details={"confidence": state.overall_confidence, "findings_count": len(state.all_findings)}
+                )
+
+                # Run Critic validation on major findings
+                for finding in state.all_findings:
+                    if finding.critic_verdict is None:
+                        # Build agent contexts for cross-validation
+                        metrics_ctx = {}
+                        if state.metrics_analysis:
+                            for a in state.metrics_analysis.anomalies:
+                                metrics_ctx[a.metric_name] = {"value": a.peak_value, "status": a.severity}
+                        k8s_ctx = {}
+                        if state.k8s_analysis:
+                            k8s_ctx["oom_kills"] = sum(1 for p in state.k8s_analysis.pod_statuses if p.oom_killed)
+                            k8s_ctx["memory_percent"] = 0
+                            k8s_ctx["crashloop"] = state.k8s_analysis.is_crashloop
+                        # Stage G — env-gated critic path. Default legacy
+                        # single-role CriticAgent; ensemble is opt-in via
+                        # DIAGNOSTIC_CRITIC_MODE=ensemble. Ensemble output
+                        # is mapped back to the CriticVerdict shape the UI
+                        # + re-investigation branch below expect.
+                        verdict = await self._run_critic_on_finding(
+                            finding,
+                            metrics_context=metrics_ctx,
+                            k8s_context=k8s_ctx,
+                            state=state,
+                        )
+                        finding.critic_verdict = verdict
+                        state.critic_verdicts.append(verdict)
+                        logger.info("Critic validation", extra={"session_id": state.session_id, "agent_name": "critic", "action": "verdict", "extra": {"finding": finding.summary[:80], "verdict": verdict.verdict, "confidence": verdict.confidence_in_verdict}})
+
+                        if verdict.verdict == "challenged" and verdict.confidence_in_verdict > 80:
+                            await event_emitter.emit(
+                                "critic", "warning",
+                                f"Challenged: {finding.summary} — {verdict.reasoning}"
+                            )
+                            if re_investigation_count < max_re_investigations:
+                                reset_cross_check_state_for_reinvestigation(state)
+                                state.phase = DiagnosticPhase.RE_INVESTIGATING
+                                re_investigation_count += 1
+                            else:
+                                logger.warning("Max re-investigations reached, proceeding to diagnosis", extra={
+                                    "session_id": state.session_id, "agent_name": "supervisor",
+                                    "action": "re_investigation_capped",
+                                    "extra": {"re_investigation_count": re_investigation_count}
+                                })
+        return re_investigation_count
+
+    async def _post_round_updates(
+        self,
+        state: DiagnosticState,
+        agent_results: list[tuple[str, Any]],
+        event_emitter: EventEmitter,
+        *,
+        mocked: bool = False,
+        confirm_repos: bool = True,
+    ) -> None:
+        """Confidence override, phase advance and follow-ups after results land.
+
+        With ``confirm_repos=False`` the repo confirmation is left to the
+        caller (streaming dispatch runs it as its own task).
+        """
+        # Stage F — deterministic confidence override (env-flagged).
+        # Runs after _update_state_with_result has mutated state for
+        # each agent so the ConfidenceInputs reflect the newest round.
+        if state_confidence_mode() == "deterministic":
+            try:
+                det_conf = compute_state_confidence(state)
+                # compute_state_confidence returns 0..1; overall_confidence
+                # is 0..100.
+                state.overall_confidence = round(max(0.0, min(det_conf, 1.0)) * 100)
+            except Exception as _conf_exc:
+                logger.warning(
+                    "deterministic confidence failed; retaining legacy value: %s",
+                    _conf_exc,
+                )
+
+        old_phase = state.phase
+        self._update_phase(state, event_emitter)
+
+        # Add phase transition delay for mocked demo pacing
+        if mocked and state.phase != old_phase:
+            await asyncio.sleep(2.0)
+
+        # Enrich reasoning chain after metrics analysis completes (skip if mocked — no point reasoning over fixture data)
+        import os as _os
+        _mock_agents = [a.strip() for a in _os.getenv("MOCK_AGENTS", "").split(",") if a.strip()]
+        if "metrics_agent" in [n for n, _ in agent_results if not isinstance(_, Exception)] and "metrics_agent" not in _mock_agents:
+            await self._enrich_reasoning_chain(state, event_emitter)
+
+        # Human-in-the-loop: ask user to confirm repos before dispatching change_agent
+        if confirm_repos and self._needs_repo_confirmation(state):
+            await self._confirm_repos(state, event_emitter)
+
+    def _needs_repo_confirmation(
+        self, state: DiagnosticState, in_flight: set[str] = frozenset(),
+    ) -> bool:
+        """Whether change_agent still waits on the repo confirmation.
+
+        An agent already in flight is not asked about: its own completion
+        marks it done.
+        """
+        return (
+            "change_agent" in self._agents
+            and "change_agent" not in state.agents_completed
+            and "change_agent" not in in_flight
+            and "metrics_agent" in state.agents_completed
+        )
+
+    async def _confirm_repos(self, state: DiagnosticState, event_emitter: EventEmitter) -> None:
+        await self._request_repo_confirmation(state, event_emitter)
+        # Ensure change_agent is marked complete regardless of outcome
+        # (timeout, skip, no affected services) to prevent re-dispatch
+        if "change_agent" not in state.agents_completed:
+            state.agents_completed.append("change_agent")
+
     def _decide_next_agents(self, state: DiagnosticState) -> list[str]:
         """Decide which agents to dispatch based on current state."""
         if state.phase == DiagnosticPhase.INITIAL:
@@ -342,6 +342,9 @@ def create_app() -> FastAPI:
             app.state.redis = await get_redis_client()
             app.state.session_store = RedisSessionStore(app.state.redis)
             logger.info("Redis session store initialized")
+            # Share Prometheus range-query chunks across replicas.
+            from src.tools.range_query_cache import configure_range_cache
+            configure_range_cache(redis_client=app.state.redis)
         except Exception as e:
             logger.warning("Redis session store init failed (falling back to in-memory): %s", e)
             app.state.redis = None
@@ -801,6 +804,13 @@ def create_app() -> FastAPI:
         except Exception as e:
             logger.warning("http_clients.close_all failed: %s", e)
 
+        # ── Stop shared K8s informer watches ──
+        try:
+            from src.agents.cluster_client.informer import stop_all as _stop_informers
+            _stop_informers()
+        except Exception as e:
+            logger.warning("K8s informer shutdown failed: %s", e)
+
         # ── Close Redis connection ──
         if getattr(app.state, "redis", None):
             try:
@@ -129,12 +129,22 @@ def get_metric_history(
     entity_id: str,
     metric_name: str,
     since: str = "1970-01-01T00:00:00",
+    until: str | None = None,
+    resolution: str = "raw",
 ):
-    """Query time-series metric history from the topology store."""
+    """Query time-series metric history from the topology store.
+
+    ``resolution`` is ``raw``, ``1m``, ``1h`` or ``auto`` (rollups sized
+    for a chart, see ``TopologyStore.query_metric_history``).
+    """
     store = _get_topology_store()
     if not store:
         return []
-    return store.query_metric_history(entity_type, entity_id, metric_name, since)
+    try:
+        return store.query_metric_history(entity_type, entity_id, metric_name, since,
+                                          until=until, resolution=resolution)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
 
 
 @monitor_router.get("/link-metrics")
@@ -159,8 +169,9 @@ async def device_history(device_id: str, period: str = "24h"):
     days = period_map.get(period, 1)
     since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
 
-    latency = store.query_metric_history("device", device_id, "latency_ms", since)
-    packet_loss = store.query_metric_history("device", device_id, "packet_loss", since)
+    # Longer periods come from the minute/hour rollups, already chart-sized
+    latency = store.query_metric_history("device", device_id, "latency_ms", since, resolution="auto")
+    packet_loss = store.query_metric_history("device", device_id, "packet_loss", since, resolution="auto")
     return {
         "device_id": device_id,
         "period": period,
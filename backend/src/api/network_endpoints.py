@@ -859,9 +859,7 @@ async def update_device(device_id: str, body: Dict[str, Any]):
     device = store.update_device(device_id, **body)
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
-    # Reload KG to pick up changes
-    kg = _get_knowledge_graph()
-    kg.load_from_store()
+    _get_knowledge_graph().refresh_device(device_id)
     return {"device": device.model_dump()}
 
 
@@ -873,9 +871,7 @@ async def delete_device_endpoint(device_id: str):
     if not device:
         raise HTTPException(status_code=404, detail="Device not found")
     store.delete_device(device_id)
-    # Reload KG
-    kg = _get_knowledge_graph()
-    kg.load_from_store()
+    _get_knowledge_graph().remove_device(device_id)
     return {"status": "deleted", "device_id": device_id}
 
 
@@ -910,8 +906,7 @@ async def delete_interface(interface_id: str):
     """Delete an interface."""
     store = _get_topology_store()
     store.delete_interface(interface_id)
-    kg = _get_knowledge_graph()
-    kg.load_from_store()
+    _get_knowledge_graph().refresh_interface(interface_id)
     return {"status": "deleted", "interface_id": interface_id}
 
 
@@ -920,6 +915,7 @@ async def delete_route(route_id: str):
     """Delete a route."""
     store = _get_topology_store()
     store.delete_route(route_id)
+    _get_knowledge_graph().refresh_route(route_id)
     return {"status": "deleted", "route_id": route_id}
 
 
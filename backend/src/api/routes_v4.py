@@ -1410,6 +1410,9 @@ async def get_session_status(session_id: str):
         # Stage J — self-consistency summary (None when the feature was
         # off for this run).
         result["self_consistency"] = getattr(state, "self_consistency", None)
+        # Streaming dispatch — per-agent timings along the critical path
+        # (empty for round-based runs).
+        result["critical_path"] = list(getattr(state, "critical_path", []) or [])
 
     return result
 
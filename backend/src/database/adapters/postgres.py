@@ -30,9 +30,91 @@ logger = logging.getLogger(__name__)
 QUERY_TIMEOUT_SEC = 10
 ROW_LIMIT = 1000
 
+# Monitor/diagnostic reads run on a small per-adapter pool so the DBMonitor
+# snapshot fetchers and interactive diagnostics don't queue behind each
+# other on one connection.
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 4
+# Tags the pool's sessions so activity counts can leave them out; otherwise
+# sibling pool connections show up as load on the monitored database.
+POOL_APPLICATION_NAME = "debugduck-db-monitor"
+
+# Catalog queries behind the cached snapshots. Kept as module constants so
+# the query text is identical on every call: asyncpg's per-connection
+# statement cache then prepares each once per pooled connection and reuses
+# the prepared statement on every later monitor cycle. ``$1`` is always
+# POOL_APPLICATION_NAME.
+_PERF_SQL = """
+    SELECT
+        (SELECT count(*) FROM pg_stat_activity
+         WHERE state = 'active' AND application_name IS DISTINCT FROM $1) AS active,
+        (SELECT count(*) FROM pg_stat_activity
+         WHERE state = 'idle' AND application_name IS DISTINCT FROM $1) AS idle,
+        (SELECT setting::int FROM pg_settings WHERE name = 'max_connections') AS max,
+        COALESCE(
+            (SELECT round(sum(heap_blks_hit)::numeric / NULLIF(sum(heap_blks_hit) + sum(heap_blks_read), 0), 4)
+             FROM pg_statio_user_tables), 0
+        ) AS ratio,
+        (SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()) AS tps,
+        (SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()) AS deadlocks,
+        EXTRACT(EPOCH FROM now() - pg_postmaster_start_time())::int AS uptime
+"""
+
+_ACTIVE_QUERIES_SQL = """
+    SELECT pid, query,
+           EXTRACT(EPOCH FROM now() - query_start) * 1000 AS duration_ms,
+           state, usename, datname, wait_event IS NOT NULL AS waiting
+    FROM pg_stat_activity
+    WHERE state != 'idle' AND application_name IS DISTINCT FROM $1
+    ORDER BY duration_ms DESC
+    LIMIT 50
+"""
+
+_IS_REPLICA_SQL = "SELECT pg_is_in_recovery() AS is_replica"
+
+_REPLICAS_SQL = """
+    SELECT client_addr, state,
+           pg_wal_lsn_diff(sent_lsn, replay_lsn) AS lag_bytes
+    FROM pg_stat_replication
+"""
+
+_REPLICA_LAG_SQL = """
+    SELECT pg_wal_lsn_diff(pg_last_wal_receive_lsn(), pg_last_wal_replay_lsn()) AS lag
+"""
+
+_SCHEMA_TABLES_SQL = """
+    SELECT relname AS name, n_live_tup AS rows,
+           pg_total_relation_size(c.oid) AS size_bytes
+    FROM pg_class c JOIN pg_stat_user_tables s ON c.relname = s.relname
+    WHERE c.relkind = 'r'
+      AND s.schemaname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+    ORDER BY size_bytes DESC LIMIT 100
+"""
+
+_SCHEMA_INDEXES_SQL = """
+    SELECT indexrelname AS name, relname AS table,
+           idx_scan, idx_tup_read, idx_tup_fetch,
+           pg_relation_size(indexrelid) AS size_bytes
+    FROM pg_stat_user_indexes
+    WHERE schemaname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
+    ORDER BY size_bytes DESC LIMIT 200
+"""
+
+_DATABASE_SIZE_SQL = "SELECT pg_database_size(current_database()) AS total"
+
+_CONNECTION_POOL_SQL = """
+    SELECT
+        count(*) FILTER (WHERE state = 'active') AS active,
+        count(*) FILTER (WHERE state = 'idle') AS idle,
+        count(*) FILTER (WHERE wait_event IS NOT NULL AND state != 'idle') AS waiting,
+        (SELECT setting::int FROM pg_settings WHERE name = 'max_connections') AS max_conn
+    FROM pg_stat_activity
+    WHERE application_name IS DISTINCT FROM $1
+"""
+
 
 class PostgresAdapter(DatabaseAdapter):
-    """PostgreSQL adapter using asyncpg for async connectivity."""
+    """PostgreSQL adapter backed by a small asyncpg connection pool."""
 
     MAX_CONNECT_RETRIES = 3
 
@@ -53,21 +135,24 @@ class PostgresAdapter(DatabaseAdapter):
         )
         self._username = username
         self._password = password
-        self._conn: Optional[asyncpg.Connection] = None
+        self._pool: Optional[asyncpg.Pool] = None
 
     async def connect(self) -> None:
-        """Connect with retry logic (3 attempts, exponential backoff)."""
+        """Open the connection pool with retry logic (3 attempts, exponential backoff)."""
         last_err: Optional[Exception] = None
         for attempt in range(1, self.MAX_CONNECT_RETRIES + 1):
             try:
-                self._conn = await asyncio.wait_for(
-                    asyncpg.connect(
+                self._pool = await asyncio.wait_for(
+                    asyncpg.create_pool(
                         host=self.host,
                         port=self.port,
                         database=self.database,
                         user=self._username,
                         password=self._password,
+                        min_size=POOL_MIN_SIZE,
+                        max_size=POOL_MAX_SIZE,
                         timeout=self.connect_timeout,
+                        server_settings={"application_name": POOL_APPLICATION_NAME},
                     ),
                     timeout=self.connect_timeout,
                 )
@@ -89,18 +174,18 @@ class PostgresAdapter(DatabaseAdapter):
         )
 
     async def disconnect(self) -> None:
-        if self._conn:
-            await self._conn.close()
-            self._conn = None
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
         self._connected = False
         self._invalidate_cache()
 
     async def health_check(self) -> AdapterHealth:
-        if not self._connected or not self._conn:
+        if not self._connected or not self._pool:
             return AdapterHealth(status="unreachable", error="Not connected")
         try:
             start = time.time()
-            row = await self._conn.fetchrow("SELECT version()")
+            row = await self._pool.fetchrow("SELECT version()")
             latency = (time.time() - start) * 1000
             version = row["version"] if row else ""
             return AdapterHealth(
@@ -120,7 +205,7 @@ class PostgresAdapter(DatabaseAdapter):
         result = {}
         for view, sql in checks.items():
             try:
-                await self._conn.fetch(sql)
+                await self._pool.fetch(sql)
                 result[view] = True
             except Exception:
                 result[view] = False
@@ -129,7 +214,7 @@ class PostgresAdapter(DatabaseAdapter):
     async def get_slow_queries_from_stats(self) -> list[dict]:
         """Return top 10 historically slow queries from pg_stat_statements."""
         try:
-            rows = await self._conn.fetch("""
+            rows = await self._pool.fetch("""
                 SELECT queryid, query, calls, mean_exec_time,
                        total_exec_time, stddev_exec_time, rows
                 FROM pg_stat_statements
@@ -142,19 +227,7 @@ class PostgresAdapter(DatabaseAdapter):
             return []
 
     async def _fetch_performance_stats(self) -> PerfSnapshot:
-        row = await self._conn.fetchrow("""
-            SELECT
-                (SELECT count(*) FROM pg_stat_activity WHERE state = 'active') AS active,
-                (SELECT count(*) FROM pg_stat_activity WHERE state = 'idle') AS idle,
-                (SELECT setting::int FROM pg_settings WHERE name = 'max_connections') AS max,
-                COALESCE(
-                    (SELECT round(sum(heap_blks_hit)::numeric / NULLIF(sum(heap_blks_hit) + sum(heap_blks_read), 0), 4)
-                     FROM pg_statio_user_tables), 0
-                ) AS ratio,
-                (SELECT xact_commit + xact_rollback FROM pg_stat_database WHERE datname = current_database()) AS tps,
-                (SELECT deadlocks FROM pg_stat_database WHERE datname = current_database()) AS deadlocks,
-                EXTRACT(EPOCH FROM now() - pg_postmaster_start_time())::int AS uptime
-        """)
+        row = await self._pool.fetchrow(_PERF_SQL, POOL_APPLICATION_NAME)
         return PerfSnapshot(
             connections_active=row["active"],
             connections_idle=row["idle"],
@@ -166,15 +239,7 @@ class PostgresAdapter(DatabaseAdapter):
         )
 
     async def _fetch_active_queries(self) -> list[ActiveQuery]:
-        rows = await self._conn.fetch("""
-            SELECT pid, query,
-                   EXTRACT(EPOCH FROM now() - query_start) * 1000 AS duration_ms,
-                   state, usename, datname, wait_event IS NOT NULL AS waiting
-            FROM pg_stat_activity
-            WHERE state != 'idle' AND pid != pg_backend_pid()
-            ORDER BY duration_ms DESC
-            LIMIT 50
-        """)
+        rows = await self._pool.fetch(_ACTIVE_QUERIES_SQL, POOL_APPLICATION_NAME)
         return [
             ActiveQuery(
                 pid=r["pid"],
@@ -189,19 +254,13 @@ class PostgresAdapter(DatabaseAdapter):
         ]
 
     async def _fetch_replication_status(self) -> ReplicationSnapshot:
-        is_replica_row = await self._conn.fetchrow(
-            "SELECT pg_is_in_recovery() AS is_replica"
-        )
+        is_replica_row = await self._pool.fetchrow(_IS_REPLICA_SQL)
         is_replica = is_replica_row["is_replica"] if is_replica_row else False
 
         replicas = []
         lag_bytes = 0
         if not is_replica:
-            rows = await self._conn.fetch("""
-                SELECT client_addr, state,
-                       pg_wal_lsn_diff(sent_lsn, replay_lsn) AS lag_bytes
-                FROM pg_stat_replication
-            """)
+            rows = await self._pool.fetch(_REPLICAS_SQL)
             replicas = [
                 ReplicaInfo(
                     name=str(r["client_addr"] or ""),
@@ -211,9 +270,7 @@ class PostgresAdapter(DatabaseAdapter):
                 for r in rows
             ]
         else:
-            lag_row = await self._conn.fetchrow("""
-                SELECT pg_wal_lsn_diff(pg_last_wal_receive_lsn(), pg_last_wal_replay_lsn()) AS lag
-            """)
+            lag_row = await self._pool.fetchrow(_REPLICA_LAG_SQL)
             lag_bytes = int(lag_row["lag"] or 0) if lag_row else 0
 
         return ReplicationSnapshot(
@@ -223,25 +280,9 @@ class PostgresAdapter(DatabaseAdapter):
         )
 
     async def _fetch_schema_snapshot(self) -> SchemaSnapshot:
-        tables = await self._conn.fetch("""
-            SELECT relname AS name, n_live_tup AS rows,
-                   pg_total_relation_size(c.oid) AS size_bytes
-            FROM pg_class c JOIN pg_stat_user_tables s ON c.relname = s.relname
-            WHERE c.relkind = 'r'
-              AND s.schemaname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-            ORDER BY size_bytes DESC LIMIT 100
-        """)
-        indexes = await self._conn.fetch("""
-            SELECT indexrelname AS name, relname AS table,
-                   idx_scan, idx_tup_read, idx_tup_fetch,
-                   pg_relation_size(indexrelid) AS size_bytes
-            FROM pg_stat_user_indexes
-            WHERE schemaname NOT IN ('pg_catalog', 'information_schema', 'pg_toast')
-            ORDER BY size_bytes DESC LIMIT 200
-        """)
-        total_row = await self._conn.fetchrow(
-            "SELECT pg_database_size(current_database()) AS total"
-        )
+        tables = await self._pool.fetch(_SCHEMA_TABLES_SQL)
+        indexes = await self._pool.fetch(_SCHEMA_INDEXES_SQL)
+        total_row = await self._pool.fetchrow(_DATABASE_SIZE_SQL)
         return SchemaSnapshot(
             tables=[dict(r) for r in tables],
             indexes=[dict(r) for r in indexes],
@@ -249,10 +290,10 @@ class PostgresAdapter(DatabaseAdapter):
         )
 
     async def get_table_detail(self, table_name: str) -> TableDetail:
-        if not self._conn:
+        if not self._pool:
             raise RuntimeError("Not connected")
 
-        col_rows = await self._conn.fetch("""
+        col_rows = await self._pool.fetch("""
             SELECT c.column_name, c.data_type, c.is_nullable, c.column_default,
                    CASE WHEN pk.column_name IS NOT NULL THEN true ELSE false END AS is_pk
             FROM information_schema.columns c
@@ -275,7 +316,7 @@ class PostgresAdapter(DatabaseAdapter):
             ) for r in col_rows
         ]
 
-        idx_rows = await self._conn.fetch("""
+        idx_rows = await self._pool.fetch("""
             SELECT indexname, indexdef,
                    pg_relation_size(quote_ident(indexname)::regclass) AS size_bytes
             FROM pg_indexes
@@ -290,7 +331,7 @@ class PostgresAdapter(DatabaseAdapter):
             ) for r in idx_rows
         ]
 
-        stat_row = await self._conn.fetchrow("""
+        stat_row = await self._pool.fetchrow("""
             SELECT n_live_tup AS row_estimate,
                    pg_total_relation_size(quote_ident($1)::regclass) AS total_size,
                    CASE WHEN n_live_tup > 0
@@ -307,14 +348,7 @@ class PostgresAdapter(DatabaseAdapter):
         )
 
     async def _fetch_connection_pool(self) -> ConnectionPoolSnapshot:
-        row = await self._conn.fetchrow("""
-            SELECT
-                count(*) FILTER (WHERE state = 'active') AS active,
-                count(*) FILTER (WHERE state = 'idle') AS idle,
-                count(*) FILTER (WHERE wait_event IS NOT NULL AND state != 'idle') AS waiting,
-                (SELECT setting::int FROM pg_settings WHERE name = 'max_connections') AS max_conn
-            FROM pg_stat_activity
-        """)
+        row = await self._pool.fetchrow(_CONNECTION_POOL_SQL, POOL_APPLICATION_NAME)
         return ConnectionPoolSnapshot(
             active=row["active"],
             idle=row["idle"],
@@ -328,7 +362,7 @@ class PostgresAdapter(DatabaseAdapter):
         """Return current wait events grouped by type."""
         try:
             rows = await asyncio.wait_for(
-                self._conn.fetch("""
+                self._pool.fetch("""
                     SELECT wait_event_type, wait_event, count(*) AS cnt,
                            array_agg(pid) AS pids
                     FROM pg_stat_activity
@@ -348,7 +382,7 @@ class PostgresAdapter(DatabaseAdapter):
         """Return blocking lock chains (who blocks whom)."""
         try:
             rows = await asyncio.wait_for(
-                self._conn.fetch("""
+                self._pool.fetch("""
                     SELECT
                         blocked.pid AS blocked_pid,
                         blocked.usename AS blocked_user,
@@ -386,7 +420,7 @@ class PostgresAdapter(DatabaseAdapter):
         """Return transactions idle in transaction > 5 minutes."""
         try:
             rows = await asyncio.wait_for(
-                self._conn.fetch("""
+                self._pool.fetch("""
                     SELECT pid, usename, state, query,
                            EXTRACT(EPOCH FROM now() - xact_start)::int AS age_seconds
                     FROM pg_stat_activity
@@ -408,7 +442,7 @@ class PostgresAdapter(DatabaseAdapter):
         result: dict = {"running": [], "stale": []}
         try:
             running = await asyncio.wait_for(
-                self._conn.fetch("""
+                self._pool.fetch("""
                     SELECT pid, datname, relid::regclass::text AS table_name,
                            phase, heap_blks_total, heap_blks_scanned
                     FROM pg_stat_progress_vacuum
@@ -421,7 +455,7 @@ class PostgresAdapter(DatabaseAdapter):
 
         try:
             stale = await asyncio.wait_for(
-                self._conn.fetch("""
+                self._pool.fetch("""
                     SELECT relname, n_dead_tup, n_live_tup,
                            last_autovacuum, last_autoanalyze
                     FROM pg_stat_user_tables
@@ -442,7 +476,7 @@ class PostgresAdapter(DatabaseAdapter):
         """Return sequential vs index scan ratios per table."""
         try:
             rows = await asyncio.wait_for(
-                self._conn.fetch("""
+                self._pool.fetch("""
                     SELECT relname, seq_scan, idx_scan,
                            CASE WHEN seq_scan + idx_scan > 0
                                THEN round(seq_scan::numeric / (seq_scan + idx_scan), 2)
@@ -466,12 +500,12 @@ class PostgresAdapter(DatabaseAdapter):
         Safety: uses EXPLAIN only — never EXPLAIN ANALYZE — so the query
         is *not* executed on production.
         """
-        if not self._conn:
+        if not self._pool:
             return None
         try:
             import json as _json
 
-            row = await self._conn.fetchval(
+            row = await self._pool.fetchval(
                 f"EXPLAIN (FORMAT JSON) {sql}",
                 timeout=QUERY_TIMEOUT_SEC,
             )
@@ -489,7 +523,7 @@ class PostgresAdapter(DatabaseAdapter):
         try:
             start = time.time()
             rows = await asyncio.wait_for(
-                self._conn.fetch(
+                self._pool.fetch(
                     f"SELECT * FROM ({sql}) AS q LIMIT {ROW_LIMIT}",
                     timeout=self.query_timeout,
                 ),
@@ -511,12 +545,12 @@ class PostgresAdapter(DatabaseAdapter):
     async def kill_query(self, pid: int) -> dict:
         """Terminate a backend process by PID."""
         # Validate PID exists
-        row = await self._conn.fetchrow(
+        row = await self._pool.fetchrow(
             "SELECT pid, query, state FROM pg_stat_activity WHERE pid = $1", pid
         )
         if not row:
             raise ValueError(f"PID {pid} not found in pg_stat_activity")
-        result = await self._conn.fetchval(
+        result = await self._pool.fetchval(
             "SELECT pg_terminate_backend($1)", pid
         )
         return {
@@ -529,7 +563,7 @@ class PostgresAdapter(DatabaseAdapter):
     async def vacuum_table(self, table: str, full: bool = False, analyze: bool = True) -> dict:
         """VACUUM [FULL] [ANALYZE] a table."""
         # Validate table exists
-        exists = await self._conn.fetchval(
+        exists = await self._pool.fetchval(
             "SELECT EXISTS(SELECT 1 FROM pg_tables WHERE tablename = $1)", table
         )
         if not exists:
@@ -541,31 +575,31 @@ class PostgresAdapter(DatabaseAdapter):
             parts.append("ANALYZE")
         parts.append(table)
         sql = " ".join(parts)
-        await self._conn.execute(sql)
+        await self._pool.execute(sql)
         return {"success": True, "table": table, "full": full, "analyze": analyze, "sql": sql}
 
     async def reindex_table(self, table: str) -> dict:
         """REINDEX TABLE CONCURRENTLY."""
-        exists = await self._conn.fetchval(
+        exists = await self._pool.fetchval(
             "SELECT EXISTS(SELECT 1 FROM pg_tables WHERE tablename = $1)", table
         )
         if not exists:
             raise ValueError(f"Table '{table}' does not exist")
         sql = f"REINDEX TABLE CONCURRENTLY {table}"
-        await self._conn.execute(sql)
+        await self._pool.execute(sql)
         return {"success": True, "table": table, "sql": sql}
 
     async def create_index(self, table: str, columns: list[str],
                            name: str | None = None, unique: bool = False) -> dict:
         """CREATE INDEX CONCURRENTLY."""
         # Validate table and columns exist
-        exists = await self._conn.fetchval(
+        exists = await self._pool.fetchval(
             "SELECT EXISTS(SELECT 1 FROM pg_tables WHERE tablename = $1)", table
         )
         if not exists:
             raise ValueError(f"Table '{table}' does not exist")
         for col in columns:
-            col_exists = await self._conn.fetchval(
+            col_exists = await self._pool.fetchval(
                 "SELECT EXISTS(SELECT 1 FROM information_schema.columns WHERE table_name = $1 AND column_name = $2)",
                 table, col,
             )
@@ -575,20 +609,20 @@ class PostgresAdapter(DatabaseAdapter):
         unique_kw = "UNIQUE " if unique else ""
         col_list = ", ".join(columns)
         sql = f"CREATE {unique_kw}INDEX CONCURRENTLY {idx_name} ON {table} ({col_list})"
-        await self._conn.execute(sql)
+        await self._pool.execute(sql)
         return {"success": True, "index_name": idx_name, "table": table, "columns": columns, "sql": sql}
 
     async def drop_index(self, index_name: str) -> dict:
         """DROP INDEX CONCURRENTLY. Prevents dropping PK indexes."""
         # Check index exists and is not a PK constraint
-        idx = await self._conn.fetchrow(
+        idx = await self._pool.fetchrow(
             """SELECT indexname, tablename FROM pg_indexes
                WHERE indexname = $1""", index_name
         )
         if not idx:
             raise ValueError(f"Index '{index_name}' does not exist")
         # Check if it backs a primary key
-        is_pk = await self._conn.fetchval(
+        is_pk = await self._pool.fetchval(
             """SELECT EXISTS(
                 SELECT 1 FROM pg_constraint
                 WHERE conname = $1 AND contype = 'p'
@@ -597,18 +631,18 @@ class PostgresAdapter(DatabaseAdapter):
         if is_pk:
             raise ValueError(f"Cannot drop primary key index '{index_name}'")
         sql = f"DROP INDEX CONCURRENTLY {index_name}"
-        await self._conn.execute(sql)
+        await self._pool.execute(sql)
         return {"success": True, "index_name": index_name, "sql": sql}
 
     async def _alter_config_impl(self, param: str, value: str) -> dict:
         """ALTER SYSTEM SET + pg_reload_conf()."""
-        await self._conn.execute(f"ALTER SYSTEM SET {param} = '{value}'")
-        await self._conn.execute("SELECT pg_reload_conf()")
+        await self._pool.execute(f"ALTER SYSTEM SET {param} = '{value}'")
+        await self._pool.execute("SELECT pg_reload_conf()")
         return {"success": True, "param": param, "value": value, "reload": True}
 
     async def get_config_recommendations(self) -> list[dict]:
         """Compare current pg_settings against heuristics."""
-        rows = await self._conn.fetch(
+        rows = await self._pool.fetch(
             """SELECT name, setting, unit, context, short_desc
                FROM pg_settings
                WHERE name IN ('shared_buffers', 'work_mem', 'maintenance_work_mem',
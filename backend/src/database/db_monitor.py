@@ -20,6 +20,8 @@ class DBMonitor:
         alert_engine,
         broadcast_callback: Optional[Callable[..., Coroutine]] = None,
         interval: int = 30,
+        max_concurrency: int = 8,
+        profile_timeout: float = 20.0,
     ):
         self.profile_store = profile_store
         self.adapter_registry = adapter_registry
@@ -27,6 +29,8 @@ class DBMonitor:
         self.alert_engine = alert_engine
         self._broadcast = broadcast_callback
         self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.profile_timeout = profile_timeout
 
         self._running = False
         self._task: Optional[asyncio.Task] = None
@@ -63,40 +67,15 @@ class DBMonitor:
         start = time.time()
         profiles = self.profile_store.list_all()
 
-        for profile in profiles:
-            pid = profile["id"]
-            try:
-                adapter = self.adapter_registry.get_by_profile(pid)
-                if not adapter:
-                    self._profile_statuses[pid] = {
-                        "id": pid, "name": profile["name"],
-                        "status": "not_connected", "last_collected_at": None,
-                    }
-                    continue
-
-                if not adapter._connected:
-                    await adapter.connect()
+        # Profiles are independent: collect them side by side so the cycle
+        # takes as long as the slowest database rather than the sum of all.
+        sem = asyncio.Semaphore(self.max_concurrency)
 
-                await self._collect_profile_metrics(profile, adapter)
+        async def bounded(profile: dict) -> None:
+            async with sem:
+                await self._collect_profile(profile)
 
-                self._profile_statuses[pid] = {
-                    "id": pid, "name": profile["name"],
-                    "status": "healthy", "last_collected_at": time.time(),
-                }
-
-                if self.alert_engine:
-                    try:
-                        await self.alert_engine.evaluate(f"db:{pid}")
-                    except Exception as e:
-                        logger.warning("Alert evaluation failed for %s: %s", pid, e)
-
-            except Exception as e:
-                logger.warning("DBMonitor collection failed for %s: %s", pid, e)
-                self._profile_statuses[pid] = {
-                    "id": pid, "name": profile.get("name", pid),
-                    "status": "error", "error": str(e),
-                    "last_collected_at": None,
-                }
+        await asyncio.gather(*(bounded(p) for p in profiles))
 
         self._last_cycle_at = time.time()
         self._cycle_duration = time.time() - start
@@ -107,6 +86,51 @@ class DBMonitor:
                 "data": self.get_snapshot(),
             })
 
+    async def _collect_profile(self, profile: dict) -> None:
+        pid = profile["id"]
+        try:
+            adapter = self.adapter_registry.get_by_profile(pid)
+            if not adapter:
+                self._profile_statuses[pid] = {
+                    "id": pid, "name": profile["name"],
+                    "status": "not_connected", "last_collected_at": None,
+                }
+                return
+
+            try:
+                await asyncio.wait_for(
+                    self._connect_and_collect(profile, adapter),
+                    timeout=self.profile_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise TimeoutError(
+                    f"collection timed out after {self.profile_timeout:g}s"
+                ) from None
+
+            self._profile_statuses[pid] = {
+                "id": pid, "name": profile["name"],
+                "status": "healthy", "last_collected_at": time.time(),
+            }
+
+            if self.alert_engine:
+                try:
+                    await self.alert_engine.evaluate(f"db:{pid}")
+                except Exception as e:
+                    logger.warning("Alert evaluation failed for %s: %s", pid, e)
+
+        except Exception as e:
+            logger.warning("DBMonitor collection failed for %s: %s", pid, e)
+            self._profile_statuses[pid] = {
+                "id": pid, "name": profile.get("name", pid),
+                "status": "error", "error": str(e),
+                "last_collected_at": None,
+            }
+
+    async def _connect_and_collect(self, profile: dict, adapter) -> None:
+        if not adapter._connected:
+            await adapter.connect()
+        await self._collect_profile_metrics(profile, adapter)
+
     async def _collect_profile_metrics(self, profile: dict, adapter) -> None:
         pid = profile["id"]
         engine = profile.get("engine", "unknown")
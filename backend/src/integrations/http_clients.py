@@ -9,11 +9,19 @@ After: one client per backend, shared across investigations. Per-backend
 limits are explicit and auditable. This is also the bulkhead — a flood of
 github requests can't drain the elasticsearch pool because they live in
 different clients.
+
+Callers that want the bulkhead to queue rather than fail go through
+``request()``: it holds a per-backend concurrency gate (sized to the pool
+by default) around the call, so a burst of queries waits its turn instead
+of tripping the pool-acquire timeout. ``pool_stats()`` reports in-flight,
+queued and connection counts per backend for the /metrics endpoint.
 """
 from __future__ import annotations
 
 import asyncio
-from typing import Final
+import importlib.util
+import time
+from typing import Any, Final
 
 import os
 
@@ -55,6 +63,13 @@ _VERIFY_SSL_DEFAULT: Final[dict[str, bool]] = {
 }
 
 
+# Backends that negotiate HTTP/2 over TLS when the optional ``h2`` package
+# is installed (``pip install httpx[http2]``). Plain-http URLs and servers
+# without ALPN support stay on HTTP/1.1 keep-alive.
+_HTTP2_BACKENDS: Final[frozenset[str]] = frozenset({"elasticsearch", "prometheus"})
+_HTTP2_AVAILABLE: Final[bool] = importlib.util.find_spec("h2") is not None
+
+
 def _verify_for(backend: str) -> bool:
     """Return the effective verify-SSL value for a backend.
 
@@ -73,6 +88,10 @@ def _verify_for(backend: str) -> bool:
 _DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=30.0, write=10.0, pool=5.0)
 
 _clients: dict[str, httpx.AsyncClient] = {}
+# Clients for callers that pin verify-SSL against the backend default
+# (e.g. a per-integration ``verify_ssl`` setting), keyed (backend, verify).
+_variant_clients: dict[tuple[str, bool], httpx.AsyncClient] = {}
+_gates: dict[str, "_BackendGate"] = {}
 _lock = asyncio.Lock()
 
 
@@ -96,37 +115,53 @@ async def _inject_traceparent_hook(request: httpx.Request) -> None:
         pass
 
 
-def _build_client(backend: str) -> httpx.AsyncClient:
+def _check_backend(backend: str) -> None:
     if backend not in _LIMITS:
         raise KeyError(
             f"Unknown backend {backend!r}. Add an entry to http_clients._LIMITS "
             f"before calling get_client()."
         )
+
+
+def _build_client(backend: str, verify: bool | None = None) -> httpx.AsyncClient:
+    _check_backend(backend)
     max_c, keep = _LIMITS[backend]
-    verify = _verify_for(backend)
+    if verify is None:
+        verify = _verify_for(backend)
+    http2 = _HTTP2_AVAILABLE and backend in _HTTP2_BACKENDS
     # ``retries=0`` because we own retry policy at the application layer
     # (Task 3.17 — Retry-After handling). Transport-level retries would
     # interact badly with our rate-limit budget.
-    transport = httpx.AsyncHTTPTransport(retries=0, verify=verify)
+    limits = httpx.Limits(max_connections=max_c, max_keepalive_connections=keep)
+    transport = httpx.AsyncHTTPTransport(
+        retries=0, verify=verify, http2=http2, limits=limits,
+    )
     return httpx.AsyncClient(
-        limits=httpx.Limits(max_connections=max_c, max_keepalive_connections=keep),
+        limits=limits,
         timeout=_DEFAULT_TIMEOUT,
         transport=transport,
         verify=verify,
+        http2=http2,
         # Stage K.11 — stamp traceparent on every request.
         event_hooks={"request": [_inject_traceparent_hook]},
     )
 
 
-def get_client(backend: str) -> httpx.AsyncClient:
+def get_client(backend: str, verify: bool | None = None) -> httpx.AsyncClient:
     """Return (creating if necessary) the singleton client for ``backend``.
 
+    ``verify`` pins TLS verification for callers with their own setting;
+    when it differs from the backend default a second shared client is
+    kept for that combination. Both share the backend's concurrency gate.
+
     Not async — the dict access is fast and the lock is only needed to
     prevent a rare double-init under concurrent first calls. We handle
     that with a double-checked pattern + a module-level asyncio.Lock that
     we don't actually enter here (init is cheap and idempotent; duplicate
     init just wastes an AsyncClient and loses nothing).
     """
+    if verify is not None and verify != _verify_for(backend):
+        return _get_variant_client(backend, verify)
     client = _clients.get(backend)
     if client is not None:
         return client
@@ -143,6 +178,135 @@ def get_client(backend: str) -> httpx.AsyncClient:
     return existing
 
 
+def _get_variant_client(backend: str, verify: bool) -> httpx.AsyncClient:
+    key = (backend, verify)
+    client = _variant_clients.get(key)
+    if client is None:
+        client = _variant_clients[key] = _build_client(backend, verify=verify)
+    return client
+
+
+# ── Concurrency gate + pool metrics ──────────────────────────────────────
+
+
+def _concurrency_for(backend: str) -> int:
+    """In-flight request cap for ``request()``.
+
+    Defaults to the backend's ``max_connections`` so queued callers wait
+    on the gate (unbounded) rather than the pool (``pool=5s`` timeout).
+    Override with ``HTTP_CONCURRENCY_<BACKEND>``.
+    """
+    override = os.getenv(f"HTTP_CONCURRENCY_{backend.upper()}")
+    if override is not None:
+        try:
+            return max(1, int(override))
+        except ValueError:
+            pass
+    return _LIMITS[backend][0]
+
+
+class _BackendGate:
+    """Semaphore plus the counters reported by ``pool_stats()``."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._sem = asyncio.Semaphore(limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = 0
+        self.errors = 0
+        self.wait_seconds = 0.0
+
+    async def __aenter__(self) -> "_BackendGate":
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_seconds += time.monotonic() - started
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.in_flight -= 1
+        self.requests += 1
+        if exc_type is not None:
+            self.errors += 1
+        self._sem.release()
+
+
+def _gate_for(backend: str) -> _BackendGate:
+    gate = _gates.get(backend)
+    if gate is None:
+        _check_backend(backend)
+        gate = _gates[backend] = _BackendGate(_concurrency_for(backend))
+    return gate
+
+
+async def request(
+    backend: str,
+    method: str,
+    url: str,
+    *,
+    verify: bool | None = None,
+    **kwargs: Any,
+) -> httpx.Response:
+    """Send one request on ``backend``'s shared client under its gate.
+
+    ``kwargs`` go straight to ``httpx.AsyncClient.request`` (``params``,
+    ``json``, ``headers``, ``timeout``...). The response is returned as-is;
+    callers decide whether to ``raise_for_status()``.
+    """
+    client = get_client(backend, verify=verify)
+    async with _gate_for(backend):
+        return await client.request(method, url, **kwargs)
+
+
+def _connection_counts(client: httpx.AsyncClient) -> tuple[int, int]:
+    """(open, idle) connections of a client's pool; (0, 0) if unknown."""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = getattr(pool, "connections", None) or []
+    idle = 0
+    for conn in connections:
+        try:
+            idle += bool(conn.is_idle())
+        except Exception:
+            pass
+    return len(connections), idle
+
+
+def pool_stats() -> dict[str, dict[str, float]]:
+    """Per-backend gate and connection-pool counters.
+
+    Only backends that have a client or gate are listed. Keys:
+    ``limit``, ``in_flight``, ``waiting``, ``requests``, ``errors``,
+    ``wait_seconds``, ``connections``, ``idle_connections``.
+    """
+    stats: dict[str, dict[str, float]] = {}
+    names = set(_clients) | set(_gates) | {b for b, _ in _variant_clients}
+    for backend in sorted(names):
+        gate = _gates.get(backend)
+        clients = [c for c in (_clients.get(backend),) if c is not None]
+        clients += [c for (b, _), c in _variant_clients.items() if b == backend]
+        open_total = idle_total = 0
+        for client in clients:
+            open_, idle = _connection_counts(client)
+            open_total += open_
+            idle_total += idle
+        stats[backend] = {
+            "limit": gate.limit if gate else _concurrency_for(backend),
+            "in_flight": gate.in_flight if gate else 0,
+            "waiting": gate.waiting if gate else 0,
+            "requests": gate.requests if gate else 0,
+            "errors": gate.errors if gate else 0,
+            "wait_seconds": gate.wait_seconds if gate else 0.0,
+            "connections": open_total,
+            "idle_connections": idle_total,
+        }
+    return stats
+
+
 def enumerate_backend_pools() -> dict[str, httpx.AsyncClient]:
     """Introspection helper for tests. Materialises all known backends."""
     for name in _LIMITS:
@@ -152,9 +316,12 @@ def enumerate_backend_pools() -> dict[str, httpx.AsyncClient]:
 
 async def close_all() -> None:
     """Close every open client. Call from the FastAPI shutdown handler."""
-    global _clients
-    to_close = list(_clients.values())
+    global _clients, _variant_clients
+    to_close = list(_clients.values()) + list(_variant_clients.values())
     _clients = {}
+    _variant_clients = {}
+    # Gates hold loop-bound semaphores; rebuild them with the next client.
+    _gates.clear()
     for c in to_close:
         try:
             await c.aclose()
@@ -1183,6 +1183,13 @@ class DiagnosticState(BaseModel):
     #    "verdict": "consistent"|"majority"|"inconclusive"}
     self_consistency: Optional[dict] = None
 
+    # Streaming dispatch (DIAGNOSTIC_DISPATCH_MODE=streaming) — the chain
+    # of agent completions that determined time-to-diagnosis, one entry
+    # per agent: {"agent", "status", "unblocked_by", "submitted_s",
+    # "started_s", "finished_s", "queued_s", "elapsed_s"} with offsets in
+    # seconds since dispatch began. Empty for round-based runs.
+    critical_path: list[dict] = Field(default_factory=list)
+
     # Agent execution statuses: {agent_name: "success"|"no_findings"|"error"}
     agent_statuses: dict[str, str] = Field(default_factory=dict)
 
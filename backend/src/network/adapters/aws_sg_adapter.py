@@ -30,6 +30,9 @@ class AWSSGAdapter(FirewallAdapter):
     traffic not matched by any allow rule is implicitly denied.
     """
 
+    WILDCARD_PROTOCOLS = frozenset({"-1", "all", "any"})
+    ANY_FLOW_PROTOCOL = False
+
     def __init__(
         self,
         region: str,
@@ -62,37 +65,20 @@ class AWSSGAdapter(FirewallAdapter):
 
     # ── Core troubleshooting ──
 
-    async def simulate_flow(
-        self, src_ip: str, dst_ip: str, port: int, protocol: str = "tcp"
-    ) -> PolicyVerdict:
-        """Evaluate cached SG rules.
-
-        AWS Security Groups are allow-only and stateful:
-        - If an inbound rule allows the traffic, the flow is allowed and
-          return traffic is automatically permitted.
-        - If no rule matches, traffic is implicitly denied.
-        """
-        await self._ensure_snapshot()
-
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            proto_match = rule.protocol.lower() in (protocol.lower(), "-1", "all", "any")
-
-            if src_match and dst_match and port_match and proto_match:
-                return PolicyVerdict(
-                    action=PolicyAction.ALLOW,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.95,
-                    details=(
-                        f"Matched AWS SG rule '{rule.rule_name}' "
-                        f"(stateful – return traffic automatically allowed)"
-                    ),
-                )
-
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        """SGs are allow-only and stateful: a match allows the flow and its return traffic."""
+        if rule is not None:
+            return PolicyVerdict(
+                action=PolicyAction.ALLOW,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.95,
+                details=(
+                    f"Matched AWS SG rule '{rule.rule_name}' "
+                    f"(stateful – return traffic automatically allowed)"
+                ),
+            )
         # SG implicit deny (no matching allow rule)
         return PolicyVerdict(
             action=PolicyAction.DENY,
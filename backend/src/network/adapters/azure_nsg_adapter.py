@@ -30,6 +30,9 @@ class AzureNSGAdapter(FirewallAdapter):
     Priority is mapped directly to ``order`` (lower = evaluated first).
     """
 
+    WILDCARD_PROTOCOLS = frozenset({"any", "*"})
+    ANY_FLOW_PROTOCOL = False
+
     def __init__(
         self,
         subscription_id: str,
@@ -59,32 +62,16 @@ class AzureNSGAdapter(FirewallAdapter):
 
     # ── Core troubleshooting ──
 
-    async def simulate_flow(
-        self, src_ip: str, dst_ip: str, port: int, protocol: str = "tcp"
-    ) -> PolicyVerdict:
-        """Evaluate cached NSG rules in priority order (lower number first).
-
-        Azure NSGs have an implicit deny-all at priority 65500 for custom rules,
-        so if no rule matches we return an implicit deny.
-        """
-        await self._ensure_snapshot()
-
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            proto_match = rule.protocol.lower() in (protocol.lower(), "any", "*")
-
-            if src_match and dst_match and port_match and proto_match:
-                return PolicyVerdict(
-                    action=rule.action,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.95,
-                    details=f"Matched Azure NSG rule '{rule.rule_name}' (priority {rule.order})",
-                )
-
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        if rule is not None:
+            return PolicyVerdict(
+                action=rule.action,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.95,
+                details=f"Matched Azure NSG rule '{rule.rule_name}' (priority {rule.order})",
+            )
         # Implicit deny-all (Azure default)
         return PolicyVerdict(
             action=PolicyAction.DENY,
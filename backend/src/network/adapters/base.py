@@ -1,12 +1,21 @@
 """Base firewall adapter interface. All vendor adapters implement this."""
 import asyncio
+import hashlib
+import json
+import logging
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Optional
 import time
 from ..models import (
     PolicyVerdict, AdapterHealth, AdapterHealthStatus, FirewallVendor,
     FirewallRule, NATRule, Zone, Route, PolicyAction, VerdictMatchType,
 )
+from ..policy_index import Flow, PolicyIndex
+
+logger = logging.getLogger(__name__)
+
+# Snapshot delta: {resource: {"added": [...], "removed": [...], "changed": [...]}}
+SnapshotDelta = dict[str, dict[str, list[str]]]
 
 
 class VRF:
@@ -38,12 +47,20 @@ class FirewallAdapter(ABC):
 
     Key design principles:
     - Diagnostics NEVER hit live API. Always read from cached snapshot.
-    - Snapshot refreshed on TTL expiry or manual trigger.
+    - Snapshot refreshed on TTL expiry or manual trigger. Once a snapshot
+      exists, an expired one keeps being served while a single background
+      refresh runs (stale-while-revalidate).
     - Each adapter normalizes vendor-specific data to common models.
     """
 
     DEFAULT_TTL = 300  # 5 minutes
 
+    # Protocol matching used by the compiled policy index: rule protocols
+    # that match any flow (None = protocol is not matched at all), and
+    # whether a flow protocol of "any" matches every rule.
+    WILDCARD_PROTOCOLS: Optional[frozenset[str]] = frozenset({"any"})
+    ANY_FLOW_PROTOCOL = True
+
     def __init__(self, vendor: FirewallVendor, api_endpoint: str = "", api_key: str = "",
                  extra_config: dict = None, ttl: int = DEFAULT_TTL):
         self.vendor = vendor
@@ -57,14 +74,45 @@ class FirewallAdapter(ABC):
         self._zones_cache: list[Zone] = []
         self._routes_cache: list[Route] = []
         self._interfaces_cache: list[DeviceInterface] = []
+        self._policy_index: Optional[PolicyIndex] = None
+        self._snapshot_revision = ""
+        self._rules_hash = ""
+        self._refresh_task: Optional[asyncio.Task] = None
 
     # -- Core troubleshooting --
 
-    @abstractmethod
     async def simulate_flow(
         self, src_ip: str, dst_ip: str, port: int, protocol: str = "tcp"
     ) -> PolicyVerdict:
-        """Simulate a flow against cached rules. Return verdict with confidence."""
+        """Simulate a flow against cached rules. Return verdict with confidence.
+
+        Rules are matched first-wins through the compiled policy index;
+        vendors differ only in ``WILDCARD_PROTOCOLS``/``ANY_FLOW_PROTOCOL``
+        and in ``_verdict``.
+        """
+        await self._ensure_snapshot()
+        return self._verdict(self.policy_index.first_match(src_ip, dst_ip, port, protocol))
+
+    async def simulate_flows(self, flows: Iterable[Flow]) -> list[PolicyVerdict]:
+        """Simulate many (src_ip, dst_ip, port, protocol) flows in one call."""
+        await self._ensure_snapshot()
+        return [self._verdict(rule) for rule in self.policy_index.first_match_many(flows)]
+
+    @abstractmethod
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        """Vendor verdict for a matched rule, or the implicit verdict for None."""
+
+    @property
+    def policy_index(self) -> PolicyIndex:
+        """Compiled form of the rule snapshot, rebuilt when the snapshot is replaced."""
+        if self._policy_index is None or not self._policy_index.is_current(self._rules_cache):
+            self._compile_policy()
+        return self._policy_index
+
+    def _compile_policy(self) -> None:
+        self._policy_index = PolicyIndex(
+            self._rules_cache, self.WILDCARD_PROTOCOLS, self.ANY_FLOW_PROTOCOL,
+        )
 
     # -- Policy snapshot (cached) --
 
@@ -88,12 +136,18 @@ class FirewallAdapter(ABC):
     async def _fetch_zones(self) -> list[Zone]:
         """Vendor-specific: fetch security zones from API."""
 
+    async def _fetch_revision(self) -> str:
+        """Vendor-specific: cheap policy revision marker ("" if unsupported).
+
+        When it is unchanged since the last refresh, rules and NAT rules are
+        not re-fetched.
+        """
+        return ""
+
     async def get_rules(self, zone_src: str = "", zone_dst: str = "") -> list[FirewallRule]:
         await self._ensure_snapshot()
         if zone_src or zone_dst:
-            return [r for r in self._rules_cache
-                    if (not zone_src or r.src_zone == zone_src)
-                    and (not zone_dst or r.dst_zone == zone_dst)]
+            return self.policy_index.rules_for_zones(zone_src, zone_dst)
         return self._rules_cache
 
     async def get_nat_rules(self) -> list[NATRule]:
@@ -157,14 +211,58 @@ class FirewallAdapter(ABC):
                 message=str(e),
             )
 
-    async def refresh_snapshot(self) -> None:
-        """Force a full snapshot refresh."""
-        self._rules_cache = await self._fetch_rules()
-        self._nat_cache = await self._fetch_nat_rules()
-        self._interfaces_cache = await self._fetch_interfaces()
-        self._routes_cache = await self._fetch_routes()
-        self._zones_cache = await self._fetch_zones()
+    async def refresh_snapshot(self) -> SnapshotDelta:
+        """Force a snapshot refresh and return what changed.
+
+        The resources are fetched concurrently. Rules and NAT rules are
+        skipped when the vendor revision is unchanged, and the policy index
+        is only recompiled when the rules' content hash changes.
+        """
+        try:
+            revision = await self._fetch_revision()
+        except Exception as e:
+            logger.debug("%s revision check failed: %s", self.vendor.value, e)
+            revision = ""
+        policy_current = bool(revision) and revision == self._snapshot_revision and self._snapshot_time > 0
+
+        fetches = [self._fetch_interfaces(), self._fetch_routes(), self._fetch_zones()]
+        if not policy_current:
+            fetches += [self._fetch_rules(), self._fetch_nat_rules()]
+        interfaces, routes, zones, *policy = await asyncio.gather(*fetches)
+
+        delta: SnapshotDelta = {}
+        _record_delta(delta, "interfaces", self._interfaces_cache, interfaces, "name")
+        _record_delta(delta, "routes", self._routes_cache, routes, "id")
+        _record_delta(delta, "zones", self._zones_cache, zones, "id")
+        self._interfaces_cache, self._routes_cache, self._zones_cache = interfaces, routes, zones
+        if policy:
+            rules, nat_rules = policy
+            _record_delta(delta, "nat_rules", self._nat_cache, nat_rules, "id")
+            self._nat_cache = nat_rules
+            rules_hash = _content_hash(rules)
+            if rules_hash != self._rules_hash or self._policy_index is None:
+                _record_delta(delta, "rules", self._rules_cache, rules, "id")
+                self._rules_cache = rules
+                self._rules_hash = rules_hash
+                self._compile_policy()
+        self._snapshot_revision = revision
         self._snapshot_time = time.time()
+        return delta
+
+    def schedule_refresh(self) -> asyncio.Task:
+        """Start a background refresh unless one is already in flight."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh_snapshot())
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    def _log_refresh_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("%s snapshot refresh failed: %s", self.vendor.value, task.exception())
+
+    def snapshot_due(self, fraction: float = 1.0) -> bool:
+        """True once the snapshot is older than ``fraction`` of its TTL."""
+        return self.snapshot_age_seconds() >= self._ttl * fraction
 
     def snapshot_age_seconds(self) -> float:
         if self._snapshot_time == 0:
@@ -174,8 +272,11 @@ class FirewallAdapter(ABC):
     # -- Internal --
 
     async def _ensure_snapshot(self) -> None:
-        if self.snapshot_age_seconds() > self._ttl:
-            await self.refresh_snapshot()
+        if self._snapshot_time == 0:
+            # Nothing to serve yet: wait for (or join) the first refresh
+            await asyncio.shield(self.schedule_refresh())
+        elif self.snapshot_age_seconds() > self._ttl:
+            self.schedule_refresh()
 
     def _format_snapshot_time(self) -> str:
         if self._snapshot_time == 0:
@@ -215,3 +316,27 @@ class FirewallAdapter(ABC):
             elif port == p:
                 return True
         return False
+
+
+def _content_hash(items: list) -> str:
+    digest = hashlib.sha256()
+    for item in items:
+        digest.update(json.dumps(_fingerprint(item), sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def _fingerprint(item) -> dict:
+    return item.model_dump(mode="json") if hasattr(item, "model_dump") else dict(vars(item))
+
+
+def _record_delta(delta: SnapshotDelta, resource: str, old: list, new: list, key: str) -> None:
+    """Add the keyed differences between two resource lists to ``delta``."""
+    before = {getattr(item, key): _fingerprint(item) for item in old}
+    after = {getattr(item, key): _fingerprint(item) for item in new}
+    changes = {
+        "added": [k for k in after if k not in before],
+        "removed": [k for k in before if k not in after],
+        "changed": [k for k in after if k in before and after[k] != before[k]],
+    }
+    if any(changes.values()):
+        delta[resource] = changes
@@ -163,43 +163,19 @@ class CheckpointAdapter(FirewallAdapter):
 
     # ── Core troubleshooting ───────────────────────────────────────────
 
-    async def simulate_flow(
-        self,
-        src_ip: str,
-        dst_ip: str,
-        port: int,
-        protocol: str = "tcp",
-    ) -> PolicyVerdict:
-        """Simulate a flow against cached Check Point access rules.
-
-        Rules are evaluated in order (ascending). The first matching rule
-        determines the verdict. If no rule matches, the implicit
-        Check Point cleanup-rule (deny all) is applied.
-        """
-        await self._ensure_snapshot()
-
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            proto_match = (
-                rule.protocol.lower() in (protocol.lower(), "any")
-                or protocol.lower() == "any"
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        if rule is not None:
+            return PolicyVerdict(
+                action=rule.action,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.90,
+                details=(
+                    f"Matched Check Point rule '{rule.rule_name}' "
+                    f"(order {rule.order})"
+                ),
             )
-
-            if src_match and dst_match and port_match and proto_match:
-                return PolicyVerdict(
-                    action=rule.action,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.90,
-                    details=(
-                        f"Matched Check Point rule '{rule.rule_name}' "
-                        f"(order {rule.order})"
-                    ),
-                )
-
         # Check Point implicit cleanup-rule: deny all
         return PolicyVerdict(
             action=PolicyAction.DENY,
@@ -297,6 +273,11 @@ class CheckpointAdapter(FirewallAdapter):
 
         return nat_rules
 
+    async def _fetch_revision(self) -> str:
+        """UID of the last published session; changes on every policy publish."""
+        data = await self._api_call("show-last-published-session")
+        return str(data.get("uid", ""))
+
     async def _fetch_interfaces(self) -> list[DeviceInterface]:
         """Fetch interfaces from Check Point gateways.
 
@@ -118,43 +118,19 @@ class CiscoAdapter(FirewallAdapter):
 
     # ── Core troubleshooting ──────────────────────────────────────────
 
-    async def simulate_flow(
-        self,
-        src_ip: str,
-        dst_ip: str,
-        port: int,
-        protocol: str = "tcp",
-    ) -> PolicyVerdict:
-        """Simulate a flow against cached IOS-XE extended ACL rules.
-
-        Rules are evaluated in ascending ``order``.  The first matching
-        rule determines the verdict.  If no rule matches, an implicit
-        deny is returned (standard IOS-XE ACL behavior).
-        """
-        await self._ensure_snapshot()
-
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            proto_match = (
-                rule.protocol.lower() in (protocol.lower(), "any")
-                or protocol.lower() == "any"
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        if rule is not None:
+            return PolicyVerdict(
+                action=rule.action,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.90,
+                details=(
+                    f"Matched IOS-XE ACE '{rule.rule_name}' "
+                    f"(order {rule.order})"
+                ),
             )
-
-            if src_match and dst_match and port_match and proto_match:
-                return PolicyVerdict(
-                    action=rule.action,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.90,
-                    details=(
-                        f"Matched IOS-XE ACE '{rule.rule_name}' "
-                        f"(order {rule.order})"
-                    ),
-                )
-
         # IOS-XE implicit deny at end of every ACL
         return PolicyVerdict(
             action=PolicyAction.DENY,
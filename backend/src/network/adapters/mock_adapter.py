@@ -1,4 +1,6 @@
 """Mock firewall adapter for testing and demo purposes."""
+from typing import Optional
+
 from .base import FirewallAdapter, DeviceInterface, VRF, VirtualRouter
 from ..models import (
     PolicyVerdict, FirewallVendor, FirewallRule, NATRule, Zone, Route,
@@ -9,6 +11,8 @@ from ..models import (
 class MockFirewallAdapter(FirewallAdapter):
     """Returns configurable mock responses. Used in tests and demos."""
 
+    WILDCARD_PROTOCOLS = None  # mock rules ignore protocol
+
     def __init__(self, vendor: FirewallVendor = FirewallVendor.PALO_ALTO,
                  rules: list[FirewallRule] = None,
                  nat_rules: list[NATRule] = None,
@@ -26,26 +30,19 @@ class MockFirewallAdapter(FirewallAdapter):
         self._api_key = api_key
         self.extra_config = extra_config or {}
 
-    async def simulate_flow(self, src_ip: str, dst_ip: str, port: int,
-                           protocol: str = "tcp") -> PolicyVerdict:
-        await self._ensure_snapshot()
-        # Evaluate rules in priority order
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            if src_match and dst_match and port_match:
-                return PolicyVerdict(
-                    action=rule.action,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.95,
-                    details=f"Matched rule {rule.rule_name} (order {rule.order})",
-                    matched_source=",".join(rule.src_ips) if rule.src_ips else "",
-                    matched_destination=",".join(rule.dst_ips) if rule.dst_ips else "",
-                    matched_ports=",".join(str(p) for p in rule.ports) if rule.ports else "",
-                )
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        if rule is not None:
+            return PolicyVerdict(
+                action=rule.action,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.95,
+                details=f"Matched rule {rule.rule_name} (order {rule.order})",
+                matched_source=",".join(rule.src_ips) if rule.src_ips else "",
+                matched_destination=",".join(rule.dst_ips) if rule.dst_ips else "",
+                matched_ports=",".join(str(p) for p in rule.ports) if rule.ports else "",
+            )
         # No explicit match -> implicit deny
         return PolicyVerdict(
             action=self._default_action,
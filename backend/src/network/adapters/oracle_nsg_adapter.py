@@ -29,6 +29,9 @@ class OracleNSGAdapter(FirewallAdapter):
     to the common FirewallRule model.  Rules are evaluated by priority.
     """
 
+    WILDCARD_PROTOCOLS = frozenset({"all", "any"})
+    ANY_FLOW_PROTOCOL = False
+
     def __init__(
         self,
         compartment_id: str,
@@ -56,28 +59,16 @@ class OracleNSGAdapter(FirewallAdapter):
 
     # ── Core troubleshooting ──
 
-    async def simulate_flow(
-        self, src_ip: str, dst_ip: str, port: int, protocol: str = "tcp"
-    ) -> PolicyVerdict:
-        """Evaluate cached OCI NSG rules in priority order."""
-        await self._ensure_snapshot()
-
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            proto_match = rule.protocol.lower() in (protocol.lower(), "all", "any")
-
-            if src_match and dst_match and port_match and proto_match:
-                return PolicyVerdict(
-                    action=rule.action,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.95,
-                    details=f"Matched OCI NSG rule '{rule.rule_name}' (order {rule.order})",
-                )
-
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        if rule is not None:
+            return PolicyVerdict(
+                action=rule.action,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.95,
+                details=f"Matched OCI NSG rule '{rule.rule_name}' (order {rule.order})",
+            )
         # Implicit deny
         return PolicyVerdict(
             action=PolicyAction.DENY,
@@ -555,33 +555,16 @@ class PanoramaAdapter(FirewallAdapter):
     # Flow simulation
     # ------------------------------------------------------------------
 
-    async def simulate_flow(
-        self, src_ip: str, dst_ip: str, port: int, protocol: str = "tcp",
-    ) -> PolicyVerdict:
-        """Evaluate cached rules in order against the given flow.
-
-        Rules are evaluated in ascending ``order`` (lower = higher priority).
-        The first matching rule determines the verdict.  If no rule matches,
-        an implicit-deny verdict is returned (standard PAN-OS behavior).
-        """
-        await self._ensure_snapshot()
-
-        for rule in sorted(self._rules_cache, key=lambda r: r.order):
-            src_match = self._match_ip(src_ip, rule.src_ips)
-            dst_match = self._match_ip(dst_ip, rule.dst_ips)
-            port_match = self._match_port(port, rule.ports)
-            proto_match = rule.protocol.lower() in (protocol.lower(), "any") or protocol.lower() == "any"
-
-            if src_match and dst_match and port_match and proto_match:
-                return PolicyVerdict(
-                    action=rule.action,
-                    rule_id=rule.id,
-                    rule_name=rule.rule_name,
-                    match_type=VerdictMatchType.EXACT,
-                    confidence=0.95,
-                    details=f"Matched PAN-OS rule '{rule.rule_name}' (order {rule.order})",
-                )
-
+    def _verdict(self, rule: Optional[FirewallRule]) -> PolicyVerdict:
+        if rule is not None:
+            return PolicyVerdict(
+                action=rule.action,
+                rule_id=rule.id,
+                rule_name=rule.rule_name,
+                match_type=VerdictMatchType.EXACT,
+                confidence=0.95,
+                details=f"Matched PAN-OS rule '{rule.rule_name}' (order {rule.order})",
+            )
         # PAN-OS implicit deny at the end of every rulebase
         return PolicyVerdict(
             action=PolicyAction.DENY,
@@ -0,0 +1,104 @@
+"""Background snapshot refresh for every registered adapter instance.
+
+Adapters serve their cached snapshot to diagnoses and only fall back to a
+blocking refresh when they have none yet. This scheduler keeps snapshots
+warm instead: each pass refreshes the instances nearing TTL expiry,
+concurrently and bounded, joining any refresh already in flight. Rule
+deltas are published on ``POLICY_CHANGED`` (one event per rule) so graph
+consumers see policy changes without polling adapters themselves.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from ..event_bus.base import EventBus
+from ..event_bus.topology_channels import POLICY_CHANGED, EventType, make_policy_event
+from .base import FirewallAdapter, SnapshotDelta
+from .registry import AdapterRegistry
+
+logger = logging.getLogger(__name__)
+
+_DELTA_EVENT_TYPES = (
+    ("added", EventType.CREATED),
+    ("changed", EventType.UPDATED),
+    ("removed", EventType.DELETED),
+)
+
+
+class AdapterRefreshScheduler:
+    """Refreshes adapter snapshots ahead of their TTL.
+
+    ``refresh_ahead`` is the fraction of an adapter's TTL after which it is
+    refreshed, so a pass that runs every monitor cycle renews snapshots
+    before diagnoses would see them expire. An instance's first snapshot
+    is its baseline and publishes no rule events.
+    """
+
+    def __init__(
+        self,
+        registry: AdapterRegistry,
+        event_bus: Optional[EventBus] = None,
+        max_concurrency: int = 8,
+        refresh_ahead: float = 0.8,
+    ) -> None:
+        self._registry = registry
+        self._event_bus = event_bus
+        self._max_concurrency = max_concurrency
+        self._refresh_ahead = refresh_ahead
+        self.last_deltas: dict[str, SnapshotDelta] = {}
+
+    async def refresh_due(self, force: bool = False) -> dict[str, SnapshotDelta]:
+        """Refresh every instance that is due (all of them if ``force``).
+
+        Returns the non-empty deltas by instance id. Failures are logged
+        and leave that instance's previous snapshot in place.
+        """
+        due = {
+            instance_id: adapter
+            for instance_id, adapter in self._registry.all_instances().items()
+            if force or adapter.snapshot_due(self._refresh_ahead)
+        }
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        results = await asyncio.gather(*(
+            self._refresh_one(iid, a, semaphore) for iid, a in due.items()
+        ))
+        deltas = {iid: delta for iid, delta in zip(due, results) if delta}
+        self.last_deltas.update(deltas)
+        return deltas
+
+    async def _refresh_one(
+        self, instance_id: str, adapter: FirewallAdapter, semaphore: asyncio.Semaphore,
+    ) -> SnapshotDelta:
+        # The first snapshot reports every rule as "added"; that is the
+        # baseline, not a change, and can be tens of thousands of rules.
+        baseline = adapter.snapshot_age_seconds() == float("inf")
+        async with semaphore:
+            try:
+                delta = await asyncio.shield(adapter.schedule_refresh())
+            except Exception as e:
+                logger.debug("Snapshot refresh failed for %s: %s", instance_id, e)
+                return {}
+        if delta.get("rules") and not baseline:
+            await self._publish_rule_delta(instance_id, adapter, delta["rules"])
+        return delta
+
+    async def _publish_rule_delta(
+        self, instance_id: str, adapter: FirewallAdapter, changes: dict[str, list[str]],
+    ) -> None:
+        if not self._event_bus:
+            return
+        rules = {rule.id: rule for rule in adapter._rules_cache}
+        for key, event_type in _DELTA_EVENT_TYPES:
+            for rule_id in changes.get(key, ()):
+                rule = rules.get(rule_id)
+                data = {"instance_id": instance_id}
+                if rule is not None:
+                    data.update(device_id=rule.device_id, name=rule.rule_name,
+                                action=rule.action.value, rule_order=rule.order)
+                event = make_policy_event(rule_id, event_type, "adapter_refresh", data=data)
+                try:
+                    await self._event_bus.publish(POLICY_CHANGED, event.to_dict())
+                except Exception as e:
+                    logger.debug("Failed to publish policy delta for %s: %s", instance_id, e)
@@ -3,121 +3,76 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import platform
 import time
+from collections import defaultdict
 
+from ..icmp_engine import EchoStats, ICMPEngine, get_engine
 from .models import DeviceInstance, PingConfig, PingResult
 
 logger = logging.getLogger(__name__)
 
 
 class PingProber:
-    """ICMP reachability + RTT prober for monitored devices."""
+    """ICMP reachability + RTT prober for monitored devices.
 
-    def __init__(self, max_concurrent: int = 20) -> None:
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+    Echoes go through the shared ``ICMPEngine``; a batch is one
+    ``ping_many`` per distinct ping config rather than a process per device.
+    """
+
+    def __init__(self, engine: ICMPEngine | None = None) -> None:
+        self._engine = engine or get_engine()
 
     async def probe(self, ip: str, config: PingConfig | None = None) -> PingResult:
         """Ping a single IP and return results."""
         cfg = config or PingConfig()
         if not cfg.enabled:
             return PingResult(reachable=False, timestamp=time.time())
-
-        async with self._semaphore:
-            return await self._do_ping(ip, cfg)
+        return (await self._ping_group([ip], cfg))[ip]
 
     async def probe_batch(
         self, devices: list[DeviceInstance]
     ) -> dict[str, PingResult]:
         """Probe multiple devices concurrently. Returns {device_id: PingResult}."""
-        tasks = {}
+        groups: dict[tuple, list[DeviceInstance]] = defaultdict(list)
         for dev in devices:
-            if dev.ping_config and dev.ping_config.enabled:
-                tasks[dev.device_id] = self.probe(dev.management_ip, dev.ping_config)
+            cfg = dev.ping_config
+            if cfg and cfg.enabled:
+                groups[(cfg.count, cfg.interval, cfg.timeout)].append(dev)
 
-        if not tasks:
+        if not groups:
             return {}
 
-        results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        results = await asyncio.gather(*(
+            self._ping_group([d.management_ip for d in devs], devs[0].ping_config)
+            for devs in groups.values()
+        ))
         out: dict[str, PingResult] = {}
-        for device_id, result in zip(tasks.keys(), results):
-            if isinstance(result, PingResult):
-                out[device_id] = result
-            else:
-                out[device_id] = PingResult(
-                    reachable=False, packet_loss_pct=100.0, timestamp=time.time()
-                )
+        for devs, by_ip in zip(groups.values(), results):
+            for dev in devs:
+                out[dev.device_id] = by_ip[dev.management_ip]
         return out
 
-    async def _do_ping(self, ip: str, cfg: PingConfig) -> PingResult:
-        """Execute system ping and parse output."""
-        system = platform.system().lower()
-        count_flag = "-n" if system == "windows" else "-c"
-        timeout_flag = "-w" if system == "windows" else "-W"
-        timeout_val = str(cfg.timeout // 1000) if system != "windows" else str(cfg.timeout)
-
-        cmd = ["ping", count_flag, str(cfg.count), timeout_flag, timeout_val, ip]
+    async def _ping_group(self, ips: list[str], cfg: PingConfig) -> dict[str, PingResult]:
+        """Ping IPs sharing one config; failures come back as unreachable."""
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, _ = await asyncio.wait_for(
-                proc.communicate(), timeout=cfg.timeout / 1000 + 5
-            )
-            output = stdout.decode(errors="replace")
-            return self._parse_ping_output(output, cfg.count)
-        except asyncio.TimeoutError:
-            return PingResult(
-                reachable=False, packet_loss_pct=100.0, timestamp=time.time()
+            stats = await self._engine.ping_many(
+                ips, count=cfg.count, interval=cfg.interval / 1000, timeout=cfg.timeout / 1000,
             )
         except Exception as e:
-            logger.debug("Ping %s failed: %s", ip, e)
-            return PingResult(
-                reachable=False, packet_loss_pct=100.0, timestamp=time.time()
-            )
-
-    @staticmethod
-    def _parse_ping_output(output: str, count: int) -> PingResult:
-        """Parse ping command output for RTT and packet loss."""
-        import re
-
+            logger.debug("Ping of %d targets failed: %s", len(ips), e)
+            stats = {}
         now = time.time()
+        return {ip: self._to_result(stats.get(ip), now) for ip in ips}
 
-        # Parse packet loss
-        loss_match = re.search(r"(\d+(?:\.\d+)?)%\s*packet\s*loss", output)
-        loss_pct = float(loss_match.group(1)) if loss_match else 100.0
-
-        # Parse RTT (macOS/Linux: "min/avg/max/stddev = 1.2/3.4/5.6/0.8 ms")
-        rtt_match = re.search(
-            r"(?:rtt|round-trip)\s+min/avg/max/(?:stddev|mdev)\s*=\s*"
-            r"([\d.]+)/([\d.]+)/([\d.]+)",
-            output,
-        )
-
-        if rtt_match:
-            rtt_min = float(rtt_match.group(1))
-            rtt_avg = float(rtt_match.group(2))
-            rtt_max = float(rtt_match.group(3))
-        else:
-            # Windows: "Minimum = 1ms, Maximum = 5ms, Average = 3ms"
-            win_match = re.search(
-                r"Minimum\s*=\s*(\d+)\s*ms.*Maximum\s*=\s*(\d+)\s*ms.*Average\s*=\s*(\d+)\s*ms",
-                output,
-            )
-            if win_match:
-                rtt_min = float(win_match.group(1))
-                rtt_max = float(win_match.group(2))
-                rtt_avg = float(win_match.group(3))
-            else:
-                rtt_min = rtt_avg = rtt_max = 0.0
-
+    @staticmethod
+    def _to_result(stats: EchoStats | None, now: float) -> PingResult:
+        if stats is None:
+            return PingResult(reachable=False, packet_loss_pct=100.0, timestamp=now)
         return PingResult(
-            rtt_avg=rtt_avg,
-            rtt_min=rtt_min,
-            rtt_max=rtt_max,
-            packet_loss_pct=loss_pct,
-            reachable=loss_pct < 100.0,
+            rtt_avg=round(stats.avg_rtt, 3),
+            rtt_min=round(stats.min_rtt, 3),
+            rtt_max=round(stats.max_rtt, 3),
+            packet_loss_pct=round(stats.packet_loss * 100, 1),
+            reachable=stats.is_alive,
             timestamp=now,
         )
@@ -5,6 +5,7 @@ import asyncio
 import logging
 import time
 
+from ..snmp_engine import PYSNMP_AVAILABLE, SNMPEngine, SNMPTarget, get_engine
 from .base import CollectorProtocol, ProtocolCollector
 from .models import (
     CollectedData,
@@ -30,30 +31,42 @@ def _get_snmp_creds(instance: DeviceInstance) -> SNMPCredentials | None:
     return None
 
 
+def _snmp_target(ip: str, creds: SNMPCredentials) -> SNMPTarget:
+    return SNMPTarget(
+        ip=ip,
+        port=creds.port,
+        version={SNMPVersion.V1: "v1", SNMPVersion.V3: "v3"}.get(creds.version, "v2c"),
+        community=creds.community,
+        v3_user=creds.v3_user or "",
+        v3_auth_protocol=creds.v3_auth_protocol.value if creds.v3_auth_protocol else "",
+        v3_auth_key=creds.v3_auth_key or "",
+        v3_priv_protocol=creds.v3_priv_protocol.value if creds.v3_priv_protocol else "",
+        v3_priv_key=creds.v3_priv_key or "",
+    )
+
+
+def _table_columns(metric_def: MetricDefinition) -> dict[str, str]:
+    """Column OIDs to walk for a table metric: its symbols plus tag columns."""
+    columns = {s.name: s.OID for s in metric_def.symbols}
+    for tag in metric_def.metric_tags:
+        if tag.column:
+            columns[f"tag:{tag.tag}"] = tag.column.OID
+    return columns
+
+
 class SNMPProtocolCollector(ProtocolCollector):
     """Singleton SNMP collector that handles all SNMP-enabled devices.
 
-    Uses pysnmp for actual SNMP operations. If pysnmp is not installed,
-    falls back to simulated collection for development.
+    Uses the shared ``SNMPEngine`` for actual SNMP operations. If pysnmp is
+    not installed, falls back to simulated collection for development.
     """
 
     protocol = CollectorProtocol.SNMP
 
-    def __init__(self) -> None:
-        self._pysnmp_available = False
-        try:
-            from pysnmp.hlapi.v3arch.asyncio import (  # noqa: F401
-                CommunityData,
-                ContextData,
-                ObjectIdentity,
-                ObjectType,
-                SnmpEngine,
-                UdpTransportTarget,
-                getCmd,
-                bulkCmd,
-            )
-            self._pysnmp_available = True
-        except ImportError:
+    def __init__(self, engine: SNMPEngine | None = None) -> None:
+        self._engine = engine or get_engine()
+        self._pysnmp_available = PYSNMP_AVAILABLE
+        if not self._pysnmp_available:
             logger.info("pysnmp not available — SNMP collector will use simulated mode")
 
     async def collect(
@@ -125,67 +138,15 @@ class SNMPProtocolCollector(ProtocolCollector):
         """Query a single OID from a device."""
         if not self._pysnmp_available:
             return None
-
-        from pysnmp.hlapi.v3arch.asyncio import (
-            CommunityData,
-            ContextData,
-            ObjectIdentity,
-            ObjectType,
-            SnmpEngine,
-            UdpTransportTarget,
-            UsmUserData,
-            getCmd,
-            usmHMACSHAAuthProtocol,
-            usmHMACMD5AuthProtocol,
-            usmAesCfb128Protocol,
-            usmDESPrivProtocol,
-        )
-
-        engine = SnmpEngine()
-        if creds.version == SNMPVersion.V3:
-            auth_proto = {
-                "MD5": usmHMACMD5AuthProtocol,
-                "SHA": usmHMACSHAAuthProtocol,
-            }.get(creds.v3_auth_protocol.value if creds.v3_auth_protocol else "SHA", usmHMACSHAAuthProtocol)
-            priv_proto = {
-                "DES": usmDESPrivProtocol,
-                "AES": usmAesCfb128Protocol,
-            }.get(creds.v3_priv_protocol.value if creds.v3_priv_protocol else "AES", usmAesCfb128Protocol)
-
-            auth_data = UsmUserData(
-                creds.v3_user or "",
-                creds.v3_auth_key or "",
-                creds.v3_priv_key or "",
-                authProtocol=auth_proto,
-                privProtocol=priv_proto,
-            )
-        else:
-            auth_data = CommunityData(creds.community, mpModel=0 if creds.version == SNMPVersion.V1 else 1)
-
-        try:
-            error_indication, error_status, _, var_binds = await getCmd(
-                engine,
-                auth_data,
-                await UdpTransportTarget.create((ip, creds.port), timeout=5, retries=1),
-                ContextData(),
-                ObjectType(ObjectIdentity(oid)),
-            )
-            if error_indication or error_status:
-                return None
-            for _, val in var_binds:
-                return str(val)
-        except Exception as e:
-            logger.debug("SNMP query %s on %s failed: %s", oid, ip, e)
-            return None
-        finally:
-            engine.close_dispatcher()
-
-        return None
+        values = await self._engine.get(_snmp_target(ip, creds), [oid])
+        val = values.get(oid)
+        return str(val) if val is not None else None
 
     async def _collect_real(
         self, instance: DeviceInstance, profile: DeviceProfile, creds: SNMPCredentials
     ) -> CollectedData:
-        """Collect using pysnmp — query all OIDs in the profile."""
+        """Collect using pysnmp — all scalar OIDs in packed GETs, tables by GETBULK."""
+        target = _snmp_target(instance.management_ip, creds)
         custom_metrics: dict[str, float] = {}
         metadata: dict[str, str] = {}
         interface_metrics: dict[str, dict[str, float]] = {}
@@ -194,33 +155,59 @@ class SNMPProtocolCollector(ProtocolCollector):
         temperature = None
         uptime = None
 
-        # Collect scalar metrics
-        for metric_def in profile.metrics:
-            if metric_def.symbol:
-                val = await self._query_oid(instance.management_ip, creds, metric_def.symbol.OID)
-                if val is not None:
+        scalars = [m.symbol for m in profile.metrics if m.symbol]
+        tables = [m for m in profile.metrics if m.table and m.symbols]
+        oids = [s.OID for s in scalars]
+        oids += [f.symbol.OID for f in profile.metadata_fields.values() if not f.value and f.symbol]
+        values, *table_rows = await asyncio.gather(
+            self._engine.get(target, oids),
+            *(self._engine.bulk_walk(target, _table_columns(m)) for m in tables),
+        )
+
+        # Scalar metrics
+        for symbol in scalars:
+            val = values.get(symbol.OID)
+            if val is None:
+                continue
+            try:
+                fval = float(val)
+                custom_metrics[symbol.name] = fval
+                # Map well-known metrics
+                if "CPU" in symbol.name or "Processor" in symbol.name:
+                    cpu_pct = fval
+                elif "Temp" in symbol.name:
+                    temperature = fval
+                elif "UpTime" in symbol.name:
+                    uptime = int(fval / 100)  # timeticks to seconds
+            except (ValueError, TypeError):
+                custom_metrics[symbol.name] = 0
+
+        # Table metrics, keyed by the first tag column (e.g. ifDescr) or row index
+        for metric_def, columns in zip(tables, table_rows):
+            tag_rows = next((columns[f"tag:{t.tag}"] for t in metric_def.metric_tags if t.column), {})
+            for symbol in metric_def.symbols:
+                for index, val in columns[symbol.name].items():
                     try:
                         fval = float(val)
-                        custom_metrics[metric_def.symbol.name] = fval
-                        # Map well-known metrics
-                        if "CPU" in metric_def.symbol.name or "Processor" in metric_def.symbol.name:
-                            cpu_pct = fval
-                        elif "Temp" in metric_def.symbol.name:
-                            temperature = fval
-                        elif "UpTime" in metric_def.symbol.name:
-                            uptime = int(fval / 100)  # timeticks to seconds
                     except (ValueError, TypeError):
-                        custom_metrics[metric_def.symbol.name] = 0
+                        continue
+                    label = str(tag_rows.get(index, index))
+                    interface_metrics.setdefault(label, {})[symbol.name] = fval
 
-        # Collect metadata fields
+        # Metadata fields
         for field_name, field_def in profile.metadata_fields.items():
             if field_def.value:
                 metadata[field_name] = field_def.value
             elif field_def.symbol:
-                val = await self._query_oid(instance.management_ip, creds, field_def.symbol.OID)
-                if val:
+                val = values.get(field_def.symbol.OID)
+                if val is not None and str(val):
                     metadata[field_name] = str(val)
 
+        # Per-device request health from the shared engine
+        for stats in self._engine.device_stats(instance.management_ip).values():
+            custom_metrics["snmp_rtt_ms"] = round(stats["avg_rtt_ms"], 2)
+            custom_metrics["snmp_timeouts"] = float(stats["timeouts"])
+
         return CollectedData(
             device_id=instance.device_id,
             protocol=CollectorProtocol.SNMP.value,
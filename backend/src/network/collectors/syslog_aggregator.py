@@ -1,24 +1,17 @@
 """Template-based syslog message aggregation.
 
-Groups similar syslog messages by extracting a template (replacing variable
-parts like IPs, numbers, and interface names with placeholders) and then
-aggregating by (device_ip, severity, template).
+Groups similar syslog messages by mining a template (variable parts like
+IPs, numbers, and interface names become placeholders, and tokens that vary
+within an otherwise identical message become ``<*>``) and then aggregating
+by (device_ip, severity, template id).
 """
 from __future__ import annotations
 
-import re
 import time
 from collections import OrderedDict
 from dataclasses import dataclass, field
 
-
-_IP_RE = re.compile(r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b")
-_NUM_RE = re.compile(r"\b\d{2,}\b")  # 2+ digit numbers
-_HEX_RE = re.compile(r"\b0x[0-9a-fA-F]+\b")
-_IFACE_RE = re.compile(
-    r"\b(GigabitEthernet|FastEthernet|TenGigE|Ethernet|eth|ens|enp|ge-|xe-|et-)"
-    r"[\w/.:]+\b"
-)
+from src.utils.log_templates import SYSLOG_MASKS, TemplateMiner
 
 
 @dataclass
@@ -40,28 +33,28 @@ class SyslogAggregator:
     def __init__(self, max_groups: int = 2000) -> None:
         self.max_groups = max_groups
         self._groups: OrderedDict[str, _AggGroup] = OrderedDict()
+        # Templates beyond the group cap could never be reported anyway.
+        self._miner = TemplateMiner(SYSLOG_MASKS, max_clusters=max_groups)
 
     def _extract_template(self, message: str) -> str:
-        """Replace variable portions of the message with placeholders."""
-        tpl = _IP_RE.sub("<IP>", message)
-        tpl = _HEX_RE.sub("<HEX>", tpl)
-        tpl = _IFACE_RE.sub("<IFACE>", tpl)
-        tpl = _NUM_RE.sub("<NUM>", tpl)
-        return tpl
+        """Return the mined template for *message*."""
+        return self._miner.add(message).template
 
-    def _make_key(self, device_ip: str, severity: str, template: str) -> str:
-        return f"{device_ip}|{severity}|{template}"
+    def _make_key(self, device_ip: str, severity: str, template_id: str) -> str:
+        return f"{device_ip}|{severity}|{template_id}"
 
     def add(self, device_ip: str, message: str, severity: str, facility: str) -> None:
         """Add a syslog message to the aggregator."""
-        template = self._extract_template(message)
-        key = self._make_key(device_ip, severity, template)
+        cluster = self._miner.add(message)
+        template = cluster.template
+        key = self._make_key(device_ip, severity, cluster.template_id)
         now = time.monotonic()
 
         if key in self._groups:
             grp = self._groups[key]
             grp.count += 1
             grp.last_seen = now
+            grp.template = template
             if len(grp.samples) < grp.MAX_SAMPLES:
                 grp.samples.append(message)
             # Move to end (most recently seen)
@@ -101,3 +94,4 @@ class SyslogAggregator:
     def clear(self) -> None:
         """Remove all aggregated groups."""
         self._groups.clear()
+        self._miner.clear()
@@ -19,6 +19,8 @@ from datetime import datetime, timezone
 from typing import Any
 from uuid import uuid4
 
+from ..receiver_pool import ReceiverWorkerPool, publish_worker_events, worker_count
+
 logger = logging.getLogger(__name__)
 
 # ── Syslog severity codes (RFC 5424 Section 6.2.1) ───────────────────
@@ -277,6 +279,8 @@ class SyslogListener:
     ~~~~~~~~~~~~~
     * ``SYSLOG_LISTENER_PORT`` — override the default listening port (514).
     * ``SYSLOG_LISTENER_ENABLED`` — set to ``"false"`` to skip binding.
+    * ``SYSLOG_LISTENER_WORKERS`` — parse in N ``SO_REUSEPORT`` worker
+      processes instead of on this event loop (default 0).
 
     Usage::
 
@@ -294,6 +298,7 @@ class SyslogListener:
         instance_store: Any,
         port: int = 514,
         listen_ipv6: bool = False,
+        workers: int | None = None,
     ) -> None:
         env_port = os.environ.get("SYSLOG_LISTENER_PORT")
         self._port: int = int(env_port) if env_port else port
@@ -307,6 +312,10 @@ class SyslogListener:
         self._listen_ipv6: bool = listen_ipv6
         self._recv_count: int = 0
         self._error_count: int = 0
+        self._workers: int = (
+            worker_count("SYSLOG_LISTENER_WORKERS") if workers is None else workers
+        )
+        self._pool: ReceiverWorkerPool | None = None
 
     RECV_BUFFER_SIZE = 4 * 1024 * 1024  # 4 MB
 
@@ -326,6 +335,10 @@ class SyslogListener:
             logger.info("Syslog listener disabled via SYSLOG_LISTENER_ENABLED")
             return
 
+        if self._workers > 0:
+            await self._start_workers()
+            return
+
         import socket as _socket
 
         loop = asyncio.get_running_loop()
@@ -366,8 +379,31 @@ class SyslogListener:
                     exc,
                 )
 
+    async def _start_workers(self) -> None:
+        """Receive through ``SO_REUSEPORT`` worker processes."""
+        pool = ReceiverWorkerPool(
+            "syslog", self._port, self._workers,
+            lambda events: publish_worker_events(events, self._instance_store, self._publish),
+        )
+        try:
+            await pool.start()
+            self._pool = pool
+        except (OSError, asyncio.TimeoutError) as exc:
+            logger.error(
+                "Failed to start syslog workers on UDP port %d: %s",
+                self._port,
+                exc,
+            )
+
     async def stop(self) -> None:
         """Close the UDP socket and stop receiving."""
+        if self._pool is not None:
+            await self._pool.stop()
+            # Keep worker counters once the pool is gone.
+            worker_stats = self._pool.stats()
+            self._recv_count += worker_stats.get("received", 0)
+            self._error_count += worker_stats.get("errors", 0)
+            self._pool = None
         if self._transport is not None:
             self._transport.close()
             self._transport = None
@@ -455,12 +491,13 @@ class SyslogListener:
     @property
     def is_running(self) -> bool:
         """Return ``True`` if the listener is actively receiving."""
-        return self._transport is not None
+        return self._transport is not None or self._pool is not None
 
     @property
     def stats(self) -> dict[str, int]:
-        """Return basic counters for monitoring."""
+        """Return basic counters for monitoring (summed across workers)."""
+        workers = self._pool.stats() if self._pool is not None else {}
         return {
-            "received": self._recv_count,
-            "errors": self._error_count,
+            "received": self._recv_count + workers.get("received", 0),
+            "errors": self._error_count + workers.get("errors", 0),
         }
@@ -18,6 +18,7 @@ from src.network.event_bus.topology_channels import (
     ROUTE_CHANGED,
     POLICY_CHANGED,
     STALE_DETECTED,
+    EventType,
 )
 from src.network.repository.neo4j_connection import Neo4jConnectionManager
 
@@ -133,6 +134,15 @@ class GraphMutatorConsumer:
     async def _handle_policy(self, channel: str, event: dict[str, Any]) -> None:
         data = event.get("data", {})
         entity_id = event.get("entity_id", "")
+        if event.get("event_type") == EventType.DELETED:
+            try:
+                self._neo4j.execute_write(
+                    "MATCH (sp:SecurityPolicy {id: $id}) DETACH DELETE sp", {"id": entity_id},
+                )
+                logger.info("DELETE SecurityPolicy %s", entity_id)
+            except Exception:
+                logger.error("Failed to DELETE SecurityPolicy %s", entity_id, exc_info=True)
+            return
         query = (
             "MERGE (sp:SecurityPolicy {id: $id}) "
             "SET sp.device_id=$device_id, sp.name=$name, "
@@ -0,0 +1,111 @@
+"""KnowledgeGraphSyncConsumer — applies topology events to the in-memory graph.
+
+Listens on the topology channels and hands each event's entity id to the
+matching ``NetworkKnowledgeGraph.refresh_*`` method, which re-reads that one
+entity from the store and patches the graph in place. Events carry no
+payload we rely on; the store is the source of truth, so a delete is just
+a refresh that finds nothing.
+
+``StoreChangePublisher`` is the producing side: registered as the
+``TopologyStore`` change listener, it turns each committed write into an
+event on the matching channel.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Callable
+
+from src.network.event_bus.base import EventBus
+from src.network.event_bus.topology_channels import (
+    DEVICE_CHANGED,
+    INTERFACE_CHANGED,
+    LINK_DISCOVERED,
+    ROUTE_CHANGED,
+    STALE_DETECTED,
+    make_device_event,
+    make_interface_event,
+    make_link_event,
+    make_route_event,
+)
+
+logger = logging.getLogger(__name__)
+
+_CHANNELS = {
+    "device": (DEVICE_CHANGED, make_device_event),
+    "interface": (INTERFACE_CHANGED, make_interface_event),
+    "link": (LINK_DISCOVERED, make_link_event),
+    "route": (ROUTE_CHANGED, make_route_event),
+}
+
+
+class StoreChangePublisher:
+    """``TopologyStore`` change listener that publishes writes to the bus.
+
+    Store writes happen on the event loop and in worker threads alike, so
+    the publish is always handed to ``loop`` thread-safely.
+    """
+
+    def __init__(self, bus: EventBus, loop: asyncio.AbstractEventLoop) -> None:
+        self._bus = bus
+        self._loop = loop
+
+    def __call__(self, entity_type: str, entity_id: str, event_type: str) -> None:
+        target = _CHANNELS.get(entity_type)
+        if target is None or self._loop.is_closed():
+            return
+        channel, make_event = target
+        event = make_event(entity_id, event_type, source="topology_store").to_dict()
+        self._loop.call_soon_threadsafe(self._schedule, channel, event)
+
+    def _schedule(self, channel: str, event: dict[str, Any]) -> None:
+        asyncio.ensure_future(self._publish(channel, event))
+
+    async def _publish(self, channel: str, event: dict[str, Any]) -> None:
+        try:
+            await self._bus.publish(channel, event)
+        except Exception as e:
+            logger.warning("Event publish failed: %s", e)
+
+
+class KnowledgeGraphSyncConsumer:
+    """Keeps a ``NetworkKnowledgeGraph`` current without full reloads."""
+
+    def __init__(self, kg) -> None:
+        self._kg = kg
+
+    async def subscribe(self, bus: EventBus) -> None:
+        """Subscribe to the topology channels that carry graph deltas."""
+        await bus.subscribe(DEVICE_CHANGED, self._handle_device)
+        await bus.subscribe(INTERFACE_CHANGED, self._handle_interface)
+        await bus.subscribe(LINK_DISCOVERED, self._handle_link)
+        await bus.subscribe(ROUTE_CHANGED, self._handle_route)
+        await bus.subscribe(STALE_DETECTED, self._handle_stale)
+
+    # ── Handlers ──────────────────────────────────────────────────────
+
+    async def _handle_device(self, channel: str, event: dict[str, Any]) -> None:
+        self._apply("device", self._kg.refresh_device, event)
+
+    async def _handle_interface(self, channel: str, event: dict[str, Any]) -> None:
+        self._apply("interface", self._kg.refresh_interface, event)
+
+    async def _handle_link(self, channel: str, event: dict[str, Any]) -> None:
+        self._apply("link", self._kg.refresh_link, event)
+
+    async def _handle_route(self, channel: str, event: dict[str, Any]) -> None:
+        self._apply("route", self._kg.refresh_route, event)
+
+    async def _handle_stale(self, channel: str, event: dict[str, Any]) -> None:
+        entity_type = event.get("entity_type", "")
+        self._apply(entity_type, lambda entity_id: self._kg.mark_stale(entity_type, entity_id), event)
+
+    def _apply(self, kind: str, refresh: Callable[[str], None], event: dict[str, Any]) -> None:
+        entity_id = event.get("entity_id")
+        if not entity_id:
+            return
+        try:
+            refresh(entity_id)
+        except Exception:
+            logger.error("Failed to apply %s %s to knowledge graph", kind, entity_id, exc_info=True)
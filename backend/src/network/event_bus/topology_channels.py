@@ -169,6 +169,23 @@ def make_route_event(
     )
 
 
+def make_policy_event(
+    policy_id: str,
+    event_type: str,
+    source: str,
+    data: dict | None = None,
+    changes: dict | None = None,
+) -> TopologyEvent:
+    return TopologyEvent(
+        event_type=event_type,
+        entity_type="policy",
+        entity_id=policy_id,
+        source=source,
+        data=data or {},
+        changes=changes or {},
+    )
+
+
 def make_stale_event(
     entity_type: str,
     entity_id: str,
@@ -0,0 +1,261 @@
+# backend/src/network/flow_aggregation.py
+"""Vectorised per-flush aggregation for FlowAggregator.
+
+A flush window (scalar ``FlowRecord``s plus columnar ``FlowBatch``es) is
+flattened once into a ``FlowFrame`` of integer-encoded key columns. Every
+group-by the aggregator needs — links, conversations, applications and ASNs —
+then runs as a sort + ``np.add.reduceat`` over those columns instead of a
+Python loop over flows.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .flow_columns import FlowBatch, int_to_ip, ip_to_int
+from .metrics_store import FlowRecord
+
+_STRING_BASE = 1 << 32
+
+
+class KeyTable:
+    """Lossless ``str`` <-> ``uint64`` code table.
+
+    Canonical dotted-quad IPv4 strings encode to their integer value so
+    columnar batches need no lookups; any other string (IPv6, device ids)
+    gets an interned code above ``2**32``.
+    """
+
+    def __init__(self) -> None:
+        self._codes: dict[str, int] = {}
+        self._strings: list[str] = []
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = ip_to_int(value)
+            if int_to_ip(code) != value:
+                code = _STRING_BASE + len(self._strings)
+                self._strings.append(value)
+            self._codes[value] = code
+        return code
+
+    def decode(self, code: int) -> str:
+        if code >= _STRING_BASE:
+            return self._strings[code - _STRING_BASE]
+        return int_to_ip(code)
+
+    def decode_many(self, codes: np.ndarray) -> list[str]:
+        """Decode a code column, converting each distinct code only once."""
+        if not len(codes):
+            return []
+        uniq, inverse = np.unique(codes, return_inverse=True)
+        strings = [self.decode(c) for c in uniq.tolist()]
+        return [strings[i] for i in inverse.tolist()]
+
+
+@dataclass
+class FlowFrame:
+    """One flush window as parallel columns (one row per flow or merged flow key)."""
+
+    keys: KeyTable
+    src: np.ndarray
+    dst: np.ndarray
+    link_src: np.ndarray
+    dst_port: np.ndarray
+    src_as: np.ndarray
+    dst_as: np.ndarray
+    bytes: np.ndarray
+    packets: np.ndarray
+    duration: np.ndarray
+    # Decoded flows per row (rows merged by a receiver worker count several).
+    flows: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+
+def build_frame(
+    records: list[FlowRecord], batches: list[FlowBatch],
+    device_ip_map: dict[str, str],
+) -> FlowFrame:
+    """Flatten records and batches into a single ``FlowFrame``.
+
+    ``link_src`` is the exporter's device id when the exporter is known,
+    otherwise the flow's source IP (matching the link-metric convention).
+    """
+    keys = KeyTable()
+    parts: dict[str, list[np.ndarray]] = {name: [] for name in (
+        "src", "dst", "link_src", "dst_port", "src_as", "dst_as",
+        "bytes", "packets", "duration", "flows",
+    )}
+
+    if records:
+        enc = keys.encode
+        src = np.fromiter((enc(f.src_ip) for f in records), np.uint64, len(records))
+        parts["src"].append(src)
+        parts["dst"].append(np.fromiter((enc(f.dst_ip) for f in records), np.uint64, len(records)))
+        parts["link_src"].append(np.fromiter(
+            (enc(device_ip_map[f.exporter_ip]) if f.exporter_ip in device_ip_map else s
+             for f, s in zip(records, src.tolist())),
+            np.uint64, len(records),
+        ))
+        parts["dst_port"].append(np.fromiter((f.dst_port for f in records), np.int64, len(records)))
+        parts["src_as"].append(np.fromiter((f.src_as for f in records), np.uint64, len(records)))
+        parts["dst_as"].append(np.fromiter((f.dst_as for f in records), np.uint64, len(records)))
+        parts["bytes"].append(np.fromiter((f.bytes for f in records), np.uint64, len(records)))
+        parts["packets"].append(np.fromiter((f.packets for f in records), np.uint64, len(records)))
+        parts["duration"].append(np.fromiter(
+            ((f.end_time - f.start_time).total_seconds() for f in records),
+            np.float64, len(records),
+        ))
+        parts["flows"].append(np.ones(len(records), np.uint64))
+
+    for batch in batches:
+        cols = batch.columns
+        src = cols["src_ip"].astype(np.uint64)
+        parts["src"].append(src)
+        parts["dst"].append(cols["dst_ip"].astype(np.uint64))
+        device = device_ip_map.get(batch.exporter_ip)
+        parts["link_src"].append(
+            src if device is None else np.full(len(cols), keys.encode(device), np.uint64)
+        )
+        parts["dst_port"].append(cols["dst_port"].astype(np.int64))
+        parts["src_as"].append(cols["src_as"].astype(np.uint64))
+        parts["dst_as"].append(cols["dst_as"].astype(np.uint64))
+        parts["bytes"].append(cols["bytes"])
+        parts["packets"].append(cols["packets"])
+        # Summed over the flows a merged row stands for.
+        parts["duration"].append(
+            (cols["end"].astype(np.int64) - cols["start"].astype(np.int64)).astype(np.float64)
+            * cols["flows"]
+        )
+        parts["flows"].append(cols["flows"].astype(np.uint64))
+
+    merged = {
+        name: np.concatenate(chunks) if chunks else np.zeros(0, np.uint64)
+        for name, chunks in parts.items()
+    }
+    return FlowFrame(keys=keys, **merged)
+
+
+def group_sums(
+    keys: tuple[np.ndarray, ...], values: tuple[np.ndarray, ...],
+) -> tuple[tuple[np.ndarray, ...], tuple[np.ndarray, ...], np.ndarray]:
+    """Multi-key group-by: ``(unique key columns, per-group sums, counts)``.
+
+    Groups are returned in order of first occurrence, like the insertion
+    order of the dict accumulators this replaces. Sums keep the value dtype
+    (``reduceat`` over a sorted copy), so integer byte counts stay exact.
+    """
+    n = len(keys[0])
+    if n == 0:
+        return (
+            tuple(k[:0] for k in keys),
+            tuple(v[:0] for v in values),
+            np.zeros(0, np.int64),
+        )
+    combined = np.zeros(n, np.int64)
+    for k in keys:
+        uniq, inverse = np.unique(k, return_inverse=True)
+        combined = combined * len(uniq) + inverse
+    order = np.argsort(combined, kind="stable")
+    sorted_keys = combined[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    counts = np.diff(np.append(starts, n))
+    sums = [np.add.reduceat(v[order], starts) for v in values]
+    first = order[starts]
+    by_first = np.argsort(first, kind="stable")
+    first = first[by_first]
+    return (
+        tuple(k[first] for k in keys),
+        tuple(s[by_first] for s in sums),
+        counts[by_first],
+    )
+
+
+@dataclass
+class WindowAggregates:
+    """All per-flush group-bys, as plain Python values ready for storage."""
+
+    flow_count: int = 0
+    total_bytes: int = 0
+    total_packets: int = 0
+    links: list[tuple[tuple[str, str], dict]] = field(default_factory=list)
+    conversations: list[tuple[tuple[str, str], dict]] = field(default_factory=list)
+    applications: list[tuple[str, dict]] = field(default_factory=list)
+    asns: list[tuple[int, dict]] = field(default_factory=list)
+
+
+def aggregate_frame(
+    frame: FlowFrame, app_ports: dict[int, str],
+    max_conversations: int | None = None,
+) -> WindowAggregates:
+    """Compute link, conversation, application and ASN aggregates in one go.
+
+    ``max_conversations`` materialises only the newest groups (by first
+    occurrence) — the ones a FIFO-bounded consumer would keep anyway.
+    """
+    out = WindowAggregates(
+        flow_count=int(frame.flows.sum()),
+        total_bytes=int(frame.bytes.sum()),
+        total_packets=int(frame.packets.sum()),
+    )
+    if not len(frame):
+        return out
+    decode_many = frame.keys.decode_many
+
+    (l_src, l_dst), (l_bytes, l_pkts), _ = group_sums(
+        (frame.link_src, frame.dst), (frame.bytes, frame.packets),
+    )
+    out.links = [
+        ((s, d), {"bytes": b, "packets": p})
+        for s, d, b, p in zip(decode_many(l_src), decode_many(l_dst),
+                              l_bytes.tolist(), l_pkts.tolist())
+    ]
+
+    (c_src, c_dst), (c_bytes, c_pkts, c_lat, c_flows), _ = group_sums(
+        (frame.src, frame.dst), (frame.bytes, frame.packets, frame.duration, frame.flows),
+    )
+    if max_conversations is not None and len(c_src) > max_conversations:
+        keep = slice(len(c_src) - max_conversations, None)
+        c_src, c_dst, c_bytes, c_pkts, c_lat, c_flows = (
+            c_src[keep], c_dst[keep], c_bytes[keep], c_pkts[keep], c_lat[keep], c_flows[keep],
+        )
+    out.conversations = [
+        ((s, d), {"bytes": b, "packets": p, "flows": n, "latency_sum": lat})
+        for s, d, b, p, lat, n in zip(
+            decode_many(c_src), decode_many(c_dst), c_bytes.tolist(), c_pkts.tolist(),
+            c_lat.tolist(), c_flows.tolist(),
+        )
+    ]
+
+    app_names = ["Other", *app_ports.values()]
+    port_index = np.zeros(65536, np.int64)
+    port_index[list(app_ports)] = np.arange(1, len(app_names))
+    app_idx = port_index[frame.dst_port & 0xFFFF]
+    (a_idx,), (a_bytes, a_pkts, a_flows), _ = group_sums(
+        (app_idx,), (frame.bytes, frame.packets, frame.flows),
+    )
+    out.applications = [
+        (app_names[i], {"bytes": b, "packets": p, "flows": n})
+        for i, b, p, n in zip(a_idx.tolist(), a_bytes.tolist(), a_pkts.tolist(), a_flows.tolist())
+    ]
+
+    # Each flow counts toward both of its (non-zero) ASNs; interleave src/dst
+    # so first-occurrence order matches a per-flow (src_as, dst_as) walk.
+    asn = np.column_stack((frame.src_as, frame.dst_as)).ravel()
+    asn_bytes = np.repeat(frame.bytes, 2)
+    asn_pkts = np.repeat(frame.packets, 2)
+    asn_flows = np.repeat(frame.flows, 2)
+    nonzero = asn != 0
+    (s_asn,), (s_bytes, s_pkts, s_flows), _ = group_sums(
+        (asn[nonzero],), (asn_bytes[nonzero], asn_pkts[nonzero], asn_flows[nonzero]),
+    )
+    out.asns = [
+        (a, {"bytes": b, "packets": p, "flows": n})
+        for a, b, p, n in zip(s_asn.tolist(), s_bytes.tolist(), s_pkts.tolist(), s_flows.tolist())
+    ]
+    return out
@@ -0,0 +1,104 @@
+# backend/src/network/flow_biflows.py
+"""Biflow stitching table for FlowAggregator.
+
+Entries live in an ``OrderedDict`` kept in ``last_seen`` order: a touch
+moves the entry to the tail, so the head is always the least recently seen
+biflow. Capacity eviction and timeout expiry both pop from the head, which
+makes insert, touch and expiry O(1) amortised instead of a full-table scan.
+"""
+
+from __future__ import annotations
+
+import heapq
+from collections import OrderedDict
+from typing import Iterator
+
+BiflowKey = tuple[str, int, str, int, int]
+
+
+class Biflow:
+    """Forward/reverse counters for one canonical 5-tuple."""
+
+    __slots__ = (
+        "src_ip", "src_port", "dst_ip", "dst_port", "protocol",
+        "forward_bytes", "forward_packets", "reverse_bytes", "reverse_packets",
+        "first_seen", "last_seen",
+    )
+
+    def __init__(self, key: BiflowKey, now: float) -> None:
+        self.src_ip, self.src_port, self.dst_ip, self.dst_port, self.protocol = key
+        self.forward_bytes = 0
+        self.forward_packets = 0
+        self.reverse_bytes = 0
+        self.reverse_packets = 0
+        self.first_seen = now
+        self.last_seen = now
+
+    @property
+    def total_bytes(self) -> int:
+        return self.forward_bytes + self.reverse_bytes
+
+    def to_dict(self) -> dict:
+        out = {name: getattr(self, name) for name in self.__slots__}
+        out["total_bytes"] = self.total_bytes
+        return out
+
+
+class BiflowTable:
+    """Canonical 5-tuple -> ``Biflow``, ordered from least to most recently seen.
+
+    Ordering assumes ``now`` does not go backwards between touches; if the
+    wall clock steps back, touched entries still move to the tail, so expiry
+    is at worst delayed, never premature.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[BiflowKey, Biflow] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def __iter__(self) -> Iterator[Biflow]:
+        return iter(self._entries.values())
+
+    def get(self, key: BiflowKey) -> Biflow | None:
+        return self._entries.get(key)
+
+    def touch(self, key: BiflowKey, now: float) -> Biflow:
+        """Return the entry for *key* (creating it) marked as seen at *now*."""
+        entries = self._entries
+        bf = entries.get(key)
+        if bf is None:
+            bf = entries[key] = Biflow(key, now)
+        else:
+            bf.last_seen = now
+            entries.move_to_end(key)
+        return bf
+
+    def evict_oldest(self, count: int = 1) -> int:
+        """Drop up to *count* least recently seen entries."""
+        entries = self._entries
+        evicted = 0
+        while evicted < count and entries:
+            entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def expire(self, cutoff: float) -> int:
+        """Drop every entry last seen before *cutoff*. Returns count evicted."""
+        entries = self._entries
+        evicted = 0
+        while entries:
+            bf = next(iter(entries.values()))
+            if bf.last_seen >= cutoff:
+                break
+            entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def top(self, limit: int) -> list[Biflow]:
+        """The *limit* entries with the most total bytes, largest first."""
+        return heapq.nlargest(limit, self._entries.values(), key=lambda bf: bf.total_bytes)
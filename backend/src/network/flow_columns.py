@@ -0,0 +1,313 @@
+# backend/src/network/flow_columns.py
+"""Columnar (struct-of-arrays) representation of decoded flow records.
+
+The receiver hot path decodes a whole NetFlow/IPFIX datagram into one numpy
+structured array instead of building a ``FlowRecord`` per flow. IPs stay as
+integers and timestamps as epoch seconds; ``FlowRecord`` objects are only
+materialised when a caller actually asks for them.
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterator
+
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
+
+from .metrics_store import FlowRecord
+
+# Native-endian column layout shared by every decode path.
+FLOW_DTYPE = np.dtype([
+    ("src_ip", np.uint32),
+    ("dst_ip", np.uint32),
+    ("src_port", np.uint16),
+    ("dst_port", np.uint16),
+    ("protocol", np.uint8),
+    ("tcp_flags", np.uint8),
+    ("tos", np.uint8),
+    ("bytes", np.uint64),
+    ("packets", np.uint64),
+    ("start", np.uint32),
+    ("end", np.uint32),
+    ("input_snmp", np.uint32),
+    ("output_snmp", np.uint32),
+    ("src_as", np.uint32),
+    ("dst_as", np.uint32),
+    ("sampling_interval", np.uint32),
+    # Decoded flows folded into this row; 1 unless merged by merge_flows().
+    ("flows", np.uint32),
+])
+
+# Per-row counters; every other column is part of a row's flow key.
+_COUNTER_COLUMNS = ("bytes", "packets", "tcp_flags", "flows")
+_KEY_COLUMNS = [name for name in FLOW_DTYPE.names if name not in _COUNTER_COLUMNS]
+
+# On-the-wire NetFlow v5 record (48 bytes, network byte order).
+V5_RECORD_DTYPE = np.dtype([
+    ("src_ip", ">u4"), ("dst_ip", ">u4"), ("next_hop", ">u4"),
+    ("input_snmp", ">u2"), ("output_snmp", ">u2"),
+    ("packets", ">u4"), ("bytes", ">u4"),
+    ("first", ">u4"), ("last", ">u4"),
+    ("src_port", ">u2"), ("dst_port", ">u2"),
+    ("pad1", "u1"), ("tcp_flags", "u1"), ("protocol", "u1"), ("tos", "u1"),
+    ("src_as", ">u2"), ("dst_as", ">u2"),
+    ("src_mask", "u1"), ("dst_mask", "u1"), ("pad2", ">u2"),
+])
+
+_V5_COPY_FIELDS = (
+    "src_ip", "dst_ip", "input_snmp", "output_snmp", "packets", "bytes",
+    "src_port", "dst_port", "tcp_flags", "protocol", "tos", "src_as", "dst_as",
+)
+
+# NetFlow v9 / IPFIX information element id -> FLOW_DTYPE column.
+V9_FIELD_COLUMNS: dict[int, str] = {
+    1: "bytes", 2: "packets", 4: "protocol", 5: "tos", 6: "tcp_flags",
+    7: "src_port", 8: "src_ip", 10: "input_snmp", 11: "dst_port",
+    12: "dst_ip", 14: "output_snmp", 16: "src_as", 17: "dst_as",
+}
+_IPV4_FIELDS = frozenset({8, 12})
+_INT_WIDTHS = frozenset({1, 2, 4, 8})
+
+
+def empty_columns(count: int = 0) -> np.ndarray:
+    """Return a zeroed column array with ``sampling_interval`` and ``flows`` at 1."""
+    cols = np.zeros(count, dtype=FLOW_DTYPE)
+    cols["sampling_interval"] = 1
+    cols["flows"] = 1
+    return cols
+
+
+def merge_flows(cols: np.ndarray) -> np.ndarray:
+    """Collapse rows that share a flow key into one row each.
+
+    Bytes, packets and ``flows`` are summed and TCP flags OR-ed; every other
+    column (addresses, ports, interfaces, timestamps, sampling) is the key.
+    Rows come back in first-occurrence order. Every flush aggregate is a sum
+    over these counters, so aggregating merged rows gives the same totals.
+    """
+    if len(cols) < 2:
+        return cols
+    keys = repack_fields(cols[_KEY_COLUMNS])
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    if len(first) == len(cols):
+        return cols
+    merged = cols[first]
+    for name in _COUNTER_COLUMNS:
+        merged[name] = 0
+    for name in ("bytes", "packets", "flows"):
+        np.add.at(merged[name], inverse, cols[name])
+    np.bitwise_or.at(merged["tcp_flags"], inverse, cols["tcp_flags"])
+    return merged[np.argsort(first, kind="stable")]
+
+
+def int_to_ip(value: int) -> str:
+    """Dotted-quad string for an IPv4 address stored as an int."""
+    return socket.inet_ntoa(struct.pack("!I", value))
+
+
+def ip_to_int(ip: str) -> int:
+    """IPv4 string as an int; 0 for anything that is not IPv4."""
+    try:
+        return struct.unpack("!I", socket.inet_aton(ip))[0]
+    except OSError:
+        return 0
+
+
+@lru_cache(maxsize=512)
+def compile_template(
+    template: tuple[tuple[int, int], ...],
+) -> tuple[np.dtype, tuple[tuple[str, str], ...]] | None:
+    """Compile a v9/IPFIX template into a wire dtype plus column assignments.
+
+    Returns ``(dtype, ((wire_field, column), ...))`` or None when the template
+    cannot be decoded with a fixed record size (e.g. IPFIX variable-length
+    elements).
+    """
+    names: list[str] = []
+    formats: list[str] = []
+    assignments: list[tuple[str, str]] = []
+    seen: set[int] = set()
+    for idx, (ftype, flen) in enumerate(template):
+        if flen == 0 or flen == 0xFFFF:
+            return None
+        name = f"f{idx}"
+        names.append(name)
+        formats.append(f">u{flen}" if flen in _INT_WIDTHS else f"V{flen}")
+        column = V9_FIELD_COLUMNS.get(ftype)
+        if column is None or ftype in seen or flen not in _INT_WIDTHS:
+            continue
+        if ftype in _IPV4_FIELDS and flen != 4:
+            continue
+        seen.add(ftype)
+        assignments.append((name, column))
+    if not names:
+        return None
+    return np.dtype({"names": names, "formats": formats}), tuple(assignments)
+
+
+def decode_v5(data: bytes, count: int, unix_secs: int) -> np.ndarray:
+    """Decode up to *count* v5 records following the 24-byte header."""
+    available = max(0, (len(data) - 24) // V5_RECORD_DTYPE.itemsize)
+    n = min(count, available)
+    raw = np.frombuffer(data, dtype=V5_RECORD_DTYPE, count=n, offset=24)
+    cols = empty_columns(n)
+    for name in _V5_COPY_FIELDS:
+        cols[name] = raw[name]
+    cols["start"] = unix_secs
+    cols["end"] = unix_secs
+    return cols
+
+
+def decode_template_records(
+    data: bytes, start: int, end: int,
+    template: tuple[tuple[int, int], ...], unix_secs: int,
+) -> np.ndarray | None:
+    """Decode every whole record of a v9/IPFIX data set in one call."""
+    compiled = compile_template(template)
+    if compiled is None:
+        return None
+    wire_dtype, assignments = compiled
+    end = min(end, len(data))
+    n = (end - start) // wire_dtype.itemsize
+    if n <= 0:
+        return None
+    raw = np.frombuffer(data, dtype=wire_dtype, count=n, offset=start)
+    cols = empty_columns(n)
+    for wire_field, column in assignments:
+        cols[column] = raw[wire_field]
+    cols["start"] = unix_secs
+    cols["end"] = unix_secs
+    return cols
+
+
+class FlowBatch:
+    """Decoded flows from a single exporter, held as a FLOW_DTYPE array."""
+
+    __slots__ = ("columns", "exporter_ip")
+
+    def __init__(self, columns: np.ndarray, exporter_ip: str = "") -> None:
+        self.columns = columns
+        self.exporter_ip = exporter_ip
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __iter__(self) -> Iterator[FlowRecord]:
+        return iter(self.to_records())
+
+    def tail(self, count: int) -> FlowBatch:
+        """Return a view over the newest *count* flows."""
+        return FlowBatch(self.columns[len(self.columns) - count:], self.exporter_ip)
+
+    def compensate_sampling(self) -> None:
+        """Scale bytes/packets by the sampling interval, in place."""
+        interval = self.columns["sampling_interval"]
+        sampled = interval > 1
+        if sampled.any():
+            factor = interval[sampled].astype(np.uint64)
+            self.columns["bytes"][sampled] *= factor
+            self.columns["packets"][sampled] *= factor
+
+    def to_records(self) -> list[FlowRecord]:
+        """Materialise ``FlowRecord`` objects for every flow in the batch."""
+        cols = self.columns
+        if len(cols) == 0:
+            return []
+        # Pull each column out once as Python ints; per-row numpy scalar
+        # access is far slower than list indexing.
+        fields = {name: cols[name].tolist() for name in FLOW_DTYPE.names}
+        ip_cache: dict[int, str] = {}
+        ts_cache: dict[int, datetime] = {}
+
+        def ip(value: int) -> str:
+            s = ip_cache.get(value)
+            if s is None:
+                s = ip_cache[value] = int_to_ip(value)
+            return s
+
+        def ts(value: int) -> datetime:
+            t = ts_cache.get(value)
+            if t is None:
+                t = ts_cache[value] = datetime.fromtimestamp(value, tz=timezone.utc)
+            return t
+
+        exporter = self.exporter_ip
+        return [
+            FlowRecord(
+                src_ip=ip(fields["src_ip"][i]),
+                dst_ip=ip(fields["dst_ip"][i]),
+                src_port=fields["src_port"][i],
+                dst_port=fields["dst_port"][i],
+                protocol=fields["protocol"][i],
+                bytes=fields["bytes"][i],
+                packets=fields["packets"][i],
+                start_time=ts(fields["start"][i]),
+                end_time=ts(fields["end"][i]),
+                tcp_flags=fields["tcp_flags"][i],
+                tos=fields["tos"][i],
+                input_snmp=fields["input_snmp"][i],
+                output_snmp=fields["output_snmp"][i],
+                src_as=fields["src_as"][i],
+                dst_as=fields["dst_as"][i],
+                exporter_ip=exporter,
+                sampling_interval=fields["sampling_interval"][i],
+            )
+            for i in range(len(cols))
+        ]
+
+
+class FlowBuffer:
+    """Ingest buffer holding both scalar ``FlowRecord``s and ``FlowBatch``es.
+
+    ``len()`` counts individual flows so callers that previously sized a
+    plain list keep working.
+    """
+
+    def __init__(self) -> None:
+        self.records: list[FlowRecord] = []
+        self.batches: list[FlowBatch] = []
+        self._batched = 0
+
+    def __len__(self) -> int:
+        return len(self.records) + self._batched
+
+    def __bool__(self) -> bool:
+        return bool(self.records) or self._batched > 0
+
+    def append(self, flow: FlowRecord) -> None:
+        self.records.append(flow)
+
+    def add_batch(self, batch: FlowBatch) -> None:
+        if len(batch):
+            self.batches.append(batch)
+            self._batched += len(batch)
+
+    def keep_newest(self, count: int) -> None:
+        """Drop the oldest flows so that at most *count* remain.
+
+        Columnar batches arrive from the receiver and scalar records from
+        direct ``ingest()`` callers; batches are trimmed first.
+        """
+        excess = len(self) - count
+        while excess > 0 and self.batches:
+            head = self.batches[0]
+            if len(head) <= excess:
+                self.batches.pop(0)
+                self._batched -= len(head)
+                excess -= len(head)
+            else:
+                self.batches[0] = head.tail(len(head) - excess)
+                self._batched -= excess
+                excess = 0
+        if excess > 0:
+            del self.records[:excess]
+
+    def drain(self) -> tuple[list[FlowRecord], list[FlowBatch]]:
+        """Return and clear the buffered records and batches."""
+        records, batches = self.records, self.batches
+        self.records, self.batches, self._batched = [], [], 0
+        return records, batches
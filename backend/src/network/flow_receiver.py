@@ -11,9 +11,21 @@ import time
 from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any
-
+from typing import Any, Iterator
+
+import numpy as np
+
+from .flow_aggregation import aggregate_frame, build_frame
+from .flow_biflows import BiflowTable
+from .flow_columns import (
+    FLOW_DTYPE,
+    FlowBatch,
+    FlowBuffer,
+    decode_template_records,
+    decode_v5,
+)
 from .metrics_store import FlowRecord
+from .receiver_pool import ReceiverWorkerPool, worker_count
 
 logger = logging.getLogger(__name__)
 
@@ -129,17 +141,17 @@ class FlowParser:
                 dst_ip=dst_ip,
                 src_port=fields[9],
                 dst_port=fields[10],
-                protocol=fields[12],
+                protocol=fields[13],
                 bytes=fields[6],
                 packets=fields[5],
                 start_time=base_time,
                 end_time=base_time,
-                tcp_flags=fields[11],
-                tos=fields[13],
+                tcp_flags=fields[12],
+                tos=fields[14],
                 input_snmp=fields[3],
                 output_snmp=fields[4],
-                src_as=fields[14],
-                dst_as=fields[15],
+                src_as=fields[15],
+                dst_as=fields[16],
                 exporter_ip=exporter_ip,
             ))
 
@@ -147,37 +159,58 @@ class FlowParser:
 
     def parse_v9(self, data: bytes, exporter_ip: str) -> list[FlowRecord]:
         """Parse NetFlow v9 packet — handles both template and data flowsets."""
-        if len(data) < 20:
+        header = self._v9_header(data)
+        if header is None:
             return []
+        source_id, unix_secs = header
+        cache_key = (exporter_ip, source_id)
+        base_time = datetime.fromtimestamp(unix_secs, tz=timezone.utc)
+        records: list[FlowRecord] = []
+        for set_id, start, end in self._iter_data_sets(data, 20, 0, cache_key):
+            records.extend(self._parse_v9_data(data, start, end, set_id,
+                                               cache_key, base_time, exporter_ip))
+        return records
+
+    @staticmethod
+    def _v9_header(data: bytes) -> tuple[int, int] | None:
+        if len(data) < 20:
+            return None
         version, count, sys_uptime, unix_secs, sequence, source_id = struct.unpack_from("!HHIIII", data)
         if version != 9:
-            return []
+            return None
+        return source_id, unix_secs
 
-        base_time = datetime.fromtimestamp(unix_secs, tz=timezone.utc)
-        cache_key = (exporter_ip, source_id)
-        offset = 20
-        records: list[FlowRecord] = []
+    @staticmethod
+    def _ipfix_header(data: bytes) -> tuple[int, int] | None:
+        if len(data) < 16:
+            return None
+        version, length, export_time, sequence, domain_id = struct.unpack_from("!HHIII", data)
+        if version != 10:
+            return None
+        return domain_id, export_time
 
+    def _iter_data_sets(self, data: bytes, offset: int, template_set_id: int,
+                        cache_key: tuple[str, int]) -> Iterator[tuple[int, int, int]]:
+        """Walk the flowsets of a v9/IPFIX packet.
+
+        Template sets are parsed into the cache as they are met; data sets are
+        yielded as ``(set_id, start, end)`` so the caller decides how to decode
+        them. Options templates (``template_set_id + 1``) are skipped.
+        """
         while offset < len(data) - 3:
             if offset + 4 > len(data):
                 break
-            flowset_id, flowset_length = struct.unpack_from("!HH", data, offset)
-            if flowset_length < 4:
+            set_id, set_length = struct.unpack_from("!HH", data, offset)
+            if set_length < 4:
                 break
-            flowset_end = offset + flowset_length
-
-            if flowset_id == 0:
-                self._parse_v9_templates(data, offset + 4, flowset_end, cache_key)
-            elif flowset_id == 1:
-                pass  # Options Template — skip
-            elif flowset_id >= 256:
-                new_records = self._parse_v9_data(data, offset + 4, flowset_end,
-                                                   flowset_id, cache_key, base_time, exporter_ip)
-                records.extend(new_records)
+            set_end = offset + set_length
 
-            offset = flowset_end
+            if set_id == template_set_id:
+                self._parse_v9_templates(data, offset + 4, set_end, cache_key)
+            elif set_id >= 256:
+                yield set_id, offset + 4, set_end
 
-        return records
+            offset = set_end
 
     def _parse_v9_templates(self, data: bytes, start: int, end: int,
                             cache_key: tuple[str, int]) -> None:
@@ -218,14 +251,14 @@ class FlowParser:
                         total -= 1
                     self._template_timestamps.pop(oldest, None)
 
-    def _parse_v9_data(self, data: bytes, start: int, end: int,
-                       template_id: int, cache_key: tuple[str, int],
-                       base_time: datetime, exporter_ip: str) -> list[FlowRecord]:
+    def _lookup_data_template(self, cache_key: tuple[str, int],
+                              template_id: int) -> list[tuple[int, int]] | None:
+        """Return the live template for a data set, evicting it if expired."""
         templates = self._v9_templates.get(cache_key, {})
         template = templates.get(template_id)
         if not template:
             logger.debug("No template %d for exporter %s", template_id, cache_key[0])
-            return []
+            return None
 
         # Check TTL on the template
         composite_key = (cache_key, template_id)
@@ -237,6 +270,14 @@ class FlowParser:
                 del self._v9_templates[cache_key]
             self._template_timestamps.pop(composite_key, None)
             logger.debug("Template %d for exporter %s expired", template_id, cache_key[0])
+            return None
+        return template
+
+    def _parse_v9_data(self, data: bytes, start: int, end: int,
+                       template_id: int, cache_key: tuple[str, int],
+                       base_time: datetime, exporter_ip: str) -> list[FlowRecord]:
+        template = self._lookup_data_template(cache_key, template_id)
+        if not template:
             return []
 
         record_size = sum(flen for _, flen in template)
@@ -294,36 +335,16 @@ class FlowParser:
 
     def parse_ipfix(self, data: bytes, exporter_ip: str) -> list[FlowRecord]:
         """Parse IPFIX (NetFlow v10) packet."""
-        if len(data) < 16:
+        header = self._ipfix_header(data)
+        if header is None:
             return []
-        version, length, export_time, sequence, domain_id = struct.unpack_from("!HHIII", data)
-        if version != 10:
-            return []
-
-        base_time = datetime.fromtimestamp(export_time, tz=timezone.utc)
+        domain_id, export_time = header
         cache_key = (exporter_ip, domain_id)
-        offset = 16
+        base_time = datetime.fromtimestamp(export_time, tz=timezone.utc)
         records: list[FlowRecord] = []
-
-        while offset < len(data) - 3:
-            if offset + 4 > len(data):
-                break
-            set_id, set_length = struct.unpack_from("!HH", data, offset)
-            if set_length < 4:
-                break
-            set_end = offset + set_length
-
-            if set_id == 2:
-                self._parse_v9_templates(data, offset + 4, set_end, cache_key)
-            elif set_id == 3:
-                pass  # Options Template — skip
-            elif set_id >= 256:
-                new_records = self._parse_v9_data(data, offset + 4, set_end,
-                                                   set_id, cache_key, base_time, exporter_ip)
-                records.extend(new_records)
-
-            offset = set_end
-
+        for set_id, start, end in self._iter_data_sets(data, 16, 2, cache_key):
+            records.extend(self._parse_v9_data(data, start, end, set_id,
+                                               cache_key, base_time, exporter_ip))
         return records
 
     def detect_and_parse(self, data: bytes, exporter_ip: str) -> list[FlowRecord]:
@@ -340,6 +361,63 @@ class FlowParser:
             logger.debug("Unsupported flow version: %d", version)
             return []
 
+    # -- Columnar batch decode --------------------------------------------
+    # Same wire handling as the parse_* methods above, but a whole datagram
+    # is decoded into one FLOW_DTYPE array; no per-flow objects are built.
+
+    def parse_v5_batch(self, data: bytes, exporter_ip: str) -> FlowBatch | None:
+        header = NetFlowV5Header.from_bytes(data)
+        if header is None or header.version != 5:
+            return None
+        return FlowBatch(decode_v5(data, header.count, header.unix_secs), exporter_ip)
+
+    def parse_v9_batch(self, data: bytes, exporter_ip: str) -> FlowBatch | None:
+        header = self._v9_header(data)
+        if header is None:
+            return None
+        source_id, unix_secs = header
+        return self._decode_data_sets(data, 20, 0, (exporter_ip, source_id),
+                                      unix_secs, exporter_ip)
+
+    def parse_ipfix_batch(self, data: bytes, exporter_ip: str) -> FlowBatch | None:
+        header = self._ipfix_header(data)
+        if header is None:
+            return None
+        domain_id, export_time = header
+        return self._decode_data_sets(data, 16, 2, (exporter_ip, domain_id),
+                                      export_time, exporter_ip)
+
+    def _decode_data_sets(self, data: bytes, offset: int, template_set_id: int,
+                          cache_key: tuple[str, int], unix_secs: int,
+                          exporter_ip: str) -> FlowBatch | None:
+        chunks = []
+        for set_id, start, end in self._iter_data_sets(data, offset, template_set_id, cache_key):
+            template = self._lookup_data_template(cache_key, set_id)
+            if not template:
+                continue
+            cols = decode_template_records(data, start, end, tuple(template), unix_secs)
+            if cols is not None:
+                chunks.append(cols)
+        if not chunks:
+            return None
+        cols = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+        return FlowBatch(cols, exporter_ip)
+
+    def detect_and_parse_batch(self, data: bytes, exporter_ip: str) -> FlowBatch | None:
+        """Columnar counterpart of :meth:`detect_and_parse`."""
+        if len(data) < 4:
+            return None
+        version = struct.unpack_from("!H", data)[0]
+        if version == 5:
+            return self.parse_v5_batch(data, exporter_ip)
+        elif version == 9:
+            return self.parse_v9_batch(data, exporter_ip)
+        elif version == 10:
+            return self.parse_ipfix_batch(data, exporter_ip)
+        else:
+            logger.debug("Unsupported flow version: %d", version)
+            return None
+
 
 class FlowAggregator:
     """Buffers flow records and flushes aggregated metrics."""
@@ -353,13 +431,13 @@ class FlowAggregator:
     ) -> None:
         self.metrics = metrics_store
         self.topo_store = topology_store
-        self._buffer: list[FlowRecord] = []
+        self._buffer = FlowBuffer()
         self._device_ip_map = device_ip_map or {}
         self._conversations: OrderedDict[tuple[str, str], dict] = OrderedDict()
         self._applications: OrderedDict[str, dict] = OrderedDict()
         self._asn_stats: OrderedDict[int, dict] = OrderedDict()
         self._event_bus = event_bus
-        self._biflows: dict[tuple, dict] = {}
+        self._biflows = BiflowTable()
         self._biflow_timeout = biflow_timeout
 
     MAX_BUFFER_SIZE = 100_000
@@ -399,51 +477,27 @@ class FlowAggregator:
     def stitch_biflow(self, flow: FlowRecord) -> None:
         """Add a flow to the biflow stitching table."""
         key = self._biflow_key(flow)
-        now = time.time()
-
-        if key not in self._biflows:
-            if len(self._biflows) >= self.MAX_BIFLOWS:
-                # Evict oldest
-                oldest_key = min(self._biflows, key=lambda k: self._biflows[k]["last_seen"])
-                del self._biflows[oldest_key]
-            self._biflows[key] = {
-                "src_ip": key[0], "src_port": key[1],
-                "dst_ip": key[2], "dst_port": key[3],
-                "protocol": key[4],
-                "forward_bytes": 0, "forward_packets": 0,
-                "reverse_bytes": 0, "reverse_packets": 0,
-                "first_seen": now, "last_seen": now,
-            }
-
-        bf = self._biflows[key]
-        bf["last_seen"] = now
+        if key not in self._biflows and len(self._biflows) >= self.MAX_BIFLOWS:
+            # Evict least recently seen
+            self._biflows.evict_oldest(len(self._biflows) - self.MAX_BIFLOWS + 1)
+        bf = self._biflows.touch(key, time.time())
 
         # Determine direction: forward if flow matches canonical order
         is_forward = (flow.src_ip, flow.src_port) <= (flow.dst_ip, flow.dst_port)
         if is_forward:
-            bf["forward_bytes"] += flow.bytes
-            bf["forward_packets"] += flow.packets
+            bf.forward_bytes += flow.bytes
+            bf.forward_packets += flow.packets
         else:
-            bf["reverse_bytes"] += flow.bytes
-            bf["reverse_packets"] += flow.packets
+            bf.reverse_bytes += flow.bytes
+            bf.reverse_packets += flow.packets
 
     def get_biflows(self, limit: int = 100) -> list[dict]:
         """Return biflows sorted by total bytes descending."""
-        result = []
-        for bf in self._biflows.values():
-            total = bf["forward_bytes"] + bf["reverse_bytes"]
-            result.append({**bf, "total_bytes": total})
-        result.sort(key=lambda x: x["total_bytes"], reverse=True)
-        return result[:limit]
+        return [bf.to_dict() for bf in self._biflows.top(limit)]
 
     def evict_expired_biflows(self) -> int:
         """Remove biflows older than timeout. Returns count evicted."""
-        now = time.time()
-        expired = [k for k, v in self._biflows.items()
-                   if now - v["last_seen"] > self._biflow_timeout]
-        for k in expired:
-            del self._biflows[k]
-        return len(expired)
+        return self._biflows.expire(time.time() - self._biflow_timeout)
 
     def set_device_map(self, device_ip_map: dict[str, str]) -> None:
         self._device_ip_map = device_ip_map
@@ -486,17 +540,28 @@ class FlowAggregator:
         return items[:limit]
 
     def ingest(self, flow: FlowRecord) -> None:
-        if len(self._buffer) >= self.MAX_BUFFER_SIZE:
-            logger.warning("Flow buffer full (%d records), dropping oldest", self.MAX_BUFFER_SIZE)
-            self._buffer = self._buffer[self.MAX_BUFFER_SIZE // 2:]
+        self._make_room(1)
         self._buffer.append(flow)
 
+    def ingest_batch(self, batch: FlowBatch) -> None:
+        """Buffer a columnar batch from ``FlowParser.detect_and_parse_batch``."""
+        if len(batch) > self.MAX_BUFFER_SIZE:
+            batch = batch.tail(self.MAX_BUFFER_SIZE)
+        self._make_room(len(batch))
+        self._buffer.add_batch(batch)
+
+    def _make_room(self, incoming: int) -> None:
+        if len(self._buffer) + incoming > self.MAX_BUFFER_SIZE:
+            logger.warning("Flow buffer full (%d records), dropping oldest", self.MAX_BUFFER_SIZE)
+            keep = min(self.MAX_BUFFER_SIZE - self.MAX_BUFFER_SIZE // 2,
+                       self.MAX_BUFFER_SIZE - incoming)
+            self._buffer.keep_newest(keep)
+
     async def flush(self) -> int:
         if not self._buffer:
             return 0
 
-        batch = self._buffer[:]
-        self._buffer.clear()
+        records, batches = self._buffer.drain()
 
         # Reset per-flush window aggregates so get_conversations() / get_applications()
         # reflect only the current flush interval (not a cumulative historical total).
@@ -505,28 +570,28 @@ class FlowAggregator:
         self._asn_stats.clear()
 
         # Apply sampling rate compensation
-        for flow in batch:
+        for flow in records:
             if flow.sampling_interval > 1:
                 flow.bytes *= flow.sampling_interval
                 flow.packets *= flow.sampling_interval
+        for cb in batches:
+            cb.compensate_sampling()
+
+        # Every group-by below comes from one vectorised pass over the window.
+        window = aggregate_frame(
+            build_frame(records, batches, self._device_ip_map), APP_PORTS,
+            max_conversations=self.MAX_CONVERSATIONS,
+        )
 
-        # Write individual flows
-        for flow in batch:
-            await self.metrics.write_flow(flow)
+        # Bulk-write individual flows; columnar batches go straight from
+        # their integer columns to line protocol.
+        await self.metrics.write_flows(records, batches)
 
         # Aggregate per (src_device, dst_device)
-        link_agg: dict[tuple[str, str], dict] = {}
-        for flow in batch:
-            src_dev = self._device_ip_map.get(flow.exporter_ip, flow.src_ip)
-            dst_dev = flow.dst_ip  # Best-effort mapping
-            key = (src_dev, dst_dev)
-            if key not in link_agg:
-                link_agg[key] = {"bytes": 0, "packets": 0}
-            link_agg[key]["bytes"] += flow.bytes
-            link_agg[key]["packets"] += flow.packets
-
-        for (src, dst), agg in link_agg.items():
-            await self.metrics.write_link_metric(src, dst, **agg)
+        await self.metrics.write_link_metrics(
+            (src, dst, agg) for (src, dst), agg in window.links
+        )
+        for (src, dst), agg in window.links:
             try:
                 self.topo_store.upsert_link_metric(
                     src, dst, latency_ms=0, bandwidth_bps=agg["bytes"] * 8 // 30,
@@ -535,54 +600,22 @@ class FlowAggregator:
             except Exception:
                 pass
 
-        # -- Conversation aggregation ----------------------------------------
-        # Accumulate into a plain dict first, then merge into the bounded
-        # OrderedDict so we only pay the eviction cost once per flush.
-        conversations: dict[tuple[str, str], dict] = {}
-        for flow in batch:
-            key = (flow.src_ip, flow.dst_ip)
-            if key not in conversations:
-                conversations[key] = {"bytes": 0, "packets": 0, "flows": 0, "latency_sum": 0.0}
-            conversations[key]["bytes"] += flow.bytes
-            conversations[key]["packets"] += flow.packets
-            conversations[key]["flows"] += 1
-            conversations[key]["latency_sum"] += (flow.end_time - flow.start_time).total_seconds()
-        for key, value in conversations.items():
+        # Aggregates arrive grouped, so we only pay the bounded-dict
+        # eviction cost once per key per flush.
+        for key, value in window.conversations:
             self._bounded_set(self._conversations, key, value, self.MAX_CONVERSATIONS)
-
-        # -- Application breakdown -------------------------------------------
-        applications: dict[str, dict] = {}
-        for flow in batch:
-            app_name = APP_PORTS.get(flow.dst_port, "Other")
-            if app_name not in applications:
-                applications[app_name] = {"bytes": 0, "packets": 0, "flows": 0}
-            applications[app_name]["bytes"] += flow.bytes
-            applications[app_name]["packets"] += flow.packets
-            applications[app_name]["flows"] += 1
-        for key, value in applications.items():
+        for key, value in window.applications:
             self._bounded_set(self._applications, key, value, self.MAX_APPLICATIONS)
-
-        # -- ASN stats -------------------------------------------------------
-        asn_stats: dict[int, dict] = {}
-        for flow in batch:
-            for asn in (flow.src_as, flow.dst_as):
-                if asn == 0:
-                    continue
-                if asn not in asn_stats:
-                    asn_stats[asn] = {"bytes": 0, "packets": 0, "flows": 0}
-                asn_stats[asn]["bytes"] += flow.bytes
-                asn_stats[asn]["packets"] += flow.packets
-                asn_stats[asn]["flows"] += 1
-        for key, value in asn_stats.items():
+        for key, value in window.asns:
             self._bounded_set(self._asn_stats, key, value, self.MAX_ASN_ENTRIES)
 
         # -- Publish to event bus --------------------------------------------
         if self._event_bus:
             try:
                 aggregate = {
-                    "flow_count": len(batch),
-                    "total_bytes": sum(f.bytes for f in batch),
-                    "total_packets": sum(f.packets for f in batch),
+                    "flow_count": window.flow_count,
+                    "total_bytes": window.total_bytes,
+                    "total_packets": window.total_packets,
                     "top_conversations": self.get_conversations(limit=10),
                     "top_applications": self.get_applications(limit=10),
                     "top_asns": self.get_asn_breakdown(limit=10),
@@ -591,19 +624,27 @@ class FlowAggregator:
             except Exception as e:
                 logger.warning("Failed to publish flow aggregate to event bus: %s", e)
 
-        return len(batch)
+        return window.flow_count
 
 
 class FlowReceiverProtocol(asyncio.DatagramProtocol):
     """Async UDP protocol for receiving flow packets."""
 
-    def __init__(self, parser: FlowParser, aggregator: FlowAggregator) -> None:
+    def __init__(self, parser: FlowParser, aggregator: FlowAggregator,
+                 columnar: bool = False) -> None:
         self.parser = parser
         self.aggregator = aggregator
+        self.columnar = columnar
         self._count = 0
 
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
         exporter_ip = addr[0]
+        if self.columnar:
+            batch = self.parser.detect_and_parse_batch(data, exporter_ip)
+            if batch is not None:
+                self.aggregator.ingest_batch(batch)
+                self._count += len(batch)
+            return
         records = self.parser.detect_and_parse(data, exporter_ip)
         for r in records:
             self.aggregator.ingest(r)
@@ -617,12 +658,17 @@ class FlowReceiver:
     _TEMPLATE_TTL = 3600  # seconds
 
     def __init__(self, metrics_store: Any, topology_store: Any,
-                 event_bus: Any | None = None) -> None:
+                 event_bus: Any | None = None, columnar: bool = True,
+                 workers: int | None = None) -> None:
         self.metrics = metrics_store
         self.topo_store = topology_store
+        self.columnar = columnar
         self.parser = FlowParser()
         self.aggregator = FlowAggregator(metrics_store, topology_store, event_bus=event_bus)
+        self.workers = worker_count("FLOW_RECEIVER_WORKERS") if workers is None else workers
         self._transports: list[asyncio.BaseTransport] = []
+        self._protocols: list[FlowReceiverProtocol] = []
+        self._pools: list[ReceiverWorkerPool] = []
         self._flush_task: asyncio.Task | None = None
         # Expose template cache attributes (delegate to parser for real usage)
         self._v9_templates = self.parser._v9_templates
@@ -659,12 +705,23 @@ class FlowReceiver:
         loop = asyncio.get_running_loop()
 
         for name, port in ports.items():
+            if self.workers > 0:
+                pool = ReceiverWorkerPool("flow", port, self.workers, self._ingest_worker_batch)
+                try:
+                    await pool.start()
+                    self._pools.append(pool)
+                except Exception as e:
+                    logger.warning("Failed to start flow workers on UDP port %d (%s): %s",
+                                   port, name, e)
+                continue
             try:
+                protocol = FlowReceiverProtocol(self.parser, self.aggregator, self.columnar)
                 transport, _ = await loop.create_datagram_endpoint(
-                    lambda: FlowReceiverProtocol(self.parser, self.aggregator),
+                    lambda: protocol,
                     local_addr=("0.0.0.0", port),
                 )
                 self._transports.append(transport)
+                self._protocols.append(protocol)
                 logger.info("Flow receiver listening on UDP port %d (%s)", port, name)
             except Exception as e:
                 logger.warning("Failed to bind UDP port %d (%s): %s", port, name, e)
@@ -681,11 +738,32 @@ class FlowReceiver:
             except Exception as e:
                 logger.error("Flow aggregation flush failed: %s", e)
 
+    def _ingest_worker_batch(self, payload: list) -> None:
+        """Feed flows shipped by a receiver worker into the aggregator."""
+        for exporter_ip, data in payload:
+            if exporter_ip is None:
+                for r in data:
+                    self.aggregator.ingest(r)
+            else:
+                # frombuffer views are read-only; sampling compensation
+                # scales the columns in place at flush.
+                cols = np.frombuffer(data, dtype=FLOW_DTYPE).copy()
+                self.aggregator.ingest_batch(FlowBatch(cols, exporter_ip))
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Flows received, summed across in-process listeners and workers."""
+        received = sum(p._count for p in self._protocols)
+        received += sum(pool.stats().get("received", 0) for pool in self._pools)
+        return {"received": received, "workers": sum(p.workers for p in self._pools)}
+
     async def stop(self) -> None:
         if self._flush_task:
             self._flush_task.cancel()
         for t in self._transports:
             t.close()
+        for pool in self._pools:
+            await pool.stop()
         await self.aggregator.flush()
 
     def update_device_map(self, device_ip_map: dict[str, str]) -> None:
@@ -0,0 +1,289 @@
+"""Single-socket async ICMP echo engine.
+
+The monitor, ``PingProber`` and the ping scheduler each used to fork a
+``ping`` process (or open a fresh socket) per target per cycle. ``ICMPEngine``
+sends every echo request through one socket per address family, registered
+with the event loop, and matches replies back to waiters by address and
+sequence number:
+
+- it prefers an unprivileged datagram ICMP socket (Linux ``ping_group_range``)
+  and falls back to a raw socket when running with ``CAP_NET_RAW``;
+- ``ping_many`` sends each round to all targets, paced in bursts so the
+  socket buffer is not overrun, and overlaps rounds by ``interval``;
+- results are ``EchoStats`` per target (RTTs in ms, loss as a fraction),
+  mirroring the attributes of icmplib's ``Host``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_ECHO_REQUEST = {socket.AF_INET: 8, socket.AF_INET6: 128}
+_ECHO_REPLY = {socket.AF_INET: 0, socket.AF_INET6: 129}
+_PROTO = {socket.AF_INET: socket.IPPROTO_ICMP, socket.AF_INET6: socket.IPPROTO_ICMPV6}
+_RECV_BUFFER = 4 * 1024 * 1024
+
+
+@dataclass
+class EchoStats:
+    """Echo results for one target."""
+
+    address: str
+    sent: int = 0
+    rtts: list[float] = field(default_factory=list)  # ms, one per reply
+
+    @property
+    def received(self) -> int:
+        return len(self.rtts)
+
+    @property
+    def packet_loss(self) -> float:
+        return 1.0 - self.received / self.sent if self.sent else 1.0
+
+    @property
+    def is_alive(self) -> bool:
+        return bool(self.rtts)
+
+    @property
+    def avg_rtt(self) -> float:
+        return sum(self.rtts) / len(self.rtts) if self.rtts else 0.0
+
+    @property
+    def min_rtt(self) -> float:
+        return min(self.rtts) if self.rtts else 0.0
+
+    @property
+    def max_rtt(self) -> float:
+        return max(self.rtts) if self.rtts else 0.0
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+class _EchoSocket:
+    """One ICMP socket for an address family plus its outstanding echoes."""
+
+    def __init__(self, family: int, loop: asyncio.AbstractEventLoop, ident: int) -> None:
+        try:
+            sock = socket.socket(family, socket.SOCK_DGRAM, _PROTO[family])
+            self.raw = False
+        except OSError:
+            sock = socket.socket(family, socket.SOCK_RAW, _PROTO[family])
+            self.raw = True
+        sock.setblocking(False)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _RECV_BUFFER)
+        except OSError:
+            pass
+        self.family = family
+        self.sock = sock
+        self.loop = loop
+        # Datagram sockets get their identifier from the kernel (and only
+        # see their own replies); raw sockets see every reply and filter on it
+        self.ident = ident
+        self.pending: dict[tuple[str, int], tuple[asyncio.Future, float]] = {}
+        loop.add_reader(sock.fileno(), self._on_readable)
+
+    def send(self, address: str, seq: int, payload: bytes) -> Optional[asyncio.Future]:
+        header = struct.pack("!BBHHH", _ECHO_REQUEST[self.family], 0, 0, self.ident, seq)
+        if self.family == socket.AF_INET:
+            header = header[:2] + struct.pack("!H", _checksum(header + payload)) + header[4:]
+        future = self.loop.create_future()
+        self.pending[(address, seq)] = (future, time.monotonic())
+        try:
+            self.sock.sendto(header + payload, (address, 0))
+        except OSError as e:
+            logger.debug("ICMP send to %s failed: %s", address, e)
+            del self.pending[(address, seq)]
+            return None
+        return future
+
+    def discard(self, address: str, seq: int) -> None:
+        entry = self.pending.pop((address, seq), None)
+        if entry and not entry[0].done():
+            entry[0].cancel()
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.debug("ICMP receive failed: %s", e)
+                return
+            received = time.monotonic()
+            if self.raw and self.family == socket.AF_INET:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8 or data[0] != _ECHO_REPLY[self.family]:
+                continue
+            ident, seq = struct.unpack("!HH", data[4:8])
+            if self.raw and ident != self.ident:
+                continue
+            address = addr[0].split("%", 1)[0]
+            if self.family == socket.AF_INET6:
+                address = ipaddress.ip_address(address).compressed
+            entry = self.pending.pop((address, seq), None)
+            if entry and not entry[0].done():
+                entry[0].set_result((received - entry[1]) * 1000)
+
+    def close(self) -> None:
+        try:
+            self.loop.remove_reader(self.sock.fileno())
+        except Exception:
+            pass
+        self.sock.close()
+        for future, _ in self.pending.values():
+            if not future.done():
+                future.cancel()
+        self.pending.clear()
+
+
+class ICMPEngine:
+    """Multiplexes echo requests for many targets over shared sockets.
+
+    ``burst`` requests are sent back to back before yielding to the event
+    loop (which also drains replies); ``max_rate`` caps sends per second
+    across all callers (0 for no cap).
+    """
+
+    def __init__(self, payload_size: int = 56, burst: int = 256, max_rate: float = 0.0) -> None:
+        self._payload = bytes(payload_size)
+        self._burst = max(1, burst)
+        self._interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self._ident = os.getpid() & 0xFFFF
+        self._seq = 0
+        self._sockets: dict[int, _EchoSocket] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_slot = 0.0
+
+    async def ping(
+        self, address: str, count: int = 3, interval: float = 0.2, timeout: float = 2.0,
+    ) -> EchoStats:
+        """Echo ``count`` times to one target."""
+        return (await self.ping_many([address], count, interval, timeout))[address]
+
+    async def ping_many(
+        self, addresses: Iterable[str], count: int = 3, interval: float = 0.2, timeout: float = 2.0,
+    ) -> dict[str, EchoStats]:
+        """Echo ``count`` times to every target; returns ``{address: EchoStats}``.
+
+        Rounds start ``interval`` seconds apart and each request waits up
+        to ``timeout`` seconds for its reply. Unresolvable targets and
+        failed sends count as lost.
+        """
+        self._bind_loop()
+        stats = {address: EchoStats(address) for address in dict.fromkeys(addresses)}
+        resolved = await self._resolve(list(stats))
+        await asyncio.gather(*(
+            self._round(stats, resolved, timeout, delay=i * interval) for i in range(count)
+        ))
+        return stats
+
+    def close(self) -> None:
+        for echo_socket in self._sockets.values():
+            echo_socket.close()
+        self._sockets.clear()
+
+    # ── Internal ──
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self.close()
+            self._loop = loop
+            self._next_slot = 0.0
+
+    def _socket(self, family: int) -> _EchoSocket:
+        echo_socket = self._sockets.get(family)
+        if echo_socket is None:
+            echo_socket = self._sockets[family] = _EchoSocket(family, self._loop, self._ident)
+        return echo_socket
+
+    async def _resolve(self, addresses: list[str]) -> dict[str, tuple[int, str]]:
+        """``{target: (family, literal address)}`` for targets that resolve."""
+        resolved: dict[str, tuple[int, str]] = {}
+        names = []
+        for address in addresses:
+            try:
+                ip = ipaddress.ip_address(address)
+            except ValueError:
+                names.append(address)
+                continue
+            family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+            resolved[address] = (family, ip.compressed)
+        if names:
+            lookups = await asyncio.gather(
+                *(self._loop.getaddrinfo(name, None, type=socket.SOCK_DGRAM) for name in names),
+                return_exceptions=True,
+            )
+            for name, infos in zip(names, lookups):
+                if isinstance(infos, BaseException) or not infos:
+                    logger.debug("ICMP target %s did not resolve: %s", name, infos)
+                    continue
+                family, _, _, _, sockaddr = infos[0]
+                resolved[name] = (family, ipaddress.ip_address(sockaddr[0]).compressed)
+        return resolved
+
+    async def _round(
+        self, stats: dict[str, EchoStats], resolved: dict[str, tuple[int, str]],
+        timeout: float, delay: float,
+    ) -> None:
+        if delay:
+            await asyncio.sleep(delay)
+        waits = []
+        for n, (target, result) in enumerate(stats.items(), 1):
+            result.sent += 1
+            if target not in resolved:
+                continue
+            family, address = resolved[target]
+            echo_socket = self._socket(family)
+            self._seq = (self._seq + 1) & 0xFFFF
+            future = echo_socket.send(address, self._seq, self._payload)
+            if future is not None:
+                waits.append((result, echo_socket, address, self._seq, future))
+            if self._interval:
+                await self._pace()
+            elif n % self._burst == 0:
+                await asyncio.sleep(0)
+        if not waits:
+            return
+        await asyncio.wait([w[-1] for w in waits], timeout=timeout)
+        for result, echo_socket, address, seq, future in waits:
+            if future.done() and not future.cancelled():
+                result.rtts.append(future.result())
+            else:
+                echo_socket.discard(address, seq)
+
+    async def _pace(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        await asyncio.sleep(slot - now)
+
+
+_engine: Optional[ICMPEngine] = None
+
+
+def get_engine() -> ICMPEngine:
+    """The process-wide engine (``ICMP_MAX_RATE`` caps echo requests per second)."""
+    global _engine
+    if _engine is None:
+        _engine = ICMPEngine(max_rate=float(os.getenv("ICMP_MAX_RATE", "0")))
+    return _engine
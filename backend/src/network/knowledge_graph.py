@@ -1,8 +1,8 @@
 """Network Knowledge Graph -- NetworkX MultiDiGraph with confidence-weighted edges."""
-import itertools
+import ipaddress
 import logging
 import time
-import networkx as nx
+import pytricia
 from typing import Optional
 from datetime import datetime, timezone
 
@@ -14,6 +14,9 @@ from .models import (
 )
 from .topology_store import TopologyStore
 from .ip_resolver import IPResolver
+from .path_engine import (
+    MAX_PATH_DEPTH, MAX_PATH_ENUMERATION, PathEngine, TopologyGraph,
+)
 from .interface_validation import validate_device_interfaces
 
 
@@ -30,26 +33,69 @@ def _safe_int(val, default: int = 0) -> int:
         return default
 
 
+_DYNAMIC_ROUTE_PROTOCOLS = ("BGP", "OSPF", "EIGRP", "IS-IS")
+_L2_NEIGHBOR_PROTOCOLS = frozenset({"lldp", "cdp"})
+
+
+def _is_forwarding_route(route: Route) -> bool:
+    """Only default routes and dynamic summaries become ``routes_via`` edges."""
+    try:
+        net = ipaddress.ip_network(route.destination_cidr, strict=False)
+    except (ValueError, TypeError):
+        return False
+    if route.destination_cidr == "0.0.0.0/0":
+        return True
+    return net.prefixlen <= 24 and route.protocol.upper() in _DYNAMIC_ROUTE_PROTOCOLS
+
+
+def _vpc_containment(vpcs: list[VPC], subnets: list[Subnet]) -> dict[str, list[str]]:
+    """Map vpc_id -> ids of subnets inside its CIDR blocks.
+
+    VPC blocks go into one prefix trie per address family; a subnet's
+    covering blocks are its longest match plus that prefix's parents.
+    A subnet appears once per matching block, as with a pairwise
+    ``subnet_of`` scan.
+    """
+    tries = {4: pytricia.PyTricia(32), 6: pytricia.PyTricia(128)}
+    for vpc in vpcs:
+        for cidr in vpc.cidr_blocks:
+            try:
+                net = ipaddress.ip_network(cidr, strict=False)
+            except (ValueError, TypeError):
+                continue
+            trie, key = tries[net.version], str(net)
+            if trie.has_key(key):
+                trie[key].append(vpc.id)
+            else:
+                trie[key] = [vpc.id]
+
+    contained: dict[str, list[str]] = {}
+    for s in subnets:
+        try:
+            net = ipaddress.ip_network(s.cidr, strict=False)
+        except (ValueError, TypeError):
+            continue
+        trie = tries[net.version]
+        key = trie.get_key(str(net))
+        while key is not None:
+            for vpc_id in trie.get(key):
+                contained.setdefault(vpc_id, []).append(s.id)
+            key = trie.parent(key)
+    return contained
+
+
+def _port_name(device_id: str, interface_ref: str) -> str:
+    """Neighbor links store interfaces as ``<device_id>:<name>``."""
+    prefix = f"{device_id}:"
+    return interface_ref[len(prefix):] if interface_ref.startswith(prefix) else interface_ref
+
+
 # ── Topology export cache (module-level) ──
 _topo_cache: dict | None = None
 _topo_cache_ts: float = 0
 _topo_cache_hash: str = ""
 _TOPO_CACHE_TTL = 60  # seconds
 
-# Topology penalties for dual cost model
-_TOPOLOGY_PENALTIES = {
-    "vrf_boundary": 0.3,
-    "inter_site": 0.2,
-    "overlay_tunnel": 0.15,
-    "vpn_tunnel": 0.15,
-    "direct_connect": 0.05,
-    "mpls_circuit": 0.05,
-    "cross_vpc": 0.25,
-    "transit_gateway": 0.1,
-    "load_balancer": 0.1,
-    "low_bandwidth": 0.1,
-}
-
 
 class NetworkKnowledgeGraph:
     """In-memory NetworkX graph backed by SQLite persistence.
@@ -60,25 +106,59 @@ class NetworkKnowledgeGraph:
 
     def __init__(self, store: TopologyStore):
         self.store = store
-        self.graph = nx.MultiDiGraph()
+        self.graph = TopologyGraph()
+        self._paths = PathEngine(self.graph)
         self.ip_resolver = IPResolver()
         self._device_index: dict[str, str] = {}  # ip -> device_id
         self.repo = None  # Optional TopologyRepository — set externally for migration
+        # Delta state: what each device / interface / route / link added to
+        # the graph, so topology events can be applied without a reload.
+        self._subnets: dict[str, Subnet] = {}
+        self._mgmt_ips: dict[str, str] = {}  # device_id -> management_ip
+        self._interfaces: dict[str, dict] = {}  # iface_id -> attachment
+        self._device_interfaces: dict[str, set[str]] = {}
+        self._subnet_members: dict[str, list[str]] = {}  # subnet_id -> iface_ids
+        self._routes: dict[str, Route] = {}  # forwarding routes only
+        self._routes_by_device: dict[str, set[str]] = {}
+        self._routes_by_next_hop: dict[str, set[str]] = {}
+        self._route_edges: dict[str, tuple[str, str]] = {}  # route_id -> edge it owns
+        self._link_edges: dict[str, tuple[str, str]] = {}  # link_id -> edge it owns
+        # Per-device, per-VRF longest-prefix-match tables over every route
+        self._route_tables: dict[str, dict[tuple[str, int], pytricia.PyTricia]] = {}
+        self._indexed_routes: dict[str, Route] = {}
+        self._routes_to_edges: dict[str, tuple[str, str]] = {}  # route_id -> routes_to edge
+
+    def _reset_delta_state(self) -> None:
+        for index in (
+            self._subnets, self._mgmt_ips, self._interfaces, self._device_interfaces,
+            self._subnet_members, self._routes, self._routes_by_device,
+            self._routes_by_next_hop, self._route_edges, self._link_edges,
+            self._route_tables, self._indexed_routes, self._routes_to_edges,
+        ):
+            index.clear()
 
     def load_from_store(self) -> None:
-        """Load all topology entities from SQLite into the graph."""
+        """Load all topology entities from SQLite into the graph.
+
+        This is the cold-start path. Device, interface, route and neighbor
+        link changes are applied in place afterwards (``refresh_device``,
+        ``refresh_interface``, ``refresh_route``, ``refresh_link``), usually
+        from topology events via ``KnowledgeGraphSyncConsumer``.
+        """
         self.graph.clear()
         self._device_index.clear()
+        self._reset_delta_state()
 
         # Rebuild pytricia first (needed for interface->subnet mapping)
         subnets = self.store.list_subnets()
         self.ip_resolver.load_subnets([s.model_dump(mode="json") for s in subnets])
+        self._subnets = {s.id: s for s in subnets}
 
         # Load devices
-        for d in self.store.list_devices():
+        devices = self.store.list_devices()
+        for d in devices:
             self.graph.add_node(d.id, **d.model_dump(mode="json"), node_type="device")
-            if d.management_ip:
-                self._device_index[d.management_ip] = d.id
+            self._index_management_ip(d)
 
         # Load subnets
         for s in subnets:
@@ -89,41 +169,21 @@ class NetworkKnowledgeGraph:
             self.graph.add_node(z.id, **z.model_dump(mode="json"), node_type="zone")
 
         # Load interfaces and create edges (device -> subnet via interface)
-        for d in self.store.list_devices():
-            for iface in self.store.list_interfaces(device_id=d.id):
-                if iface.ip:
-                    bare_ip = _strip_cidr(iface.ip)
-                    self._device_index[bare_ip] = d.id
-                    self._device_index[iface.ip] = d.id  # Also index with CIDR for route lookups
-                # Find which subnet this interface IP belongs to
-                subnet_meta = self.ip_resolver.resolve(_strip_cidr(iface.ip)) if iface.ip else None
-                if subnet_meta:
-                    self.graph.add_edge(
-                        d.id, subnet_meta.get("id", iface.ip),
-                        edge_type="connected_to",
-                        interface=iface.name,
-                        ip=iface.ip,
-                        confidence=0.9,
-                        source=EdgeSource.API.value,
-                        last_verified_at=datetime.now(timezone.utc).isoformat(),
-                    )
+        interfaces_by_device = self.store.list_interfaces_by_device()
+        for d in devices:
+            for iface in interfaces_by_device.get(d.id, ()):
+                self._attach_interface(d.id, iface)
 
         # Load VPCs (don't overwrite if already loaded as device)
-        for vpc in self.store.list_vpcs():
+        vpcs = self.store.list_vpcs()
+        contained = _vpc_containment(vpcs, subnets)
+        for vpc in vpcs:
             if vpc.id not in self.graph:
                 self.graph.add_node(vpc.id, **vpc.model_dump(mode="json"), node_type="vpc")
-            # VPC contains subnets — find subnets whose CIDR falls within VPC CIDRs
-            for s in subnets:
-                for vpc_cidr in vpc.cidr_blocks:
-                    try:
-                        import ipaddress
-                        if ipaddress.ip_network(s.cidr, strict=False).subnet_of(
-                            ipaddress.ip_network(vpc_cidr, strict=False)
-                        ):
-                            self.graph.add_edge(vpc.id, s.id, edge_type="vpc_contains",
-                                                confidence=1.0, source=EdgeSource.MANUAL.value)
-                    except (ValueError, TypeError):
-                        pass
+            # VPC contains subnets whose CIDR falls within one of its blocks
+            for subnet_id in contained.get(vpc.id, ()):
+                self.graph.add_edge(vpc.id, subnet_id, edge_type="vpc_contains",
+                                    confidence=1.0, source=EdgeSource.MANUAL.value)
 
         # Load VPC peerings
         for p in self.store.list_vpc_peerings():
@@ -211,12 +271,7 @@ class NetworkKnowledgeGraph:
                     if remote_id not in self.graph:
                         continue
                     # Avoid duplicate L2 edges
-                    existing_l2 = any(
-                        d.get("edge_type") == "layer2_link"
-                        for _, _, d in self.graph.edges(device_id, data=True)
-                        if _ == remote_id
-                    )
-                    if not existing_l2:
+                    if not self._has_edge_type(device_id, remote_id, "layer2_link"):
                         self.graph.add_edge(device_id, remote_id,
                             edge_type="layer2_link",
                             local_port=n.get("local_port", ""),
@@ -230,82 +285,22 @@ class NetworkKnowledgeGraph:
         except Exception as e:
             logger.warning("L2 neighbor edge creation failed: %s", e)
 
+        # ── Discovered LLDP/CDP links persisted in neighbor_links ──
+        for link in self.store.list_neighbor_links():
+            self._apply_neighbor_link(link)
+
         # ── P2P shared subnet → device-to-device links (only /30, /31) ──
-        import ipaddress as _ipaddress
-
-        subnet_devices: dict[str, list[tuple[str, str, str]]] = {}
-        for d in self.store.list_devices():
-            for iface in self.store.list_interfaces(device_id=d.id):
-                if iface.ip:
-                    s_meta = self.ip_resolver.resolve(iface.ip)
-                    if s_meta:
-                        sid = s_meta.get("id", "")
-                        subnet_devices.setdefault(sid, []).append((d.id, iface.name, iface.ip))
-
-        for sid, members in subnet_devices.items():
-            if len(members) < 2:
+        for sid, members in self._subnet_members.items():
+            if len(members) < 2 or not self._is_p2p_subnet(sid):
                 continue
-            # Only P2P subnets get device↔device edges
-            subnet_obj = next((s for s in subnets if s.id == sid), None)
-            if not subnet_obj:
-                continue
-            try:
-                net = _ipaddress.ip_network(subnet_obj.cidr, strict=False)
-                if net.prefixlen < 30:
-                    continue  # Large subnet — devices connect via subnet node, not each other
-            except (ValueError, TypeError):
-                continue
-
             for i in range(len(members)):
                 for j in range(i + 1, len(members)):
-                    d1_id, d1_iface, d1_ip = members[i]
-                    d2_id, d2_iface, d2_ip = members[j]
-                    self.graph.add_edge(d1_id, d2_id,
-                        edge_type="layer3_link",
-                        src_interface=d1_iface, dst_interface=d2_iface,
-                        src_ip=d1_ip, dst_ip=d2_ip,
-                        subnet_id=sid,
-                        confidence=0.9,
-                        source=EdgeSource.API.value,
-                        last_verified_at=datetime.now(timezone.utc).isoformat())
+                    self._add_p2p_edge(sid, members[i], members[j])
 
         # ── Route-based forwarding edges (default + summary routes only) ──
         for route in self.store.list_routes():
-            src_device = route.device_id
-            if src_device not in self.graph:
-                continue
-            next_hop_device = self._device_index.get(route.next_hop)
-            if not next_hop_device or next_hop_device == src_device:
-                continue
-            if next_hop_device not in self.graph:
-                continue
-
-            try:
-                net = _ipaddress.ip_network(route.destination_cidr, strict=False)
-                is_default = route.destination_cidr == "0.0.0.0/0"
-                is_summary = net.prefixlen <= 24
-                is_dynamic = route.protocol.upper() in ("BGP", "OSPF", "EIGRP", "IS-IS")
-            except (ValueError, TypeError):
-                continue
-
-            if not (is_default or (is_summary and is_dynamic)):
-                continue
-
-            # Avoid duplicate route edges to same next-hop
-            existing_route = any(
-                d.get("edge_type") == "routes_via" and d.get("destination") == route.destination_cidr
-                for _, target, d in self.graph.edges(src_device, data=True)
-                if target == next_hop_device
-            )
-            if not existing_route:
-                self.graph.add_edge(src_device, next_hop_device,
-                    edge_type="routes_via",
-                    destination=route.destination_cidr,
-                    protocol=route.protocol,
-                    metric=route.metric,
-                    confidence=0.85,
-                    source=EdgeSource.API.value,
-                    last_verified_at=datetime.now(timezone.utc).isoformat())
+            self._index_route(route)
+            self._apply_route(route)
 
         # ── HA peer edges ──
         for ha in self.store.list_ha_groups():
@@ -349,11 +344,341 @@ class NetworkKnowledgeGraph:
                     self.graph[src][dst][key]["confidence"] = ec["confidence"]
                     self.graph[src][dst][key]["last_verified_at"] = ec["last_verified_at"]
 
-    def add_device(self, device: Device) -> None:
-        self.store.add_device(device)
+    # ── Incremental updates ──
+    #
+    # Each method re-reads one entity from the store and replaces whatever
+    # that entity previously contributed to the graph. Subnets, VPCs and the
+    # other cloud / HA entities have no deltas; changes to them still go
+    # through load_from_store().
+
+    def refresh_device(self, device_id: str) -> None:
+        """Apply a device create/update/delete from the store."""
+        device = self.store.get_device(device_id)
+        if device is None:
+            self.remove_device(device_id)
+            return
+        is_new = device_id not in self.graph
         self.graph.add_node(device.id, **device.model_dump(mode="json"), node_type="device")
+        self.graph.nodes[device.id].pop("stale", None)
+        self._index_management_ip(device)
+        if is_new:
+            for iface in self.store.list_interfaces(device_id=device_id):
+                self._attach_live_interface(iface)
+            for route in self.store.list_routes(device_id=device_id):
+                self._index_route(route)
+                self._apply_route(route)
+
+    def remove_device(self, device_id: str) -> None:
+        """Drop a device node and everything indexed against it."""
+        for iface_id in list(self._device_interfaces.pop(device_id, ())):
+            self._detach_interface(iface_id)
+        for route_id in list(self._routes_by_device.get(device_id, ())):
+            self._forget_route(route_id)
+        for table in self._route_tables.pop(device_id, {}).values():
+            for prefix in list(table):
+                for route in table[prefix]:
+                    self._indexed_routes.pop(route.id, None)
+                    self._routes_to_edges.pop(route.id, None)
+        mgmt_ip = self._mgmt_ips.pop(device_id, "")
+        if mgmt_ip and self._device_index.get(mgmt_ip) == device_id:
+            del self._device_index[mgmt_ip]
+        for link_id, (src, dst) in list(self._link_edges.items()):
+            if device_id in (src, dst):
+                del self._link_edges[link_id]
+        # routes_to edges from other devices into this one go with the node
+        for route_id, (_src, dst) in list(self._routes_to_edges.items()):
+            if dst == device_id:
+                del self._routes_to_edges[route_id]
+        if device_id in self.graph:
+            self.graph.remove_node(device_id)
+        if mgmt_ip:
+            self._relink_next_hops(mgmt_ip)
+
+    def refresh_interface(self, interface_id: str) -> None:
+        """Apply an interface create/update/delete from the store."""
+        self._detach_interface(interface_id)
+        iface = self.store.get_interface(interface_id)
+        if iface is not None and iface.device_id in self.graph:
+            self._attach_live_interface(iface)
+
+    def refresh_route(self, route_id: str) -> None:
+        """Apply a route create/update/delete from the store."""
+        self._unindex_route(route_id)
+        route = self.store.get_route(route_id)
+        if route is None:
+            self._forget_route(route_id)
+        else:
+            self._index_route(route)
+            self._apply_route(route)
+
+    def refresh_link(self, link_id: str) -> None:
+        """Apply a neighbor link create/update/delete from the store."""
+        owned = self._link_edges.pop(link_id, None)
+        if owned:
+            self._remove_edge_where(*owned, edge_type="layer2_link")
+        link = self.store.get_neighbor_link(link_id)
+        if link is not None:
+            self._apply_neighbor_link(link)
+
+    def mark_stale(self, entity_type: str, entity_id: str) -> None:
+        """Flag a device node as stale until its next refresh."""
+        if entity_type == "device" and entity_id in self.graph:
+            self.graph.nodes[entity_id]["stale"] = True
+
+    # ── Delta internals ──
+
+    def _has_edge_type(self, src: str, dst: str, edge_type: str) -> bool:
+        data = self.graph.get_edge_data(src, dst) or {}
+        return any(d.get("edge_type") == edge_type for d in data.values())
+
+    def _remove_edge_where(self, src: str, dst: str, **match) -> bool:
+        """Remove the first src->dst edge whose attributes match."""
+        for key, data in (self.graph.get_edge_data(src, dst) or {}).items():
+            if all(data.get(k) == v for k, v in match.items()):
+                self.graph.remove_edge(src, dst, key)
+                return True
+        return False
+
+    def _index_management_ip(self, device: Device) -> None:
+        old_ip = self._mgmt_ips.pop(device.id, "")
+        if old_ip and old_ip != device.management_ip:
+            if self._device_index.get(old_ip) == device.id:
+                del self._device_index[old_ip]
+            self._relink_next_hops(old_ip)
         if device.management_ip:
             self._device_index[device.management_ip] = device.id
+            self._mgmt_ips[device.id] = device.management_ip
+            if old_ip != device.management_ip:
+                self._relink_next_hops(device.management_ip)
+
+    def _is_p2p_subnet(self, subnet_id: str) -> bool:
+        subnet = self._subnets.get(subnet_id)
+        if not subnet:
+            return False
+        try:
+            # Larger subnets connect devices via the subnet node, not each other
+            return ipaddress.ip_network(subnet.cidr, strict=False).prefixlen >= 30
+        except (ValueError, TypeError):
+            return False
+
+    def _attach_interface(self, device_id: str, iface: Interface) -> None:
+        """Index an interface and add its device -> subnet edge."""
+        if iface.ip:
+            bare_ip = _strip_cidr(iface.ip)
+            self._device_index[bare_ip] = device_id
+            self._device_index[iface.ip] = device_id  # Also index with CIDR for route lookups
+        # Find which subnet this interface IP belongs to
+        subnet_meta = self.ip_resolver.resolve(_strip_cidr(iface.ip)) if iface.ip else None
+        subnet_id = None
+        if subnet_meta:
+            subnet_id = subnet_meta.get("id", iface.ip)
+            self.graph.add_edge(
+                device_id, subnet_id,
+                edge_type="connected_to",
+                interface=iface.name,
+                ip=iface.ip,
+                confidence=0.9,
+                source=EdgeSource.API.value,
+                last_verified_at=datetime.now(timezone.utc).isoformat(),
+            )
+        # Subnet membership (P2P links, candidate lookups) resolves the
+        # address as configured
+        member_meta = self.ip_resolver.resolve(iface.ip) if iface.ip else None
+        member_of = member_meta.get("id", "") if member_meta else None
+        if member_of is not None:
+            self._subnet_members.setdefault(member_of, []).append(iface.id)
+        self._interfaces[iface.id] = {
+            "device_id": device_id, "name": iface.name, "ip": iface.ip,
+            "subnet_id": subnet_id, "member_of": member_of,
+        }
+        self._device_interfaces.setdefault(device_id, set()).add(iface.id)
+
+    def _attach_live_interface(self, iface: Interface) -> None:
+        """Attach outside a cold start: also link P2P peers and re-resolve routes."""
+        self._attach_interface(iface.device_id, iface)
+        member_of = self._interfaces[iface.id]["member_of"]
+        if member_of is not None and self._is_p2p_subnet(member_of):
+            for peer_id in self._subnet_members[member_of][:-1]:
+                self._add_p2p_edge(member_of, peer_id, iface.id)
+        if iface.ip:
+            self._relink_next_hops(_strip_cidr(iface.ip), iface.ip)
+
+    def _add_p2p_edge(self, subnet_id: str, iface_a: str, iface_b: str) -> None:
+        a, b = self._interfaces[iface_a], self._interfaces[iface_b]
+        self.graph.add_edge(a["device_id"], b["device_id"],
+            edge_type="layer3_link",
+            src_interface=a["name"], dst_interface=b["name"],
+            src_ip=a["ip"], dst_ip=b["ip"],
+            subnet_id=subnet_id,
+            confidence=0.9,
+            source=EdgeSource.API.value,
+            last_verified_at=datetime.now(timezone.utc).isoformat())
+
+    def _detach_interface(self, iface_id: str) -> None:
+        """Undo ``_attach_interface`` and any P2P edges the interface is on."""
+        state = self._interfaces.get(iface_id)
+        if state is None:
+            return
+        device_id, name, ip = state["device_id"], state["name"], state["ip"]
+        if state["subnet_id"] is not None:
+            self._remove_edge_where(device_id, state["subnet_id"],
+                                    edge_type="connected_to", interface=name, ip=ip)
+        member_of = state["member_of"]
+        if member_of is not None:
+            members = self._subnet_members.get(member_of, [])
+            if iface_id in members:
+                pos = members.index(iface_id)
+                for i, peer_id in enumerate(members):
+                    peer = self._interfaces[peer_id]
+                    if i < pos:
+                        self._remove_edge_where(peer["device_id"], device_id,
+                            edge_type="layer3_link", subnet_id=member_of,
+                            src_interface=peer["name"], dst_interface=name)
+                    elif i > pos:
+                        self._remove_edge_where(device_id, peer["device_id"],
+                            edge_type="layer3_link", subnet_id=member_of,
+                            src_interface=name, dst_interface=peer["name"])
+                members.remove(iface_id)
+        del self._interfaces[iface_id]
+        self._device_interfaces.get(device_id, set()).discard(iface_id)
+        if ip:
+            bare_ip = _strip_cidr(ip)
+            for key in {bare_ip, ip}:
+                if self._device_index.get(key) == device_id:
+                    del self._device_index[key]
+            if self._mgmt_ips.get(device_id) == bare_ip:
+                self._device_index[bare_ip] = device_id
+            self._relink_next_hops(bare_ip, ip)
+
+    def _apply_route(self, route: Route) -> None:
+        self._forget_route(route.id)
+        if not _is_forwarding_route(route):
+            return
+        self._routes[route.id] = route
+        self._routes_by_device.setdefault(route.device_id, set()).add(route.id)
+        self._routes_by_next_hop.setdefault(route.next_hop, set()).add(route.id)
+        self._link_route(route)
+
+    def _forget_route(self, route_id: str) -> None:
+        route = self._routes.get(route_id)
+        if route is None:
+            return
+        self._unlink_route(route_id)
+        del self._routes[route_id]
+        self._routes_by_device.get(route.device_id, set()).discard(route_id)
+        self._routes_by_next_hop.get(route.next_hop, set()).discard(route_id)
+
+    def _link_route(self, route: Route) -> None:
+        src_device = route.device_id
+        if src_device not in self.graph:
+            return
+        next_hop_device = self._device_index.get(route.next_hop)
+        if not next_hop_device or next_hop_device == src_device:
+            return
+        if next_hop_device not in self.graph:
+            return
+        # Avoid duplicate route edges to same next-hop
+        existing_route = any(
+            d.get("edge_type") == "routes_via" and d.get("destination") == route.destination_cidr
+            for d in (self.graph.get_edge_data(src_device, next_hop_device) or {}).values()
+        )
+        if not existing_route:
+            self.graph.add_edge(src_device, next_hop_device,
+                edge_type="routes_via",
+                destination=route.destination_cidr,
+                protocol=route.protocol,
+                metric=route.metric,
+                confidence=0.85,
+                source=EdgeSource.API.value,
+                last_verified_at=datetime.now(timezone.utc).isoformat())
+            self._route_edges[route.id] = (src_device, next_hop_device)
+
+    def _unlink_route(self, route_id: str) -> None:
+        owned = self._route_edges.pop(route_id, None)
+        if owned is None:
+            return
+        route = self._routes[route_id]
+        src, dst = owned
+        self._remove_edge_where(src, dst, edge_type="routes_via",
+                                destination=route.destination_cidr)
+        # A duplicate route (same prefix, same next-hop device) takes over
+        for other_id in self._routes_by_device.get(src, ()):
+            other = self._routes[other_id]
+            if (other_id != route_id and other_id not in self._route_edges
+                    and other.destination_cidr == route.destination_cidr):
+                self._link_route(other)
+
+    def _relink_next_hops(self, *ips: str) -> None:
+        """Re-resolve routes whose next hop is one of ``ips``."""
+        for ip in ips:
+            for route_id in list(self._routes_by_next_hop.get(ip, ())):
+                self._unlink_route(route_id)
+                self._link_route(self._routes[route_id])
+
+    def _index_route(self, route: Route) -> None:
+        """Add a route to its device's per-VRF longest-prefix-match table."""
+        try:
+            net = ipaddress.ip_network(route.destination_cidr, strict=False)
+        except (ValueError, TypeError):
+            return
+        tables = self._route_tables.setdefault(route.device_id, {})
+        table = tables.get((route.vrf, net.version))
+        if table is None:
+            table = tables[(route.vrf, net.version)] = pytricia.PyTricia(net.max_prefixlen)
+        prefix = str(net)
+        if table.has_key(prefix):
+            table[prefix].append(route)
+        else:
+            table[prefix] = [route]
+        self._indexed_routes[route.id] = route
+
+    def _unindex_route(self, route_id: str) -> None:
+        route = self._indexed_routes.pop(route_id, None)
+        if route is None:
+            return
+        self._drop_routes_to_edge(route)
+        net = ipaddress.ip_network(route.destination_cidr, strict=False)
+        table = self._route_tables[route.device_id][(route.vrf, net.version)]
+        routes = table[str(net)]
+        routes[:] = [r for r in routes if r.id != route_id]
+        if not routes:
+            del table[str(net)]
+
+    def lookup_routes(self, device_id: str, ip: str) -> list[Route]:
+        """Longest-prefix-match routes for ``ip`` on a device, across its VRFs."""
+        try:
+            version = ipaddress.ip_address(_strip_cidr(ip)).version
+        except ValueError:
+            return []
+        matched: list[Route] = []
+        for (_vrf, table_version), table in self._route_tables.get(device_id, {}).items():
+            if table_version == version:
+                matched.extend(table.get(_strip_cidr(ip)) or ())
+        return matched
+
+    def _apply_neighbor_link(self, link: dict) -> None:
+        """Add a layer2_link edge for a discovered LLDP/CDP neighbor."""
+        if (link.get("protocol") or "").lower() not in _L2_NEIGHBOR_PROTOCOLS:
+            return
+        src, dst = link["device_id"], link["remote_device"]
+        if src == dst or src not in self.graph or dst not in self.graph:
+            return
+        if self._has_edge_type(src, dst, "layer2_link"):
+            return
+        self.graph.add_edge(src, dst,
+            edge_type="layer2_link",
+            local_port=_port_name(src, link.get("local_interface") or ""),
+            remote_port=_port_name(dst, link.get("remote_interface") or ""),
+            protocol=link["protocol"].upper(),
+            confidence=link.get("confidence", 1.0),
+            source=EdgeSource.API.value,
+            last_verified_at=link.get("last_seen") or datetime.now(timezone.utc).isoformat())
+        self._link_edges[link["id"]] = (src, dst)
+
+    def add_device(self, device: Device) -> None:
+        self.store.add_device(device)
+        self.graph.add_node(device.id, **device.model_dump(mode="json"), node_type="device")
+        self._index_management_ip(device)
 
     def add_subnet(self, subnet: Subnet) -> None:
         self.store.add_subnet(subnet)
@@ -402,46 +727,80 @@ class NetworkKnowledgeGraph:
         subnet_meta = self.ip_resolver.resolve(ip)
         if not subnet_meta:
             return []
-        subnet_cidr = subnet_meta.get("cidr", "")
         candidates = []
-        for d in self.store.list_devices():
-            for iface in self.store.list_interfaces(device_id=d.id):
-                iface_subnet = self.ip_resolver.resolve(iface.ip)
-                if iface_subnet and iface_subnet.get("cidr") == subnet_cidr:
-                    candidates.append({
-                        "device_id": d.id,
-                        "device_name": d.name,
-                        "interface_ip": iface.ip,
-                        "interface_name": iface.name,
-                    })
+        for iface_id in self._subnet_members.get(subnet_meta.get("id", ""), ()):
+            iface = self._interfaces[iface_id]
+            device = self.graph.nodes.get(iface["device_id"], {})
+            candidates.append({
+                "device_id": iface["device_id"],
+                "device_name": device.get("name", ""),
+                "interface_ip": iface["ip"],
+                "interface_name": iface["name"],
+            })
         return candidates
 
     def build_route_edges(self, src_ip: str, dst_ip: str) -> None:
-        """Dynamically build routes_to edges relevant to a specific path query."""
-        for node_id, data in self.graph.nodes(data=True):
-            if data.get("node_type") != "device":
+        """Dynamically build routes_to edges relevant to a specific path query.
+
+        Each device contributes its longest-prefix-match routes (per VRF)
+        towards ``dst_ip`` and back towards ``src_ip``; next hops resolve
+        through the IP index. Edges persist until their route changes.
+        """
+        targets = [ip for ip in dict.fromkeys((dst_ip, src_ip)) if ip]
+        for device_id in self._route_tables:
+            if self.graph.nodes.get(device_id, {}).get("node_type") != "device":
                 continue
-            routes = self.store.list_routes(device_id=node_id)
-            for route in routes:
-                next_device = self.find_device_by_ip(route.next_hop)
-                if next_device and next_device != node_id:
-                    self.graph.add_edge(
-                        node_id, next_device,
-                        edge_type="routes_to",
-                        destination=route.destination_cidr,
-                        next_hop=route.next_hop,
-                        metric=route.metric,
-                        protocol=route.protocol,
-                        vrf=route.vrf,
-                        confidence=0.85,
-                        source=EdgeSource.API.value,
-                        last_verified_at=route.last_updated or "",
-                    )
+            for ip in targets:
+                for route in self.lookup_routes(device_id, ip):
+                    self._add_routes_to_edge(route)
+
+    def _add_routes_to_edge(self, route: Route) -> None:
+        node_id = route.device_id
+        next_device = self._device_index.get(route.next_hop)
+        owned = self._routes_to_edges.get(route.id)
+        if owned is not None:
+            # Keep the edge only while the next hop still resolves to the
+            # same device and the edge itself is still in the graph.
+            if owned == (node_id, next_device) and any(
+                d.get("edge_type") == "routes_to"
+                and d.get("destination") == route.destination_cidr
+                and d.get("next_hop") == route.next_hop
+                for d in (self.graph.get_edge_data(*owned) or {}).values()
+            ):
+                return
+            self._drop_routes_to_edge(route)
+        if next_device and next_device != node_id:
+            self.graph.add_edge(
+                node_id, next_device,
+                edge_type="routes_to",
+                destination=route.destination_cidr,
+                next_hop=route.next_hop,
+                metric=route.metric,
+                protocol=route.protocol,
+                vrf=route.vrf,
+                confidence=0.85,
+                source=EdgeSource.API.value,
+                last_verified_at=route.last_updated or "",
+            )
+            self._routes_to_edges[route.id] = (node_id, next_device)
+
+    def _drop_routes_to_edge(self, route: Route) -> None:
+        owned = self._routes_to_edges.pop(route.id, None)
+        if owned:
+            self._remove_edge_where(*owned, edge_type="routes_to",
+                                    destination=route.destination_cidr, next_hop=route.next_hop)
 
     # Maximum number of paths to enumerate before stopping (prevents hang on dense graphs)
-    MAX_PATH_ENUMERATION = 1000
+    MAX_PATH_ENUMERATION = MAX_PATH_ENUMERATION
     # Maximum path depth (number of nodes) to consider
-    MAX_PATH_DEPTH = 15
+    MAX_PATH_DEPTH = MAX_PATH_DEPTH
+
+    @property
+    def paths(self) -> PathEngine:
+        """Path engine over ``self.graph`` (rebound if the graph is replaced)."""
+        if self._paths.graph is not self.graph:
+            self._paths = PathEngine(self.graph)
+        return self._paths
 
     def find_k_shortest_paths(
         self, src_id: str, dst_id: str, k: int = 3, max_depth: int | None = None
@@ -451,51 +810,13 @@ class NetworkKnowledgeGraph:
 
         Bounded to enumerate at most MAX_PATH_ENUMERATION paths total and
         filters out paths longer than *max_depth* nodes (default MAX_PATH_DEPTH).
+        The cost graph is cached by ``self.paths`` between calls.
         """
-        if src_id not in self.graph or dst_id not in self.graph:
-            return []
-
         depth_limit = max_depth if max_depth is not None else self.MAX_PATH_DEPTH
-
-        cost_graph = nx.DiGraph()
-        for u, v, data in self.graph.edges(data=True):
-            confidence = data.get("confidence", 0.5)
-            penalty = 0.0
-            if data.get("vrf") and data.get("vrf") != "":
-                penalty += _TOPOLOGY_PENALTIES["vrf_boundary"]
-            if data.get("edge_type") == "overlay":
-                penalty += _TOPOLOGY_PENALTIES["overlay_tunnel"]
-            if data.get("edge_type") == "tunnel_to":
-                penalty += _TOPOLOGY_PENALTIES["vpn_tunnel"]
-            if data.get("edge_type") == "attached_to":
-                penalty += _TOPOLOGY_PENALTIES["transit_gateway"]
-            if data.get("edge_type") == "load_balances":
-                penalty += _TOPOLOGY_PENALTIES["load_balancer"]
-            if data.get("edge_type") == "peered_to":
-                penalty += _TOPOLOGY_PENALTIES["cross_vpc"]
-            if data.get("edge_type") == "mpls_path":
-                penalty += _TOPOLOGY_PENALTIES["mpls_circuit"]
-            cost = (1.0 - confidence) + penalty
-            if cost_graph.has_edge(u, v):
-                if cost < cost_graph[u][v]["weight"]:
-                    cost_graph[u][v]["weight"] = cost
-            else:
-                cost_graph.add_edge(u, v, weight=cost)
-
-        try:
-            bounded_paths = itertools.islice(
-                nx.shortest_simple_paths(cost_graph, src_id, dst_id, weight="weight"),
-                self.MAX_PATH_ENUMERATION,
-            )
-            result = []
-            for path in bounded_paths:
-                if len(path) <= depth_limit:
-                    result.append(path)
-                if len(result) >= k:
-                    break
-            return result
-        except (nx.NetworkXNoPath, nx.NodeNotFound):
-            return []
+        return self.paths.k_shortest_paths(
+            src_id, dst_id, k=k, max_depth=depth_limit,
+            max_enumeration=self.MAX_PATH_ENUMERATION,
+        )
 
     def boost_edge_confidence(self, src_id: str, dst_id: str, boost: float = 0.05) -> None:
         """Boost confidence on a verified edge and persist to SQLite."""
@@ -507,6 +828,7 @@ class NetworkKnowledgeGraph:
                 self.graph[src_id][dst_id][key]["confidence"] = new_conf
                 self.graph[src_id][dst_id][key]["last_verified_at"] = \
                     datetime.now(timezone.utc).isoformat()
+            self.paths.invalidate_edge(src_id, dst_id)
             # Persist to SQLite
             self.store.save_edge_confidence(src_id, dst_id, new_conf, "diagnosis")
 
@@ -0,0 +1,461 @@
+"""Time-partitioned metric history with latest values and rollups.
+
+``metric_history`` used to be a single row-per-sample table keyed by ISO
+strings. Every chart read walked a string index, each "current value" read
+took ``MAX(id)`` per series, long windows shipped every raw row to the
+caller, and retention was one ``DELETE`` over the whole table.
+``MetricHistoryStore`` keeps the same samples in the same SQLite file, in
+this layout:
+
+- ``mh_series`` gives each (entity_type, entity_id, metric) an integer id.
+- ``mh_raw_YYYYMMDD`` holds one table per UTC day of (series_id, ts,
+  value). It is clustered on (series_id, ts), and ts is integer epoch
+  microseconds, so a series' window is one contiguous range read.
+  Retention drops whole days.
+- ``mh_latest`` holds the newest sample per series, for current-value reads.
+- ``mh_1m_YYYYMMDD`` and ``mh_1h`` hold per-minute and per-hour count,
+  sum, min, max and last value. They are folded in as samples are
+  written, so long windows are answered from rollups instead of raw rows.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+_US = 1_000_000
+_DAY_US = 86_400 * _US
+_MINUTE_US = 60 * _US
+_HOUR_US = 3_600 * _US
+_MAX_TS = 253_402_300_799 * _US  # 9999-12-31T23:59:59Z, the datetime limit
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_RAW_DDL = (
+    "CREATE TABLE IF NOT EXISTS {table} (series_id INTEGER NOT NULL, ts INTEGER NOT NULL, "
+    "value REAL NOT NULL, PRIMARY KEY (series_id, ts)) WITHOUT ROWID"
+)
+_ROLLUP_DDL = (
+    "CREATE TABLE IF NOT EXISTS {table} (series_id INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+    "cnt INTEGER NOT NULL, total REAL NOT NULL, lo REAL NOT NULL, hi REAL NOT NULL, "
+    "last_ts INTEGER NOT NULL, last_val REAL NOT NULL, PRIMARY KEY (series_id, bucket)) WITHOUT ROWID"
+)
+_ROLLUP_UPSERT = (
+    "INSERT INTO {table} VALUES (?,?,?,?,?,?,?,?) ON CONFLICT(series_id, bucket) DO UPDATE SET "
+    "cnt=cnt+excluded.cnt, total=total+excluded.total, lo=MIN(lo, excluded.lo), hi=MAX(hi, excluded.hi), "
+    "last_val=CASE WHEN excluded.last_ts >= last_ts THEN excluded.last_val ELSE last_val END, "
+    "last_ts=MAX(last_ts, excluded.last_ts)"
+)
+# Rebuilds one bucket from its raw rows, for buckets a batch overwrote into.
+_ROLLUP_RECOMPUTE = (
+    "INSERT OR REPLACE INTO {table} SELECT :sid, :start, COUNT(*), SUM(value), MIN(value), MAX(value), "
+    "MAX(ts), (SELECT value FROM {raw} WHERE series_id=:sid AND ts>=:start AND ts<:end "
+    "ORDER BY ts DESC LIMIT 1) FROM {raw} WHERE series_id=:sid AND ts>=:start AND ts<:end"
+)
+_PROBE_CHUNK = 400  # (series_id, ts) pairs per existence probe, 2 variables each
+
+SeriesKey = tuple[str, str, str]
+
+
+def to_micros(when) -> int:
+    """Epoch microseconds from epoch seconds, a datetime or an ISO-8601 string (naive means UTC)."""
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    if isinstance(when, datetime):
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return (when - _EPOCH) // timedelta(microseconds=1)
+    return round(when * _US)
+
+
+def _iso(ts: int) -> str:
+    return (_EPOCH + timedelta(microseconds=ts)).isoformat()
+
+
+def _day(ts: int) -> str:
+    return (_EPOCH + timedelta(microseconds=ts)).strftime("%Y%m%d")
+
+
+def _merge(buckets: dict, key: tuple, agg: list) -> None:
+    """Fold a [count, sum, min, max, last_ts, last] aggregate into ``buckets[key]``."""
+    into = buckets.get(key)
+    if into is None:
+        buckets[key] = list(agg)
+        return
+    into[0] += agg[0]
+    into[1] += agg[1]
+    into[2] = min(into[2], agg[2])
+    into[3] = max(into[3], agg[3])
+    if agg[4] >= into[4]:
+        into[4], into[5] = agg[4], agg[5]
+
+
+class MetricHistoryStore:
+    """Metric samples over a SQLite connection source.
+
+    ``connect`` returns a connection and ``release`` gives it back; the
+    ``TopologyStore`` passes its pool so monitor batches can write samples
+    in the same transaction as device statuses. ``prune`` sets the raw
+    retention; minute and hour rollups are kept at least
+    ``minute_retention_days`` / ``hour_retention_days``.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        release: Optional[Callable[[sqlite3.Connection], None]] = None,
+        minute_retention_days: int = 30,
+        hour_retention_days: int = 365,
+    ) -> None:
+        self._connect = connect
+        self._release = release or (lambda conn: conn.close())
+        self._minute_retention_days = minute_retention_days
+        self._hour_retention_days = hour_retention_days
+        self._lock = threading.Lock()
+        self._series: dict[SeriesKey, int] = {}
+        self._tables: set[str] = set()
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS mh_series (
+                    id INTEGER PRIMARY KEY,
+                    entity_type TEXT NOT NULL,
+                    entity_id TEXT NOT NULL,
+                    metric TEXT NOT NULL,
+                    UNIQUE (entity_type, entity_id, metric)
+                );
+                CREATE TABLE IF NOT EXISTS mh_latest (
+                    series_id INTEGER PRIMARY KEY,
+                    ts INTEGER NOT NULL,
+                    value REAL NOT NULL
+                );
+            """)
+            conn.execute(_ROLLUP_DDL.format(table="mh_1h"))
+            conn.commit()
+            self._migrate_legacy(conn)
+        finally:
+            self._release(conn)
+
+    # ── Writes ──
+
+    def append(self, samples: Iterable[tuple], conn: Optional[sqlite3.Connection] = None) -> int:
+        """Write (entity_type, entity_id, metric, value, when) samples.
+
+        ``when`` is anything ``to_micros`` accepts. With ``conn`` the rows
+        join the caller's transaction; otherwise they are committed here.
+        A repeated (series, timestamp) overwrites the raw sample.
+        """
+        own = conn is None
+        if own:
+            conn = self._connect()
+        try:
+            with self._lock:
+                try:
+                    written = self._write(conn, samples)
+                except Exception:
+                    # Ids and tables created in a rolled-back transaction are gone
+                    self._series.clear()
+                    self._tables.clear()
+                    raise
+            if own:
+                conn.commit()
+            return written
+        except Exception:
+            if own:
+                conn.rollback()
+            raise
+        finally:
+            if own:
+                self._release(conn)
+
+    def _write(self, conn: sqlite3.Connection, samples: Iterable[tuple]) -> int:
+        raw: dict[str, list[tuple[int, int, float]]] = {}
+        minutes: dict[tuple[str, int, int], list] = {}
+        seen: set[tuple[int, int]] = set()
+        days: dict[int, str] = {}
+        series = self._series
+        # Per-sample work stays minimal: raw rows and minute aggregates;
+        # hours and latest values are folded from the minutes afterwards
+        for entity_type, entity_id, metric, value, when in samples:
+            key = (entity_type, entity_id, metric)
+            sid = series.get(key) or self._series_id(conn, key)
+            ts = round(when * _US) if type(when) is float else to_micros(when)
+            value = float(value)
+            while (sid, ts) in seen:  # same-instant samples in one batch stay distinct
+                ts += 1
+            seen.add((sid, ts))
+            day = days.get(ts // _DAY_US)
+            if day is None:
+                day = days[ts // _DAY_US] = _day(ts)
+            raw.setdefault(day, []).append((sid, ts, value))
+            agg = minutes.get((day, sid, ts - ts % _MINUTE_US))
+            if agg is None:
+                minutes[(day, sid, ts - ts % _MINUTE_US)] = [1, value, value, value, ts, value]
+                continue
+            agg[0] += 1
+            agg[1] += value
+            if value < agg[2]:
+                agg[2] = value
+            if value > agg[3]:
+                agg[3] = value
+            if ts >= agg[4]:
+                agg[4], agg[5] = ts, value
+
+        # A (series, ts) that is already stored gets overwritten, so folding
+        # it into the rollups again would count it twice; the buckets it
+        # falls in are rebuilt from the raw rows instead.
+        stale_minutes: set[tuple[str, int, int]] = set()
+        stale_hours: set[tuple[int, int]] = set()
+        for day, rows in raw.items():
+            table = self._table(conn, f"mh_raw_{day}", _RAW_DDL)
+            for sid, ts in self._existing(conn, table, rows):
+                stale_minutes.add((day, sid, ts - ts % _MINUTE_US))
+                stale_hours.add((sid, ts - ts % _HOUR_US))
+
+        hours: dict[tuple[int, int], list] = {}
+        latest: dict[int, tuple[int, float]] = {}
+        by_day: dict[str, list[tuple]] = {}
+        for (day, sid, bucket), agg in minutes.items():
+            if (day, sid, bucket) not in stale_minutes:
+                by_day.setdefault(day, []).append((sid, bucket, *agg))
+            hour = (sid, bucket - bucket % _HOUR_US)
+            if hour not in stale_hours:
+                _merge(hours, hour, agg)
+            if sid not in latest or agg[4] >= latest[sid][0]:
+                latest[sid] = (agg[4], agg[5])
+
+        for day, rows in raw.items():
+            conn.executemany(f"INSERT OR REPLACE INTO mh_raw_{day} VALUES (?,?,?)", rows)
+        for day, rows in by_day.items():
+            table = self._table(conn, f"mh_1m_{day}", _ROLLUP_DDL)
+            conn.executemany(_ROLLUP_UPSERT.format(table=table), rows)
+        conn.executemany(_ROLLUP_UPSERT.format(table="mh_1h"),
+                         [(sid, bucket, *agg) for (sid, bucket), agg in hours.items()])
+        for day, sid, bucket in stale_minutes:
+            table = self._table(conn, f"mh_1m_{day}", _ROLLUP_DDL)
+            conn.execute(_ROLLUP_RECOMPUTE.format(table=table, raw=f"mh_raw_{day}"),
+                         {"sid": sid, "start": bucket, "end": bucket + _MINUTE_US})
+        for sid, bucket in stale_hours:
+            # Days are whole hours, so an hour's raw rows share one partition
+            conn.execute(_ROLLUP_RECOMPUTE.format(table="mh_1h", raw=f"mh_raw_{_day(bucket)}"),
+                         {"sid": sid, "start": bucket, "end": bucket + _HOUR_US})
+        conn.executemany(
+            "INSERT INTO mh_latest VALUES (?,?,?) ON CONFLICT(series_id) DO UPDATE SET "
+            "ts=excluded.ts, value=excluded.value WHERE excluded.ts >= mh_latest.ts",
+            [(sid, ts, value) for sid, (ts, value) in latest.items()],
+        )
+        return len(seen)
+
+    @staticmethod
+    def _existing(conn: sqlite3.Connection, table: str,
+                  rows: list[tuple[int, int, float]]) -> list[tuple[int, int]]:
+        """The (series_id, ts) keys of ``rows`` already present in ``table``."""
+        found: list[tuple[int, int]] = []
+        for i in range(0, len(rows), _PROBE_CHUNK):
+            chunk = rows[i:i + _PROBE_CHUNK]
+            values = ",".join("(?,?)" for _ in chunk)
+            found += conn.execute(
+                f"SELECT r.series_id, r.ts FROM (VALUES {values}) v CROSS JOIN {table} r "
+                "ON r.series_id = v.column1 AND r.ts = v.column2",
+                [x for sid, ts, _ in chunk for x in (sid, ts)],
+            ).fetchall()
+        return found
+
+    def _series_id(self, conn: sqlite3.Connection, key: SeriesKey) -> int:
+        sid = self._series.get(key)
+        if sid is None:
+            conn.execute("INSERT OR IGNORE INTO mh_series (entity_type, entity_id, metric) VALUES (?,?,?)", key)
+            sid = self._lookup(conn, key)
+        return sid
+
+    def _lookup(self, conn: sqlite3.Connection, key: SeriesKey) -> Optional[int]:
+        sid = self._series.get(key)
+        if sid is None:
+            row = conn.execute(
+                "SELECT id FROM mh_series WHERE entity_type=? AND entity_id=? AND metric=?", key,
+            ).fetchone()
+            if row is None:
+                return None
+            sid = self._series[key] = row[0]
+        return sid
+
+    def _table(self, conn: sqlite3.Connection, table: str, ddl: str) -> str:
+        if table not in self._tables:
+            conn.execute(ddl.format(table=table))
+            self._tables.add(table)
+        return table
+
+    # ── Reads ──
+
+    def query(self, entity_type: str, entity_id: str, metric: str,
+              since, until=None) -> list[dict]:
+        """Raw samples in ``[since, until)``, oldest first."""
+        since_us = to_micros(since)
+        until_us = to_micros(until) if until is not None else _MAX_TS
+        conn = self._connect()
+        try:
+            sid = self._lookup(conn, (entity_type, entity_id, metric))
+            if sid is None:
+                return []
+            rows = []
+            for table in self._partitions(conn, "mh_raw_", since_us, until_us):
+                rows += conn.execute(
+                    f"SELECT ts, value FROM {table} WHERE series_id=? AND ts>=? AND ts<? ORDER BY ts",
+                    (sid, since_us, until_us),
+                ).fetchall()
+        finally:
+            self._release(conn)
+        return [
+            {"entity_type": entity_type, "entity_id": entity_id, "metric": metric,
+             "value": value, "recorded_at": _iso(ts)}
+            for ts, value in rows
+        ]
+
+    def rollup(self, entity_type: str, entity_id: str, metric: str,
+               since, until=None, step: int = 60) -> list[dict]:
+        """Aggregates over ``step``-second buckets in ``[since, until)``, oldest first.
+
+        ``step`` is a whole number of minutes; multiples of an hour read
+        the hourly rollups. Each point carries the bucket's mean as
+        ``value`` plus ``min``, ``max`` and ``count``.
+        """
+        if step <= 0 or step % 60:
+            raise ValueError(f"rollup step must be a positive multiple of 60 seconds, got {step}")
+        step_us = step * _US
+        since_us = to_micros(since)
+        until_us = to_micros(until) if until is not None else _MAX_TS
+        start = since_us - since_us % (_HOUR_US if step_us % _HOUR_US == 0 else _MINUTE_US)
+        conn = self._connect()
+        try:
+            sid = self._lookup(conn, (entity_type, entity_id, metric))
+            if sid is None:
+                return []
+            if step_us % _HOUR_US == 0:
+                tables = ["mh_1h"]
+            else:
+                tables = self._partitions(conn, "mh_1m_", start, until_us)
+            rows = []
+            for table in tables:
+                rows += conn.execute(
+                    f"SELECT bucket, cnt, total, lo, hi FROM {table} "
+                    "WHERE series_id=? AND bucket>=? AND bucket<? ORDER BY bucket",
+                    (sid, start, until_us),
+                ).fetchall()
+        finally:
+            self._release(conn)
+
+        points: dict[int, list] = {}
+        for bucket, cnt, total, lo, hi in rows:
+            point = points.get(bucket - bucket % step_us)
+            if point is None:
+                points[bucket - bucket % step_us] = [cnt, total, lo, hi]
+            else:
+                point[0] += cnt
+                point[1] += total
+                point[2] = min(point[2], lo)
+                point[3] = max(point[3], hi)
+        return [
+            {"entity_type": entity_type, "entity_id": entity_id, "metric": metric,
+             "value": total / cnt, "min": lo, "max": hi, "count": cnt, "recorded_at": _iso(bucket)}
+            for bucket, (cnt, total, lo, hi) in points.items()
+        ]
+
+    def latest(self, entity_type: str, entity_ids: list[str],
+               metrics: list[str]) -> list[tuple[str, str, float, int]]:
+        """(entity_id, metric, value, ts) of the newest sample per matching series."""
+        if not entity_ids or not metrics:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT s.entity_id, s.metric, l.value, l.ts FROM mh_latest l "
+                "JOIN mh_series s ON s.id = l.series_id "
+                f"WHERE s.entity_type=? AND s.entity_id IN ({','.join('?' * len(entity_ids))}) "
+                f"AND s.metric IN ({','.join('?' * len(metrics))})",
+                [entity_type, *entity_ids, *metrics],
+            ).fetchall()
+            return [tuple(row) for row in rows]
+        finally:
+            self._release(conn)
+
+    def _partitions(self, conn: sqlite3.Connection, prefix: str,
+                    since_us: int = 0, until_us: int = _MAX_TS) -> list[str]:
+        """Day tables with this prefix that can hold timestamps in ``[since_us, until_us)``."""
+        first = prefix + _day(max(since_us, 0))
+        last = prefix + _day(min(until_us, _MAX_TS) - 1)
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name GLOB ?", (prefix + "[0-9]*",),
+        )]
+        return sorted(name for name in names if first <= name <= last)
+
+    # ── Retention ──
+
+    def prune(self, older_than_days: int = 7) -> int:
+        """Drop raw and minute partitions for days that ended more than the
+        retention ago, and hour rollups and latest values older than it.
+
+        Raw data is dropped a whole day at a time, so up to a day more than
+        ``older_than_days`` is kept. Returns the number of raw samples
+        deleted, counted before their partitions are dropped.
+        """
+        now_us = to_micros(time.time())
+        raw_cutoff = now_us - older_than_days * _DAY_US
+        minute_cutoff = now_us - max(older_than_days, self._minute_retention_days) * _DAY_US
+        hour_cutoff = now_us - max(older_than_days, self._hour_retention_days) * _DAY_US
+        conn = self._connect()
+        try:
+            with self._lock:
+                raw = self._partitions(conn, "mh_raw_", 0, raw_cutoff - raw_cutoff % _DAY_US)
+                deleted = sum(
+                    conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in raw
+                )
+                dropped = raw + self._partitions(
+                    conn, "mh_1m_", 0, minute_cutoff - minute_cutoff % _DAY_US,
+                )
+                for table in dropped:
+                    conn.execute(f"DROP TABLE {table}")
+                    self._tables.discard(table)
+                conn.execute("DELETE FROM mh_1h WHERE bucket < ?", (hour_cutoff,))
+                conn.execute("DELETE FROM mh_latest WHERE ts < ?", (raw_cutoff,))
+                conn.commit()
+            return deleted
+        finally:
+            self._release(conn)
+
+    # ── Migration ──
+
+    def _migrate_legacy(self, conn: sqlite3.Connection) -> None:
+        """Move rows from the old single ``metric_history`` table, then drop it."""
+        if not conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='metric_history'"
+        ).fetchone():
+            return
+        moved = 0
+        cursor = conn.execute(
+            "SELECT entity_type, entity_id, metric, value, recorded_at FROM metric_history ORDER BY id"
+        )
+        with self._lock:
+            while batch := cursor.fetchmany(10_000):
+                moved += self._write(conn, [tuple(row) for row in batch])
+        conn.execute("DROP TABLE metric_history")
+        conn.commit()
+        logger.info("Moved %d metric_history rows into day partitions", moved)
+
+
+def auto_step(since, until=None, max_points: int = 150) -> int:
+    """Rollup step in seconds that keeps ``[since, until)`` under ``max_points``
+    points, or 0 when the window is short enough (an hour) to read raw."""
+    since_us = to_micros(since)
+    until_us = to_micros(until) if until is not None else to_micros(time.time())
+    span = until_us - since_us
+    if span <= _HOUR_US:
+        return 0
+    step = math.ceil(span / max_points / _US)
+    unit = 3600 if step > 3600 else 60
+    return math.ceil(step / unit) * unit
@@ -0,0 +1,121 @@
+"""Write-behind sink for the monitor's device status and metric history rows.
+
+Monitor passes used to write every device's status and samples straight
+to SQLite, one connection and one commit per row, on the event loop.
+Passes now enqueue rows here; a single writer task flushes the buffer in
+one ``executemany`` transaction, on a fixed interval or as soon as
+``max_pending`` rows are waiting, off the event loop.
+
+Statuses are coalesced per device (the latest one wins), so a device
+that flaps within one flush interval records only its final state.
+Samples keep the time they were enqueued.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from .topology_store import TopologyStore
+
+logger = logging.getLogger(__name__)
+
+
+class MetricSink:
+    """Buffers monitor writes and flushes them in batches.
+
+    If a flush fails the rows are kept for the next one; beyond
+    ``max_buffered`` samples the oldest are dropped.
+    """
+
+    def __init__(
+        self,
+        store: TopologyStore,
+        flush_interval: float = 5.0,
+        max_pending: int = 5000,
+        max_buffered: int = 200_000,
+    ) -> None:
+        self._store = store
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+        self._max_buffered = max_buffered
+        self._statuses: dict[str, tuple[str, str, float, float, str]] = {}
+        self._samples: list[tuple[str, str, str, float, float]] = []
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.flush_count = 0
+        self.rows_written = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._statuses) + len(self._samples)
+
+    def put_status(self, device_id: str, status: str, latency_ms: float,
+                   packet_loss: float, probe_method: str) -> None:
+        self._statuses[device_id] = (device_id, status, latency_ms, packet_loss, probe_method)
+        self._maybe_wake()
+
+    def put_metric(self, entity_type: str, entity_id: str, metric: str, value: float) -> None:
+        self._samples.append((entity_type, entity_id, metric, value, time.time()))
+        self._maybe_wake()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of rows written."""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            statuses, self._statuses = self._statuses, {}
+            samples, self._samples = self._samples, []
+            try:
+                await asyncio.to_thread(self._store.write_monitor_batch, list(statuses.values()), samples)
+            except Exception as e:
+                logger.warning("Metric flush of %d rows failed: %s", len(statuses) + len(samples), e)
+                self._requeue(statuses, samples)
+                return 0
+            written = len(statuses) + len(samples)
+            self.flush_count += 1
+            self.rows_written += written
+            return written
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer and flush what is left."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:  # keep the writer alive
+                logger.error("Metric sink writer failed: %s", e)
+
+    def _maybe_wake(self) -> None:
+        if self.pending >= self._max_pending:
+            self._wake.set()
+
+    def _requeue(self, statuses: dict, samples: list) -> None:
+        for device_id, row in statuses.items():
+            self._statuses.setdefault(device_id, row)  # newer statuses win
+        self._samples = samples + self._samples
+        overflow = len(self._samples) - self._max_buffered
+        if overflow > 0:
+            logger.warning("Metric sink over capacity, dropping %d oldest samples", overflow)
+            del self._samples[:overflow]
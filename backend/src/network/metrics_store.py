@@ -7,10 +7,11 @@ import collections
 import ipaddress
 import logging
 import os
+import random
 import re
 from datetime import datetime, timezone
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterable
 
 from influxdb_client.client.influxdb_client_async import InfluxDBClientAsync
 from influxdb_client import Point, WritePrecision
@@ -27,6 +28,51 @@ def ip_to_subnet_tag(ip: str, prefix: int = 24) -> str:
         return "unknown"
 
 
+# -- Line protocol helpers ----------------------------------------------
+# Bulk writes bypass Point objects: building one Point per flow costs more
+# than the HTTP write it feeds. Escaping mirrors influxdb_client.Point.
+
+_TAG_ESCAPE = str.maketrans({
+    ",": "\\,", "=": "\\=", " ": "\\ ", "\n": "\\n", "\r": "\\r", "\t": "\\t",
+})
+_STRING_ESCAPE = str.maketrans({'"': '\\"', "\\": "\\\\"})
+
+
+def _tag(value: Any) -> str:
+    return str(value).translate(_TAG_ESCAPE)
+
+
+def _str_field(value: Any) -> str:
+    return '"' + str(value).translate(_STRING_ESCAPE) + '"'
+
+
+def _float_field(value: float) -> str:
+    s = str(float(value))
+    return s[:-2] if s.endswith(".0") else s
+
+
+def _epoch_s(ts: datetime) -> int:
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return int(ts.timestamp())
+
+
+def _flow_line(
+    src_ip: str, dst_ip: str, src_subnet: str, dst_subnet: str,
+    src_port: int, dst_port: int, protocol: int, nbytes: int, packets: int,
+    duration: float, src_as: int, dst_as: int, exporter: str, end_s: int,
+) -> str:
+    """One ``flow_summary`` line, identical to what ``write_flow`` emits."""
+    exporter_tag = f",exporter={_tag(exporter)}" if exporter else ""
+    return (
+        f"flow_summary,dst_as={dst_as},dst_subnet={_tag(dst_subnet)}{exporter_tag}"
+        f",protocol={protocol},src_as={src_as},src_subnet={_tag(src_subnet)}"
+        f" bytes={nbytes}i,dst_ip={_str_field(dst_ip)},dst_port={dst_port}i"
+        f",duration={_float_field(duration)},packets={packets}i"
+        f",src_ip={_str_field(src_ip)},src_port={src_port}i {end_s}"
+    )
+
+
 @dataclass
 class FlowRecord:
     src_ip: str
@@ -54,11 +100,28 @@ class MetricsStore:
     def __init__(self, url: str, token: str, org: str, bucket: str) -> None:
         self.org = org
         self.bucket = bucket
-        self._client = InfluxDBClientAsync(url=url, token=token, org=org)
+        self._client = InfluxDBClientAsync(
+            url=url, token=token, org=org,
+            enable_gzip=os.getenv("INFLUXDB_GZIP", "true").lower() == "true",
+        )
         self._write_api = self._client.write_api()
         self._query_api = self._client.query_api()
         self._query_timeout = float(os.getenv("INFLUXDB_QUERY_TIMEOUT", "30"))
-        self._retry_queue: collections.deque[Point] = collections.deque(maxlen=1000)
+        self._write_slots = asyncio.Semaphore(self.MAX_IN_FLIGHT_WRITES)
+        # Line-protocol chunks whose write failed; re-sent by a background
+        # task with backoff. Bounded by point count, with overflow counted.
+        self._retry_backlog: collections.deque[list[str]] = collections.deque()
+        self._backlog_points = 0
+        self.dropped_points = 0
+        self._retry_task: asyncio.Task | None = None
+        self._retry_wake = asyncio.Event()
+
+    # Batched write tuning
+    WRITE_BATCH_SIZE = 5_000
+    MAX_IN_FLIGHT_WRITES = 4
+    RETRY_BASE_DELAY = 0.5  # seconds, doubled per failed backlog flush (with jitter)
+    RETRY_MAX_DELAY = 10.0
+    MAX_BACKLOG_POINTS = 200_000
 
     async def health_check(self) -> bool:
         try:
@@ -68,37 +131,108 @@ class MetricsStore:
             return False
 
     async def close(self) -> None:
+        if self._retry_task is not None:
+            self._retry_task.cancel()
+            self._retry_task = None
         await self._client.close()
 
     # -- Writes ----------------------------------------------------------
 
     async def _safe_write(self, point: Point) -> None:
+        await self._write_chunk([point.to_line_protocol()])
+
+    async def write_points(self, records: Iterable[Point | str]) -> int:
+        """Write many points as line-protocol requests of ``WRITE_BATCH_SIZE``.
+
+        Chunks are sent concurrently, at most ``MAX_IN_FLIGHT_WRITES`` at a
+        time, with one attempt each; a failed chunk goes to the retry
+        backlog instead of backing off here, so callers such as the flow
+        flush never wait out an outage. Returns the number of points written.
+        """
+        lines = [r if isinstance(r, str) else r.to_line_protocol() for r in records]
+        size = self.WRITE_BATCH_SIZE
+        chunks = [lines[i:i + size] for i in range(0, len(lines), size)]
+        results = await asyncio.gather(*(self._write_chunk(c) for c in chunks))
+        if chunks and all(results) and self._retry_backlog:
+            # InfluxDB is taking writes again; skip the rest of the backoff.
+            self._retry_wake.set()
+        return sum(len(c) for c, ok in zip(chunks, results) if ok)
+
+    async def _write_chunk(self, lines: list[str]) -> bool:
+        lines = [line for line in lines if line]
+        if not lines:
+            return True
         try:
-            await self._write_api.write(bucket=self.bucket, record=point)
+            async with self._write_slots:
+                await self._write_api.write(
+                    bucket=self.bucket, record="\n".join(lines), write_precision=WritePrecision.S,
+                )
+            return True
         except Exception as e:
-            logger.warning("InfluxDB write failed: %s", e)
-            self._retry_queue.append(point)
+            logger.warning("InfluxDB write of %d points failed: %s", len(lines), e)
+        self._spill(lines)
+        self._start_retry_task()
+        return False
 
-    async def flush_retry_queue(self) -> int:
-        """Attempt to re-write all queued points. Returns the number successfully flushed.
+    def _start_retry_task(self) -> None:
+        if self._retry_task is None or self._retry_task.done():
+            self._retry_task = asyncio.get_running_loop().create_task(self._retry_loop())
+
+    async def _retry_loop(self) -> None:
+        """Re-send the backlog until it is empty, backing off between rounds.
 
-        Points that still fail remain in the queue for a future attempt.
-        When the deque overflows its maxlen, oldest items are silently dropped.
+        The delay doubles (with jitter) up to ``RETRY_MAX_DELAY`` after each
+        round that leaves points behind; a successful fresh write wakes the
+        loop early.
         """
-        flushed = 0
-        remaining: list[Point] = []
-        while self._retry_queue:
-            point = self._retry_queue.popleft()
+        attempt = 0
+        while self._retry_backlog:
+            delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** attempt)
+            self._retry_wake.clear()
             try:
-                await self._write_api.write(bucket=self.bucket, record=point)
-                flushed += 1
-            except Exception as e:
-                logger.debug("Retry write still failing: %s", e)
-                remaining.append(point)
-        # Put failed items back (they re-enter in order)
-        for p in remaining:
-            self._retry_queue.append(p)
-        return flushed
+                await asyncio.wait_for(
+                    self._retry_wake.wait(), delay * random.uniform(0.5, 1.0),
+                )
+            except asyncio.TimeoutError:
+                pass
+            before = self._backlog_points
+            await self.flush_retry_queue()
+            attempt = 0 if self._backlog_points < before else attempt + 1
+
+    def _spill(self, lines: list[str]) -> None:
+        self._retry_backlog.append(lines)
+        self._backlog_points += len(lines)
+        while self._backlog_points > self.MAX_BACKLOG_POINTS and len(self._retry_backlog) > 1:
+            dropped = self._retry_backlog.popleft()
+            self._backlog_points -= len(dropped)
+            self.dropped_points += len(dropped)
+            logger.error(
+                "InfluxDB retry backlog full; dropped %d points (%d total)",
+                len(dropped), self.dropped_points,
+            )
+
+    def _take_backlog(self) -> list[list[str]]:
+        chunks = list(self._retry_backlog)
+        self._retry_backlog.clear()
+        self._backlog_points = 0
+        return chunks
+
+    @property
+    def backlog_size(self) -> int:
+        """Number of points waiting in the retry backlog."""
+        return self._backlog_points
+
+    async def flush_retry_queue(self) -> int:
+        """Re-send the retry backlog once. Returns the number of points written.
+
+        Each spilled chunk gets a single attempt; chunks that fail again go
+        back on the backlog for the retry task's next round.
+        """
+        chunks = self._take_backlog()
+        if not chunks:
+            return 0
+        results = await asyncio.gather(*(self._write_chunk(c) for c in chunks))
+        return sum(len(c) for c, ok in zip(chunks, results) if ok)
 
     async def write_device_metric(
         self, device_id: str, metric: str, value: float
@@ -125,6 +259,84 @@ class MetricsStore:
             point = point.field(k, float(v))
         await self._safe_write(point)
 
+    async def write_link_metrics(
+        self, links: Iterable[tuple[str, str, dict[str, Any]]],
+    ) -> int:
+        """Batched ``write_link_metric`` for ``(src, dst, fields)`` triples."""
+        now_s = _epoch_s(datetime.now(timezone.utc))
+        lines = []
+        for src, dst, fields in links:
+            values = ",".join(
+                f"{_tag(k)}={_float_field(v)}" for k, v in sorted(fields.items())
+            )
+            if values:
+                lines.append(
+                    f"link_traffic,dst_device={_tag(dst)},src_device={_tag(src)} {values} {now_s}"
+                )
+        return await self.write_points(lines)
+
+    async def write_flows(
+        self, flows: Iterable[FlowRecord] = (), batches: Iterable[Any] = (),
+    ) -> int:
+        """Bulk counterpart of :meth:`write_flow`.
+
+        *batches* are columnar ``FlowBatch`` objects (a FLOW_DTYPE ``columns``
+        array plus ``exporter_ip``); their lines are formatted straight from
+        the integer columns without materialising ``FlowRecord`` objects.
+        """
+        subnets: dict[str, str] = {}
+
+        def subnet(ip: str) -> str:
+            tag = subnets.get(ip)
+            if tag is None:
+                tag = subnets[ip] = ip_to_subnet_tag(ip)
+            return tag
+
+        lines = [
+            _flow_line(
+                f.src_ip, f.dst_ip, subnet(f.src_ip), subnet(f.dst_ip),
+                f.src_port, f.dst_port, f.protocol, f.bytes, f.packets,
+                (f.end_time - f.start_time).total_seconds(),
+                f.src_as, f.dst_as, f.exporter_ip, _epoch_s(f.end_time),
+            )
+            for f in flows
+        ]
+        for batch in batches:
+            lines.extend(self._flow_column_lines(batch.columns, batch.exporter_ip))
+        return await self.write_points(lines)
+
+    @staticmethod
+    def _flow_column_lines(cols: Any, exporter_ip: str) -> list[str]:
+        if not len(cols):
+            return []
+        src_int = cols["src_ip"].tolist()
+        dst_int = cols["dst_ip"].tolist()
+        ips: dict[int, tuple[str, str]] = {}
+
+        def ip(value: int) -> tuple[str, str]:
+            pair = ips.get(value)
+            if pair is None:
+                addr = str(ipaddress.IPv4Address(value))
+                net = str(ipaddress.IPv4Address(value & 0xFFFFFF00))
+                pair = ips[value] = (addr, f"{net}/24")
+            return pair
+
+        start = cols["start"].tolist()
+        end = cols["end"].tolist()
+        lines = []
+        for i, (src_port, dst_port, protocol, nbytes, packets, src_as, dst_as) in enumerate(zip(
+            cols["src_port"].tolist(), cols["dst_port"].tolist(), cols["protocol"].tolist(),
+            cols["bytes"].tolist(), cols["packets"].tolist(),
+            cols["src_as"].tolist(), cols["dst_as"].tolist(),
+        )):
+            src, src_net = ip(src_int[i])
+            dst, dst_net = ip(dst_int[i])
+            lines.append(_flow_line(
+                src, dst, src_net, dst_net, src_port, dst_port, protocol, nbytes, packets,
+                float(end[i] - start[i]), src_as, dst_as, exporter_ip, end[i],
+            ))
+        return lines
+
     async def write_flow(self, flow: FlowRecord) -> None:
         point = (
             Point("flow_summary")
@@ -224,7 +436,7 @@ class MetricsStore:
                     .tag("metric_type", metric)
                     .field("value", float(value))
                 )
-            await self._write_api.write(bucket=self.bucket, record=points)
+            await self.write_points(points)
         except Exception as e:
             logger.warning("Failed to write DB metrics batch: %s", e)
 
@@ -4,12 +4,9 @@ import logging
 import time
 from collections import defaultdict
 
-try:
-    from icmplib import async_ping
-except ImportError:  # pragma: no cover — optional at import time, patched in tests
-    async_ping = None  # type: ignore[assignment]
-
 from .topology_store import TopologyStore
+from .icmp_engine import get_engine as get_icmp_engine
+from .metric_sink import MetricSink
 from .drift_engine import DriftEngine
 from .discovery_engine import DiscoveryEngine
 from .snmp_collector import SNMPCollector, SNMPDeviceConfig
@@ -27,6 +24,8 @@ from .collectors.ping_prober import PingProber
 from .collectors.data_merger import merge_collected_data
 
 from .event_bus import EventBus, RedisEventBus, MemoryEventBus, EventProcessor
+from .event_bus.kg_sync import KnowledgeGraphSyncConsumer, StoreChangePublisher
+from .adapters.refresh_scheduler import AdapterRefreshScheduler
 from .collectors.trap_listener import SNMPTrapListener
 from .collectors.syslog_listener import SyslogListener
 from .collectors.event_store import EventStore
@@ -36,7 +35,10 @@ logger = logging.getLogger(__name__)
 # Thresholds for status derivation
 _LATENCY_DEGRADED_MS = 100.0
 _PACKET_LOSS_DEGRADED = 0.10
-_PROBE_TIMEOUT = 5
+_PROBE_COUNT = 3
+_PROBE_TIMEOUT = 2
+# metric_history retention is enforced hourly, not every cycle
+_PRUNE_INTERVAL = 3600
 
 
 class NetworkMonitor:
@@ -56,8 +58,10 @@ class NetworkMonitor:
         self.event_bus = event_bus
         self.event_store = event_store
         self.event_processor: EventProcessor | None = None
+        self.kg_sync: KnowledgeGraphSyncConsumer | None = None
         self.trap_listener: SNMPTrapListener | None = None
         self.syslog_listener: SyslogListener | None = None
+        self.adapter_refresh = AdapterRefreshScheduler(adapters, event_bus)
         self.drift_engine = DriftEngine(store)
         self.discovery_engine = DiscoveryEngine(store, kg)
         self.snmp_collector = SNMPCollector(metrics_store) if metrics_store else None
@@ -77,7 +81,10 @@ class NetworkMonitor:
         self.autodiscovery_engine = AutodiscoveryEngine(
             self.profile_loader, self.protocol_snmp
         )
-        self.ping_prober = PingProber()
+        self.icmp = get_icmp_engine()
+        self.metric_sink = MetricSink(store)
+        self._last_prune: float | None = None
+        self.ping_prober = PingProber(self.icmp)
         self._autodiscovery_interval = 300  # 5 min
         self._last_autodiscovery: float = 0
 
@@ -134,6 +141,15 @@ class NetworkMonitor:
                     metrics_store=self.metrics_store,
                 )
                 await self.event_processor.start()
+            # Apply topology deltas to the knowledge graph in place
+            if hasattr(self.kg, "refresh_device"):
+                self.kg_sync = KnowledgeGraphSyncConsumer(self.kg)
+                await self.kg_sync.subscribe(self.event_bus)
+            # Store writers (collectors, discovery, API) feed those channels
+            if hasattr(self.store, "set_change_listener"):
+                self.store.set_change_listener(
+                    StoreChangePublisher(self.event_bus, asyncio.get_running_loop())
+                )
 
         # Start trap listener if enabled
         import os
@@ -152,6 +168,7 @@ class NetworkMonitor:
             )
             await self.syslog_listener.start()
 
+        self.metric_sink.start()
         self._task = asyncio.create_task(self._run_loop())
         logger.info("NetworkMonitor started (interval=%ds)", self.cycle_interval)
 
@@ -179,6 +196,8 @@ class NetworkMonitor:
         if self.event_processor:
             await self.event_processor.stop()
         if self.event_bus:
+            if hasattr(self.store, "set_change_listener"):
+                self.store.set_change_listener(None)
             await self.event_bus.stop()
 
         if self._task:
@@ -187,6 +206,7 @@ class NetworkMonitor:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self.metric_sink.stop()
 
     async def _run_loop(self):
         while True:
@@ -223,9 +243,11 @@ class NetworkMonitor:
             if isinstance(result, Exception):
                 logger.error("Monitor pass %d failed: %s", i, result)
         # Alert pass reads data written by the others — must run after gather
+        # and after the buffered statuses/samples have landed
+        await self.metric_sink.flush()
         await self._alert_pass()
         await self._ipam_alert_pass()
-        self.store.prune_metric_history(older_than_days=7)
+        await self._prune_pass()
         self._last_cycle_at = time.monotonic()
         self._last_cycle_duration = self._last_cycle_at - t0
 
@@ -254,52 +276,45 @@ class NetworkMonitor:
                 logger.debug("Broadcast failed: %s", e)
 
     async def _probe_pass(self):
-        devices = self.store.list_devices()
-        tasks = []
-        for d in devices:
-            if not d.management_ip:
-                continue
-            tasks.append(self._probe_one(d.id, d.management_ip))
-        await asyncio.gather(*tasks, return_exceptions=True)
-
-    async def _probe_one(self, device_id: str, ip: str):
+        targets = {d.id: d.management_ip for d in self.store.list_devices() if d.management_ip}
+        if not targets:
+            return
         try:
-            result = await asyncio.wait_for(
-                async_ping(ip, count=3, timeout=2),
-                timeout=_PROBE_TIMEOUT,
+            results = await self.icmp.ping_many(
+                targets.values(), count=_PROBE_COUNT, timeout=_PROBE_TIMEOUT,
             )
+        except Exception as e:
+            logger.debug("ICMP probe pass failed: %s", e)
+            results = {}
+
+        sink = self.metric_sink
+        for device_id, ip in targets.items():
+            result = results.get(ip)
+            if result is None:
+                sink.put_status(device_id, "down", 0.0, 1.0, "icmp")
+                continue
             latency = result.avg_rtt
             loss = result.packet_loss
-            alive = result.is_alive
-
-            if not alive:
+            if not result.is_alive:
                 status = "down"
             elif latency > _LATENCY_DEGRADED_MS or loss > _PACKET_LOSS_DEGRADED:
                 status = "degraded"
             else:
                 status = "up"
+            sink.put_status(device_id, status, latency, loss, "icmp")
+            sink.put_metric("device", device_id, "latency_ms", latency)
+            sink.put_metric("device", device_id, "packet_loss", loss)
 
-            self.store.upsert_device_status(device_id, status, latency, loss, "icmp")
-            self.store.append_metric("device", device_id, "latency_ms", latency)
-            self.store.append_metric("device", device_id, "packet_loss", loss)
-
-        except Exception as e:
-            logger.debug("Probe failed for %s (%s): %s", device_id, ip, e)
-            self.store.upsert_device_status(device_id, "down", 0.0, 1.0, "icmp")
+    async def _prune_pass(self):
+        now = time.monotonic()
+        if self._last_prune is not None and now - self._last_prune < _PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        await asyncio.to_thread(self.store.prune_metric_history, older_than_days=7)
 
     async def _adapter_pass(self):
-        async def _query_adapter(instance_id, adapter):
-            try:
-                await adapter.get_interfaces()
-            except Exception as e:
-                logger.debug("Adapter pass failed for %s: %s", instance_id, e)
-
-        tasks = [
-            _query_adapter(iid, adp)
-            for iid, adp in self.adapters.all_instances().items()
-        ]
-        if tasks:
-            await asyncio.gather(*tasks)
+        # Renews snapshots nearing TTL expiry; fresh instances are skipped
+        await self.adapter_refresh.refresh_due()
 
     async def _drift_pass(self):
         # device_bindings() returns {device_id: instance_id}
@@ -0,0 +1,252 @@
+"""Cached cost graph and batched path queries over the topology graph.
+
+Path queries run on a weighted ``nx.DiGraph`` that collapses parallel
+topology edges to their cheapest cost::
+
+    cost = (1 - confidence) + topology_penalty
+
+Building that graph walks every edge, which used to happen on every
+``find_k_shortest_paths`` call. ``PathEngine`` keeps the cost graph and
+patches single (u, v) pairs as ``TopologyGraph`` reports edge changes.
+Many-to-many queries (the reachability matrix) run one Dijkstra per
+source and only fall back to k-shortest enumeration when the caller asks
+for more than one path or the shortest path exceeds the depth limit.
+"""
+from __future__ import annotations
+
+import itertools
+from typing import Hashable, Iterable, Optional
+
+import networkx as nx
+
+# Topology penalties for dual cost model
+_TOPOLOGY_PENALTIES = {
+    "vrf_boundary": 0.3,
+    "inter_site": 0.2,
+    "overlay_tunnel": 0.15,
+    "vpn_tunnel": 0.15,
+    "direct_connect": 0.05,
+    "mpls_circuit": 0.05,
+    "cross_vpc": 0.25,
+    "transit_gateway": 0.1,
+    "load_balancer": 0.1,
+    "low_bandwidth": 0.1,
+}
+
+_EDGE_TYPE_PENALTIES = {
+    "overlay": _TOPOLOGY_PENALTIES["overlay_tunnel"],
+    "tunnel_to": _TOPOLOGY_PENALTIES["vpn_tunnel"],
+    "attached_to": _TOPOLOGY_PENALTIES["transit_gateway"],
+    "load_balances": _TOPOLOGY_PENALTIES["load_balancer"],
+    "peered_to": _TOPOLOGY_PENALTIES["cross_vpc"],
+    "mpls_path": _TOPOLOGY_PENALTIES["mpls_circuit"],
+}
+
+# Maximum number of paths to enumerate before stopping (prevents hang on dense graphs)
+MAX_PATH_ENUMERATION = 1000
+# Maximum path depth (number of nodes) to consider
+MAX_PATH_DEPTH = 15
+
+Pair = tuple[Hashable, Hashable]
+
+
+def edge_cost(data: dict) -> float:
+    """Dual-model cost of one topology edge."""
+    penalty = 0.0
+    if data.get("vrf"):
+        penalty += _TOPOLOGY_PENALTIES["vrf_boundary"]
+    penalty += _EDGE_TYPE_PENALTIES.get(data.get("edge_type"), 0.0)
+    return (1.0 - data.get("confidence", 0.5)) + penalty
+
+
+class TopologyGraph(nx.MultiDiGraph):
+    """MultiDiGraph that reports edge changes to an attached ``PathEngine``.
+
+    Structural changes (adding/removing edges or nodes) are reported
+    automatically. In-place edge attribute writes are not; callers that
+    change a confidence must call ``PathEngine.invalidate_edge``.
+    """
+
+    def __init__(self, incoming_graph_data=None, **attr):
+        self.path_engine: Optional[PathEngine] = None
+        super().__init__(incoming_graph_data, **attr)
+
+    def add_edge(self, u_for_edge, v_for_edge, key=None, **attr):
+        key = super().add_edge(u_for_edge, v_for_edge, key, **attr)
+        if self.path_engine is not None:
+            self.path_engine.invalidate_edge(u_for_edge, v_for_edge)
+        return key
+
+    def remove_edge(self, u, v, key=None):
+        super().remove_edge(u, v, key)
+        if self.path_engine is not None:
+            self.path_engine.invalidate_edge(u, v)
+
+    def remove_node(self, n):
+        super().remove_node(n)
+        if self.path_engine is not None:
+            self.path_engine.invalidate_node(n)
+
+    def remove_nodes_from(self, nodes):
+        for n in list(nodes):
+            if n in self:
+                self.remove_node(n)
+
+    def clear(self):
+        super().clear()
+        if self.path_engine is not None:
+            self.path_engine.invalidate()
+
+    def clear_edges(self):
+        super().clear_edges()
+        if self.path_engine is not None:
+            self.path_engine.invalidate()
+
+
+class PathEngine:
+    """Weighted path queries over a topology graph with a cached cost graph."""
+
+    def __init__(self, graph: nx.MultiDiGraph) -> None:
+        self._graph = graph
+        self._cost: nx.DiGraph | None = None
+        self._dirty_pairs: set[Pair] = set()
+        self._removed_nodes: set[Hashable] = set()
+        if isinstance(graph, TopologyGraph):
+            graph.path_engine = self
+        self.rebuilds = 0
+
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        return self._graph
+
+    # ── Invalidation ──
+
+    def invalidate(self) -> None:
+        """Drop the cost graph; the next query rebuilds it from scratch."""
+        self._cost = None
+        self._dirty_pairs.clear()
+        self._removed_nodes.clear()
+
+    def invalidate_edge(self, u: Hashable, v: Hashable) -> None:
+        """Recompute the (u, v) cost before the next query."""
+        if self._cost is not None:
+            self._dirty_pairs.add((u, v))
+
+    def invalidate_node(self, n: Hashable) -> None:
+        if self._cost is not None:
+            self._removed_nodes.add(n)
+
+    def cost_graph(self) -> nx.DiGraph:
+        """The current cost graph; callers must not mutate it."""
+        if self._cost is None:
+            self._cost = self._build()
+            self._dirty_pairs.clear()
+            self._removed_nodes.clear()
+        elif self._dirty_pairs or self._removed_nodes:
+            self._apply_changes()
+        return self._cost
+
+    def _build(self) -> nx.DiGraph:
+        self.rebuilds += 1
+        cost_graph = nx.DiGraph()
+        for u, v, data in self._graph.edges(data=True):
+            cost = edge_cost(data)
+            if cost_graph.has_edge(u, v):
+                if cost < cost_graph[u][v]["weight"]:
+                    cost_graph[u][v]["weight"] = cost
+            else:
+                cost_graph.add_edge(u, v, weight=cost)
+        return cost_graph
+
+    def _apply_changes(self) -> None:
+        cost_graph = self._cost
+        for n in self._removed_nodes:
+            if n in cost_graph:
+                cost_graph.remove_node(n)
+        for u, v in self._dirty_pairs:
+            parallel = self._graph.get_edge_data(u, v) if self._graph.has_node(u) else None
+            if parallel:
+                cost_graph.add_edge(u, v, weight=min(edge_cost(d) for d in parallel.values()))
+            elif cost_graph.has_edge(u, v):
+                cost_graph.remove_edge(u, v)
+        self._dirty_pairs.clear()
+        self._removed_nodes.clear()
+
+    # ── Queries ──
+
+    def k_shortest_paths(
+        self,
+        src: Hashable,
+        dst: Hashable,
+        k: int = 3,
+        max_depth: int = MAX_PATH_DEPTH,
+        max_enumeration: int = MAX_PATH_ENUMERATION,
+    ) -> list[list]:
+        """Up to ``k`` loop-free paths in cost order, each at most ``max_depth`` nodes."""
+        if src not in self._graph or dst not in self._graph:
+            return []
+        try:
+            bounded_paths = itertools.islice(
+                nx.shortest_simple_paths(self.cost_graph(), src, dst, weight="weight"),
+                max_enumeration,
+            )
+            result = []
+            for path in bounded_paths:
+                if len(path) <= max_depth:
+                    result.append(path)
+                if len(result) >= k:
+                    break
+            return result
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            return []
+
+    def shortest_paths_from(
+        self, src: Hashable, targets: Optional[Iterable[Hashable]] = None,
+    ) -> dict[Hashable, tuple[float, list]]:
+        """One Dijkstra from ``src``: ``{target: (cost, path)}`` for reachable targets."""
+        cost_graph = self.cost_graph()
+        if src not in cost_graph:
+            return {}
+        pred, dist = nx.dijkstra_predecessor_and_distance(cost_graph, src, weight="weight")
+        wanted = dist.keys() if targets is None else [t for t in targets if t in dist]
+        result = {}
+        for target in wanted:
+            path = [target]
+            while path[-1] != src:
+                path.append(pred[path[-1]][0])
+            path.reverse()
+            result[target] = (dist[target], path)
+        return result
+
+    def k_shortest_paths_many(
+        self,
+        pairs: Iterable[Pair],
+        k: int = 3,
+        max_depth: int = MAX_PATH_DEPTH,
+        max_enumeration: int = MAX_PATH_ENUMERATION,
+    ) -> dict[Pair, list[list]]:
+        """``k_shortest_paths`` for many (src, dst) pairs.
+
+        Pairs are grouped by source and answered from one Dijkstra each.
+        Unreachable pairs cost nothing further; with ``k == 1`` a shortest
+        path within ``max_depth`` is the answer. Other pairs fall back to
+        the bounded k-shortest enumeration.
+        """
+        by_source: dict[Hashable, list[Hashable]] = {}
+        for src, dst in pairs:
+            by_source.setdefault(src, []).append(dst)
+
+        result: dict[Pair, list[list]] = {}
+        for src, dsts in by_source.items():
+            reachable = self.shortest_paths_from(src, dsts)
+            for dst in dsts:
+                shortest = reachable.get(dst)
+                if dst != src and shortest is None:
+                    result[(src, dst)] = []
+                elif dst != src and k == 1 and len(shortest[1]) <= max_depth:
+                    result[(src, dst)] = [shortest[1]]
+                else:
+                    result[(src, dst)] = self.k_shortest_paths(
+                        src, dst, k, max_depth, max_enumeration,
+                    )
+        return result
@@ -6,6 +6,7 @@ import asyncio
 import random
 from typing import Any
 from src.config import is_demo_mode
+from src.network.icmp_engine import get_engine as get_icmp_engine
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,7 +15,7 @@ logger = get_logger(__name__)
 async def _mock_ping(target_ip: str) -> dict:
     """Mock ping — returns realistic RTT and loss.
 
-    In production, use subprocess with 'ping' or raw ICMP socket.
+    Used in demo mode; otherwise targets are pinged via the ICMP engine.
     """
     await asyncio.sleep(random.uniform(0.01, 0.05))
 
@@ -44,63 +45,49 @@ class PingProbeScheduler:
         logger.info("Ping probe scheduler started (interval: %ds, targets: %d)", self.interval, len(self._targets))
         while self._running:
             if self._targets:
-                tasks = [self._probe(t) for t in self._targets]
-                await asyncio.gather(*tasks, return_exceptions=True)
+                try:
+                    await self._probe_all()
+                except Exception as e:
+                    logger.error("Ping probe pass failed: %s", e)
             await asyncio.sleep(self.interval)
 
-    async def _probe(self, target: dict) -> None:
-        ip = target.get("ip", "")
-        if not ip:
+    async def _probe_all(self) -> None:
+        """Probe every target in one pass and write the results in one batch."""
+        ips = list(dict.fromkeys(t["ip"] for t in self._targets if t.get("ip")))
+        if not ips:
             return
-        try:
-            if is_demo_mode():
-                result = await _mock_ping(ip)
-            else:
-                result = await _real_ping(ip)
-            self.store.write_probe_metric(
-                target_ip=ip,
-                probe_type="icmp",
-                latency_ms=result["avg_rtt_ms"],
-                packet_loss_pct=result["packet_loss_pct"],
-                status=result["status"],
-            )
-        except Exception as e:
-            logger.error("Ping probe failed for %s: %s", ip, e)
+        if is_demo_mode():
+            results = dict(zip(ips, await asyncio.gather(*(_mock_ping(ip) for ip in ips))))
+        else:
+            results = await _real_ping_many(ips)
+        self.store.write_probe_metrics([
+            (ip, "icmp", r["avg_rtt_ms"], r["packet_loss_pct"], r["status"])
+            for ip, r in results.items()
+        ])
 
     def stop(self) -> None:
         self._running = False
 
 
-async def _real_ping(target_ip: str) -> dict:
-    """Real ICMP ping using subprocess.
-
-    TODO: Implement with subprocess ping or raw socket.
-    Falls back to mock with warning.
-    """
-    import asyncio
-    import re
-    import subprocess
-
+async def _real_ping_many(target_ips: list[str]) -> dict[str, dict]:
+    """Real ICMP echo to every target through the shared ICMP engine."""
+    down = {"avg_rtt_ms": 0, "packet_loss_pct": 100, "status": "down"}
     try:
-        proc = await asyncio.create_subprocess_exec(
-            "ping", "-c", "3", "-W", "2", target_ip,
-            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=10)
-        output = stdout.decode()
-
-        # Parse ping output for RTT and loss
-        loss_match = re.search(r'(\d+)% packet loss', output)
-        rtt_match = re.search(r'min/avg/max.*= [\d.]+/([\d.]+)/', output)
-
-        loss = float(loss_match.group(1)) if loss_match else 100
-        rtt = float(rtt_match.group(1)) if rtt_match else 0
-
-        return {
-            "avg_rtt_ms": rtt,
+        stats = await get_icmp_engine().ping_many(target_ips, count=3, timeout=2)
+    except Exception as e:
+        logger.warning("Real ping failed for %d targets: %s", len(target_ips), e)
+        return {ip: dict(down) for ip in target_ips}
+
+    results = {}
+    for ip in target_ips:
+        host = stats.get(ip)
+        if host is None:
+            results[ip] = dict(down)
+            continue
+        loss = round(host.packet_loss * 100, 1)
+        results[ip] = {
+            "avg_rtt_ms": round(host.avg_rtt, 3),
             "packet_loss_pct": loss,
             "status": "ok" if loss == 0 else "degraded" if loss < 100 else "down",
         }
-    except Exception as e:
-        logger.warning("Real ping failed for %s: %s", target_ip, e)
-        return {"avg_rtt_ms": 0, "packet_loss_pct": 100, "status": "down"}
+    return results
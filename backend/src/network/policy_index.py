@@ -0,0 +1,299 @@
+"""Compiled packet-classification index over firewall and NACL rulebases.
+
+Adapters used to walk their rule snapshot for every simulated flow,
+re-sorting it and re-parsing each CIDR pattern along the way. A
+``PolicyIndex`` compiles the snapshot once:
+
+- addresses become integer intervals on one axis (IPv4 in ``[0, 2**32)``,
+  IPv6 above it), merged per rule;
+- ports become ``(lo, hi)`` ranges and protocols a lowercase set;
+- each address dimension gets an elementary-interval table that maps an
+  address to the rules covering it, grouped by identical address sets.
+
+A lookup takes the more selective of the source and destination tables,
+walks just those candidate rules in priority order and stops at the first
+one whose remaining dimensions match. Rules that cover every address are
+candidates in both tables, so a rulebase of broad rules degrades to the
+old linear scan rather than to anything worse.
+"""
+from __future__ import annotations
+
+import heapq
+import ipaddress
+from bisect import bisect_right
+from typing import Iterable, Optional, Sequence
+
+from .models import FirewallRule, NACLDirection, NACLRule
+
+_V6_OFFSET = 1 << 32
+
+# (src_ip, dst_ip, port, protocol)
+Flow = tuple[str, str, int, str]
+
+Intervals = tuple[tuple[int, ...], tuple[int, ...]]  # (starts, ends), merged
+
+
+def ip_key(ip: str) -> Optional[int]:
+    """Position of an address on the shared IPv4/IPv6 axis, or None if invalid."""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return None
+    return int(addr) if addr.version == 4 else _V6_OFFSET + int(addr)
+
+
+def _network_interval(pattern: str) -> Optional[tuple[int, int]]:
+    try:
+        if "/" in pattern:
+            net = ipaddress.ip_network(pattern, strict=False)
+            lo, hi = int(net.network_address), int(net.broadcast_address)
+            version = net.version
+        else:
+            addr = ipaddress.ip_address(pattern)
+            lo = hi = int(addr)
+            version = addr.version
+    except ValueError:
+        return None
+    offset = 0 if version == 4 else _V6_OFFSET
+    return lo + offset, hi + offset
+
+
+def _merge(ranges: Iterable[tuple[int, int]]) -> Intervals:
+    starts: list[int] = []
+    ends: list[int] = []
+    for lo, hi in sorted(ranges):
+        if ends and lo <= ends[-1] + 1:
+            ends[-1] = max(ends[-1], hi)
+        else:
+            starts.append(lo)
+            ends.append(hi)
+    return tuple(starts), tuple(ends)
+
+
+def _contains(intervals: Optional[Intervals], key: Optional[int]) -> bool:
+    if intervals is None:
+        return True
+    if key is None:
+        return False
+    starts, ends = intervals
+    i = bisect_right(starts, key) - 1
+    return i >= 0 and key <= ends[i]
+
+
+def compile_addresses(patterns: Sequence[str]) -> Optional[Intervals]:
+    """Address patterns as merged intervals; None means any address.
+
+    Matches ``FirewallAdapter._match_ip``: an empty list or ``"any"`` matches
+    everything, other entries are CIDRs or single addresses. Entries that
+    parse as neither never match.
+    """
+    if not patterns or "any" in patterns:
+        return None
+    return _merge(r for r in map(_network_interval, patterns) if r is not None)
+
+
+def compile_ports(ports: Sequence) -> Optional[Intervals]:
+    """Port list (ints and ``(lo, hi)`` tuples) as intervals; None means any port."""
+    if not ports:
+        return None
+    ranges = []
+    for p in ports:
+        if isinstance(p, tuple):
+            ranges.append((p[0], p[1]))
+        elif isinstance(p, int):
+            ranges.append((p, p))
+    return _merge(ranges)
+
+
+class _IntervalTable:
+    """Elementary-interval table: address -> rules covering it.
+
+    Rules are grouped by identical address sets; each elementary interval
+    stores the groups covering it, so a ``/8`` shared by a thousand rules
+    costs one group reference per interval rather than a thousand.
+    Positions are rule priorities (0 = evaluated first).
+    """
+
+    def __init__(self, rule_intervals: Sequence[Optional[Intervals]]) -> None:
+        groups: dict[Optional[Intervals], list[int]] = {}
+        for position, intervals in enumerate(rule_intervals):
+            groups.setdefault(intervals, []).append(position)
+        self._any: tuple[int, ...] = tuple(groups.pop(None, ()))
+
+        bounds: set[int] = set()
+        for starts, ends in groups:
+            bounds.update(starts)
+            bounds.update(e + 1 for e in ends)
+        self._bounds = sorted(bounds)
+        members = [tuple(positions) for positions in groups.values()]
+        covering: list[list[int]] = [[] for _ in self._bounds]
+        for group, (starts, ends) in enumerate(groups):
+            for lo, hi in zip(starts, ends):
+                for i in range(bisect_right(self._bounds, lo) - 1, bisect_right(self._bounds, hi)):
+                    covering[i].append(group)
+
+        # Intern identical segments and precompute their candidate counts
+        tail = (self._any,) if self._any else ()
+        self._empty = (tail, len(self._any))
+        interned: dict[tuple[int, ...], tuple[tuple[tuple[int, ...], ...], int]] = {}
+        self._segments = []
+        for covered in covering:
+            key = tuple(covered)
+            if key not in interned:
+                lists = tuple(members[g] for g in key) + tail
+                interned[key] = (lists, sum(len(m) for m in lists))
+            self._segments.append(interned[key])
+
+    def candidates(self, key: Optional[int]) -> tuple[tuple[tuple[int, ...], ...], int]:
+        """(ascending position lists, total count) for rules covering ``key``."""
+        if key is None:
+            return self._empty
+        i = bisect_right(self._bounds, key) - 1
+        return self._segments[i] if i >= 0 else self._empty
+
+
+def _in_order(lists: tuple[tuple[int, ...], ...]) -> Iterable[int]:
+    if len(lists) == 1:
+        return lists[0]
+    return heapq.merge(*lists)
+
+
+class PolicyIndex:
+    """First-match index over one adapter's firewall rule snapshot.
+
+    ``wildcard_protocols`` are rule protocols that match any flow;
+    ``any_flow_protocol`` lets a flow protocol of ``"any"`` match every
+    rule. ``wildcard_protocols=None`` disables protocol matching.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[FirewallRule],
+        wildcard_protocols: Optional[frozenset[str]] = frozenset({"any"}),
+        any_flow_protocol: bool = True,
+    ) -> None:
+        self.rules_source = rules
+        self.size = len(rules)
+        self._rules = sorted(rules, key=lambda r: r.order)
+        self._match_protocol = wildcard_protocols is not None
+        self._any_flow_protocol = any_flow_protocol
+
+        self._src_ips: list[Optional[Intervals]] = []
+        self._dst_ips: list[Optional[Intervals]] = []
+        self._ports: list[Optional[Intervals]] = []
+        self._protocols: list[Optional[str]] = []  # None = any protocol
+        for rule in self._rules:
+            self._src_ips.append(compile_addresses(rule.src_ips))
+            self._dst_ips.append(compile_addresses(rule.dst_ips))
+            self._ports.append(compile_ports(rule.ports))
+            proto = rule.protocol.lower()
+            self._protocols.append(
+                None if not self._match_protocol or proto in wildcard_protocols else proto
+            )
+        self._src_table = _IntervalTable(self._src_ips)
+        self._dst_table = _IntervalTable(self._dst_ips)
+
+        self._by_src_zone: dict[str, list[FirewallRule]] = {}
+        self._by_dst_zone: dict[str, list[FirewallRule]] = {}
+        for rule in rules:
+            self._by_src_zone.setdefault(rule.src_zone, []).append(rule)
+            self._by_dst_zone.setdefault(rule.dst_zone, []).append(rule)
+
+    def is_current(self, rules: Sequence[FirewallRule]) -> bool:
+        """True if this index was compiled from ``rules`` (the same list object)."""
+        return rules is self.rules_source and len(rules) == self.size
+
+    def first_match(
+        self, src_ip: str, dst_ip: str, port: int, protocol: str = "tcp",
+    ) -> Optional[FirewallRule]:
+        """The highest-priority rule matching the flow, or None (implicit deny)."""
+        return self._first_match(ip_key(src_ip), ip_key(dst_ip), port, protocol.lower())
+
+    def first_match_many(self, flows: Iterable[Flow]) -> list[Optional[FirewallRule]]:
+        """``first_match`` for many flows; repeated addresses are keyed once."""
+        keys: dict[str, Optional[int]] = {}
+        results: dict[tuple, Optional[FirewallRule]] = {}
+        matched = []
+        for src_ip, dst_ip, port, protocol in flows:
+            flow = (src_ip, dst_ip, port, protocol.lower())
+            if flow not in results:
+                if src_ip not in keys:
+                    keys[src_ip] = ip_key(src_ip)
+                if dst_ip not in keys:
+                    keys[dst_ip] = ip_key(dst_ip)
+                results[flow] = self._first_match(keys[src_ip], keys[dst_ip], port, flow[3])
+            matched.append(results[flow])
+        return matched
+
+    def rules_for_zones(self, zone_src: str = "", zone_dst: str = "") -> list[FirewallRule]:
+        """Snapshot rules for a zone pair, in snapshot order."""
+        if zone_src and zone_dst:
+            return [r for r in self._by_src_zone.get(zone_src, ()) if r.dst_zone == zone_dst]
+        if zone_src:
+            return list(self._by_src_zone.get(zone_src, ()))
+        if zone_dst:
+            return list(self._by_dst_zone.get(zone_dst, ()))
+        return list(self.rules_source)
+
+    def _first_match(
+        self, src: Optional[int], dst: Optional[int], port: int, protocol: str,
+    ) -> Optional[FirewallRule]:
+        src_lists, src_count = self._src_table.candidates(src)
+        dst_lists, dst_count = self._dst_table.candidates(dst)
+        if src_count <= dst_count:
+            lists, other_ips, other_key = src_lists, self._dst_ips, dst
+        else:
+            lists, other_ips, other_key = dst_lists, self._src_ips, src
+        any_protocol = not self._match_protocol or (self._any_flow_protocol and protocol == "any")
+        for position in _in_order(lists):
+            rule_protocol = self._protocols[position]
+            if not (any_protocol or rule_protocol is None or rule_protocol == protocol):
+                continue
+            if not _contains(self._ports[position], port):
+                continue
+            if _contains(other_ips[position], other_key):
+                return self._rules[position]
+        return None
+
+
+class NACLPolicy:
+    """Compiled, direction-split NACL rules (stateless, first match wins).
+
+    Mirrors the NACL evaluator's semantics: a rule matches when its CIDR
+    contains either endpoint, ``"-1"`` is any protocol (and any port), and
+    ``0.0.0.0/0`` matches every address.
+    """
+
+    def __init__(self, rules: Sequence[NACLRule]) -> None:
+        self._directions: dict[NACLDirection, tuple] = {}
+        for direction in NACLDirection:
+            ordered = sorted((r for r in rules if r.direction == direction), key=lambda r: r.rule_number)
+            cidrs = [
+                None if r.cidr == "0.0.0.0/0"
+                else _merge(x for x in (_network_interval(r.cidr),) if x is not None)
+                for r in ordered
+            ]
+            self._directions[direction] = (ordered, _IntervalTable(cidrs))
+
+    def evaluate(
+        self, direction: NACLDirection, src_ip: str, dst_ip: str, port: int, protocol: str,
+    ) -> Optional[NACLRule]:
+        """First matching rule for the direction, or None (implicit deny)."""
+        ordered, table = self._directions[direction]
+        src_lists, _ = table.candidates(ip_key(src_ip))
+        dst_lists, _ = table.candidates(ip_key(dst_ip))
+        for position in _unique(_in_order(src_lists + dst_lists)):
+            rule = ordered[position]
+            if rule.protocol == "-1":
+                return rule
+            if rule.protocol == protocol and rule.port_range_from <= port <= rule.port_range_to:
+                return rule
+        return None
+
+
+def _unique(positions: Iterable[int]) -> Iterable[int]:
+    last = -1
+    for position in positions:
+        if position != last:
+            yield position
+            last = position
@@ -1,5 +1,38 @@
 """Prometheus metrics exporter for the NetworkMonitor."""
 from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from src.integrations import http_clients
+
+
+class HttpPoolCollector:
+    """Scrape-time view of the shared outbound HTTP pools (``http_clients``)."""
+
+    _GAUGES = (
+        ("limit", "http_pool_concurrency_limit", "Concurrency gate size per backend"),
+        ("in_flight", "http_pool_in_flight", "Requests currently holding the gate"),
+        ("waiting", "http_pool_waiting", "Requests queued on the gate"),
+        ("connections", "http_pool_connections", "Open pooled connections"),
+        ("idle_connections", "http_pool_idle_connections", "Idle keep-alive connections"),
+    )
+    _COUNTERS = (
+        ("requests", "http_pool_requests", "Requests completed through the gate"),
+        ("errors", "http_pool_errors", "Requests that raised"),
+        ("wait_seconds", "http_pool_wait_seconds", "Total time spent queued on the gate"),
+    )
+
+    def collect(self):
+        stats = http_clients.pool_stats()
+        for key, name, doc in self._GAUGES:
+            family = GaugeMetricFamily(name, doc, labels=["backend"])
+            for backend, values in stats.items():
+                family.add_metric([backend], values[key])
+            yield family
+        for key, name, doc in self._COUNTERS:
+            family = CounterMetricFamily(name, doc, labels=["backend"])
+            for backend, values in stats.items():
+                family.add_metric([backend], values[key])
+            yield family
 
 
 class MetricsCollector:
@@ -50,6 +83,8 @@ class MetricsCollector:
             registry=self._registry,
         )
 
+        self._registry.register(HttpPoolCollector())
+
     # ── Recording helpers ──
 
     def record_cycle_duration(self, seconds: float) -> None:
@@ -0,0 +1,389 @@
+# backend/src/network/receiver_pool.py
+"""Multi-process UDP receivers sharing one port via ``SO_REUSEPORT``.
+
+Each worker process binds its own socket to the port (the kernel hashes
+datagrams across them by source address, so an exporter sticks to one
+worker and its v9/IPFIX templates stay local), runs the *unchanged*
+datagram protocol class on its own event loop, and ships compact batches
+back to the API process over a pipe:
+
+* ``syslog`` / ``traps`` — parsed event dicts, published in the parent
+  after device resolution (the instance store only lives there).
+* ``flow`` — one ``FLOW_DTYPE`` buffer per exporter, pre-aggregated in the
+  worker with ``merge_flows`` (one row per flow key), fed to the parent's
+  ``FlowAggregator.ingest_batch``.
+
+Every message carries the worker's cumulative counters, which the
+listeners merge into their ``stats`` properties.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from collections import defaultdict
+from multiprocessing.connection import Connection
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("syslog", "traps", "flow")
+
+
+def reuseport_socket(port: int, host: str = "0.0.0.0", rcvbuf: int = 4 * 1024 * 1024) -> socket.socket:
+    """Return a non-blocking UDP socket bound to *port* with ``SO_REUSEPORT``."""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise OSError("SO_REUSEPORT is not supported on this platform")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        sock.bind((host, port))
+        sock.setblocking(False)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+# ── Worker side ───────────────────────────────────────────────────────
+
+
+class _WorkerEventBus:
+    """Event bus stand-in for listeners running inside a worker."""
+
+    def __init__(self, on_publish: Callable[[], None]) -> None:
+        self.pending: list[dict] = []
+        self._on_publish = on_publish
+
+    async def publish(self, channel: str, event: dict) -> None:
+        self.pending.append(event)
+        self._on_publish()
+
+
+class _NotifyingProtocol(asyncio.DatagramProtocol):
+    """Wraps a datagram protocol and calls ``on_datagram`` after each packet."""
+
+    def __init__(self, inner: asyncio.DatagramProtocol, on_datagram: Callable[[], None]) -> None:
+        self._inner = inner
+        self._on_datagram = on_datagram
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._inner.connection_made(transport)
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        self._inner.datagram_received(data, addr)
+        self._on_datagram()
+
+    def error_received(self, exc: Exception) -> None:
+        self._inner.error_received(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._inner.connection_lost(exc)
+
+
+class _NoDevices:
+    """Worker-side instance store: device resolution happens in the parent."""
+
+    def get_device_by_ip(self, ip: str) -> None:
+        return None
+
+
+class _WorkerSink:
+    """Builds the protocol for one worker and drains what it produced.
+
+    ``wake`` is set once ``batch_max`` items are pending, so the serve
+    loop ships a full batch without waiting out the interval.
+    """
+
+    def __init__(self, kind: str, batch_max: int = 2_000) -> None:
+        self.kind = kind
+        self.batch_max = batch_max
+        self.wake = asyncio.Event()
+        if kind == "flow":
+            from .flow_receiver import FlowAggregator, FlowParser, FlowReceiverProtocol
+
+            self._aggregator = FlowAggregator()
+            self._protocol = FlowReceiverProtocol(FlowParser(), self._aggregator, columnar=True)
+            self.protocol_factory: Callable[[], asyncio.DatagramProtocol] = (
+                lambda: _NotifyingProtocol(self._protocol, self._check_full)
+            )
+        else:
+            if kind == "syslog":
+                from .collectors.syslog_listener import SyslogListener as listener_cls
+                from .collectors.syslog_listener import _SyslogDatagramProtocol as proto_cls
+            else:
+                from .collectors.trap_listener import SNMPTrapListener as listener_cls
+                from .collectors.trap_listener import _TrapDatagramProtocol as proto_cls
+            self._bus = _WorkerEventBus(self._check_full)
+            self._listener = listener_cls(self._bus, _NoDevices())
+            self.protocol_factory = lambda: proto_cls(self._listener)
+
+    def pending(self) -> int:
+        if self.kind == "flow":
+            return len(self._aggregator._buffer)
+        return len(self._bus.pending)
+
+    def _check_full(self) -> None:
+        if self.pending() >= self.batch_max:
+            self.wake.set()
+
+    def drain(self) -> list:
+        if self.kind == "flow":
+            import numpy as np
+
+            from .flow_columns import merge_flows
+
+            records, batches = self._aggregator._buffer.drain()
+            by_exporter: dict[str, list] = defaultdict(list)
+            for batch in batches:
+                by_exporter[batch.exporter_ip].append(batch.columns)
+            # Pre-aggregate so the parent only sums one row per flow key.
+            payload = [
+                (exporter, merge_flows(cols[0] if len(cols) == 1 else np.concatenate(cols)).tobytes())
+                for exporter, cols in by_exporter.items()
+            ]
+            if records:
+                # Scalar fallbacks are rare; ship them as-is.
+                payload.append((None, records))
+            return payload
+        events, self._bus.pending = self._bus.pending, []
+        return events
+
+    def stats(self) -> dict[str, int]:
+        if self.kind == "flow":
+            return {"received": self._protocol._count}
+        return self._listener.stats
+
+
+async def _serve(
+    kind: str, port: int, index: int, conn: Connection, stop: Any,
+    batch_interval: float, batch_max: int,
+) -> None:
+    sink = _WorkerSink(kind, batch_max)
+    loop = asyncio.get_running_loop()
+    try:
+        sock = reuseport_socket(port)
+    except OSError as exc:
+        conn.send(("error", index, str(exc), {}))
+        return
+    transport, _ = await loop.create_datagram_endpoint(sink.protocol_factory, sock=sock)
+    # The stop flag is a process-shared Event; a daemon thread blocks on it
+    # and wakes the loop, so the loop itself only waits on ``sink.wake``.
+    threading.Thread(
+        target=_wake_on_stop, args=(stop, loop, sink.wake), daemon=True,
+    ).start()
+    conn.send(("ready", index, None, {}))
+    try:
+        while not stop.is_set():
+            if sink.pending() < batch_max:
+                try:
+                    await asyncio.wait_for(sink.wake.wait(), batch_interval)
+                except asyncio.TimeoutError:
+                    pass
+            sink.wake.clear()
+            # Let publish tasks scheduled by the listener run before draining.
+            await asyncio.sleep(0)
+            payload = sink.drain()
+            if payload:
+                conn.send(("batch", index, payload, sink.stats()))
+    finally:
+        transport.close()
+        await asyncio.sleep(0)
+        conn.send(("batch", index, sink.drain(), sink.stats()))
+        conn.close()
+
+
+def _wake_on_stop(stop: Any, loop: asyncio.AbstractEventLoop, wake: asyncio.Event) -> None:
+    stop.wait()
+    try:
+        loop.call_soon_threadsafe(wake.set)
+    except RuntimeError:
+        # The worker loop already finished.
+        pass
+
+
+def _worker_main(
+    kind: str, port: int, index: int, conn: Connection, stop: Any,
+    batch_interval: float, batch_max: int,
+) -> None:
+    try:
+        asyncio.run(_serve(kind, port, index, conn, stop, batch_interval, batch_max))
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+# ── Parent side ───────────────────────────────────────────────────────
+
+
+class ReceiverWorkerPool:
+    """N worker processes receiving one UDP port through ``SO_REUSEPORT``.
+
+    ``on_batch`` is called on the parent's event loop with each worker
+    payload (a list of events, or of ``(exporter_ip, buffer)`` pairs for
+    flows).
+
+    Usage::
+
+        pool = ReceiverWorkerPool("syslog", 514, workers=4, on_batch=handle)
+        await pool.start()
+        ...
+        await pool.stop()
+    """
+
+    BATCH_INTERVAL = 0.2
+    BATCH_MAX = 2_000
+    START_TIMEOUT = 30.0
+    STOP_TIMEOUT = 5.0
+
+    def __init__(
+        self, kind: str, port: int, workers: int,
+        on_batch: Callable[[list], None],
+    ) -> None:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown receiver kind: {kind}")
+        self.kind = kind
+        self.port = port
+        self.workers = workers
+        self._on_batch = on_batch
+        self._ctx = multiprocessing.get_context("spawn")
+        self._stop = self._ctx.Event()
+        self._procs: list[Any] = []
+        self._conns: list[Connection] = []
+        self._worker_stats: dict[int, dict[str, int]] = {}
+        self._ready: dict[int, asyncio.Future] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return any(p.is_alive() for p in self._procs)
+
+    async def start(self) -> None:
+        """Spawn the workers and wait until each has bound the port.
+
+        Raises ``OSError`` if any worker fails to bind; the others are
+        stopped first.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        for index in range(self.workers):
+            parent_conn, child_conn = self._ctx.Pipe(duplex=False)
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(self.kind, self.port, index, child_conn, self._stop,
+                      self.BATCH_INTERVAL, self.BATCH_MAX),
+                name=f"{self.kind}-receiver-{index}",
+                daemon=True,
+            )
+            proc.start()
+            child_conn.close()
+            self._procs.append(proc)
+            self._conns.append(parent_conn)
+            self._ready[index] = self._loop.create_future()
+            self._loop.add_reader(parent_conn.fileno(), self._drain, parent_conn)
+        try:
+            await asyncio.wait_for(asyncio.gather(*self._ready.values()), self.START_TIMEOUT)
+        except BaseException:
+            await self.stop()
+            raise
+        logger.info(
+            "%s receiver: %d workers on UDP port %d (SO_REUSEPORT)",
+            self.kind, self.workers, self.port,
+        )
+
+    async def stop(self) -> None:
+        """Signal workers to flush and exit, then reap them."""
+        self._stop.set()
+        loop = asyncio.get_running_loop()
+        for proc in self._procs:
+            await loop.run_in_executor(None, proc.join, self.STOP_TIMEOUT)
+            if proc.is_alive():
+                proc.terminate()
+        # Deliver anything the workers flushed on their way out.
+        for conn in list(self._conns):
+            self._drain(conn)
+        for conn in self._conns:
+            self._remove_reader(conn)
+            conn.close()
+        self._procs.clear()
+        self._conns.clear()
+        self._ready.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Counters summed across workers."""
+        merged: dict[str, int] = defaultdict(int)
+        for worker in self._worker_stats.values():
+            for key, value in worker.items():
+                merged[key] += value
+        return dict(merged)
+
+    def _remove_reader(self, conn: Connection) -> None:
+        if self._loop is not None and not conn.closed:
+            try:
+                self._loop.remove_reader(conn.fileno())
+            except (ValueError, OSError):
+                pass
+
+    def _drain(self, conn: Connection) -> None:
+        try:
+            while not conn.closed and conn.poll():
+                kind, index, payload, stats = conn.recv()
+                if stats:
+                    self._worker_stats[index] = stats
+                if kind == "ready":
+                    self._resolve(index, None)
+                elif kind == "error":
+                    self._resolve(index, OSError(payload))
+                elif payload:
+                    try:
+                        self._on_batch(payload)
+                    except Exception as exc:
+                        logger.error("%s receiver batch handler failed: %s", self.kind, exc)
+        except (EOFError, OSError):
+            # Worker exited; stop watching its pipe.
+            self._remove_reader(conn)
+
+    def _resolve(self, index: int, exc: Exception | None) -> None:
+        fut = self._ready.get(index)
+        if fut is None or fut.done():
+            return
+        if exc is None:
+            fut.set_result(None)
+        else:
+            fut.set_exception(exc)
+
+
+def publish_worker_events(
+    events: list[dict[str, Any]],
+    instance_store: Any,
+    publish: Callable[[dict[str, Any]], Any],
+) -> None:
+    """Resolve ``device_id`` for events parsed by a worker and publish them.
+
+    Workers have no instance store, so syslog and trap listeners hand
+    their batches here on the parent loop; ``publish`` is the listener's
+    own ``_publish`` coroutine function.
+    """
+    loop = asyncio.get_running_loop()
+    for event in events:
+        try:
+            device = instance_store.get_device_by_ip(event["device_ip"])
+        except Exception as exc:
+            logger.debug("Device lookup failed for %s: %s", event["device_ip"], exc)
+            device = None
+        event["device_id"] = device.device_id if device else None
+        loop.create_task(publish(event))
+
+
+def worker_count(env_var: str, default: int = 0) -> int:
+    """Read a worker count from the environment (0 = in-process receiver)."""
+    raw = os.environ.get(env_var)
+    try:
+        return max(0, int(raw)) if raw else default
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", env_var, raw)
+        return default
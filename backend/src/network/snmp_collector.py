@@ -9,17 +9,10 @@ import time
 from dataclasses import dataclass, field
 from typing import Any
 
-logger = logging.getLogger(__name__)
+from .snmp_engine import PYSNMP_AVAILABLE as _PYSNMP_AVAILABLE
+from .snmp_engine import SNMPEngine, SNMPTarget, get_engine
 
-try:
-    from pysnmp.hlapi.v3arch.asyncio import (
-        bulk_cmd, SnmpEngine, CommunityData, UdpTransportTarget,
-        ContextData, ObjectType, ObjectIdentity, UsmUserData,
-        get_cmd,
-    )
-    _PYSNMP_AVAILABLE = True
-except ImportError:
-    _PYSNMP_AVAILABLE = False
+logger = logging.getLogger(__name__)
 
 STANDARD_OIDS = {
     "sysUpTime": "1.3.6.1.2.1.1.3.0",
@@ -56,12 +49,30 @@ class SNMPDeviceConfig:
     v3_priv_proto: str = ""
     v3_priv_key: str = ""
 
+    def target(self) -> SNMPTarget:
+        return SNMPTarget(
+            ip=self.ip, port=self.port,
+            version="v3" if self.version == "v3" else "v2c",
+            community=self.community, v3_user=self.v3_user,
+            v3_auth_protocol=self.v3_auth_proto, v3_auth_key=self.v3_auth_key,
+            v3_priv_protocol=self.v3_priv_proto, v3_priv_key=self.v3_priv_key,
+        )
+
+
+# Interface table columns walked together by _walk_interfaces
+INTERFACE_COLUMNS = {
+    name: STANDARD_OIDS[name]
+    for name in ("ifDescr", "ifOperStatus", "ifSpeed", "ifInOctets", "ifOutOctets",
+                 "ifInErrors", "ifOutErrors", "ifHCInOctets", "ifHCOutOctets")
+}
+
 
 class SNMPCollector:
     """Polls SNMP OIDs and writes metrics to MetricsStore."""
 
-    def __init__(self, metrics_store: Any) -> None:
+    def __init__(self, metrics_store: Any, engine: SNMPEngine | None = None) -> None:
         self.metrics = metrics_store
+        self._engine = engine or get_engine()
         self._prev_counters: dict[tuple[str, int], tuple[dict, float]] = {}
 
     @staticmethod
@@ -140,61 +151,17 @@ class SNMPCollector:
             logger.error("pysnmp-lextudio not installed")
             return {}
 
-        engine = SnmpEngine()
-        try:
-            target = UdpTransportTarget((cfg.ip, cfg.port), timeout=5, retries=1)
-            if cfg.version == "v3":
-                auth = UsmUserData(cfg.v3_user, cfg.v3_auth_key, cfg.v3_priv_key)
-            else:
-                auth = CommunityData(cfg.community, mpModel=1)
-
-            walk_oids = {
-                "ifDescr": "1.3.6.1.2.1.2.2.1.2",
-                "ifOperStatus": "1.3.6.1.2.1.2.2.1.8",
-                "ifSpeed": "1.3.6.1.2.1.2.2.1.5",
-                "ifInOctets": "1.3.6.1.2.1.2.2.1.10",
-                "ifOutOctets": "1.3.6.1.2.1.2.2.1.16",
-                "ifInErrors": "1.3.6.1.2.1.2.2.1.14",
-                "ifOutErrors": "1.3.6.1.2.1.2.2.1.20",
-                "ifHCInOctets": "1.3.6.1.2.1.31.1.1.1.6",
-                "ifHCOutOctets": "1.3.6.1.2.1.31.1.1.1.10",
-            }
-
-            interfaces: dict[int, dict] = {}
-
-            for name, base_oid in walk_oids.items():
-                marker = base_oid
-                while True:
-                    try:
-                        err_indication, err_status, err_index, var_binds = await bulk_cmd(
-                            engine, auth, target, ContextData(),
-                            0, 25,
-                            ObjectType(ObjectIdentity(marker)),
-                        )
-                    except Exception:
-                        break
-                    if err_indication or err_status:
-                        break
-                    out_of_subtree = False
-                    for var_bind_row in var_binds:
-                        for oid, val in var_bind_row:
-                            oid_str = str(oid)
-                            if not oid_str.startswith(base_oid):
-                                out_of_subtree = True
-                                break
-                            if_index = int(oid_str.split(".")[-1])
-                            if if_index not in interfaces:
-                                interfaces[if_index] = {}
-                            interfaces[if_index][name] = int(val) if name != "ifDescr" else str(val)
-                            marker = oid_str
-                        if out_of_subtree:
-                            break
-                    if out_of_subtree:
-                        break
-
-            return interfaces
-        finally:
-            engine.close_dispatcher()
+        columns = await self._engine.bulk_walk(cfg.target(), INTERFACE_COLUMNS)
+        interfaces: dict[int, dict] = {}
+        for name, rows in columns.items():
+            for index, val in rows.items():
+                try:
+                    if_index = int(index)
+                    value = str(val) if name == "ifDescr" else int(val)
+                except (ValueError, TypeError):
+                    continue
+                interfaces.setdefault(if_index, {})[name] = value
+        return interfaces
 
     async def _safe_walk_interfaces(self, cfg: SNMPDeviceConfig) -> dict[int, dict]:
         """Walk interfaces with timeout protection."""
@@ -212,31 +179,20 @@ class SNMPCollector:
             logger.error("pysnmp not installed — pip install pysnmp-lextudio")
             return {}
 
-        engine = SnmpEngine()
-        target = await UdpTransportTarget.create((cfg.ip, cfg.port), timeout=5, retries=1)
-
-        if cfg.version == "v2c":
-            auth = CommunityData(cfg.community, mpModel=1)
-        else:
-            auth = UsmUserData(cfg.v3_user, cfg.v3_auth_key, cfg.v3_priv_key)
-
         result: dict[str, Any] = {"interfaces": {}}
 
-        # System scalars
-        for name, oid in [
-            ("cpu_pct", STANDARD_OIDS["hrProcessorLoad"]),
-            ("mem_total", STANDARD_OIDS["memTotalReal"]),
-            ("mem_avail", STANDARD_OIDS["memAvailReal"]),
-        ]:
-            err_indication, err_status, _, var_binds = await get_cmd(
-                engine, auth, target, ContextData(),
-                ObjectType(ObjectIdentity(oid)),
-            )
-            if not err_indication and not err_status and var_binds:
-                val = var_binds[0][1]
+        # System scalars, in one GET
+        scalars = {
+            "cpu_pct": STANDARD_OIDS["hrProcessorLoad"],
+            "mem_total": STANDARD_OIDS["memTotalReal"],
+            "mem_avail": STANDARD_OIDS["memAvailReal"],
+        }
+        values = await self._engine.get(cfg.target(), list(scalars.values()))
+        for name, oid in scalars.items():
+            if oid in values:
+                val = values[oid]
                 result[name] = float(val) if hasattr(val, "__float__") else 0.0
 
-        engine.close_dispatcher()
         result["interfaces"] = await self._safe_walk_interfaces(cfg)
         return result
 
@@ -270,61 +226,24 @@ class SNMPCollector:
 
     async def walk_arp_table(self, cfg: SNMPDeviceConfig) -> list[dict]:
         """BULKWALK ipNetToMediaTable. Returns [{ip, mac, type, device_id}]."""
-        try:
-            from pysnmp.hlapi.v3arch.asyncio import (
-                bulk_cmd, SnmpEngine, CommunityData, UdpTransportTarget,
-                ContextData, ObjectType, ObjectIdentity, UsmUserData,
-            )
-        except ImportError:
+        if not _PYSNMP_AVAILABLE:
             logger.error("pysnmp-lextudio not installed")
             return []
 
-        engine = SnmpEngine()
-        target = UdpTransportTarget((cfg.ip, cfg.port), timeout=5, retries=1)
-        if cfg.version == "v3":
-            auth = UsmUserData(cfg.v3_user, cfg.v3_auth_key, cfg.v3_priv_key)
-        else:
-            auth = CommunityData(cfg.community, mpModel=1)
-
-        base_oid = STANDARD_OIDS["ipNetToMediaPhysAddress"]
+        columns = await self._engine.bulk_walk(
+            cfg.target(), {"mac": STANDARD_OIDS["ipNetToMediaPhysAddress"]},
+        )
         entries: list[dict] = []
-        marker = base_oid
-
-        while True:
-            try:
-                err_indication, err_status, err_index, var_binds = await bulk_cmd(
-                    engine, auth, target, ContextData(),
-                    0, 25,
-                    ObjectType(ObjectIdentity(marker)),
-                )
-            except Exception:
-                break
-            if err_indication or err_status:
-                break
-            out_of_subtree = False
-            for var_bind_row in var_binds:
-                for oid, val in var_bind_row:
-                    oid_str = str(oid)
-                    if not oid_str.startswith(base_oid):
-                        out_of_subtree = True
-                        break
-                    # OID format: base_oid.ifIndex.ip1.ip2.ip3.ip4
-                    parts = oid_str[len(base_oid) + 1:].split(".")
-                    if len(parts) >= 5:
-                        ip_addr = ".".join(parts[1:5])
-                        mac_hex = val.prettyPrint() if hasattr(val, "prettyPrint") else str(val)
-                        entries.append({
-                            "ip": ip_addr,
-                            "mac": mac_hex,
-                            "type": "dynamic",
-                            "device_id": cfg.device_id,
-                        })
-                    marker = oid_str
-                if out_of_subtree:
-                    break
-            if out_of_subtree:
-                break
-
+        for index, val in columns["mac"].items():
+            # Row index format: ifIndex.ip1.ip2.ip3.ip4
+            parts = index.split(".")
+            if len(parts) >= 5:
+                entries.append({
+                    "ip": ".".join(parts[1:5]),
+                    "mac": val.prettyPrint() if hasattr(val, "prettyPrint") else str(val),
+                    "type": "dynamic",
+                    "device_id": cfg.device_id,
+                })
         return entries
 
     _MAX_CONCURRENT = 10
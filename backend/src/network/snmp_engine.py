@@ -0,0 +1,384 @@
+"""Shared SNMP request engine: one pysnmp engine, many devices.
+
+Collectors used to build a fresh ``SnmpEngine`` and transport target for
+every OID they queried, paying engine setup (and SNMPv3 discovery) per
+round trip and walking tables one column at a time. ``SNMPEngine`` keeps
+one pysnmp engine per process (per event loop) and a session per device:
+
+- ``get`` packs scalar OIDs into as few GET PDUs as the estimated message
+  size allows. An agent answering ``tooBig`` gets the batch split in half,
+  and the smaller limit is remembered for that device.
+- ``bulk_walk`` walks several table columns with one GETBULK per step
+  (GETNEXT for SNMPv1). Each column advances on its own and stops when it
+  leaves its subtree.
+- Requests from all devices share a bound on in-flight PDUs and an
+  optional rate limit, so collectors can fan out across devices freely.
+- Each device's request count, timeouts, errors and RTT are kept in
+  ``DeviceStats``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pysnmp.hlapi.v3arch.asyncio import (
+        CommunityData,
+        ContextData,
+        ObjectIdentity,
+        ObjectType,
+        SnmpEngine,
+        UdpTransportTarget,
+        UsmUserData,
+        bulk_cmd,
+        get_cmd,
+        next_cmd,
+        usmAesCfb128Protocol,
+        usmDESPrivProtocol,
+        usmHMACMD5AuthProtocol,
+        usmHMACSHAAuthProtocol,
+    )
+    PYSNMP_AVAILABLE = True
+except ImportError:
+    PYSNMP_AVAILABLE = False
+
+# Largest message an agent is assumed to accept/return (Ethernet UDP payload)
+DEFAULT_MAX_MESSAGE_SIZE = 1472
+# Rough per-PDU header cost and per-value allowance used when packing OIDs
+_HEADER_BYTES = {"v3": 128}
+_DEFAULT_HEADER_BYTES = 64
+_VALUE_ALLOWANCE = 24
+
+_END_OF_COLUMN = ("NoSuchObject", "NoSuchInstance", "EndOfMibView")
+_RTT_ALPHA = 0.2
+
+
+@dataclass(frozen=True)
+class SNMPTarget:
+    """Address and credentials of one SNMP agent; doubles as the session key."""
+
+    ip: str
+    port: int = 161
+    version: str = "v2c"  # "v1" | "v2c" | "v3"
+    community: str = "public"
+    v3_user: str = ""
+    v3_auth_protocol: str = ""  # "MD5" | "SHA"
+    v3_auth_key: str = ""
+    v3_priv_protocol: str = ""  # "DES" | "AES"
+    v3_priv_key: str = ""
+    timeout: float = 5.0
+    retries: int = 1
+
+
+@dataclass
+class DeviceStats:
+    requests: int = 0
+    timeouts: int = 0
+    errors: int = 0
+    oids: int = 0
+    last_rtt_ms: float = 0.0
+    avg_rtt_ms: float = 0.0
+    max_oids_per_pdu: int = 0  # learned once an agent reports tooBig
+
+
+@dataclass
+class _Session:
+    target: SNMPTarget
+    stats: DeviceStats = field(default_factory=DeviceStats)
+    too_big_at: int = 0  # smallest GET size the agent rejected as tooBig
+    auth: Any = None
+    transport: Any = None
+
+
+def is_value(value: Any) -> bool:
+    """False for the noSuchObject / noSuchInstance / endOfMibView markers."""
+    return value is not None and type(value).__name__ not in _END_OF_COLUMN
+
+
+def _oid_tuple(oid: str) -> tuple[int, ...]:
+    return tuple(int(arc) for arc in oid.split(".") if arc)
+
+
+def _status_name(error_status: Any) -> str:
+    pretty = getattr(error_status, "prettyPrint", None)
+    return pretty() if pretty else str(error_status)
+
+
+def _flatten(var_binds: Any) -> list[tuple[str, Any]]:
+    """``(oid, value)`` pairs from a flat var-bind list or a table of rows."""
+    pairs = []
+    for item in var_binds or ():
+        for var_bind in (item if isinstance(item, list) else (item,)):
+            pairs.append((str(var_bind[0]), var_bind[1]))
+    return pairs
+
+
+class SNMPEngine:
+    """Process-wide SNMP client shared by the SNMP collectors.
+
+    ``max_inflight`` bounds outstanding PDUs across all devices and
+    ``rate_limit`` (PDUs per second, 0 for none) paces them.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 64,
+        rate_limit: float = 0.0,
+        max_message_size: int = DEFAULT_MAX_MESSAGE_SIZE,
+    ) -> None:
+        self._max_inflight = max_inflight
+        self._interval = 1.0 / rate_limit if rate_limit > 0 else 0.0
+        self._max_message_size = max_message_size
+        self._sessions: dict[SNMPTarget, _Session] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: Optional[asyncio.Semaphore] = None
+        self._next_slot = 0.0
+        self._snmp_engine: Any = None
+
+    # ── Public API ──
+
+    async def get(self, target: SNMPTarget, oids: Sequence[str]) -> dict[str, Any]:
+        """GET many scalar OIDs; returns ``{oid: value}`` for those that exist."""
+        session = self._session(target)
+        results: dict[str, Any] = {}
+        batches = self._pack(session, list(dict.fromkeys(oids)))
+        await asyncio.gather(*(self._get_batch(session, batch, results) for batch in batches))
+        return results
+
+    async def bulk_walk(
+        self, target: SNMPTarget, columns: dict[str, str], max_repetitions: int = 25,
+    ) -> dict[str, dict[str, Any]]:
+        """Walk table columns together; returns ``{name: {row_index: value}}``.
+
+        ``columns`` maps a name to a column OID. Row indexes are the OID
+        suffix below the column (``"3"`` for ifIndex 3, ``"1.10.0.0.1"`` for
+        an ipNetToMedia row).
+        """
+        session = self._session(target)
+        rows: dict[str, dict[str, Any]] = {name: {} for name in columns}
+        cursors = {name: (oid, _oid_tuple(oid)) for name, oid in columns.items()}
+        repetitions = max(1, max_repetitions)
+        while cursors:
+            names = list(cursors)
+            error_indication, error_status, _, var_binds = await self._request(
+                session, self._send_bulk, [cursors[n][0] for n in names], repetitions,
+            )
+            if error_indication:
+                break
+            if error_status:
+                if _status_name(error_status) == "tooBig" and repetitions > 1:
+                    repetitions //= 2
+                    continue
+                break
+            advanced = set()
+            for i, (oid, value) in enumerate(var_binds):
+                name = names[i % len(names)]
+                if name not in cursors:
+                    continue
+                base = columns[name]
+                key = _oid_tuple(oid)
+                if not is_value(value) or not oid.startswith(base + ".") or key <= cursors[name][1]:
+                    del cursors[name]
+                    continue
+                rows[name][oid[len(base) + 1:]] = value
+                cursors[name] = (oid, key)
+                advanced.add(name)
+            for name in names:
+                if name in cursors and name not in advanced:
+                    del cursors[name]
+        return rows
+
+    def device_stats(self, ip: Optional[str] = None) -> dict[str, dict]:
+        """Per-device request stats keyed by ``ip:port`` (optionally one IP)."""
+        return {
+            f"{s.target.ip}:{s.target.port}": asdict(s.stats)
+            for s in self._sessions.values()
+            if ip is None or s.target.ip == ip
+        }
+
+    def close(self) -> None:
+        """Release the pysnmp dispatcher; the next request starts a new one."""
+        if self._snmp_engine is not None:
+            try:
+                self._snmp_engine.close_dispatcher()
+            except Exception as e:
+                logger.debug("Closing SNMP dispatcher failed: %s", e)
+        self._snmp_engine = None
+        for session in self._sessions.values():
+            session.transport = None
+
+    # ── Internal ──
+
+    def _session(self, target: SNMPTarget) -> _Session:
+        session = self._sessions.get(target)
+        if session is None:
+            session = self._sessions[target] = _Session(target)
+        return session
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # pysnmp's dispatcher and the semaphore belong to one event loop
+            self.close()
+            self._loop = loop
+            self._inflight = asyncio.Semaphore(self._max_inflight)
+            self._next_slot = 0.0
+
+    def _pack(self, session: _Session, oids: list[str]) -> list[list[str]]:
+        """Split OIDs into GET batches that fit the agent's message size."""
+        budget = self._max_message_size - _HEADER_BYTES.get(session.target.version, _DEFAULT_HEADER_BYTES)
+        limit = session.stats.max_oids_per_pdu or (session.too_big_at - 1 if session.too_big_at else len(oids))
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        size = 0
+        for oid in oids:
+            cost = oid.count(".") + 5 + _VALUE_ALLOWANCE
+            if batch and (size + cost > budget or len(batch) >= limit):
+                batches.append(batch)
+                batch, size = [], 0
+            batch.append(oid)
+            size += cost
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _get_batch(self, session: _Session, oids: list[str], results: dict[str, Any]) -> None:
+        error_indication, error_status, error_index, var_binds = await self._request(
+            session, self._send_get, oids,
+        )
+        if error_indication:
+            return
+        if error_status:
+            status = _status_name(error_status)
+            if status == "tooBig" and len(oids) > 1:
+                session.too_big_at = min(session.too_big_at or len(oids), len(oids))
+                stats = session.stats
+                stats.max_oids_per_pdu = min(stats.max_oids_per_pdu, session.too_big_at - 1)
+                half = len(oids) // 2
+                await asyncio.gather(
+                    self._get_batch(session, oids[:half], results),
+                    self._get_batch(session, oids[half:], results),
+                )
+            elif status == "noSuchName" and 0 < int(error_index or 0) <= len(oids):
+                # SNMPv1 fails the whole PDU on one missing OID; retry without it
+                rest = oids[:int(error_index) - 1] + oids[int(error_index):]
+                if rest:
+                    await self._get_batch(session, rest, results)
+            return
+        if len(oids) < session.too_big_at:
+            # Largest PDU known to fit below the smallest one that did not
+            session.stats.max_oids_per_pdu = max(session.stats.max_oids_per_pdu, len(oids))
+        # Responses preserve request order, whatever form the agent echoes OIDs in
+        for oid, (_, value) in zip(oids, var_binds):
+            if is_value(value):
+                results[oid] = value
+
+    async def _request(self, session: _Session, send, *args) -> tuple:
+        """Send one PDU under the shared limits and record its outcome."""
+        self._bind_loop()
+        stats = session.stats
+        async with self._inflight:
+            await self._throttle()
+            started = time.monotonic()
+            try:
+                error_indication, error_status, error_index, var_binds = await send(session, *args)
+            except Exception as e:
+                error_indication, error_status, error_index, var_binds = str(e), None, None, []
+            rtt_ms = (time.monotonic() - started) * 1000
+        stats.requests += 1
+        stats.oids += len(args[0])
+        if error_indication:
+            if "timeout" in str(error_indication).lower():
+                stats.timeouts += 1
+            else:
+                stats.errors += 1
+            logger.debug("SNMP request to %s failed: %s", session.target.ip, error_indication)
+        else:
+            if error_status and _status_name(error_status) != "tooBig":
+                stats.errors += 1
+            stats.last_rtt_ms = rtt_ms
+            stats.avg_rtt_ms = (rtt_ms if not stats.avg_rtt_ms
+                                else (1 - _RTT_ALPHA) * stats.avg_rtt_ms + _RTT_ALPHA * rtt_ms)
+        return error_indication, error_status, error_index, var_binds
+
+    async def _throttle(self) -> None:
+        if not self._interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    # pysnmp transport; tests replace these two methods
+
+    async def _send_get(self, session: _Session, oids: list[str]) -> tuple:
+        engine, auth, transport = await self._pysnmp_session(session)
+        error_indication, error_status, error_index, var_binds = await get_cmd(
+            engine, auth, transport, ContextData(),
+            *(ObjectType(ObjectIdentity(oid)) for oid in oids),
+            lookupMib=False,
+        )
+        return error_indication, error_status, error_index, _flatten(var_binds)
+
+    async def _send_bulk(self, session: _Session, oids: list[str], repetitions: int) -> tuple:
+        engine, auth, transport = await self._pysnmp_session(session)
+        var_types = [ObjectType(ObjectIdentity(oid)) for oid in oids]
+        if session.target.version == "v1":
+            # No GETBULK in SNMPv1: one GETNEXT row per step
+            result = await next_cmd(engine, auth, transport, ContextData(), *var_types, lookupMib=False)
+        else:
+            result = await bulk_cmd(
+                engine, auth, transport, ContextData(), 0, repetitions, *var_types, lookupMib=False,
+            )
+        error_indication, error_status, error_index, var_binds = result
+        return error_indication, error_status, error_index, _flatten(var_binds)
+
+    async def _pysnmp_session(self, session: _Session) -> tuple:
+        if not PYSNMP_AVAILABLE:
+            raise RuntimeError("pysnmp not installed — pip install pysnmp-lextudio")
+        if self._snmp_engine is None:
+            self._snmp_engine = SnmpEngine()
+        target = session.target
+        if session.auth is None:
+            session.auth = _auth_data(target)
+        if session.transport is None:
+            session.transport = await UdpTransportTarget.create(
+                (target.ip, target.port), timeout=target.timeout, retries=target.retries,
+            )
+        return self._snmp_engine, session.auth, session.transport
+
+
+def _auth_data(target: SNMPTarget) -> Any:
+    if target.version == "v3":
+        auth_proto = {"MD5": usmHMACMD5AuthProtocol}.get(
+            target.v3_auth_protocol.upper(), usmHMACSHAAuthProtocol)
+        priv_proto = {"DES": usmDESPrivProtocol}.get(
+            target.v3_priv_protocol.upper(), usmAesCfb128Protocol)
+        return UsmUserData(
+            target.v3_user, target.v3_auth_key or None, target.v3_priv_key or None,
+            authProtocol=auth_proto if target.v3_auth_key else None,
+            privProtocol=priv_proto if target.v3_priv_key else None,
+        )
+    return CommunityData(target.community, mpModel=0 if target.version == "v1" else 1)
+
+
+_engine: Optional[SNMPEngine] = None
+
+
+def get_engine() -> SNMPEngine:
+    """The process-wide engine, configured from ``SNMP_MAX_INFLIGHT`` / ``SNMP_RATE_LIMIT``."""
+    global _engine
+    if _engine is None:
+        _engine = SNMPEngine(
+            max_inflight=int(os.getenv("SNMP_MAX_INFLIGHT", "64")),
+            rate_limit=float(os.getenv("SNMP_RATE_LIMIT", "0")),
+        )
+    return _engine
@@ -133,6 +133,18 @@ class SQLiteMetricsStore:
         )
         conn.commit()
 
+    def write_probe_metrics(self, probes: list[tuple[str, str, float, float, str]]) -> None:
+        """Bulk insert of (target_ip, probe_type, latency_ms, packet_loss_pct, status)."""
+        if not probes:
+            return
+        now = time.time()
+        conn = self._get_conn()
+        conn.executemany(
+            "INSERT INTO probe_metrics (timestamp, target_ip, probe_type, latency_ms, packet_loss_pct, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [(now, *probe) for probe in probes]
+        )
+        conn.commit()
+
     def write_event(self, device_id: str, source_ip: str, event_type: str, severity: str, message: str, raw_data: str = "") -> int:
         conn = self._get_conn()
         cursor = conn.execute(
@@ -2,11 +2,13 @@
 import sqlite3
 import hashlib
 import json
+import logging
 import os
 import queue
 import threading
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Callable, Optional
 from cachetools import TTLCache
 from .models import (
     Device, DeviceType, Interface, Subnet, Zone, Workload,
@@ -23,7 +25,12 @@ from .models import (
     VRF, Region, Site, AddressBlock,
     CloudAccount, CloudInterface,
 )
+from .metric_history_store import MetricHistoryStore, auto_step
+from .policy_index import NACLPolicy
 from src.integrations.credential_resolver import get_credential_resolver
+from src.utils.lttb import MAX_POINTS
+
+logger = logging.getLogger(__name__)
 
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "network.db")
 
@@ -38,8 +45,12 @@ class TopologyStore:
         self._cache_lock = threading.Lock()
         self._cache = TTLCache(maxsize=64, ttl=10)
         self._cache_lock = threading.Lock()
+        self._change_listener: Optional[Callable[[str, str, str], None]] = None
+        # Compiled NACL policies live until their rules change, not on the TTL.
+        self._nacl_policies: dict[str, NACLPolicy] = {}
         self._init_tables()
         self._migrate_tables()
+        self.metric_history = MetricHistoryStore(self._conn, self._return_conn)
 
     def _invalidate_cache(self, *keys):
         """Remove one or more keys from the in-memory cache."""
@@ -47,6 +58,23 @@ class TopologyStore:
             for key in keys:
                 self._cache.pop(key, None)
 
+    def set_change_listener(self, listener: Optional[Callable[[str, str, str], None]]) -> None:
+        """Register ``listener(entity_type, entity_id, event_type)`` for topology writes.
+
+        Called after each device, interface, route and neighbor-link write
+        commits. Pass ``None`` to detach.
+        """
+        self._change_listener = listener
+
+    def _notify_change(self, entity_type: str, entity_id: str, event_type: str) -> None:
+        listener = self._change_listener
+        if listener is None:
+            return
+        try:
+            listener(entity_type, entity_id, event_type)
+        except Exception:
+            logger.warning("Change listener failed for %s %s", entity_type, entity_id, exc_info=True)
+
     def _conn(self) -> sqlite3.Connection:
         """Get a connection from the pool or create a new one."""
         try:
@@ -280,16 +308,6 @@ class TopologyStore:
                     updated_at TEXT,
                     PRIMARY KEY (src_device_id, dst_device_id)
                 );
-                CREATE TABLE IF NOT EXISTS metric_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entity_type TEXT NOT NULL,
-                    entity_id TEXT NOT NULL,
-                    metric TEXT NOT NULL,
-                    value REAL NOT NULL,
-                    recorded_at TEXT NOT NULL
-                );
-                CREATE INDEX IF NOT EXISTS idx_metric_history_entity
-                    ON metric_history(entity_type, entity_id, recorded_at);
                 CREATE TABLE IF NOT EXISTS drift_events (
                     id TEXT PRIMARY KEY,
                     entity_type TEXT NOT NULL,
@@ -654,6 +672,7 @@ class TopologyStore:
         finally:
             conn.close()
         self._invalidate_cache("list_devices")
+        self._notify_change("device", device.id, "updated")
 
     def get_device(self, device_id: str) -> Optional[Device]:
         conn = self._conn()
@@ -753,6 +772,7 @@ class TopologyStore:
         finally:
             conn.close()
         self._invalidate_cache("list_devices", f"list_interfaces:{device_id}", "list_device_statuses")
+        self._notify_change("device", device_id, "deleted")
 
     def clear_all_devices(self) -> int:
         """Remove all devices and cascading data. Returns count of devices removed."""
@@ -783,6 +803,7 @@ class TopologyStore:
         finally:
             conn.close()
         self._invalidate_cache("list_devices")
+        self._notify_change("device", device_id, "updated")
         return self.get_device(device_id)
 
     # ── Subnet CRUD ──
@@ -2540,6 +2561,7 @@ class TopologyStore:
         finally:
             conn.close()
         self._invalidate_cache(f"list_interfaces:{iface.device_id}")
+        self._notify_change("interface", iface.id, "updated")
 
     def list_interfaces(self, device_id: Optional[str] = None) -> list[Interface]:
         cache_key = f"list_interfaces:{device_id}"
@@ -2560,6 +2582,30 @@ class TopologyStore:
         finally:
             self._return_conn(conn)
 
+    def list_interfaces_by_device(self) -> dict[str, list[Interface]]:
+        """All interfaces of existing devices, grouped by device_id in one query."""
+        conn = self._conn()
+        try:
+            rows = conn.execute(
+                "SELECT i.* FROM interfaces i JOIN devices d ON d.id = i.device_id "
+                "ORDER BY i.rowid"
+            ).fetchall()
+            grouped: dict[str, list[Interface]] = {}
+            for r in rows:
+                iface = Interface(**dict(r))
+                grouped.setdefault(iface.device_id, []).append(iface)
+            return grouped
+        finally:
+            conn.close()
+
+    def get_interface(self, interface_id: str) -> Optional[Interface]:
+        conn = self._conn()
+        try:
+            row = conn.execute("SELECT * FROM interfaces WHERE id=?", (interface_id,)).fetchone()
+            return Interface(**dict(row)) if row else None
+        finally:
+            conn.close()
+
     def find_interface_by_ip(self, ip: str) -> Optional[Interface]:
         conn = self._conn()
         try:
@@ -2581,6 +2627,7 @@ class TopologyStore:
             conn.close()
         if device_id:
             self._invalidate_cache(f"list_interfaces:{device_id}")
+        self._notify_change("interface", interface_id, "deleted")
 
     # ── Zone CRUD ──
     def add_zone(self, zone: Zone) -> None:
@@ -2624,6 +2671,7 @@ class TopologyStore:
             conn.commit()
         finally:
             conn.close()
+        self._notify_change("route", route.id, "updated")
 
     def bulk_add_routes(self, routes: list[Route]) -> None:
         conn = self._conn()
@@ -2636,6 +2684,8 @@ class TopologyStore:
             conn.commit()
         finally:
             conn.close()
+        for r in routes:
+            self._notify_change("route", r.id, "updated")
 
     def list_routes(self, device_id: Optional[str] = None) -> list[Route]:
         conn = self._conn()
@@ -2648,6 +2698,14 @@ class TopologyStore:
         finally:
             conn.close()
 
+    def get_route(self, route_id: str) -> Optional[Route]:
+        conn = self._conn()
+        try:
+            row = conn.execute("SELECT * FROM routes WHERE id=?", (route_id,)).fetchone()
+            return Route(**dict(row)) if row else None
+        finally:
+            conn.close()
+
     def delete_route(self, route_id: str) -> None:
         conn = self._conn()
         try:
@@ -2655,6 +2713,7 @@ class TopologyStore:
             conn.commit()
         finally:
             conn.close()
+        self._notify_change("route", route_id, "deleted")
 
     # ── NAT Rule CRUD ──
     def add_nat_rule(self, rule: NATRule) -> None:
@@ -3704,6 +3763,8 @@ class TopologyStore:
             conn.commit()
         finally:
             conn.close()
+        # REPLACE deletes the old row, cascading to its rules.
+        self._invalidate_nacl_policy(nacl.id)
 
     def list_nacls(self, vpc_id: Optional[str] = None) -> list[NACL]:
         conn = self._conn()
@@ -3729,6 +3790,7 @@ class TopologyStore:
             conn.commit()
         finally:
             conn.close()
+        self._invalidate_nacl_policy(rule.nacl_id)
 
     def list_nacl_rules(self, nacl_id: str) -> list[NACLRule]:
         conn = self._conn()
@@ -3741,6 +3803,21 @@ class TopologyStore:
         finally:
             conn.close()
 
+    def get_nacl_policy(self, nacl_id: str) -> NACLPolicy:
+        """Compiled rules for one NACL, cached until its rules change."""
+        with self._cache_lock:
+            cached = self._nacl_policies.get(nacl_id)
+        if cached is not None:
+            return cached
+        policy = NACLPolicy(self.list_nacl_rules(nacl_id))
+        with self._cache_lock:
+            self._nacl_policies[nacl_id] = policy
+        return policy
+
+    def _invalidate_nacl_policy(self, nacl_id: str) -> None:
+        with self._cache_lock:
+            self._nacl_policies.pop(nacl_id, None)
+
     # ── Load Balancer CRUD ──
     def add_load_balancer(self, lb: LoadBalancer) -> None:
         conn = self._conn()
@@ -3942,32 +4019,49 @@ class TopologyStore:
 
     def upsert_device_status(self, device_id: str, status: str, latency_ms: float,
                               packet_loss: float, probe_method: str) -> None:
+        self.upsert_device_statuses([(device_id, status, latency_ms, packet_loss, probe_method)])
+
+    def upsert_device_statuses(self, statuses: list[tuple[str, str, float, float, str]]) -> None:
+        """Bulk upsert of (device_id, status, latency_ms, packet_loss, probe_method)."""
+        self.write_monitor_batch(statuses, [])
+
+    def write_monitor_batch(self, statuses: list[tuple[str, str, float, float, str]],
+                            samples: list[tuple[str, str, str, float, str]]) -> None:
+        """Device statuses and metric history rows in one transaction.
+
+        ``statuses`` are (device_id, status, latency_ms, packet_loss,
+        probe_method); ``last_status_change`` only moves when a device's
+        status differs from the stored one. ``samples`` are (entity_type,
+        entity_id, metric, value, epoch seconds).
+        """
+        if not statuses and not samples:
+            return
         conn = self._conn()
         try:
             now = datetime.now(timezone.utc).isoformat()
-            existing = conn.execute(
-                "SELECT status, last_status_change FROM device_status WHERE device_id=?",
-                (device_id,),
-            ).fetchone()
-            if existing:
-                last_change = existing["last_status_change"]
-                if existing["status"] != status:
-                    last_change = now
-                conn.execute(
-                    "UPDATE device_status SET status=?, latency_ms=?, packet_loss=?, "
-                    "last_seen=?, last_status_change=?, probe_method=?, updated_at=? "
-                    "WHERE device_id=?",
-                    (status, latency_ms, packet_loss, now, last_change, probe_method, now, device_id),
-                )
-            else:
-                conn.execute(
-                    "INSERT INTO device_status VALUES (?,?,?,?,?,?,?,?)",
-                    (device_id, status, latency_ms, packet_loss, now, now, probe_method, now),
+            if statuses:
+                conn.executemany(
+                    "INSERT INTO device_status (device_id, status, latency_ms, packet_loss, last_seen, "
+                    "last_status_change, probe_method, updated_at) VALUES (?,?,?,?,?,?,?,?) "
+                    "ON CONFLICT(device_id) DO UPDATE SET status=excluded.status, "
+                    "latency_ms=excluded.latency_ms, packet_loss=excluded.packet_loss, "
+                    "last_seen=excluded.last_seen, "
+                    "last_status_change=CASE WHEN device_status.status != excluded.status "
+                    "THEN excluded.last_status_change ELSE device_status.last_status_change END, "
+                    "probe_method=excluded.probe_method, updated_at=excluded.updated_at",
+                    [(device_id, status, latency_ms, packet_loss, now, now, probe_method, now)
+                     for device_id, status, latency_ms, packet_loss, probe_method in statuses],
                 )
+            if samples:
+                self.metric_history.append(samples, conn=conn)
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
         finally:
-            conn.close()
-        self._invalidate_cache("list_device_statuses")
+            self._return_conn(conn)
+        if statuses:
+            self._invalidate_cache("list_device_statuses")
 
     def get_device_status(self, device_id: str):
         conn = self._conn()
@@ -4037,96 +4131,68 @@ class TopologyStore:
     # ── Metric History ──
 
     def append_metric(self, entity_type: str, entity_id: str, metric: str, value: float) -> None:
-        conn = self._conn()
-        try:
-            now = datetime.now(timezone.utc).isoformat()
-            conn.execute(
-                "INSERT INTO metric_history (entity_type, entity_id, metric, value, recorded_at) VALUES (?,?,?,?,?)",
-                (entity_type, entity_id, metric, value, now),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        self.metric_history.append([(entity_type, entity_id, metric, value, time.time())])
+
+    def append_metrics(self, samples: list[tuple[str, str, str, float]]) -> None:
+        """Bulk append of (entity_type, entity_id, metric, value), one transaction."""
+        now = time.time()
+        self.write_monitor_batch([], [(*sample, now) for sample in samples])
 
     def query_metric_history(self, entity_type: str, entity_id: str, metric: str,
-                              since: str) -> list:
-        conn = self._conn()
-        try:
-            rows = conn.execute(
-                "SELECT * FROM metric_history WHERE entity_type=? AND entity_id=? AND metric=? "
-                "AND recorded_at>=? ORDER BY recorded_at",
-                (entity_type, entity_id, metric, since),
-            ).fetchall()
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+                              since: str, until: str | None = None,
+                              resolution: str = "raw", max_points: int = MAX_POINTS) -> list:
+        """Samples of one series from ``since`` (ISO-8601), oldest first.
+
+        ``resolution`` is ``raw``, ``1m``, ``1h`` or ``auto``; rollup points
+        add ``min``, ``max`` and ``count`` and carry the bucket mean as
+        ``value``. ``auto`` reads raw samples for windows up to an hour and
+        otherwise the coarsest-needed rollup for at most ``max_points``.
+        """
+        steps = {"raw": 0, "1m": 60, "1h": 3600}
+        if resolution == "auto":
+            step = auto_step(since, until, max_points)
+        elif resolution in steps:
+            step = steps[resolution]
+        else:
+            raise ValueError(f"Unknown resolution {resolution!r}")
+        if not step:
+            return self.metric_history.query(entity_type, entity_id, metric, since, until)
+        return self.metric_history.rollup(entity_type, entity_id, metric, since, until, step)
 
     def add_metric_history(self, device_id: str, timestamp: float, metrics: dict) -> None:
         """Store a snapshot of device metrics (convenience wrapper over append_metric)."""
-        conn = self._conn()
-        try:
-            ts = datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
-            for metric_name, value in metrics.items():
-                conn.execute(
-                    "INSERT INTO metric_history (entity_type, entity_id, metric, value, recorded_at) VALUES (?,?,?,?,?)",
-                    ("device", device_id, metric_name, float(value), ts),
-                )
-            conn.commit()
-        finally:
-            conn.close()
+        self.metric_history.append(
+            [("device", device_id, metric_name, value, timestamp) for metric_name, value in metrics.items()]
+        )
 
     def aggregate_device_metrics(self, device_ids: list[str]) -> dict:
         """Return averaged latest CPU, memory, temperature across given devices."""
         if not device_ids:
             return {"avg_cpu": 0, "avg_mem": 0, "avg_temp": 0, "device_count": 0}
-        conn = self._conn()
-        try:
-            placeholders = ",".join("?" for _ in device_ids)
-            # Get latest metric value per device per metric name
-            rows = conn.execute(f"""
-                SELECT entity_id, metric, value
-                FROM metric_history
-                WHERE entity_type = 'device'
-                AND entity_id IN ({placeholders})
-                AND metric IN ('cpu_pct', 'mem_pct', 'temperature')
-                AND id IN (
-                    SELECT MAX(id) FROM metric_history
-                    WHERE entity_type = 'device'
-                    AND entity_id IN ({placeholders})
-                    AND metric IN ('cpu_pct', 'mem_pct', 'temperature')
-                    GROUP BY entity_id, metric
-                )
-            """, device_ids + device_ids).fetchall()
-
-            cpu_vals, mem_vals, temp_vals = [], [], []
-            seen_devices = set()
-            for row in rows:
-                seen_devices.add(row["entity_id"])
-                if row["metric"] == "cpu_pct":
-                    cpu_vals.append(row["value"])
-                elif row["metric"] == "mem_pct":
-                    mem_vals.append(row["value"])
-                elif row["metric"] == "temperature":
-                    temp_vals.append(row["value"])
+        rows = self.metric_history.latest("device", device_ids, ["cpu_pct", "mem_pct", "temperature"])
+
+        cpu_vals, mem_vals, temp_vals = [], [], []
+        seen_devices = set()
+        for entity_id, metric, value, _ in rows:
+            seen_devices.add(entity_id)
+            if metric == "cpu_pct":
+                cpu_vals.append(value)
+            elif metric == "mem_pct":
+                mem_vals.append(value)
+            elif metric == "temperature":
+                temp_vals.append(value)
 
-            return {
-                "avg_cpu": sum(cpu_vals) / len(cpu_vals) if cpu_vals else 0,
-                "avg_mem": sum(mem_vals) / len(mem_vals) if mem_vals else 0,
-                "avg_temp": sum(temp_vals) / len(temp_vals) if temp_vals else 0,
-                "device_count": len(seen_devices),
-            }
-        finally:
-            conn.close()
+        return {
+            "avg_cpu": sum(cpu_vals) / len(cpu_vals) if cpu_vals else 0,
+            "avg_mem": sum(mem_vals) / len(mem_vals) if mem_vals else 0,
+            "avg_temp": sum(temp_vals) / len(temp_vals) if temp_vals else 0,
+            "device_count": len(seen_devices),
+        }
 
     def prune_metric_history(self, older_than_days: int = 7) -> int:
-        conn = self._conn()
-        try:
-            cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
-            cursor = conn.execute("DELETE FROM metric_history WHERE recorded_at < ?", (cutoff,))
-            conn.commit()
-            return cursor.rowcount
-        finally:
-            conn.close()
+        """Drop metric history older than ``older_than_days`` (whole days);
+        returns the number of samples deleted."""
+        return self.metric_history.prune(older_than_days)
 
     # ── Drift Events ──
 
@@ -4297,6 +4363,17 @@ class TopologyStore:
             conn.commit()
         finally:
             conn.close()
+        self._notify_change("link", link_id, "updated")
+
+    def get_neighbor_link(self, link_id: str) -> Optional[dict]:
+        conn = self._conn()
+        try:
+            row = conn.execute(
+                "SELECT * FROM neighbor_links WHERE id=?", (link_id,)
+            ).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
 
     def list_neighbor_links(self, device_id: str = None) -> list[dict]:
         conn = self._conn()
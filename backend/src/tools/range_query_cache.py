@@ -0,0 +1,309 @@
+"""Cross-investigation cache for Prometheus range queries.
+
+During an incident storm many investigations ask Prometheus for the same
+golden-signal series over nearly the same window ("now-3h" to "now",
+evaluated a few seconds apart). ``ResultCache`` is per-investigation and
+keys on exact params, so none of that is shared.
+
+This cache aligns every range query to its step grid and stores the
+result in fixed-size chunks of ``chunk_points`` steps, keyed by
+(source, promql, step, chunk index). A query is answered from cached
+chunks where possible; contiguous runs of missing chunks are fetched
+from Prometheus as one request each (widened to whole chunks), so a
+sliding "last 3h" window only fetches its new tail. Chunks that end too
+close to ``now`` may still change as samples arrive; they are fetched
+but never stored.
+
+Tiers: an in-process LRU, plus an optional Redis tier (``redis.asyncio``
+client) shared by every backend replica. Concurrent misses for the same
+chunk run share one in-flight fetch.
+
+Alignment moves ``start``/``end`` down to multiples of ``step``, the same
+trade-off Prometheus query frontends make: points land on the grid, not
+on the caller's exact timestamps.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# fetch(start, end) -> parsed Prometheus JSON for query_range on the grid.
+RangeFetch = Callable[[float, float], Awaitable[dict]]
+
+# A chunk is a list of {"metric": {...}, "values": [[ts, "v"], ...]}.
+Chunk = list[dict]
+
+DEFAULT_CHUNK_POINTS = 120
+DEFAULT_MAX_CHUNKS = 4096
+DEFAULT_REDIS_TTL = 6 * 3600
+REDIS_PREFIX = "promrange:"
+
+
+def align_range(start: float, end: float, step: float) -> tuple[float, float]:
+    """Snap ``start``/``end`` down to the step grid."""
+    return math.floor(start / step) * step, math.floor(end / step) * step
+
+
+def _series_key(metric: dict) -> str:
+    return json.dumps(metric, sort_keys=True)
+
+
+def _split_into_chunks(
+    result: list[dict], first: int, last: int, span: float,
+) -> dict[int, Chunk]:
+    """Bucket a matrix result's samples by chunk index in ``[first, last]``."""
+    chunks: dict[int, Chunk] = {k: [] for k in range(first, last + 1)}
+    for series in result:
+        metric = series.get("metric", {})
+        buckets: dict[int, list] = {}
+        for point in series.get("values", []):
+            k = int(float(point[0]) // span)
+            if first <= k <= last:
+                buckets.setdefault(k, []).append(point)
+        for k, values in buckets.items():
+            chunks[k].append({"metric": metric, "values": values})
+    return chunks
+
+
+def _merge_chunks(chunks: list[Chunk], start: float, end: float) -> list[dict]:
+    """Concatenate per-chunk series in order, trimmed to ``[start, end]``."""
+    merged: dict[str, dict] = {}
+    for chunk in chunks:
+        for series in chunk:
+            key = _series_key(series["metric"])
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {"metric": series["metric"], "values": []}
+            entry["values"].extend(
+                p for p in series["values"] if start <= float(p[0]) <= end
+            )
+    return [s for s in merged.values() if s["values"]]
+
+
+class RangeQueryCache:
+    """Step-aligned, chunked range-query cache; see the module docstring."""
+
+    def __init__(
+        self,
+        *,
+        chunk_points: int = DEFAULT_CHUNK_POINTS,
+        max_chunks: int = DEFAULT_MAX_CHUNKS,
+        redis_client: Any = None,
+        redis_ttl: int = DEFAULT_REDIS_TTL,
+        settle_s: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if chunk_points <= 0 or max_chunks <= 0:
+            raise ValueError("chunk_points and max_chunks must be positive")
+        self._chunk_points = chunk_points
+        self._max_chunks = max_chunks
+        self._redis = redis_client
+        self._redis_ttl = redis_ttl
+        self._settle_s = settle_s
+        self._clock = clock
+        self._lru: OrderedDict[str, Chunk] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+
+    def set_redis(self, redis_client: Any) -> None:
+        self._redis = redis_client
+
+    def clear(self) -> None:
+        self._lru.clear()
+        self.hits = self.misses = self.fetches = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    # ── Public API ──
+
+    async def query_range(
+        self,
+        source: str,
+        promql: str,
+        start: float,
+        end: float,
+        step: float,
+        fetch: RangeFetch,
+    ) -> dict:
+        """Return a Prometheus ``query_range`` response for the aligned window.
+
+        ``fetch(start, end)`` is called only for chunk runs that are not
+        cached. A non-success response from ``fetch`` is returned as-is
+        and nothing is stored.
+        """
+        start, end = align_range(start, end, step)
+        if end < start:
+            return _success([])
+        span = step * self._chunk_points
+        first, last = int(start // span), int(end // span)
+        base = self._base_key(source, promql, step)
+
+        chunks: dict[int, Chunk] = {}
+        for k in range(first, last + 1):
+            cached = self._lru_get(f"{base}:{k}")
+            if cached is not None:
+                chunks[k] = cached
+        await self._fill_from_redis(base, [k for k in range(first, last + 1) if k not in chunks], chunks)
+
+        missing = [k for k in range(first, last + 1) if k not in chunks]
+        self.hits += (last - first + 1) - len(missing)
+        self.misses += len(missing)
+        for run_first, run_last in _runs(missing):
+            # Fetch whole chunks so partially requested head/tail chunks
+            # become cacheable too; only a still-filling tail stops at end.
+            run_start = run_first * span
+            run_end = (run_last + 1) * span - step
+            if not self._is_settled(run_last, span, step):
+                run_end = max(end, run_start)
+            error, fetched = await self._fetch_run(
+                base, run_first, run_last, run_start, run_end, span, step, fetch,
+            )
+            if error is not None:
+                return error
+            chunks.update(fetched)
+
+        ordered = [chunks[k] for k in range(first, last + 1)]
+        return _success(_merge_chunks(ordered, start, end))
+
+    # ── Internals ──
+
+    @staticmethod
+    def _base_key(source: str, promql: str, step: float) -> str:
+        digest = hashlib.sha256(f"{source}|{promql}|{step}".encode()).hexdigest()[:32]
+        return f"{REDIS_PREFIX}{digest}"
+
+    def _is_settled(self, k: int, span: float, step: float) -> bool:
+        chunk_end = (k + 1) * span - step
+        return chunk_end <= self._clock() - self._settle_s
+
+    async def _fetch_run(
+        self,
+        base: str,
+        run_first: int,
+        run_last: int,
+        run_start: float,
+        run_end: float,
+        span: float,
+        step: float,
+        fetch: RangeFetch,
+    ) -> tuple[dict | None, dict[int, Chunk]]:
+        """Fetch one run of chunks; returns ``(error_response, chunks)``."""
+        key = (base, run_start, run_end)
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.fetches += 1
+            data = await fetch(run_start, run_end)
+            if data.get("status") != "success":
+                outcome: tuple[dict | None, dict[int, Chunk]] = (data, {})
+            else:
+                result = data.get("data", {}).get("result", [])
+                fetched = _split_into_chunks(result, run_first, run_last, span)
+                outcome = (None, fetched)
+                # Runs cover whole chunks, so only chunks still gaining
+                # samples are unsafe to reuse.
+                storable = {
+                    k: chunk for k, chunk in fetched.items()
+                    if self._is_settled(k, span, step)
+                }
+                for k, chunk in storable.items():
+                    self._lru_put(f"{base}:{k}", chunk)
+                await self._store_in_redis(base, storable)
+            future.set_result(outcome)
+            return outcome
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an un-awaited future doesn't warn.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _lru_get(self, key: str) -> Chunk | None:
+        chunk = self._lru.get(key)
+        if chunk is not None:
+            self._lru.move_to_end(key)
+        return chunk
+
+    def _lru_put(self, key: str, chunk: Chunk) -> None:
+        self._lru[key] = chunk
+        self._lru.move_to_end(key)
+        if len(self._lru) > self._max_chunks:
+            self._lru.popitem(last=False)
+
+    async def _fill_from_redis(self, base: str, ks: list[int], chunks: dict[int, Chunk]) -> None:
+        if self._redis is None or not ks:
+            return
+        try:
+            raw = await self._redis.mget([f"{base}:{k}" for k in ks])
+        except Exception as exc:
+            logger.debug("range cache: redis read failed: %s", exc)
+            return
+        for k, blob in zip(ks, raw):
+            if blob is None:
+                continue
+            try:
+                chunk = json.loads(blob)
+            except (TypeError, ValueError):
+                continue
+            chunks[k] = chunk
+            self._lru_put(f"{base}:{k}", chunk)
+
+    async def _store_in_redis(self, base: str, chunks: dict[int, Chunk]) -> None:
+        if self._redis is None or not chunks:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for k, chunk in chunks.items():
+                pipe.setex(f"{base}:{k}", self._redis_ttl, json.dumps(chunk))
+            await pipe.execute()
+        except Exception as exc:
+            logger.debug("range cache: redis write failed: %s", exc)
+
+
+def _runs(ks: list[int]) -> list[tuple[int, int]]:
+    """Group sorted chunk indexes into contiguous (first, last) runs."""
+    runs: list[tuple[int, int]] = []
+    for k in ks:
+        if runs and runs[-1][1] == k - 1:
+            runs[-1] = (runs[-1][0], k)
+        else:
+            runs.append((k, k))
+    return runs
+
+
+def _success(result: list[dict]) -> dict:
+    return {"status": "success", "data": {"resultType": "matrix", "result": result}}
+
+
+_shared: RangeQueryCache | None = None
+
+
+def get_range_cache() -> RangeQueryCache:
+    """Process-wide cache shared by every MetricsAgent."""
+    global _shared
+    if _shared is None:
+        _shared = RangeQueryCache()
+    return _shared
+
+
+def configure_range_cache(*, redis_client: Any = None) -> RangeQueryCache:
+    """Attach (or detach with ``None``) the Redis tier; call at startup."""
+    cache = get_range_cache()
+    cache.set_redis(redis_client)
+    return cache
@@ -0,0 +1,222 @@
+"""Drain-style log template miner shared by syslog and app-log grouping.
+
+A message goes through three cheap steps:
+
+1. One pass of a precompiled alternation regex masks variable fields
+   (IPs, numbers, UUIDs, paths, ...) with placeholders. Rules are tried in
+   list order at each position, so earlier rules win where they overlap,
+   much like a chain of ``re.sub`` calls in the same order.
+2. The masked text is split into tokens and routed through a fixed-depth
+   prefix tree (token count, then the first ``prefix_depth`` tokens) to a
+   small list of candidate clusters.
+3. The most similar cluster absorbs the message if at least
+   ``sim_threshold`` of its tokens match; positions that differ become
+   ``<*>``. Otherwise a new cluster is created.
+
+At most ``max_clusters`` clusters are kept; past that the least recently
+matched one is evicted, so a stream of one-off messages cannot grow the
+tree without bound.
+
+Each cluster has an id fixed at creation (a hash of its first masked
+template), so it stays stable as the template generalises. Exact repeats
+skip all three steps, and repeats of a masked text skip the tree walk,
+through two LRUs of recently seen messages.
+
+Usage::
+
+    miner = TemplateMiner(SYSLOG_MASKS)
+    cluster = miner.add("BGP peer 10.0.0.1 down after 3600 seconds")
+    cluster.template_id, cluster.template
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Callable
+
+WILDCARD = "<*>"
+
+# (first-character class, regex, replacement). The first-character classes
+# are folded into a lookahead guard so the scan skips most positions without
+# trying every alternative.
+MaskRules = tuple[tuple[str, str, str], ...]
+
+# Syslog: IPs, hex, interface names, 2+ digit numbers.
+SYSLOG_MASKS: MaskRules = (
+    (r"\d", r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b", "<IP>"),
+    (r"0", r"\b0x[0-9a-fA-F]+\b", "<HEX>"),
+    (r"GFTEegx", r"\b(?:GigabitEthernet|FastEthernet|TenGigE|Ethernet|eth|ens|enp|ge-|xe-|et-)"
+     r"[\w/.:]+\b", "<IFACE>"),
+    (r"\d", r"\b\d{2,}\b", "<NUM>"),
+)
+
+# Application logs: timestamps, UUIDs, endpoints, paths, quoted values, ids.
+APP_LOG_MASKS: MaskRules = (
+    (r"\d", r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}[.\d]*[Z]?", "<TIMESTAMP>"),
+    (r"0-9a-f", r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "<UUID>"),
+    (r"\d", r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:\d+\b", "<IP:PORT>"),
+    (r"\d", r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}\b", "<IP>"),
+    (r":", r":\d{2,5}\b", ":<PORT>"),
+    (r"/", r"/[a-zA-Z0-9/_.-]+", "/<PATH>"),
+    (r'"', r'"[^"]{4,}"', '"<STR>"'),
+    (r"'", r"'[^']{4,}'", "'<STR>'"),
+    (r"0", r"\b0x[0-9a-fA-F]+\b", "<HEX>"),
+    (r"0-9a-f", r"\b[0-9a-f]{8,}\b", "<HEX>"),
+    (r"\d", r"\b\d+\b", "<NUM>"),
+)
+
+
+def compile_masks(rules: MaskRules) -> tuple[re.Pattern, tuple[str, ...]]:
+    """Fold *rules* into one guarded alternation regex plus replacements.
+
+    Rule regexes must not contain capturing groups: the matching rule is
+    identified by ``Match.lastindex``.
+    """
+    for _, regex, _ in rules:
+        if re.compile(regex).groups:
+            raise ValueError(f"Mask rule has a capturing group: {regex}")
+    guard = "".join(dict.fromkeys(lead for lead, _, _ in rules))
+    body = "|".join(f"(?P<m{i}>{regex})" for i, (_, regex, _) in enumerate(rules))
+    return re.compile(f"(?=[{guard}])(?:{body})"), tuple(repl for _, _, repl in rules)
+
+
+class LogCluster:
+    """One mined template: its stable id, current tokens and hit count."""
+
+    __slots__ = ("template_id", "tokens", "size")
+
+    def __init__(self, tokens: list[str]) -> None:
+        self.tokens = tokens
+        self.size = 0
+        self.template_id = hashlib.md5(" ".join(tokens).encode()).hexdigest()[:12]
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: list[str]) -> float:
+        same = 0
+        for ours, theirs in zip(self.tokens, tokens):
+            if ours == theirs or ours == WILDCARD:
+                same += 1
+        return same / len(tokens) if tokens else 1.0
+
+    def absorb(self, tokens: list[str]) -> None:
+        for i, (ours, theirs) in enumerate(zip(self.tokens, tokens)):
+            if ours != theirs:
+                self.tokens[i] = WILDCARD
+
+
+class TemplateMiner:
+    """Online template miner; see the module docstring for the algorithm."""
+
+    def __init__(
+        self,
+        masks: MaskRules = SYSLOG_MASKS,
+        sim_threshold: float = 0.5,
+        prefix_depth: int = 2,
+        max_clusters_per_leaf: int = 64,
+        cache_size: int = 4096,
+        max_clusters: int = 10_000,
+        masker: Callable[[str], str] | None = None,
+    ) -> None:
+        self._mask_re, self._replacements = compile_masks(masks)
+        # Overrides the compiled masks when given.
+        self._masker = masker or self.mask
+        self.sim_threshold = sim_threshold
+        self.prefix_depth = prefix_depth
+        self.max_clusters_per_leaf = max_clusters_per_leaf
+        self.cache_size = cache_size
+        self.max_clusters = max_clusters
+        self._leaves: dict[tuple, list[LogCluster]] = {}
+        # Live clusters in match order -> their leaf key, for global eviction.
+        self._clusters: OrderedDict[LogCluster, tuple] = OrderedDict()
+        # Recently seen raw messages and masked texts -> cluster.
+        self._cache: OrderedDict[str, LogCluster] = OrderedDict()
+        self._masked: OrderedDict[str, LogCluster] = OrderedDict()
+
+    def _replace(self, match: re.Match) -> str:
+        return self._replacements[match.lastindex - 1]
+
+    def mask(self, message: str) -> str:
+        """Replace variable fields with placeholders in a single scan."""
+        return self._mask_re.sub(self._replace, message)
+
+    def _leaf_key(self, tokens: list[str]) -> tuple:
+        # Tokens that are placeholders or still contain digits are likely
+        # variables; route them together rather than one branch per value.
+        prefix = tuple(
+            WILDCARD if tok.startswith("<") or any(c.isdigit() for c in tok) else tok
+            for tok in tokens[:self.prefix_depth]
+        )
+        return (len(tokens), prefix)
+
+    def add(self, message: str) -> LogCluster:
+        """Return the cluster for *message*, creating or widening one as needed."""
+        cached = self._cache.get(message)
+        if cached is not None and cached in self._clusters:
+            self._cache.move_to_end(message)
+            self._clusters.move_to_end(cached)
+            cached.size += 1
+            return cached
+
+        masked = self._masker(message)
+        cluster = self._masked.get(masked)
+        if cluster is not None and cluster in self._clusters:
+            self._masked.move_to_end(masked)
+            self._clusters.move_to_end(cluster)
+            cluster.size += 1
+            self._remember(self._cache, message, cluster)
+            return cluster
+
+        tokens = masked.split()
+        key = self._leaf_key(tokens)
+        leaf = self._leaves.setdefault(key, [])
+        best: LogCluster | None = None
+        best_sim = -1.0
+        for cluster in leaf:
+            sim = cluster.similarity(tokens)
+            if sim > best_sim:
+                best, best_sim = cluster, sim
+        if best is not None and best_sim >= self.sim_threshold:
+            best.absorb(tokens)
+            # Keep the leaf in recency order for eviction.
+            leaf.remove(best)
+            leaf.append(best)
+        else:
+            best = LogCluster(tokens)
+            leaf.append(best)
+            if len(leaf) > self.max_clusters_per_leaf:
+                del self._clusters[leaf.pop(0)]
+        self._clusters[best] = key
+        self._clusters.move_to_end(best)
+        if len(self._clusters) > self.max_clusters:
+            self._evict_oldest()
+        best.size += 1
+        self._remember(self._masked, masked, best)
+        self._remember(self._cache, message, best)
+        return best
+
+    def _evict_oldest(self) -> None:
+        # LRU entries pointing at the evicted cluster are skipped on lookup.
+        cluster, key = self._clusters.popitem(last=False)
+        leaf = self._leaves[key]
+        leaf.remove(cluster)
+        if not leaf:
+            del self._leaves[key]
+
+    def _remember(self, lru: OrderedDict, key: str, cluster: LogCluster) -> None:
+        lru[key] = cluster
+        if len(lru) > self.cache_size:
+            lru.popitem(last=False)
+
+    def clear(self) -> None:
+        self._leaves.clear()
+        self._clusters.clear()
+        self._cache.clear()
+        self._masked.clear()
+
+    @property
+    def cluster_count(self) -> int:
+        return len(self._clusters)
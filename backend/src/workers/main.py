@@ -71,7 +71,8 @@ async def _start_outbox_relay() -> asyncio.Task[None]:
     """Boot the OutboxRelay → Redis Streams sink.
 
     The Redis sink is the production transport; SSE fan-out is per-pod and
-    happens in the web process, not here.
+    happens in the web process, not here. The relay wakes on the outbox
+    NOTIFY, so the poll interval is only a fallback.
     """
     from src.workflows.outbox_relay import OutboxRelay, RedisStreamSink
 
@@ -79,7 +80,8 @@ async def _start_outbox_relay() -> asyncio.Task[None]:
     import redis.asyncio as redis_async
 
     client = redis_async.from_url(redis_url, decode_responses=False)
-    relay = OutboxRelay(sink=RedisStreamSink(client))
+    poll_ms = int(os.environ.get("OUTBOX_RELAY_POLL_MS", "1000"))
+    relay = OutboxRelay(sink=RedisStreamSink(client), poll_ms=poll_ms, listen=True)
     logger.info("starting outbox relay (redis_url=%s)", _redact(redis_url))
     return asyncio.create_task(_supervised(relay.run_forever, "outbox_relay"))
 
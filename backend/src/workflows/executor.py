@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
 import time
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Any, Awaitable, Callable
@@ -69,6 +71,35 @@ class _QueueItem:
     step_id: str = field(compare=True)
 
 
+_TERMINAL = ("SUCCESS", "SKIPPED", "FAILED")
+
+
+class _NodesView(Mapping):
+    """Live ``nodes`` view handed to the evaluator.
+
+    Only terminal nodes are visible. A primary replaced by a fallback
+    reads as the fallback's status/output (``output_for_ref``). Lookups are
+    O(1), so resolving a step's refs does not scan the whole run.
+    """
+
+    def __init__(self, node_states: dict[str, NodeState], output_for_ref: dict[str, str]) -> None:
+        self._states = node_states
+        self._output_for_ref = output_for_ref
+
+    def __getitem__(self, sid: str) -> dict:
+        ns = self._states.get(sid)
+        if ns is None or ns.status not in _TERMINAL:
+            raise KeyError(sid)
+        src_ns = self._states[self._output_for_ref.get(sid, sid)]
+        return {"status": src_ns.status, "output": src_ns.output}
+
+    def __iter__(self):
+        return (sid for sid, ns in self._states.items() if ns.status in _TERMINAL)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
 class WorkflowExecutor:
     def __init__(
         self,
@@ -213,10 +244,15 @@ class WorkflowExecutor:
         # reference them (for fallback replacement).
         output_for_ref: dict[str, str] = {sid: sid for sid in compiled.topo_order}
 
-        remaining_upstream: dict[str, set[str]] = {
-            sid: set(compiled.steps[sid].upstream_ids) for sid in compiled.topo_order
-        }
-        completed: set[str] = set()
+        # Downstream adjacency + remaining in-degree, so finishing a step only
+        # touches its own out-edges.
+        downstream: dict[str, list[str]] = {sid: [] for sid in compiled.topo_order}
+        remaining_upstream: dict[str, int] = {}
+        for sid in compiled.topo_order:
+            ups = set(compiled.steps[sid].upstream_ids)
+            remaining_upstream[sid] = len(ups)
+            for up in ups:
+                downstream[up].append(sid)
         fail_fast_triggered = False
         run_error: dict | None = None
 
@@ -227,6 +263,7 @@ class WorkflowExecutor:
 
         scheduled: set[str] = set()  # already started (or skipped) — will not re-queue
         running: set[str] = set()
+        # Ready steps, ordered by (readiness_time, step_id).
         queue: list[_QueueItem] = []
 
         # Fallback-target steps must NOT be scheduled normally — they only run
@@ -264,57 +301,39 @@ class WorkflowExecutor:
             if sid in fallback_targets:
                 continue
             if not remaining_upstream[sid]:
-                queue.append(_QueueItem(monotonic(), sid))
+                heapq.heappush(queue, _QueueItem(monotonic(), sid))
 
         tasks: dict[str, asyncio.Task] = {}
-        cond = asyncio.Condition()
+        # Finished step tasks are delivered here by a done-callback; ``None``
+        # is the cancel-event wakeup.
+        completions: asyncio.Queue[str | None] = asyncio.Queue()
+
+        eval_state = {
+            "input": inputs,
+            "env": env,
+            "nodes": _NodesView(node_states, output_for_ref),
+        }
 
         def _state_dict_for_eval() -> dict:
-            nodes_view: dict[str, dict] = {}
-            for sid, ns in node_states.items():
-                if ns.status in ("SUCCESS", "SKIPPED", "FAILED"):
-                    # Remap to output-source for fallback replacement
-                    src_id = output_for_ref.get(sid, sid)
-                    src_ns = node_states[src_id]
-                    nodes_view[sid] = {
-                        "status": src_ns.status,
-                        "output": src_ns.output,
-                    }
-            return {"input": inputs, "env": env, "nodes": nodes_view}
+            return eval_state
 
-        def _queue_ready(sid: str) -> None:
-            if sid in scheduled or sid in running:
-                return
-            if remaining_upstream[sid]:
-                return
-            queue.append(_QueueItem(monotonic(), sid))
-
-        def _sort_queue() -> None:
-            queue.sort(key=lambda q: (q.readiness_time, q.step_id))
-
-        async def _finalize_node(sid: str) -> None:
+        def _finalize_node(sid: str) -> None:
             """Propagate completion to downstream ready-set."""
-            completed.add(sid)
             running.discard(sid)
-            for nsid, ups in remaining_upstream.items():
-                if sid in ups:
-                    ups.discard(sid)
-                    if (
-                        not ups
-                        and nsid not in completed
-                        and nsid not in scheduled
-                        and nsid not in running
-                        and nsid not in fallback_targets
-                    ):
-                        queue.append(_QueueItem(monotonic(), nsid))
-            async with cond:
-                cond.notify_all()
+            for nsid in downstream[sid]:
+                remaining_upstream[nsid] -= 1
+                if (
+                    not remaining_upstream[nsid]
+                    and nsid not in scheduled
+                    and nsid not in fallback_targets
+                ):
+                    heapq.heappush(queue, _QueueItem(monotonic(), nsid))
 
         async def _run_step(step: CompiledStep) -> None:
             try:
                 await _run_step_inner(step)
             finally:
-                await _finalize_node(step.id)
+                _finalize_node(step.id)
 
         async def _run_step_inner(step: CompiledStep) -> None:
             """Execute a single step including predicate eval, input resolve,
@@ -597,52 +616,42 @@ class WorkflowExecutor:
             cancel_waiter: asyncio.Task | None = None
             if _cancel is not None:
                 cancel_waiter = asyncio.create_task(_cancel.wait())
+                cancel_waiter.add_done_callback(lambda _t: completions.put_nowait(None))
             try:
                 while True:
-                    # Clean up finished tasks
-                    done_ids = [sid for sid, t in tasks.items() if t.done()]
-                    for sid in done_ids:
-                        t = tasks.pop(sid)
-                        exc = t.exception()
-                        if exc is not None:
-                            logger.exception("task for %s crashed", sid, exc_info=exc)
-
                     # Observe cancel → switch to cancelling mode.
                     if _is_cancelled() and not cancelling:
                         await _emit_cancelling_once()
 
-                    if not cancelling:
-                        # Schedule more ready nodes
-                        _sort_queue()
-                        while queue:
-                            item = queue.pop(0)
-                            sid = item.step_id
-                            if sid in scheduled or sid in running:
-                                continue
-                            step = compiled.steps[sid]
-                            scheduled.add(sid)
-                            running.add(sid)
-                            tasks[sid] = asyncio.create_task(_run_step(step))
-                    else:
-                        # Cancelling: drain ready queue — those nodes will be
-                        # marked CANCELLED in the post-loop pass. Do not start.
-                        queue.clear()
-
-                    # When cancelling, exit the launcher immediately so the
+                    # When cancelling, drain the ready queue (those nodes are
+                    # marked CANCELLED in the post-loop pass) and exit so the
                     # post-loop grace window can govern in-flight tasks.
                     if cancelling:
+                        queue.clear()
                         return
 
-                    if not tasks and not queue:
+                    # Schedule ready nodes
+                    while queue:
+                        sid = heapq.heappop(queue).step_id
+                        if sid in scheduled:
+                            continue
+                        scheduled.add(sid)
+                        running.add(sid)
+                        task = asyncio.create_task(_run_step(compiled.steps[sid]))
+                        task.add_done_callback(
+                            lambda _t, sid=sid: completions.put_nowait(sid)
+                        )
+                        tasks[sid] = task
+
+                    if not tasks:
                         return
 
-                    if tasks:
-                        waiters: set[asyncio.Future] = set(tasks.values())
-                        if cancel_waiter is not None and not cancel_waiter.done():
-                            waiters.add(cancel_waiter)
-                        await asyncio.wait(
-                            waiters, return_when=asyncio.FIRST_COMPLETED
-                        )
+                    sid = await completions.get()
+                    if sid is None:
+                        continue
+                    t = tasks.pop(sid)
+                    if not t.cancelled() and t.exception() is not None:
+                        logger.exception("task for %s crashed", sid, exc_info=t.exception())
             finally:
                 if cancel_waiter is not None and not cancel_waiter.done():
                     cancel_waiter.cancel()
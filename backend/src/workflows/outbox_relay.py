@@ -1,9 +1,22 @@
-"""Polling relay: drains the Postgres outbox to live Sinks.
+"""Outbox relay: drains the Postgres outbox to live Sinks.
 
 Pairs with ``OutboxWriter`` (Task 1.3). The writer commits ``(state, event)``
-pairs atomically; this relay reads unrelayed events in seq order, hands each
+pairs atomically; this relay claims unrelayed events in seq order, hands them
 to a ``Sink`` (Redis Streams + in-memory SSE broadcaster in production), then
-marks the row ``relayed_at = now()`` inside the same Postgres transaction.
+marks the claimed rows ``relayed_at = now()`` with one bulk UPDATE inside the
+same Postgres transaction.
+
+Claims use ``FOR UPDATE SKIP LOCKED`` so several relay workers can share the
+outbox. Ordering is per ``run_id``: a worker only delivers a run when its
+claim starts at that run's earliest unrelayed seq, so a second worker that
+skipped past another's locked prefix leaves the tail for the next drain
+instead of overtaking it. Within a batch, distinct runs are delivered
+concurrently; sinks that implement ``emit_many`` (``RedisStreamSink``)
+receive the whole batch at once and pipeline it in a single round trip.
+
+With ``listen=True`` the relay wakes on the ``investigation_outbox`` NOTIFY
+fired by the insert trigger instead of waiting out ``poll_ms``; polling stays
+on as a fallback for missed notifications and listener reconnects.
 
 Crash semantics: a process killed mid-drain leaves rows un-marked, so the
 next ``drain_once`` re-emits them. Sinks must be idempotent — at-least-once
@@ -19,15 +32,26 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
-from typing import Any, Iterable, Protocol
+from itertools import groupby
+from typing import Any, Iterable, NamedTuple, Protocol, Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 
-from src.database.engine import get_session
+from src.database.engine import get_engine, get_session
 from src.database.models import Outbox
 
 logger = logging.getLogger(__name__)
 
+# Channel the outbox insert trigger NOTIFYs on (migration b2f6c8d1e4a7).
+NOTIFY_CHANNEL = "investigation_outbox"
+
+
+class OutboxEvent(NamedTuple):
+    run_id: str
+    seq: int
+    kind: str
+    payload: dict[str, Any]
+
 
 class Sink(Protocol):
     async def emit(
@@ -35,71 +59,202 @@ class Sink(Protocol):
     ) -> None: ...
 
 
+async def _emit_per_run(sink: Sink, events: Sequence[OutboxEvent]) -> None:
+    """Emit ``events`` one by one, runs in parallel and seq order within a run.
+
+    ``events`` must already be sorted by ``(run_id, seq)``. Every run is
+    attempted even if another fails; the first failure is re-raised after
+    all runs settle.
+    """
+
+    async def _run(group: list[OutboxEvent]) -> None:
+        for ev in group:
+            await sink.emit(ev.kind, ev.payload, run_id=ev.run_id, seq=ev.seq)
+
+    groups = [list(g) for _, g in groupby(events, key=lambda ev: ev.run_id)]
+    if len(groups) == 1:
+        await _run(groups[0])
+        return
+    results = await asyncio.gather(*(_run(g) for g in groups), return_exceptions=True)
+    for res in results:
+        if isinstance(res, BaseException):
+            raise res
+
+
+async def deliver(sink: Sink, events: Sequence[OutboxEvent]) -> None:
+    """Hand a claimed batch to ``sink``, batched when the sink supports it."""
+    emit_many = getattr(sink, "emit_many", None)
+    if emit_many is not None:
+        await emit_many(events)
+    else:
+        await _emit_per_run(sink, events)
+
+
 class OutboxRelay:
-    def __init__(self, sink: Sink, batch: int = 500, poll_ms: int = 200) -> None:
+    def __init__(
+        self,
+        sink: Sink,
+        batch: int = 500,
+        poll_ms: int = 200,
+        *,
+        listen: bool = False,
+    ) -> None:
         self._sink = sink
         self._batch = batch
         self._poll_ms = poll_ms
+        self._listen = listen
+        self._wake = asyncio.Event()
+        self._listener: tuple[Any, Any] | None = None
 
     async def drain_once(self) -> int:
         async with get_session() as session:
             async with session.begin():
                 stmt = (
-                    select(Outbox)
+                    select(Outbox.id, Outbox.run_id, Outbox.seq, Outbox.kind, Outbox.payload)
                     .where(Outbox.relayed_at.is_(None))
                     .order_by(Outbox.run_id, Outbox.seq)
                     .limit(self._batch)
+                    .with_for_update(skip_locked=True)
                 )
-                result = await session.execute(stmt)
-                # Materialise the cursor before iterating: SQLAlchemy's async
-                # result is single-shot, and we both iterate (to emit) and need
-                # the count after the loop. The plan's pseudocode called
-                # ``len(rows.all())`` *after* ``rows.scalars()`` consumed the
-                # cursor — that always returns 0.
-                rows = list(result.scalars().all())
+                # Materialise the cursor up front: SQLAlchemy's async result
+                # is single-shot and we need both the rows and their count.
+                rows = list((await session.execute(stmt)).all())
+                if not rows:
+                    return 0
+
+                # Another worker may hold the head of a run we only got the
+                # tail of; delivering it now would overtake that worker.
+                first_seq: dict[str, int] = {}
                 for row in rows:
-                    await self._sink.emit(
-                        row.kind,
-                        row.payload,
-                        run_id=row.run_id,
-                        seq=row.seq,
+                    first_seq.setdefault(row.run_id, row.seq)
+                heads = await session.execute(
+                    select(Outbox.run_id, func.min(Outbox.seq))
+                    .where(
+                        Outbox.relayed_at.is_(None),
+                        Outbox.run_id.in_(list(first_seq)),
                     )
-                    row.relayed_at = func.now()
+                    .group_by(Outbox.run_id)
+                )
+                blocked = {
+                    run_id for run_id, head in heads if head != first_seq[run_id]
+                }
+                if blocked:
+                    rows = [row for row in rows if row.run_id not in blocked]
+                    if not rows:
+                        return 0
+
+                await deliver(
+                    self._sink,
+                    [OutboxEvent(r.run_id, r.seq, r.kind, r.payload) for r in rows],
+                )
+                await session.execute(
+                    update(Outbox)
+                    .where(Outbox.id.in_([row.id for row in rows]))
+                    .values(relayed_at=func.now())
+                )
                 return len(rows)
 
     async def run_forever(self) -> None:
-        while True:
-            try:
-                await self.drain_once()
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                logger.exception("OutboxRelay drain iteration failed")
-            await asyncio.sleep(self._poll_ms / 1000)
+        try:
+            while True:
+                if self._listen:
+                    await self._ensure_listener()
+                self._wake.clear()
+                drained = 0
+                try:
+                    drained = await self.drain_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("OutboxRelay drain iteration failed")
+                if drained >= self._batch:
+                    # Backlog: go straight back for the next batch.
+                    continue
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self._poll_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self._close_listener()
+
+    async def _ensure_listener(self) -> None:
+        """Hold a dedicated connection LISTENing on ``NOTIFY_CHANNEL``.
+
+        Failures are logged and retried on the next iteration; until then the
+        relay keeps draining on its poll interval.
+        """
+        if self._listener is not None:
+            if not self._listener[1].is_closed():
+                return
+            await self._close_listener()
+        conn = None
+        try:
+            conn = await get_engine().connect()
+            driver = (await conn.get_raw_connection()).driver_connection
+            await driver.add_listener(NOTIFY_CHANNEL, self._on_notify)
+        except asyncio.CancelledError:
+            if conn is not None:
+                await conn.close()
+            raise
+        except Exception:
+            logger.exception("OutboxRelay LISTEN %s failed; polling", NOTIFY_CHANNEL)
+            if conn is not None:
+                await conn.invalidate()
+            return
+        self._listener = (conn, driver)
+
+    async def _close_listener(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        conn, driver = listener
+        try:
+            if not driver.is_closed():
+                await driver.remove_listener(NOTIFY_CHANNEL, self._on_notify)
+            await conn.close()
+        except Exception:
+            logger.debug("OutboxRelay listener close failed", exc_info=True)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self._wake.set()
 
 
 class RedisStreamSink:
     """Writes events to Redis Stream ``investigation:{run_id}:events`` via XADD.
 
     Cross-process fan-out: any worker can XREAD the stream to follow a run.
+    ``emit_many`` pipelines a whole relay batch into one round trip; Redis
+    applies pipelined commands in order, so per-run seq order is kept.
     """
 
     def __init__(self, client: Any, key_template: str = "investigation:{run_id}:events") -> None:
         self._client = client
         self._key_template = key_template
 
+    def _fields(self, kind: str, payload: dict[str, Any], seq: int) -> dict[str, str]:
+        return {
+            "kind": kind,
+            "seq": str(seq),
+            "payload": json.dumps(payload),
+        }
+
     async def emit(
         self, kind: str, payload: dict[str, Any], *, run_id: str, seq: int
     ) -> None:
         await self._client.xadd(
             self._key_template.format(run_id=run_id),
-            {
-                "kind": kind,
-                "seq": str(seq),
-                "payload": json.dumps(payload),
-            },
+            self._fields(kind, payload, seq),
         )
 
+    async def emit_many(self, events: Sequence[OutboxEvent]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for ev in events:
+            pipe.xadd(
+                self._key_template.format(run_id=ev.run_id),
+                self._fields(ev.kind, ev.payload, ev.seq),
+            )
+        await pipe.execute()
+
 
 # Module-level registry: run_id -> list of subscriber queues. Lives in-process,
 # so it only fans out to SSE clients connected to the same worker. For
@@ -150,6 +305,8 @@ class MultiSink:
         sinks)
       - if every inner sink raised, re-raise the last exception so the relay
         leaves the row unrelayed and the next drain retries
+
+    ``emit_many`` applies the same policy to a whole relay batch.
     """
 
     def __init__(self, sinks: Iterable[Sink]) -> None:
@@ -177,3 +334,20 @@ class MultiSink:
                 )
         if not any_success and last_exc is not None:
             raise last_exc
+
+    async def emit_many(self, events: Sequence[OutboxEvent]) -> None:
+        last_exc: Exception | None = None
+        any_success = False
+        for sink in self._sinks:
+            try:
+                await deliver(sink, events)
+                any_success = True
+            except Exception as exc:
+                last_exc = exc
+                logger.exception(
+                    "Sink %s failed to emit a batch of %d events",
+                    type(sink).__name__,
+                    len(events),
+                )
+        if not any_success and last_exc is not None:
+            raise last_exc
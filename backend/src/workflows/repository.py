@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import uuid
+from collections import OrderedDict
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from pathlib import Path
@@ -11,8 +13,30 @@ import sqlite3
 
 import aiosqlite
 
+logger = logging.getLogger(__name__)
+
 _MIGRATIONS_DIR = Path(__file__).parent / "migrations"
 
+_INSERT_EVENT_SQL = (
+    "INSERT INTO workflow_run_events "
+    "(event_id, run_id, sequence, timestamp, type, node_id, attempt, "
+    "duration_ms, error_class, error_message, parent_node_id, payload_json) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_INSERT_STEP_RUN_SQL = (
+    "INSERT INTO workflow_step_runs "
+    "(id, run_id, step_id, status, started_at, attempt) "
+    "VALUES (?, ?, ?, 'running', ?, ?)"
+)
+_UPDATE_STEP_RUN_SQL = (
+    "UPDATE workflow_step_runs SET status = ?, "
+    "output_json = COALESCE(?, output_json), "
+    "ended_at = COALESCE(?, ended_at), "
+    "duration_ms = COALESCE(?, duration_ms), "
+    "error_json = COALESCE(?, error_json) "
+    "WHERE id = ?"
+)
+
 
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -22,10 +46,129 @@ def _new_id() -> str:
     return uuid.uuid4().hex
 
 
+class _GroupCommitWriter:
+    """Group-commit writer for run events and step-run rows.
+
+    Callers queue a write and await its future. One flush task drains
+    everything queued while the previous flush was running and writes it
+    in a single ``BEGIN IMMEDIATE`` transaction, one ``executemany`` per
+    run of consecutive same-statement rows, so FIFO order (and therefore
+    per-run event order) is preserved.
+
+    Event sequences are allocated inside the flush transaction from an
+    in-memory next-sequence per run, seeded once from
+    ``MAX(sequence)``. A run is owned by one replica at a time (run lock),
+    so the counter does not need re-reading on every append.
+
+    If a batch fails it is rolled back and replayed row by row with the
+    counters re-seeded, so one bad row only fails its own caller and a
+    stale counter costs a single retry.
+    """
+
+    _MAX_TRACKED_RUNS = 4096
+
+    def __init__(self, repo: "WorkflowRepository") -> None:
+        self._repo = repo
+        # (sql, params, future); event params have ``None`` in the sequence slot.
+        self._pending: list[tuple[str, tuple, asyncio.Future]] = []
+        self._task: asyncio.Task | None = None
+        self._next_seq: OrderedDict[str, int] = OrderedDict()
+
+    def submit(self, sql: str, params: tuple) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((sql, params, fut))
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._drain())
+        return fut
+
+    async def _drain(self) -> None:
+        while self._pending:
+            batch, self._pending = self._pending, []
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[str, tuple, asyncio.Future]]) -> None:
+        try:
+            results = await self._write(batch)
+        except Exception as exc:
+            # Also covers a one-row batch: a stale counter (another writer
+            # appended to the run) fails once, then succeeds re-seeded.
+            logger.warning("group commit of %d rows failed (%s); replaying row by row", len(batch), exc)
+            for item in batch:
+                self._next_seq.clear()
+                try:
+                    (result,) = await self._write([item])
+                except Exception as item_exc:
+                    _resolve(item[2], exc=item_exc)
+                else:
+                    _resolve(item[2], result=result)
+            return
+        for (_sql, _params, fut), result in zip(batch, results):
+            _resolve(fut, result=result)
+
+    async def _write(self, batch: list[tuple[str, tuple, asyncio.Future]]) -> list[Any]:
+        async with self._repo._conn() as db:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                alloc = await self._seed(db, {p[1] for sql, p, _ in batch if sql is _INSERT_EVENT_SQL})
+                results: list[Any] = []
+                groups: list[tuple[str, list[tuple]]] = []
+                for sql, params, _fut in batch:
+                    if sql is _INSERT_EVENT_SQL:
+                        run_id = params[1]
+                        sequence = alloc[run_id]
+                        alloc[run_id] = sequence + 1
+                        params = (params[0], run_id, sequence, *params[3:])
+                        results.append((params[0], sequence))
+                    else:
+                        results.append(None)
+                    if groups and groups[-1][0] is sql:
+                        groups[-1][1].append(params)
+                    else:
+                        groups.append((sql, [params]))
+                for sql, rows in groups:
+                    await db.executemany(sql, rows)
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+        for run_id, nxt in alloc.items():
+            self._next_seq[run_id] = nxt
+            self._next_seq.move_to_end(run_id)
+        while len(self._next_seq) > self._MAX_TRACKED_RUNS:
+            self._next_seq.popitem(last=False)
+        return results
+
+    async def _seed(self, db: aiosqlite.Connection, run_ids: set[str]) -> dict[str, int]:
+        alloc = {r: self._next_seq[r] for r in run_ids if r in self._next_seq}
+        missing = [r for r in run_ids if r not in alloc]
+        if missing:
+            placeholders = ",".join("?" for _ in missing)
+            async with db.execute(
+                f"SELECT run_id, MAX(sequence) FROM workflow_run_events "
+                f"WHERE run_id IN ({placeholders}) GROUP BY run_id",
+                tuple(missing),
+            ) as cur:
+                found = {row[0]: int(row[1]) for row in await cur.fetchall()}
+            for r in missing:
+                alloc[r] = found.get(r, 0) + 1
+        return alloc
+
+
+def _resolve(fut: asyncio.Future, *, result: Any = None, exc: BaseException | None = None) -> None:
+    # The caller may have been cancelled while waiting; the write stands.
+    if fut.done():
+        return
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(result)
+
+
 class WorkflowRepository:
     def __init__(self, db_path: str) -> None:
         self._db_path = db_path
-        self._write_lock = asyncio.Lock()
+        self._writer = _GroupCommitWriter(self)
 
     async def init(self) -> None:
         async with aiosqlite.connect(self._db_path) as db:
@@ -334,14 +477,9 @@ class WorkflowRepository:
         self, run_id: str, step_id: str, attempt: int
     ) -> str:
         sr_id = _new_id()
-        async with self._conn() as db:
-            await db.execute(
-                "INSERT INTO workflow_step_runs "
-                "(id, run_id, step_id, status, started_at, attempt) "
-                "VALUES (?, ?, ?, 'running', ?, ?)",
-                (sr_id, run_id, step_id, _now(), attempt),
-            )
-            await db.commit()
+        await self._writer.submit(
+            _INSERT_STEP_RUN_SQL, (sr_id, run_id, step_id, _now(), attempt)
+        )
         return sr_id
 
     async def update_step_run(
@@ -353,17 +491,10 @@ class WorkflowRepository:
         duration_ms: int | None = None,
         error_json: str | None = None,
     ) -> None:
-        async with self._conn() as db:
-            await db.execute(
-                "UPDATE workflow_step_runs SET status = ?, "
-                "output_json = COALESCE(?, output_json), "
-                "ended_at = COALESCE(?, ended_at), "
-                "duration_ms = COALESCE(?, duration_ms), "
-                "error_json = COALESCE(?, error_json) "
-                "WHERE id = ?",
-                (status, output_json, ended_at, duration_ms, error_json, step_run_id),
-            )
-            await db.commit()
+        await self._writer.submit(
+            _UPDATE_STEP_RUN_SQL,
+            (status, output_json, ended_at, duration_ms, error_json, step_run_id),
+        )
 
     async def list_step_runs(self, run_id: str) -> list[dict[str, Any]]:
         async with self._conn() as db:
@@ -387,41 +518,26 @@ class WorkflowRepository:
         parent_node_id: str | None = None,
         payload_json: str | None = None,
     ) -> tuple[str, int]:
-        # Sequence is computed inside the write lock + transaction so concurrent
-        # appenders cannot observe the same MAX(sequence) and produce duplicates.
-        event_id = _new_id()
-        async with self._write_lock:
-            async with self._conn() as db:
-                await db.execute("BEGIN IMMEDIATE")
-                async with db.execute(
-                    "SELECT COALESCE(MAX(sequence), 0) + 1 FROM workflow_run_events "
-                    "WHERE run_id = ?",
-                    (run_id,),
-                ) as cur:
-                    row = await cur.fetchone()
-                    sequence = int(row[0])
-                await db.execute(
-                    "INSERT INTO workflow_run_events "
-                    "(event_id, run_id, sequence, timestamp, type, node_id, attempt, "
-                    "duration_ms, error_class, error_message, parent_node_id, payload_json) "
-                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                    (
-                        event_id,
-                        run_id,
-                        sequence,
-                        _now(),
-                        type,
-                        node_id,
-                        attempt,
-                        duration_ms,
-                        error_class,
-                        error_message,
-                        parent_node_id,
-                        payload_json,
-                    ),
-                )
-                await db.commit()
-        return event_id, sequence
+        # Sequence is allocated by the group-commit writer inside the flush
+        # transaction, in submission order, so concurrent appenders to one
+        # run get distinct, ordered sequences.
+        return await self._writer.submit(
+            _INSERT_EVENT_SQL,
+            (
+                _new_id(),
+                run_id,
+                None,
+                _now(),
+                type,
+                node_id,
+                attempt,
+                duration_ms,
+                error_class,
+                error_message,
+                parent_node_id,
+                payload_json,
+            ),
+        )
 
     async def find_run_by_idempotency_key(
         self, workflow_version_id: str, key: str
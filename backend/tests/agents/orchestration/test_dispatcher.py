@@ -101,3 +101,98 @@ async def test_result_carries_elapsed_time():
     results = await d.dispatch_round([AgentSpec(agent="log_agent")])
     assert results[0].elapsed_s >= 0.02
     assert results[0].started_at > 0
+
+
+# ── StreamingDispatcher ──────────────────────────────────────────────────
+
+from src.agents.orchestration.dispatcher import StreamingDispatcher  # noqa: E402
+
+
+def _sleepy_executor(delays: dict[str, float]):
+    async def run(spec: AgentSpec):
+        await asyncio.sleep(delays.get(spec.agent, 0.0))
+        return {"agent": spec.agent}
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_streaming_returns_fastest_agent_first():
+    d = StreamingDispatcher(
+        _sleepy_executor({"tracing_agent": 0.2, "log_agent": 0.01}),
+        timeout_per_agent_s=1.0,
+    )
+    d.submit(AgentSpec(agent="tracing_agent"))
+    d.submit(AgentSpec(agent="log_agent"))
+
+    first = await d.next_result()
+    assert first.agent == "log_agent"
+    assert d.in_flight == {"tracing_agent"}
+
+    # A follow-up submitted mid-flight finishes before the slow agent.
+    d.submit(AgentSpec(agent="metrics_agent"), unblocked_by="log_agent")
+    assert (await d.next_result()).agent == "metrics_agent"
+    assert (await d.next_result()).agent == "tracing_agent"
+    assert d.in_flight == set()
+
+
+@pytest.mark.asyncio
+async def test_streaming_enforces_per_backend_budget():
+    running: dict[str, int] = {"github": 0}
+    peak = {"github": 0}
+
+    async def executor(spec: AgentSpec):
+        running["github"] += 1
+        peak["github"] = max(peak["github"], running["github"])
+        await asyncio.sleep(0.02)
+        running["github"] -= 1
+        return spec.agent
+
+    d = StreamingDispatcher(executor, timeout_per_agent_s=1.0, budgets={"github": 1})
+    d.submit(AgentSpec(agent="code_agent"))
+    d.submit(AgentSpec(agent="change_agent"))
+    assert d.in_flight == {"code_agent", "change_agent"}
+
+    results = [await d.next_result(), await d.next_result()]
+    assert [r.agent for r in results] == ["code_agent", "change_agent"]
+    assert peak["github"] == 1
+    assert d.timings[1].queued_s >= 0.015
+
+
+@pytest.mark.asyncio
+async def test_streaming_timeout_and_cancel_all():
+    d = StreamingDispatcher(
+        _sleepy_executor({"code_agent": 5.0, "k8s_agent": 5.0}),
+        timeout_per_agent_s=0.05,
+    )
+    d.submit(AgentSpec(agent="code_agent"))
+    assert (await d.next_result()).status == "timeout"
+
+    d = StreamingDispatcher(_sleepy_executor({"k8s_agent": 5.0}), timeout_per_agent_s=10.0)
+    d.submit(AgentSpec(agent="k8s_agent"))
+    await asyncio.sleep(0.01)
+    assert await d.cancel_all() == ["k8s_agent"]
+    assert d.in_flight == set()
+    with pytest.raises(LookupError):
+        await d.next_result()
+
+
+@pytest.mark.asyncio
+async def test_critical_path_follows_unblocking_chain():
+    d = StreamingDispatcher(
+        _sleepy_executor({"log_agent": 0.01, "k8s_agent": 0.01, "metrics_agent": 0.05, "code_agent": 0.02}),
+        timeout_per_agent_s=1.0,
+    )
+    d.submit(AgentSpec(agent="log_agent"))
+    await d.next_result()
+    d.submit(AgentSpec(agent="metrics_agent"), unblocked_by="log_agent")
+    d.submit(AgentSpec(agent="k8s_agent"), unblocked_by="log_agent")
+    assert (await d.next_result()).agent == "k8s_agent"
+    assert (await d.next_result()).agent == "metrics_agent"
+    d.submit(AgentSpec(agent="code_agent"), unblocked_by="metrics_agent")
+    await d.next_result()
+
+    path = d.critical_path()
+    assert [t.agent for t in path] == ["log_agent", "metrics_agent", "code_agent"]
+    assert path[-1].finished_s >= path[0].finished_s + 0.06
+    assert path[1].as_dict()["unblocked_by"] == "log_agent"
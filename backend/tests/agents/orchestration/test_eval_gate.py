@@ -53,6 +53,13 @@ def test_coverage_saturation_plus_stall_trips_done():
     assert decision.reason == "coverage_saturated_no_new_signal"
 
 
+
+def test_round_scale_widens_stall_window():
+    stalled = _state(confidence=0.60, coverage_ratio=0.80, rounds_since_new_signal=3, rounds=4)
+    assert EvalGate(round_scale=2).is_done(stalled).is_done is False
+    stalled.rounds_since_new_signal = 4
+    assert EvalGate(round_scale=2).is_done(stalled).reason == "coverage_saturated_no_new_signal"
+
 def test_continue_when_no_rule_fires():
     decision = EvalGate().is_done(_state(confidence=0.30, rounds=2))
     assert decision.is_done is False
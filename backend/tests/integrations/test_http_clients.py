@@ -1,6 +1,9 @@
 """Task 3.3 — singleton http clients per backend."""
 from __future__ import annotations
 
+import asyncio
+
+import httpx
 import pytest
 import pytest_asyncio
 
@@ -64,3 +67,81 @@ class TestShutdown:
         c2 = http_clients.get_client("jira")
         assert c1 is not c2
         assert c2.is_closed is False
+
+
+def _install_mock(backend: str, handler) -> None:
+    http_clients._clients[backend] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestConcurrencyGate:
+    @pytest.mark.asyncio
+    async def test_request_caps_in_flight_per_backend(self, monkeypatch):
+        monkeypatch.setenv("HTTP_CONCURRENCY_PROMETHEUS", "2")
+        active = {"now": 0, "peak": 0}
+
+        async def handler(request):
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+            await asyncio.sleep(0.01)
+            active["now"] -= 1
+            return httpx.Response(200, json={"status": "success"})
+
+        _install_mock("prometheus", handler)
+        responses = await asyncio.gather(*(
+            http_clients.request("prometheus", "GET", "http://prom/api/v1/query")
+            for _ in range(8)
+        ))
+        assert all(r.status_code == 200 for r in responses)
+        assert active["peak"] == 2
+        stats = http_clients.pool_stats()["prometheus"]
+        assert stats["limit"] == 2
+        assert stats["requests"] == 8
+        assert stats["in_flight"] == 0 and stats["waiting"] == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_are_counted(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        _install_mock("elasticsearch", handler)
+        with pytest.raises(httpx.ConnectError):
+            await http_clients.request("elasticsearch", "POST", "http://es/_search")
+        assert http_clients.pool_stats()["elasticsearch"]["errors"] == 1
+
+    def test_verify_override_gets_its_own_shared_client(self):
+        default = http_clients.get_client("elasticsearch")
+        insecure = http_clients.get_client("elasticsearch", verify=False)
+        assert insecure is not default
+        assert http_clients.get_client("elasticsearch", verify=False) is insecure
+        assert http_clients.get_client("elasticsearch", verify=True) is default
+
+
+class TestAgentClientsUsePool:
+    @pytest.mark.asyncio
+    async def test_prometheus_and_elasticsearch_clients(self):
+        from src.agents.log_agent import ElasticsearchClient
+        from src.agents.metrics_agent import PrometheusClient
+
+        seen = []
+
+        def handler(request):
+            seen.append((request.method, request.url.path, request.headers.get("authorization")))
+            return httpx.Response(200, json={"ok": True})
+
+        http_clients._variant_clients[("prometheus", False)] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler))
+        http_clients._variant_clients[("elasticsearch", False)] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler))
+
+        prom = PrometheusClient("http://prom:9090/", token="t0k")
+        assert await prom.query_range("up", 0, 60) == {"ok": True}
+        es = ElasticsearchClient("http://es:9200", auth_method="api_key", credentials="k")
+        assert await es.search("logs-*", {"size": 1}) == {"ok": True}
+        await es.close_pit(pit_id="p1")
+
+        assert seen == [
+            ("GET", "/api/v1/query_range", "Bearer t0k"),
+            ("POST", "/logs-*/_search", "ApiKey k"),
+            ("DELETE", "/_pit", "ApiKey k"),
+        ]
+        assert http_clients.pool_stats()["prometheus"]["requests"] == 1
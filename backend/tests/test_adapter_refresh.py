@@ -0,0 +1,154 @@
+"""Tests for concurrent, delta-aware adapter snapshot refresh."""
+import asyncio
+import time
+
+import pytest
+
+from src.network.adapters.mock_adapter import MockFirewallAdapter
+from src.network.adapters.refresh_scheduler import AdapterRefreshScheduler
+from src.network.adapters.registry import AdapterRegistry
+from src.network.event_bus.memory_bus import MemoryEventBus
+from src.network.event_bus.topology_channels import POLICY_CHANGED
+from src.network.models import FirewallRule, PolicyAction, Zone
+
+
+class SlowAdapter(MockFirewallAdapter):
+    """Mock adapter whose fetches take ``delay`` seconds and are counted."""
+
+    def __init__(self, rules, delay=0.05, revision=""):
+        super().__init__(rules=rules, zones=[Zone(id="trust", name="trust")])
+        self.delay = delay
+        self.revision = revision
+        self.calls: dict[str, int] = {}
+
+    async def _slow(self, name, value):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await asyncio.sleep(self.delay)
+        return value
+
+    async def _fetch_revision(self):
+        return self.revision
+
+    async def _fetch_rules(self):
+        return await self._slow("rules", list(self._mock_rules))
+
+    async def _fetch_nat_rules(self):
+        return await self._slow("nat", [])
+
+    async def _fetch_interfaces(self):
+        return await self._slow("interfaces", [])
+
+    async def _fetch_routes(self):
+        return await self._slow("routes", [])
+
+    async def _fetch_zones(self):
+        return await self._slow("zones", list(self._mock_zones))
+
+
+def _rule(rule_id, action=PolicyAction.ALLOW, order=0):
+    return FirewallRule(id=rule_id, device_id="fw", rule_name=rule_id, action=action, order=order)
+
+
+@pytest.mark.asyncio
+async def test_refresh_fetches_concurrently_and_reports_delta():
+    adapter = SlowAdapter([_rule("a")], delay=0.1)
+    t0 = time.monotonic()
+    delta = await adapter.refresh_snapshot()
+    assert time.monotonic() - t0 < 0.3
+    assert delta == {"rules": {"added": ["a"], "removed": [], "changed": []},
+                     "zones": {"added": ["trust"], "removed": [], "changed": []}}
+
+    index = adapter.policy_index
+    assert await adapter.refresh_snapshot() == {}
+    assert adapter.policy_index is index  # unchanged content is not recompiled
+
+    adapter._mock_rules = [_rule("a", PolicyAction.DENY), _rule("b", order=1)]
+    delta = await adapter.refresh_snapshot()
+    assert delta["rules"] == {"added": ["b"], "removed": [], "changed": ["a"]}
+    assert adapter.policy_index is not index
+
+
+@pytest.mark.asyncio
+async def test_unchanged_revision_skips_policy_fetch():
+    adapter = SlowAdapter([_rule("a")], revision="r1")
+    await adapter.refresh_snapshot()
+    await adapter.refresh_snapshot()
+    assert adapter.calls["rules"] == 1 and adapter.calls["zones"] == 2
+    adapter.revision = "r2"
+    await adapter.refresh_snapshot()
+    assert adapter.calls["rules"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_served_while_revalidating():
+    adapter = SlowAdapter([_rule("a")], delay=0.1)
+    # Concurrent first use shares one refresh
+    await asyncio.gather(*(adapter.simulate_flow("1.1.1.1", "2.2.2.2", 443) for _ in range(3)))
+    assert adapter.calls["rules"] == 1
+
+    adapter._snapshot_time -= adapter._ttl + 1
+    adapter._mock_rules = [_rule("a", PolicyAction.DENY)]
+    t0 = time.monotonic()
+    verdict = await adapter.simulate_flow("1.1.1.1", "2.2.2.2", 443)
+    assert time.monotonic() - t0 < 0.05
+    assert verdict.action == PolicyAction.ALLOW  # stale answer, refresh in flight
+    await adapter._refresh_task
+    verdict = await adapter.simulate_flow("1.1.1.1", "2.2.2.2", 443)
+    assert verdict.action == PolicyAction.DENY
+
+
+@pytest.mark.asyncio
+async def test_scheduler_refreshes_due_instances_and_publishes_rule_deltas():
+    fresh, stale = SlowAdapter([_rule("a")]), SlowAdapter([_rule("x")])
+    registry = AdapterRegistry()
+    registry.register("fresh", fresh)
+    registry.register("stale", stale)
+    await fresh.refresh_snapshot()
+    await stale.refresh_snapshot()
+    stale._snapshot_time -= stale._ttl
+    stale._mock_rules = [_rule("y")]
+
+    bus = MemoryEventBus()
+    await bus.start()
+    events = []
+
+    async def collect(channel, event):
+        events.append(event)
+
+    await bus.subscribe(POLICY_CHANGED, collect)
+    scheduler = AdapterRefreshScheduler(registry, bus)
+    deltas = await scheduler.refresh_due()
+    await asyncio.sleep(0.1)
+    await bus.stop()
+
+    assert list(deltas) == ["stale"]
+    assert fresh.calls["rules"] == 1
+    assert sorted((e["entity_id"], e["event_type"]) for e in events) == [("x", "deleted"), ("y", "created")]
+    created = next(e for e in events if e["entity_id"] == "y")
+    assert created["entity_type"] == "policy"
+    assert created["data"]["instance_id"] == "stale" and created["data"]["action"] == "allow"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_first_snapshot_is_baseline():
+    adapter = SlowAdapter([_rule(f"r{i}") for i in range(50)], delay=0)
+    registry = AdapterRegistry()
+    registry.register("fw", adapter)
+
+    bus = MemoryEventBus()
+    await bus.start()
+    events = []
+
+    async def collect(channel, event):
+        events.append(event)
+
+    await bus.subscribe(POLICY_CHANGED, collect)
+    scheduler = AdapterRefreshScheduler(registry, bus)
+    deltas = await scheduler.refresh_due()
+    adapter._mock_rules = adapter._mock_rules[1:]
+    await scheduler.refresh_due(force=True)
+    await asyncio.sleep(0.1)
+    await bus.stop()
+
+    assert len(deltas["fw"]["rules"]["added"]) == 50
+    assert [(e["entity_id"], e["event_type"]) for e in events] == [("r0", "deleted")]
@@ -0,0 +1,184 @@
+"""Watch-based informer cache for the K8s cluster client."""
+
+import asyncio
+import queue
+import time
+
+import pytest
+
+from src.agents.cluster_client import informer as informer_mod
+from src.agents.cluster_client.informer import (
+    POD_INDEXERS,
+    Informer,
+    acquire_group,
+    match_field_selector,
+    release_group,
+    stop_all,
+)
+
+
+def _pod(name, ns="default", node="n1", owner="rs-1", rv="1"):
+    return {
+        "metadata": {
+            "name": name, "namespace": ns, "resourceVersion": rv,
+            "ownerReferences": [{"uid": owner}],
+        },
+        "spec": {"nodeName": node},
+    }
+
+
+class FakeApi:
+    """Raw list/watch endpoint: pages for list calls, a queue for watches."""
+
+    def __init__(self, objs, rv="100"):
+        self.objs = list(objs)
+        self.rv = rv
+        self.list_calls: list[dict] = []
+        self.watch_calls: list[dict] = []
+        self.events: queue.Queue = queue.Queue()
+
+    def __call__(self, **kwargs):
+        assert kwargs.get("_preload_content") is False
+        if kwargs.get("watch"):
+            self.watch_calls.append(kwargs)
+            return self._watch()
+        self.list_calls.append(kwargs)
+        start = int(kwargs.get("_continue") or 0)
+        end = start + kwargs["limit"]
+        meta = {"resourceVersion": self.rv}
+        if end < len(self.objs):
+            meta["continue"] = str(end)
+        return {"items": self.objs[start:end], "metadata": meta}
+
+    def _watch(self):
+        while True:
+            ev = self.events.get()
+            if ev is None:
+                return
+            yield ev
+
+
+def _wait_for(pred, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def api():
+    fake = FakeApi([_pod(f"p{i}", node=f"n{i % 3}") for i in range(7)])
+    yield fake
+    fake.events.put(None)
+
+
+@pytest.fixture(autouse=True)
+def _cleanup():
+    yield
+    stop_all()
+
+
+@pytest.mark.asyncio
+async def test_initial_list_pages_and_indexes(api):
+    inf = Informer("pods", api, indexers=POD_INDEXERS, page_size=3)
+    await inf.ensure_synced()
+    assert len(api.list_calls) == 3
+    assert len(inf.items()) == 7
+    assert inf.resource_version == "100"
+    assert len(inf.by_index("node", "n0")) == 3
+    assert len(inf.items("default")) == 7
+    assert len(inf.by_index("owner", "rs-1")) == 7
+    inf.stop()
+
+
+@pytest.mark.asyncio
+async def test_watch_applies_events_from_resource_version(api):
+    inf = Informer("pods", api, indexers=POD_INDEXERS)
+    await inf.ensure_synced()
+    assert _wait_for(lambda: api.watch_calls)
+    assert api.watch_calls[0]["resource_version"] == "100"
+
+    moved = _pod("p0", node="n9", rv="101")
+    api.events.put({"type": "MODIFIED", "object": moved})
+    api.events.put({"type": "ADDED", "object": _pod("new", ns="payments", rv="102")})
+    api.events.put({"type": "DELETED", "object": _pod("p1", node="n1", rv="103")})
+    assert _wait_for(lambda: inf.resource_version == "103")
+
+    assert inf.get("default/p0")["spec"]["nodeName"] == "n9"
+    assert [p["metadata"]["name"] for p in inf.by_index("node", "n9")] == ["p0"]
+    assert inf.get("default/p1") is None
+    assert len(inf.items("payments")) == 1
+    assert len(inf.items()) == 7
+    inf.stop()
+
+
+@pytest.mark.asyncio
+async def test_reads_do_not_relist(api):
+    inf = Informer("pods", api)
+    for _ in range(5):
+        await inf.ensure_synced()
+    assert len(api.list_calls) == 1
+    inf.stop()
+
+
+@pytest.mark.asyncio
+async def test_expired_watch_relists(api):
+    inf = Informer("pods", api)
+    await inf.ensure_synced()
+    assert _wait_for(lambda: api.watch_calls)
+    api.objs = [_pod("only")]
+    api.rv = "500"
+    api.events.put({"type": "ERROR", "object": {"code": 410, "message": "too old"}})
+    assert _wait_for(lambda: inf.resource_version == "500")
+    assert [p["metadata"]["name"] for p in inf.items()] == ["only"]
+    assert len(api.list_calls) == 2
+    inf.stop()
+
+
+@pytest.mark.asyncio
+async def test_group_shared_per_cluster_and_released():
+    a = acquire_group("cluster-a")
+    b = acquire_group("cluster-a")
+    other = acquire_group("cluster-b")
+    assert a is b
+    assert a is not other
+    release_group(a)
+    assert not a.idle_expired(time.monotonic() + informer_mod.IDLE_TTL + 1)
+    release_group(b)
+    assert a.idle_expired(time.monotonic() + informer_mod.IDLE_TTL + 1)
+
+
+def test_match_field_selector():
+    ev = {"involvedObject": {"kind": "Node", "name": "n1"}, "type": "Warning"}
+    assert match_field_selector(ev, "involvedObject.kind=Node")
+    assert match_field_selector(ev, "involvedObject.name==n1,type!=Normal")
+    assert not match_field_selector(ev, "involvedObject.kind=Pod")
+    assert not match_field_selector(ev, "type!=Warning")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_first_reads_share_one_list(api):
+    inf = Informer("pods", api)
+    await asyncio.gather(*(inf.ensure_synced() for _ in range(10)))
+    assert len(api.list_calls) == 1
+    inf.stop()
+
+
+class Forbidden(Exception):
+    status = 403
+
+
+def test_forbidden_list_is_remembered():
+    calls = []
+
+    def list_fn(**kwargs):
+        calls.append(kwargs)
+        raise Forbidden()
+
+    inf = Informer("pods", list_fn)
+    for _ in range(3):
+        with pytest.raises(Forbidden):
+            inf.start()
+    assert len(calls) == 1
@@ -1,4 +1,6 @@
 """Tests for DB monitoring components."""
+import asyncio
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -16,11 +18,13 @@ async def test_write_db_metric():
 @pytest.mark.asyncio
 async def test_write_db_metrics_batch():
     from src.network.metrics_store import MetricsStore
-    store = MetricsStore.__new__(MetricsStore)
+    with patch("src.network.metrics_store.InfluxDBClientAsync"):
+        store = MetricsStore(url="http://localhost:8086", token="t", org="o", bucket="test")
     store._write_api = AsyncMock()
-    store.bucket = "test"
     await store.write_db_metrics_batch("p1", "postgresql", {"cache_hit_ratio": 0.95, "deadlocks": 0.0})
     store._write_api.write.assert_called_once()
+    lines = store._write_api.write.call_args.kwargs["record"].split("\n")
+    assert len(lines) == 2
 
 
 @pytest.mark.asyncio
@@ -73,6 +77,62 @@ async def test_db_monitor_collect_cycle():
     mock_broadcast.assert_called_once()
 
 
+def _slow_adapter(delay):
+    from src.database.adapters.mock_adapter import MockDatabaseAdapter
+
+    class SlowAdapter(MockDatabaseAdapter):
+        async def refresh_snapshot(self):
+            await asyncio.sleep(delay)
+            return await super().refresh_snapshot()
+
+    return SlowAdapter(engine="postgresql", host="localhost", port=5432, database="testdb")
+
+
+def _profiles(*ids):
+    return [{"id": i, "name": f"db-{i}", "engine": "postgresql"} for i in ids]
+
+
+@pytest.mark.asyncio
+async def test_db_monitor_collects_profiles_concurrently():
+    from src.database.db_monitor import DBMonitor
+    from src.database.adapters.registry import DatabaseAdapterRegistry
+
+    registry = DatabaseAdapterRegistry()
+    for pid in ("p1", "p2", "p3"):
+        registry.register(pid, _slow_adapter(0.2), profile_id=pid)
+    store = MagicMock()
+    store.list_all.return_value = _profiles("p1", "p2", "p3")
+    metrics = AsyncMock()
+
+    monitor = DBMonitor(store, registry, metrics, alert_engine=None)
+    await monitor._collect_cycle()
+
+    assert metrics.write_db_metrics_batch.call_count == 3
+    assert monitor.get_snapshot()["cycle_duration"] < 0.5
+    assert {p["status"] for p in monitor.get_snapshot()["profiles"]} == {"healthy"}
+
+
+@pytest.mark.asyncio
+async def test_db_monitor_profile_timeout_isolated():
+    from src.database.db_monitor import DBMonitor
+    from src.database.adapters.registry import DatabaseAdapterRegistry
+
+    registry = DatabaseAdapterRegistry()
+    registry.register("fast", _slow_adapter(0), profile_id="fast")
+    registry.register("hung", _slow_adapter(5), profile_id="hung")
+    store = MagicMock()
+    store.list_all.return_value = _profiles("fast", "hung")
+
+    monitor = DBMonitor(store, registry, AsyncMock(), alert_engine=None,
+                        profile_timeout=0.1)
+    await monitor._collect_cycle()
+
+    statuses = {p["id"]: p for p in monitor.get_snapshot()["profiles"]}
+    assert statuses["fast"]["status"] == "healthy"
+    assert statuses["hung"]["status"] == "error"
+    assert "timed out" in statuses["hung"]["error"]
+
+
 @pytest.mark.asyncio
 async def test_db_monitor_snapshot():
     from src.database.db_monitor import DBMonitor
@@ -1,11 +1,12 @@
 """Tests for DNS monitoring API endpoints."""
+import importlib.util
 import sys
 import types
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 # Mock influxdb_client before importing
-if "influxdb_client" not in sys.modules:
+if "influxdb_client" not in sys.modules and importlib.util.find_spec("influxdb_client") is None:
     _mock_influx = types.ModuleType("influxdb_client")
     _mock_influx.Point = MagicMock()
     _mock_influx.WritePrecision = MagicMock()
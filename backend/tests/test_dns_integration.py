@@ -97,7 +97,7 @@ class TestDNSPassIntegration:
         monitor.dns_monitor = MagicMock()
         monitor.dns_monitor.run_pass = AsyncMock(return_value=[])
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock):
+        with patch.object(monitor.icmp, "ping_many", AsyncMock(return_value={})):
             await monitor._collect_cycle()
 
         monitor.dns_monitor.run_pass.assert_called_once()
@@ -1,12 +1,14 @@
 """Tests for DNS metric write/query methods in MetricsStore."""
+import asyncio
 import collections
+import importlib.util
 import sys
 import types
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
 # Mock influxdb_client before importing
-if "influxdb_client" not in sys.modules:
+if "influxdb_client" not in sys.modules and importlib.util.find_spec("influxdb_client") is None:
     _mock_influx = types.ModuleType("influxdb_client")
     _mock_influx.Point = MagicMock()
     _mock_influx.WritePrecision = MagicMock()
@@ -32,7 +34,12 @@ def store():
         s._query_api = AsyncMock()
         s._client = AsyncMock()
         s._query_timeout = 30.0
-        s._retry_queue = collections.deque(maxlen=1000)
+        s._write_slots = asyncio.Semaphore(MetricsStore.MAX_IN_FLIGHT_WRITES)
+        s._retry_backlog = collections.deque()
+        s._backlog_points = 0
+        s.dropped_points = 0
+        s._retry_task = None
+        s._retry_wake = asyncio.Event()
         return s
 
 
@@ -101,6 +101,6 @@ class TestEscalationInMonitorCycle:
         mock_dispatcher.check_escalations = AsyncMock(return_value=[])
         monitor.alert_engine._dispatcher = mock_dispatcher
 
-        with patch("src.network.monitor.async_ping", new=None):
+        with patch.object(monitor.icmp, "ping_many", AsyncMock(return_value={})):
             await monitor._collect_cycle()
         mock_dispatcher.check_escalations.assert_awaited_once()
@@ -270,3 +270,42 @@ async def test_emitter_exception_does_not_fail_run():
     executor = WorkflowExecutor(runners, event_emitter=emit)
     result = await executor.run(compiled, inputs={})
     assert result.status == "SUCCESS"
+
+
+@pytest.mark.asyncio
+async def test_wide_fanout_join_runs_every_step_once():
+    from src.workflows.compiler import CompiledStep, CompiledWorkflow
+
+    def step(sid: str, ups: list[str]) -> CompiledStep:
+        return CompiledStep(
+            id=sid, agent="a", agent_version=1, inputs={}, when=None,
+            on_failure="fail", fallback_step_id=None, parallel_group=None,
+            concurrency_group=None, timeout_seconds=30.0, retry_on=[],
+            upstream_ids=ups,
+        )
+
+    fan = [f"f{i:04d}" for i in range(2000)]
+    edges = [("root", [])] + [(f, ["root"]) for f in fan] + [("join", fan)]
+    compiled = CompiledWorkflow(
+        topo_order=[sid for sid, _ in edges],
+        steps={sid: step(sid, ups) for sid, ups in edges},
+        inputs_schema={},
+    )
+
+    class _StepIdRunner:
+        def __init__(self) -> None:
+            self.order: list[str] = []
+
+        async def run(self, inputs: dict, *, context: dict) -> dict:
+            self.order.append(context["step_id"])
+            return {"v": context["step_id"]}
+
+    runner = _StepIdRunner()
+    result = await WorkflowExecutor(_runners({"a": runner}), max_concurrent_steps=16).run(
+        compiled, inputs={}
+    )
+    assert result.status == "SUCCESS"
+    assert runner.order[0] == "root"
+    assert runner.order[-1] == "join"
+    assert sorted(runner.order[1:-1]) == fan
+    assert len(runner.order) == len(set(runner.order)) == 2002
@@ -0,0 +1,155 @@
+"""Tests for the vectorised flush aggregation engine."""
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.network.flow_aggregation import KeyTable, aggregate_frame, build_frame, group_sums
+from src.network.flow_columns import FlowBatch, empty_columns, ip_to_int, merge_flows
+from src.network.flow_receiver import APP_PORTS, FlowAggregator
+from src.network.metrics_store import FlowRecord
+
+_T0 = datetime(2024, 3, 5, tzinfo=timezone.utc)
+
+
+def _random_records(n: int, seed: int = 3) -> list[FlowRecord]:
+    rng = random.Random(seed)
+    ips = [f"10.0.{i // 250}.{i % 250 + 1}" for i in range(40)] + ["2001:db8::1"]
+    return [
+        FlowRecord(
+            src_ip=rng.choice(ips), dst_ip=rng.choice(ips),
+            src_port=rng.randint(1024, 65535),
+            dst_port=rng.choice([443, 53, 80, 22, 9999, 5432]),
+            protocol=6, bytes=rng.randint(40, 10**6), packets=rng.randint(1, 1000),
+            start_time=_T0, end_time=_T0 + timedelta(milliseconds=rng.randint(0, 5000)),
+            src_as=rng.choice([0, 0, 64512, 15169]), dst_as=rng.choice([0, 13335, 15169]),
+            exporter_ip=rng.choice(["192.168.1.1", "192.168.1.2"]),
+        )
+        for _ in range(n)
+    ]
+
+
+def _reference(records, device_ip_map):
+    """The per-flow dict accumulators the engine replaces."""
+    links, convs, apps, asns = {}, {}, {}, {}
+    for f in records:
+        key = (device_ip_map.get(f.exporter_ip, f.src_ip), f.dst_ip)
+        agg = links.setdefault(key, {"bytes": 0, "packets": 0})
+        agg["bytes"] += f.bytes
+        agg["packets"] += f.packets
+        c = convs.setdefault((f.src_ip, f.dst_ip),
+                             {"bytes": 0, "packets": 0, "flows": 0, "latency_sum": 0.0})
+        c["bytes"] += f.bytes
+        c["packets"] += f.packets
+        c["flows"] += 1
+        c["latency_sum"] += (f.end_time - f.start_time).total_seconds()
+        a = apps.setdefault(APP_PORTS.get(f.dst_port, "Other"), {"bytes": 0, "packets": 0, "flows": 0})
+        a["bytes"] += f.bytes
+        a["packets"] += f.packets
+        a["flows"] += 1
+        for asn in (f.src_as, f.dst_as):
+            if asn:
+                s = asns.setdefault(asn, {"bytes": 0, "packets": 0, "flows": 0})
+                s["bytes"] += f.bytes
+                s["packets"] += f.packets
+                s["flows"] += 1
+    return links, convs, apps, asns
+
+
+def test_key_table_round_trips_ipv4_and_other_strings():
+    table = KeyTable()
+    assert table.encode("10.0.0.1") == ip_to_int("10.0.0.1")
+    for value in ("10.0.0.1", "2001:db8::1", "router-1", "10.1"):
+        assert table.decode(table.encode(value)) == value
+
+
+def test_group_sums_first_occurrence_order_and_exact_sums():
+    a = np.array([3, 1, 3, 2, 1], np.uint64)
+    b = np.array([0, 0, 0, 1, 0], np.uint64)
+    v = np.array([2**60, 1, 2**60, 5, 1], np.uint64)
+    (ka, kb), (sv,), counts = group_sums((a, b), (v,))
+    assert ka.tolist() == [3, 1, 2]
+    assert kb.tolist() == [0, 0, 1]
+    assert sv.tolist() == [2**61, 2, 5]
+    assert counts.tolist() == [2, 2, 1]
+
+
+def test_aggregate_frame_matches_reference_loops():
+    records = _random_records(2000)
+    device_map = {"192.168.1.1": "edge-1"}
+    links, convs, apps, asns = _reference(records, device_map)
+    window = aggregate_frame(build_frame(records, [], device_map), APP_PORTS)
+
+    assert window.flow_count == 2000
+    assert window.total_bytes == sum(f.bytes for f in records)
+    assert dict(window.links) == links
+    assert list(dict(window.links)) == list(links)
+    got_convs = dict(window.conversations)
+    assert got_convs.keys() == convs.keys()
+    for key, value in convs.items():
+        assert got_convs[key]["latency_sum"] == pytest.approx(value["latency_sum"])
+        assert {k: v for k, v in got_convs[key].items() if k != "latency_sum"} == \
+            {k: v for k, v in value.items() if k != "latency_sum"}
+    assert dict(window.applications) == apps
+    assert dict(window.asns) == asns
+    assert list(dict(window.asns)) == list(asns)
+
+
+def test_records_and_batches_share_keys():
+    rec = _random_records(1)[0]
+    rec.src_ip, rec.dst_ip, rec.exporter_ip = "10.0.0.1", "10.0.0.2", "192.168.1.9"
+    cols = empty_columns(2)
+    cols["src_ip"] = ip_to_int("10.0.0.1")
+    cols["dst_ip"] = ip_to_int("10.0.0.2")
+    cols["bytes"] = 100
+    cols["packets"] = 1
+    window = aggregate_frame(
+        build_frame([rec], [FlowBatch(cols, "192.168.1.9")], {"192.168.1.9": "core-1"}),
+        APP_PORTS,
+    )
+    assert len(window.conversations) == 1
+    (key, value), = window.conversations
+    assert key == ("10.0.0.1", "10.0.0.2")
+    assert value["flows"] == 3
+    assert value["bytes"] == rec.bytes + 200
+    assert [k for k, _ in window.links] == [("core-1", "10.0.0.2")]
+
+
+def test_merged_batches_aggregate_like_raw_rows():
+    rng = np.random.default_rng(5)
+    cols = empty_columns(3000)
+    cols["src_ip"] = ip_to_int("10.0.0.1") + rng.integers(0, 8, len(cols))
+    cols["dst_ip"] = ip_to_int("10.0.1.1") + rng.integers(0, 4, len(cols))
+    cols["dst_port"] = rng.choice([443, 53, 9999], len(cols))
+    cols["src_as"] = rng.choice([0, 64512], len(cols))
+    cols["start"] = 1_700_000_000
+    cols["end"] = cols["start"] + rng.integers(0, 3, len(cols))
+    cols["bytes"] = rng.integers(40, 10**6, len(cols))
+    cols["packets"] = rng.integers(1, 100, len(cols))
+    merged = merge_flows(cols)
+    assert len(merged) < len(cols) and int(merged["flows"].sum()) == len(cols)
+
+    device_map = {"192.168.1.1": "edge-1"}
+    raw = aggregate_frame(build_frame([], [FlowBatch(cols, "192.168.1.1")], device_map), APP_PORTS)
+    pre = aggregate_frame(build_frame([], [FlowBatch(merged, "192.168.1.1")], device_map), APP_PORTS)
+    assert (pre.flow_count, pre.total_bytes, pre.total_packets) == \
+        (raw.flow_count, raw.total_bytes, raw.total_packets)
+    for name in ("links", "conversations", "applications", "asns"):
+        assert dict(getattr(pre, name)) == dict(getattr(raw, name))
+
+
+@pytest.mark.asyncio
+async def test_flush_publishes_event_bus_payload():
+    bus = MagicMock()
+    agg = FlowAggregator(AsyncMock(), MagicMock(), event_bus=bus)
+    records = _random_records(50)
+    for r in records:
+        agg.ingest(r)
+    assert await agg.flush() == 50
+    payload = bus.publish.call_args[0][1]
+    assert payload["flow_count"] == 50
+    assert payload["total_bytes"] == sum(r.bytes for r in records)
+    assert isinstance(payload["top_conversations"][0]["bytes"], int)
+    assert payload["top_applications"][0]["bytes"] >= payload["top_applications"][-1]["bytes"]
@@ -0,0 +1,180 @@
+"""Tests for the columnar (batch) flow decode path."""
+import socket
+import struct
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.network.flow_columns import FlowBatch, FlowBuffer, empty_columns, ip_to_int
+from src.network.flow_receiver import FlowAggregator, FlowParser, FlowReceiverProtocol
+from src.network.metrics_store import FlowRecord
+
+
+def _v5_packet(records: list[dict]) -> bytes:
+    header = struct.pack("!HHIIIIBBh", 5, len(records), 1000, 1709600000, 0, 1, 0, 0, 0)
+    body = b""
+    for r in records:
+        body += struct.pack(
+            "!IIIHHIIIIHHBBBBHHBBH",
+            ip_to_int(r.get("src_ip", "10.0.0.1")),
+            ip_to_int(r.get("dst_ip", "10.0.0.2")),
+            0, r.get("input_snmp", 3), r.get("output_snmp", 4),
+            r.get("packets", 100), r.get("bytes", 5000),
+            0, 0,
+            r.get("src_port", 12345), r.get("dst_port", 80),
+            0, r.get("tcp_flags", 0x18), r.get("protocol", 6), r.get("tos", 0),
+            r.get("src_as", 64512), r.get("dst_as", 15169),
+            24, 24, 0,
+        )
+    return header + body
+
+
+_TEMPLATE_FIELDS = [(1, 4), (2, 4), (7, 2), (11, 2), (4, 1), (8, 4), (12, 4), (16, 4)]
+
+
+def _v9_template_packet(template_id=256) -> bytes:
+    header = struct.pack("!HHIIII", 9, 1, 1000, 1709740800, 1, 100)
+    record = struct.pack("!HH", template_id, len(_TEMPLATE_FIELDS))
+    for ftype, flen in _TEMPLATE_FIELDS:
+        record += struct.pack("!HH", ftype, flen)
+    return header + struct.pack("!HH", 0, 4 + len(record)) + record
+
+
+def _data_records(count: int) -> bytes:
+    body = b""
+    for i in range(count):
+        body += struct.pack("!IIHHB", 1000 + i, 10 + i, 40000 + i, 443, 17)
+        body += socket.inet_aton(f"10.1.0.{i % 250 + 1}") + socket.inet_aton("10.2.0.1")
+        body += struct.pack("!I", 65000 + i)
+    return body
+
+
+def _v9_data_packet(count: int, template_id=256) -> bytes:
+    header = struct.pack("!HHIIII", 9, count, 2000, 1709740830, 2, 100)
+    body = _data_records(count)
+    pad = (4 - (4 + len(body)) % 4) % 4
+    return header + struct.pack("!HH", template_id, 4 + len(body) + pad) + body + b"\x00" * pad
+
+
+def _ipfix_packet(count: int, template_id=300) -> bytes:
+    tpl = struct.pack("!HH", template_id, len(_TEMPLATE_FIELDS))
+    for ftype, flen in _TEMPLATE_FIELDS:
+        tpl += struct.pack("!HH", ftype, flen)
+    tpl_set = struct.pack("!HH", 2, 4 + len(tpl)) + tpl
+    body = _data_records(count)
+    data_set = struct.pack("!HH", template_id, 4 + len(body)) + body
+    total = 16 + len(tpl_set) + len(data_set)
+    return struct.pack("!HHIII", 10, total, 1709740830, 1, 7) + tpl_set + data_set
+
+
+def _assert_same(batch: FlowBatch, records: list[FlowRecord]):
+    assert batch.to_records() == records
+
+
+def test_v5_batch_matches_scalar_parser():
+    packet = _v5_packet([
+        {"src_ip": "10.0.0.1", "dst_ip": "10.0.0.2", "bytes": 5000},
+        {"src_ip": "192.168.1.9", "dst_ip": "8.8.8.8", "dst_port": 53, "protocol": 17},
+    ])
+    parser = FlowParser()
+    batch = parser.parse_v5_batch(packet, "192.168.1.1")
+    assert len(batch) == 2
+    _assert_same(batch, parser.parse_v5(packet, "192.168.1.1"))
+    rec = batch.to_records()[1]
+    assert rec.protocol == 17
+    assert rec.tcp_flags == 0x18
+    assert rec.src_as == 64512 and rec.dst_as == 15169
+
+
+def test_v5_batch_truncated_packet_decodes_whole_records_only():
+    packet = _v5_packet([{}, {}, {}])[:-10]
+    batch = FlowParser().parse_v5_batch(packet, "1.1.1.1")
+    assert len(batch) == 2
+
+
+def test_v9_batch_matches_scalar_parser():
+    parser = FlowParser()
+    assert parser.detect_and_parse_batch(_v9_template_packet(), "10.0.0.254") is None
+    data = _v9_data_packet(25)
+    batch = parser.detect_and_parse_batch(data, "10.0.0.254")
+    assert len(batch) == 25
+    _assert_same(batch, parser.detect_and_parse(data, "10.0.0.254"))
+    assert batch.to_records()[3].src_as == 65003
+
+
+def test_v9_batch_without_template_returns_none():
+    parser = FlowParser()
+    assert parser.detect_and_parse_batch(_v9_data_packet(3, template_id=999), "10.0.0.254") is None
+
+
+def test_ipfix_batch_matches_scalar_parser():
+    parser = FlowParser()
+    packet = _ipfix_packet(40)
+    batch = parser.detect_and_parse_batch(packet, "10.0.0.100")
+    assert len(batch) == 40
+    _assert_same(batch, FlowParser().detect_and_parse(packet, "10.0.0.100"))
+
+
+def test_batch_sampling_compensation_in_place():
+    cols = empty_columns(2)
+    cols["bytes"] = [100, 100]
+    cols["packets"] = [2, 2]
+    cols["sampling_interval"] = [1, 50]
+    batch = FlowBatch(cols, "1.1.1.1")
+    batch.compensate_sampling()
+    assert cols["bytes"].tolist() == [100, 5000]
+    assert cols["packets"].tolist() == [2, 100]
+
+
+def test_flow_buffer_counts_and_trims_oldest_batches_first():
+    buf = FlowBuffer()
+    now = datetime.now(tz=timezone.utc)
+    buf.append(FlowRecord("1.1.1.1", "2.2.2.2", 1, 2, 6, 10, 1, now, now))
+    buf.add_batch(FlowBatch(empty_columns(5), "a"))
+    buf.add_batch(FlowBatch(empty_columns(5), "b"))
+    assert len(buf) == 11
+    buf.keep_newest(4)
+    assert len(buf) == 4
+    records, batches = buf.drain()
+    assert len(records) == 1
+    assert [b.exporter_ip for b in batches] == ["b"]
+    assert len(batches[0]) == 3
+    assert len(buf) == 0 and not buf
+
+
+def test_columnar_protocol_buffers_batches_without_records():
+    agg = FlowAggregator(AsyncMock(), MagicMock())
+    proto = FlowReceiverProtocol(FlowParser(), agg, columnar=True)
+    proto.datagram_received(_v5_packet([{}, {}, {}]), ("192.168.1.1", 2055))
+    assert len(agg._buffer) == 3
+    assert agg._buffer.records == []
+    assert proto._count == 3
+
+
+@pytest.mark.asyncio
+async def test_flush_aggregates_columnar_batches():
+    metrics = AsyncMock()
+    topo = MagicMock()
+    agg = FlowAggregator(metrics, topo, device_ip_map={"192.168.1.1": "dev-1"})
+    batch = FlowParser().parse_v5_batch(
+        _v5_packet([{"bytes": 1000, "packets": 10}, {"bytes": 500, "packets": 5}]),
+        "192.168.1.1",
+    )
+    batch.columns["sampling_interval"] = 10
+    agg.ingest_batch(batch)
+    assert await agg.flush() == 2
+    metrics.write_flows.assert_awaited_once()
+    records, batches = metrics.write_flows.await_args[0]
+    assert records == [] and batches == [batch]
+    convos = agg.get_conversations()
+    assert convos[0]["bytes"] == 15000
+    assert convos[0]["packets"] == 150
+
+
+def test_ingest_batch_respects_buffer_cap(monkeypatch):
+    monkeypatch.setattr(FlowAggregator, "MAX_BUFFER_SIZE", 10)
+    agg = FlowAggregator(AsyncMock(), MagicMock())
+    for _ in range(4):
+        agg.ingest_batch(FlowBatch(empty_columns(4), "x"))
+    assert len(agg._buffer) <= 10
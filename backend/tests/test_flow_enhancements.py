@@ -27,8 +27,8 @@ def _make_flow(
 @pytest.fixture
 def aggregator():
     metrics_store = MagicMock()
-    metrics_store.write_flow = AsyncMock()
-    metrics_store.write_link_metric = AsyncMock()
+    metrics_store.write_flows = AsyncMock()
+    metrics_store.write_link_metrics = AsyncMock()
     topo_store = MagicMock()
     topo_store.upsert_link_metric = MagicMock()
     return FlowAggregator(metrics_store, topo_store)
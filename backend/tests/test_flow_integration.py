@@ -44,8 +44,8 @@ class TestFlowAggregator:
     @pytest.mark.asyncio
     async def test_flush_writes_to_metrics(self):
         metrics = MagicMock()
-        metrics.write_flow = AsyncMock()
-        metrics.write_link_metric = AsyncMock()
+        metrics.write_flows = AsyncMock()
+        metrics.write_link_metrics = AsyncMock()
         topo = MagicMock()
         topo.upsert_link_metric = MagicMock()
         agg = FlowAggregator(metrics, topo)
@@ -60,7 +60,8 @@ class TestFlowAggregator:
         agg.ingest(record)
         count = await agg.flush()
         assert count == 1
-        metrics.write_flow.assert_awaited_once()
+        metrics.write_flows.assert_awaited_once()
+        assert metrics.write_flows.await_args[0][0] == [record]
 
     @pytest.mark.asyncio
     async def test_flush_empty_returns_zero(self):
@@ -1,4 +1,5 @@
 # backend/tests/test_flow_receiver.py
+import importlib.util
 import sys
 import types
 import pytest
@@ -6,7 +7,7 @@ import struct
 from unittest.mock import AsyncMock, MagicMock
 
 # Mock influxdb_client before importing modules that depend on it
-if "influxdb_client" not in sys.modules:
+if "influxdb_client" not in sys.modules and importlib.util.find_spec("influxdb_client") is None:
     _mock_influx = types.ModuleType("influxdb_client")
     _mock_influx.Point = MagicMock()
     _mock_influx.WritePrecision = MagicMock()
@@ -97,7 +98,8 @@ async def test_flow_aggregator():
     agg.ingest(flow)
     assert len(agg._buffer) == 1
     await agg.flush()
-    assert mock_metrics.write_flow.call_count == 1
+    assert mock_metrics.write_flows.call_count == 1
+    assert mock_metrics.write_flows.call_args[0][0] == [flow]
 
 
 # ── NetFlow v9 helpers ──────────────────────────────────────────────
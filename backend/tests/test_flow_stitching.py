@@ -100,3 +100,43 @@ class TestBiflowStitching:
                            dst_ip="10.1.0.1", src_port=i + 1024, dst_port=443)
             agg.stitch_biflow(f)
         assert len(agg._biflows) <= 10
+
+    def test_stitch_evicts_least_recently_seen(self):
+        """A touched biflow survives capacity eviction; the stalest one goes."""
+        agg = FlowAggregator(buffer_size=1000)
+        agg.MAX_BIFLOWS = 3
+        flows = [_make_flow(src_ip=f"10.0.0.{i}", dst_ip="10.1.0.1") for i in range(1, 4)]
+        for f in flows:
+            agg.stitch_biflow(f)
+        agg.stitch_biflow(flows[0])  # 10.0.0.1 is now the most recent
+        agg.stitch_biflow(_make_flow(src_ip="10.0.0.9", dst_ip="10.1.0.1"))
+        remaining = {bf.src_ip for bf in agg._biflows}
+        assert remaining == {"10.0.0.1", "10.0.0.3", "10.0.0.9"}
+
+    def test_expiry_only_drops_stale_entries(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(time, "time", lambda: clock[0])
+        agg = FlowAggregator(buffer_size=1000, biflow_timeout=60)
+        old = _make_flow(src_ip="10.0.0.1")
+        agg.stitch_biflow(old)
+        clock[0] += 50
+        agg.stitch_biflow(_make_flow(src_ip="10.0.0.2"))
+        clock[0] += 20
+        assert agg.evict_expired_biflows() == 1
+        assert [bf.src_ip for bf in agg._biflows] == ["10.0.0.2"]
+
+        agg.stitch_biflow(_make_flow(src_ip="10.0.0.2"))  # refresh
+        clock[0] += 59
+        assert agg.evict_expired_biflows() == 0
+
+    def test_get_biflows_limit_and_shape(self):
+        agg = FlowAggregator(buffer_size=1000)
+        for i in range(5):
+            agg.stitch_biflow(_make_flow(src_ip=f"10.0.0.{i + 1}", bytes_=(i + 1) * 100))
+        top = agg.get_biflows(limit=2)
+        assert [bf["total_bytes"] for bf in top] == [500, 400]
+        assert set(top[0]) == {
+            "src_ip", "src_port", "dst_ip", "dst_port", "protocol",
+            "forward_bytes", "forward_packets", "reverse_bytes", "reverse_packets",
+            "first_seen", "last_seen", "total_bytes",
+        }
@@ -17,10 +17,12 @@ from src.network.event_bus.memory_bus import MemoryEventBus
 from src.network.event_bus.topology_channels import (
     DEVICE_CHANGED,
     INTERFACE_CHANGED,
+    POLICY_CHANGED,
     STALE_DETECTED,
     EventType,
     make_device_event,
     make_interface_event,
+    make_policy_event,
     make_stale_event,
 )
 from src.network.repository.neo4j_connection import Neo4jConnectionManager
@@ -132,3 +134,20 @@ def test_stale_event_marks_node(bus_and_mutator):
     assert len(rows) == 1
     assert rows[0]["stale"] is True
     assert rows[0]["confidence"] == 0.5
+
+
+def test_deleted_policy_event_removes_node(bus_and_mutator):
+    bus, mutator, neo4j, loop = bus_and_mutator
+
+    created = make_policy_event(
+        "rule-1", EventType.CREATED, "test",
+        data={"device_id": "fw-1", "name": "allow-web", "action": "allow", "rule_order": 1},
+    )
+    loop.run_until_complete(bus.publish(POLICY_CHANGED, created.to_dict()))
+    time.sleep(0.2)
+    deleted = make_policy_event("rule-1", EventType.DELETED, "test", data={"instance_id": "fw"})
+    loop.run_until_complete(bus.publish(POLICY_CHANGED, deleted.to_dict()))
+    time.sleep(0.2)
+
+    rows = neo4j.execute_read("MATCH (sp:SecurityPolicy {id: 'rule-1'}) RETURN sp.id AS id")
+    assert rows == []
@@ -0,0 +1,92 @@
+"""Tests for the single-socket ICMP engine, against loopback addresses."""
+import os
+import socket
+
+import pytest
+
+from src.network.collectors.models import DeviceInstance, PingConfig
+from src.network.collectors.ping_prober import PingProber
+from src.network.icmp_engine import EchoStats, ICMPEngine
+from src.network.topology_store import TopologyStore
+
+
+def _icmp_allowed(family=socket.AF_INET):
+    for kind in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+        try:
+            socket.socket(family, kind, proto).close()
+            return True
+        except OSError:
+            continue
+    return False
+
+
+needs_icmp = pytest.mark.skipif(
+    not _icmp_allowed(), reason="no ICMP socket (needs ping_group_range or CAP_NET_RAW)",
+)
+
+
+@pytest.fixture
+def engine():
+    engine = ICMPEngine()
+    yield engine
+    engine.close()
+
+
+@needs_icmp
+@pytest.mark.asyncio
+async def test_ping_many_loopback_targets(engine):
+    # Every 127/8 address answers on Linux loopback: many targets, one socket
+    targets = [f"127.0.{i // 250}.{i % 250 + 1}" for i in range(500)]
+    results = await engine.ping_many(targets + ["no-such-host.invalid"], count=2, interval=0.01, timeout=1)
+
+    assert len(engine._sockets) == 1
+    assert all(results[t].received == 2 and results[t].packet_loss == 0.0 for t in targets)
+    assert all(0 < results[t].avg_rtt < 1000 for t in targets)
+    missing = results["no-such-host.invalid"]
+    assert missing.sent == 2 and not missing.is_alive and missing.packet_loss == 1.0
+    assert not engine._sockets[socket.AF_INET].pending
+
+
+@needs_icmp
+@pytest.mark.asyncio
+async def test_ipv6_and_hostnames(engine):
+    if not _icmp_allowed(socket.AF_INET6) or not socket.has_ipv6:
+        pytest.skip("no ICMPv6 socket")
+    results = await engine.ping_many(["::1", "localhost"], count=1, timeout=1)
+    assert results["::1"].is_alive
+    assert results["localhost"].is_alive
+
+
+@needs_icmp
+@pytest.mark.asyncio
+async def test_prober_batches_by_ping_config(engine):
+    prober = PingProber(engine)
+    fast = PingConfig(count=2, interval=10, timeout=500)
+    devices = [
+        DeviceInstance(device_id="a", management_ip="127.0.0.1", hostname="a", ping_config=fast),
+        DeviceInstance(device_id="b", management_ip="127.0.0.1", hostname="b", ping_config=fast),
+        DeviceInstance(device_id="c", management_ip="127.0.0.2", hostname="c",
+                       ping_config=PingConfig(count=1, timeout=500)),
+        DeviceInstance(device_id="d", management_ip="127.0.0.3", hostname="d",
+                       ping_config=PingConfig(enabled=False)),
+    ]
+    results = await prober.probe_batch(devices)
+    assert set(results) == {"a", "b", "c"}
+    assert all(r.reachable and r.packet_loss_pct == 0.0 for r in results.values())
+
+
+def test_echo_stats_and_bulk_status_upsert(tmp_path):
+    stats = EchoStats("10.0.0.1", sent=4, rtts=[1.0, 3.0])
+    assert (stats.packet_loss, stats.avg_rtt, stats.min_rtt, stats.max_rtt) == (0.5, 2.0, 1.0, 3.0)
+    assert EchoStats("10.0.0.2", sent=3).packet_loss == 1.0
+
+    store = TopologyStore(db_path=os.path.join(str(tmp_path), "icmp.db"))
+    store.upsert_device_statuses([("d1", "up", 1.0, 0.0, "icmp"), ("d2", "up", 2.0, 0.0, "icmp")])
+    changed_at = store.get_device_status("d1")["last_status_change"]
+    store.upsert_device_statuses([("d1", "up", 1.5, 0.0, "icmp"), ("d2", "down", 0.0, 1.0, "icmp")])
+    assert store.get_device_status("d1")["last_status_change"] == changed_at
+    assert store.get_device_status("d1")["latency_ms"] == 1.5
+    assert store.get_device_status("d2")["status"] == "down"
+    store.append_metrics([("device", "d1", "latency_ms", 1.5), ("device", "d2", "packet_loss", 1.0)])
+    assert len(store.query_metric_history("device", "d1", "latency_ms", since="2000-01-01")) == 1
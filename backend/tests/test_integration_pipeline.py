@@ -107,8 +107,8 @@ class TestFlowIngestToAggregation:
         from src.network.metrics_store import FlowRecord
 
         mock_metrics = AsyncMock()
-        mock_metrics.write_flow = AsyncMock()
-        mock_metrics.write_link_metric = AsyncMock()
+        mock_metrics.write_flows = AsyncMock()
+        mock_metrics.write_link_metrics = AsyncMock()
 
         # Use a mock topology store
         mock_topo = MagicMock()
@@ -139,8 +139,9 @@ class TestFlowIngestToAggregation:
         count = await aggregator.flush()
         assert count == 100
 
-        # Verify write_flow was called 100 times
-        assert mock_metrics.write_flow.call_count == 100
+        # Verify all 100 flows went out in one bulk write
+        mock_metrics.write_flows.assert_awaited_once()
+        assert len(mock_metrics.write_flows.await_args[0][0]) == 100
 
         # Verify conversations
         conversations = aggregator.get_conversations()
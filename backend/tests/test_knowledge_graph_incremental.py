@@ -0,0 +1,217 @@
+"""Tests for in-place knowledge graph updates from topology deltas."""
+import asyncio
+import os
+from collections import Counter
+
+import pytest
+
+from src.network.event_bus.kg_sync import KnowledgeGraphSyncConsumer, StoreChangePublisher
+from src.network.event_bus.memory_bus import MemoryEventBus
+from src.network.event_bus.topology_channels import (
+    DEVICE_CHANGED, INTERFACE_CHANGED, ROUTE_CHANGED, STALE_DETECTED,
+    EventType, make_device_event, make_interface_event, make_route_event, make_stale_event,
+)
+from src.network.knowledge_graph import NetworkKnowledgeGraph
+from src.network.models import VPC, Device, DeviceType, Interface, Route, Subnet
+from src.network.topology_store import TopologyStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TopologyStore(db_path=os.path.join(str(tmp_path), "test_network.db"))
+    for dev_id, mgmt in (("r1", "192.168.0.1"), ("r2", "192.168.0.2"), ("fw1", "192.168.0.3")):
+        store.add_device(Device(id=dev_id, name=dev_id, device_type=DeviceType.ROUTER, management_ip=mgmt))
+    store.add_subnet(Subnet(id="lan", cidr="10.0.0.0/24"))
+    store.add_subnet(Subnet(id="p2p", cidr="10.255.0.0/30"))
+    store.add_interface(Interface(id="r1-lan", device_id="r1", name="eth0", ip="10.0.0.1"))
+    store.add_interface(Interface(id="r1-p2p", device_id="r1", name="eth1", ip="10.255.0.1"))
+    store.add_interface(Interface(id="r2-p2p", device_id="r2", name="eth1", ip="10.255.0.2"))
+    store.add_route(Route(id="rt-default", device_id="r1", destination_cidr="0.0.0.0/0", next_hop="10.255.0.2"))
+    return store
+
+
+@pytest.fixture
+def graph(store):
+    kg = NetworkKnowledgeGraph(store)
+    kg.load_from_store()
+    return kg
+
+
+def _edges(kg):
+    return Counter(
+        (u, v, d["edge_type"], d.get("destination") or d.get("interface") or d.get("subnet_id"))
+        for u, v, d in kg.graph.edges(data=True)
+    )
+
+
+def _reloaded(store):
+    kg = NetworkKnowledgeGraph(store)
+    kg.load_from_store()
+    return kg
+
+
+def test_vpc_containment_uses_all_covering_blocks(store):
+    store.add_subnet(Subnet(id="app", cidr="10.1.2.0/24"))
+    store.add_subnet(Subnet(id="v6", cidr="2001:db8:0:1::/64"))
+    store.add_vpc(VPC(id="vpc-a", name="a", cidr_blocks=["10.1.0.0/16", "10.0.0.0/8", "bogus"]))
+    store.add_vpc(VPC(id="vpc-b", name="b", cidr_blocks=["10.1.2.0/24", "2001:db8::/32"]))
+    kg = _reloaded(store)
+    contains = Counter((u, v) for u, v, d in kg.graph.edges(data=True) if d["edge_type"] == "vpc_contains")
+    assert contains == {
+        ("vpc-a", "lan"): 1, ("vpc-a", "p2p"): 1, ("vpc-a", "app"): 2,
+        ("vpc-b", "app"): 1, ("vpc-b", "v6"): 1,
+    }
+
+
+def test_interface_changes_update_p2p_and_subnet_edges(store, graph):
+    assert graph.graph.has_edge("r1", "r2")
+    store.delete_interface("r2-p2p")
+    graph.refresh_interface("r2-p2p")
+    assert not graph.graph.has_edge("r1", "r2")
+    # The default route lost its next hop
+    assert graph.find_device_by_ip("10.255.0.2") is None
+
+    store.add_interface(Interface(id="fw1-p2p", device_id="fw1", name="ge0", ip="10.255.0.2"))
+    store.add_interface(Interface(id="fw1-lan", device_id="fw1", name="ge1", ip="10.0.0.9"))
+    graph.refresh_interface("fw1-p2p")
+    graph.refresh_interface("fw1-lan")
+    assert graph.find_device_by_ip("10.255.0.2") == "fw1"
+    assert _edges(graph) == _edges(_reloaded(store))
+    assert ("r1", "fw1", "routes_via", "0.0.0.0/0") in _edges(graph)
+
+
+def test_duplicate_route_takes_over_edge(store, graph):
+    store.add_route(Route(id="rt-dup", device_id="r1", destination_cidr="0.0.0.0/0",
+                          next_hop="192.168.0.2", protocol="static"))
+    graph.refresh_route("rt-dup")
+    assert _edges(graph)[("r1", "r2", "routes_via", "0.0.0.0/0")] == 1
+    store.delete_route("rt-default")
+    graph.refresh_route("rt-default")
+    assert _edges(graph)[("r1", "r2", "routes_via", "0.0.0.0/0")] == 1
+    store.delete_route("rt-dup")
+    graph.refresh_route("rt-dup")
+    assert _edges(graph) == _edges(_reloaded(store))
+
+
+def test_device_update_and_delete(store, graph):
+    store.update_device("r2", management_ip="192.168.9.9", vendor="juniper")
+    graph.refresh_device("r2")
+    assert graph.graph.nodes["r2"]["vendor"] == "juniper"
+    assert graph.find_device_by_ip("192.168.9.9") == "r2"
+    assert "192.168.0.2" not in graph._device_index
+
+    store.delete_device("r2")
+    graph.refresh_device("r2")
+    assert "r2" not in graph.graph
+    assert _edges(graph) == _edges(_reloaded(store))
+    assert graph._device_index == _reloaded(store)._device_index
+
+
+def _routes_to(kg):
+    return sorted((u, v) for u, v, d in kg.graph.edges(data=True) if d["edge_type"] == "routes_to")
+
+
+def test_routes_to_rebuilt_after_next_hop_device_readded(store, graph):
+    graph.build_route_edges("10.0.0.7", "8.8.8.8")
+    assert _routes_to(graph) == [("r1", "r2")]
+
+    store.delete_device("r2")
+    graph.refresh_device("r2")
+    graph.build_route_edges("10.0.0.7", "8.8.8.8")
+    assert _routes_to(graph) == []
+
+    store.add_device(Device(id="r2", name="r2", device_type=DeviceType.ROUTER, management_ip="192.168.0.2"))
+    store.add_interface(Interface(id="r2-p2p", device_id="r2", name="eth1", ip="10.255.0.2"))
+    graph.refresh_device("r2")
+    graph.build_route_edges("10.0.0.7", "8.8.8.8")
+    assert _routes_to(graph) == [("r1", "r2")]
+
+
+def test_routes_to_follows_moved_next_hop(store, graph):
+    graph.build_route_edges("10.0.0.7", "8.8.8.8")
+    store.delete_interface("r2-p2p")
+    graph.refresh_interface("r2-p2p")
+    store.add_interface(Interface(id="fw1-p2p", device_id="fw1", name="ge0", ip="10.255.0.2"))
+    graph.refresh_interface("fw1-p2p")
+    graph.build_route_edges("10.0.0.7", "8.8.8.8")
+    assert _routes_to(graph) == [("r1", "fw1")]
+
+
+def test_consumer_applies_bus_events(store, graph):
+    async def scenario():
+        bus = MemoryEventBus()
+        await bus.start()
+        await KnowledgeGraphSyncConsumer(graph).subscribe(bus)
+        store.add_device(Device(id="r3", name="r3", management_ip="192.168.0.4"))
+        store.add_interface(Interface(id="r3-lan", device_id="r3", name="eth0", ip="10.0.0.3"))
+        store.add_route(Route(id="rt-r3", device_id="r3", destination_cidr="0.0.0.0/0",
+                              next_hop="10.0.0.1", protocol="static"))
+        await bus.publish(DEVICE_CHANGED, make_device_event("r3", EventType.CREATED, "test").to_dict())
+        await bus.publish(STALE_DETECTED, make_stale_event("device", "r1").to_dict())
+        store.delete_interface("r1-lan")
+        await bus.publish(INTERFACE_CHANGED, make_interface_event("r1-lan", EventType.DELETED, "test").to_dict())
+        await bus.publish(ROUTE_CHANGED, make_route_event("missing", EventType.DELETED, "test").to_dict())
+        await asyncio.sleep(0.2)
+        await bus.stop()
+
+    asyncio.run(scenario())
+    assert graph.graph.nodes["r1"]["stale"] is True
+    assert ("r3", "lan", "connected_to", "eth0") in _edges(graph)
+    # r3's default route pointed at r1-lan, which is gone again
+    assert _edges(graph) == _edges(_reloaded(store))
+
+
+
+def test_store_writes_reach_graph_through_bus(store, graph):
+    async def scenario():
+        bus = MemoryEventBus()
+        await bus.start()
+        await KnowledgeGraphSyncConsumer(graph).subscribe(bus)
+        store.set_change_listener(StoreChangePublisher(bus, asyncio.get_running_loop()))
+        store.add_device(Device(id="r3", name="r3", management_ip="192.168.0.4"))
+        # collectors write from worker threads
+        await asyncio.to_thread(
+            store.add_interface, Interface(id="r3-lan", device_id="r3", name="eth0", ip="10.0.0.3"),
+        )
+        store.add_route(Route(id="rt-r3", device_id="r3", destination_cidr="0.0.0.0/0",
+                              next_hop="10.0.0.1", protocol="static"))
+        store.delete_route("rt-default")
+        await asyncio.sleep(0.2)
+        store.set_change_listener(None)
+        await bus.stop()
+
+    asyncio.run(scenario())
+    assert ("r3", "lan", "connected_to", "eth0") in _edges(graph)
+    assert _edges(graph) == _edges(_reloaded(store))
+
+def test_candidate_devices_follow_interface_deltas(store, graph):
+    assert [c["device_id"] for c in graph.find_candidate_devices("10.0.0.50")] == ["r1"]
+    store.add_interface(Interface(id="fw1-lan", device_id="fw1", name="ge1", ip="10.0.0.9"))
+    graph.refresh_interface("fw1-lan")
+    assert graph.find_candidate_devices("10.0.0.50") == [
+        {"device_id": "r1", "device_name": "r1", "interface_ip": "10.0.0.1", "interface_name": "eth0"},
+        {"device_id": "fw1", "device_name": "fw1", "interface_ip": "10.0.0.9", "interface_name": "ge1"},
+    ]
+    assert graph.find_candidate_devices("172.16.0.1") == []
+
+
+def test_route_edges_use_longest_prefix_match(store, graph):
+    store.add_route(Route(id="rt-lan", device_id="r1", destination_cidr="10.0.0.0/24",
+                          next_hop="192.168.0.3", protocol="static"))
+    store.add_route(Route(id="rt-mgmt", device_id="r1", destination_cidr="192.168.0.0/24",
+                          next_hop="192.168.0.2", protocol="static"))
+    graph.refresh_route("rt-lan")
+    graph.refresh_route("rt-mgmt")
+    assert [r.id for r in graph.lookup_routes("r1", "10.0.0.7")] == ["rt-lan"]
+    assert [r.id for r in graph.lookup_routes("r1", "8.8.8.8")] == ["rt-default"]
+
+    for _ in range(2):
+        graph.build_route_edges("8.8.8.8", "10.0.0.7")
+    routes_to = Counter((u, v, d["destination"]) for u, v, d in graph.graph.edges(data=True)
+                        if d["edge_type"] == "routes_to")
+    assert routes_to == {("r1", "fw1", "10.0.0.0/24"): 1, ("r1", "r2", "0.0.0.0/0"): 1}
+
+    store.delete_route("rt-lan")
+    graph.refresh_route("rt-lan")
+    assert [r.id for r in graph.lookup_routes("r1", "10.0.0.7")] == ["rt-default"]
+    assert not any(d["edge_type"] == "routes_to" for _, v, d in graph.graph.edges(data=True) if v == "fw1")
@@ -1,10 +1,25 @@
 import json
 import pytest
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 
 from src.agents.log_agent import LogAnalysisAgent
 
 
+def _patch_es(*, get=None, post=None, head=None):
+    """Stub the agent's pooled ES calls per method.
+
+    Each stub is either a canned response or a ``fn(url, **kwargs)``
+    returning one.
+    """
+    stubs = {"GET": get, "POST": post, "HEAD": head}
+
+    async def _request(backend, method, url, **kwargs):
+        stub = stubs[method]
+        return stub if isinstance(stub, Mock) else stub(url, **kwargs)
+
+    return patch("src.agents.log_agent.http_clients.request", side_effect=_request)
+
+
 # ─── Init / basics ────────────────────────────────────────────────────────────
 
 def test_log_agent_init():
@@ -272,6 +287,42 @@ def test_pick_best_index_prefers_log_keyword():
     assert best == "app-logs-2025.01"
 
 
+@pytest.mark.asyncio
+async def test_es_calls_reuse_pooled_client(monkeypatch):
+    import httpx
+    from src.integrations import http_clients
+
+    seen: list[tuple[str, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, request.url.path))
+        if request.url.path.startswith("/_cat/indices"):
+            return httpx.Response(200, json=[{"index": "app-logs"}])
+        if request.method == "HEAD":
+            return httpx.Response(200)
+        return httpx.Response(200, json={"hits": {"hits": []}})
+
+    built = []
+
+    def build(backend, verify=None):
+        built.append((backend, verify))
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await http_clients.reset_for_tests()
+    monkeypatch.setattr(http_clients, "_build_client", build)
+    try:
+        for agent in (LogAnalysisAgent(), LogAnalysisAgent()):
+            assert await agent._check_index_exists("app-logs")
+            await agent._list_available_indices({"pattern": "app-*"})
+            await agent._search_elasticsearch({"index": "app-logs", "query": "*"})
+            await agent._search_by_trace_id({"index": "app-logs", "trace_id": "t1"})
+        assert len(built) == 1 and built[0][0] == "elasticsearch"
+        assert len(seen) == 8
+        assert http_clients.pool_stats()["elasticsearch"]["requests"] == 8
+    finally:
+        await http_clients.reset_for_tests()
+
+
 def test_pick_best_index_empty():
     agent = LogAnalysisAgent()
     assert agent._pick_best_index([], "anything") is None
@@ -472,9 +523,7 @@ async def test_run_full_hybrid_pipeline():
         stop_reason="tool_use",
     )
 
-    with patch("requests.get", side_effect=mock_requests_side_effect), \
-         patch("requests.post", return_value=mock_search_response), \
-         patch("requests.head", return_value=mock_head_response):
+    with _patch_es(get=mock_requests_side_effect, post=mock_search_response, head=mock_head_response):
         agent.llm_client.chat_with_tools = AsyncMock(return_value=mock_llm_response)
 
         result = await agent.run(
@@ -532,9 +581,7 @@ async def test_run_emits_events():
         stop_reason="tool_use",
     )
 
-    with patch("requests.get", return_value=mock_indices), \
-         patch("requests.post", return_value=mock_response), \
-         patch("requests.head", return_value=MagicMock(status_code=404)):
+    with _patch_es(get=mock_indices, post=mock_response, head=MagicMock(status_code=404)):
         agent.llm_client.chat_with_tools = AsyncMock(return_value=mock_llm)
         await agent.run(
             context={"service_name": "test", "elk_index": "*", "timeframe": "now-1h"},
@@ -563,9 +610,7 @@ async def test_run_no_data_returns_low_confidence():
     mock_indices.json.return_value = []
     mock_indices.raise_for_status = MagicMock()
 
-    with patch("requests.get", return_value=mock_indices), \
-         patch("requests.post", return_value=mock_response), \
-         patch("requests.head", return_value=MagicMock(status_code=404)):
+    with _patch_es(get=mock_indices, post=mock_response, head=MagicMock(status_code=404)):
         # LLM should not be called if no data
         result = await agent.run(
             context={"service_name": "test", "elk_index": "*", "timeframe": "now-1h"},
@@ -655,9 +700,7 @@ async def test_run_with_trace_id_reconstructs_flow():
     )
 
     # For this test, directly mock _search_by_trace_id to return trace logs
-    with patch("requests.head", return_value=mock_head), \
-         patch("requests.get", return_value=mock_indices), \
-         patch("requests.post", return_value=mock_search):
+    with _patch_es(get=mock_indices, post=mock_search, head=mock_head):
         agent.llm_client.chat_with_tools = AsyncMock(return_value=mock_llm)
 
         # Mock trace search specifically
@@ -1612,7 +1655,7 @@ async def test_get_log_context_includes_service_field():
         }
     }
 
-    with patch("requests.post", return_value=mock_response):
+    with _patch_es(post=mock_response):
         result = await agent._get_log_context({"index": "logs", "timestamp": "2025-01-01T00:00:01Z", "service": "checkout-svc"})
 
     logs = json.loads(result)["logs"]
@@ -2044,7 +2087,7 @@ async def test_search_elasticsearch_deduplicates_logs():
         }
     }
 
-    with patch("requests.post", return_value=mock_response):
+    with _patch_es(post=mock_response):
         await agent._search_elasticsearch({"index": "logs", "query": "*", "level_filter": "ERROR"})
         assert len(agent._raw_logs) == 2
         assert len(agent._seen_log_ids) == 2
@@ -2200,7 +2243,7 @@ async def test_search_elasticsearch_level_filter_includes_status():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({"index": "logs", "query": "*", "level_filter": "ERROR"})
 
     # Level filter is the only must clause when query is "*"
@@ -2236,7 +2279,7 @@ async def test_get_log_context_multi_field_service_query():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._get_log_context({"index": "logs", "timestamp": "2025-01-01T00:00:01Z", "service": "checkout"})
 
     service_clause = captured_body["json"]["query"]["bool"]["must"][0]["bool"]["should"]
@@ -2705,7 +2748,7 @@ async def test_search_elasticsearch_uses_targeted_service_fields():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({"index": "logs", "query": "checkout-service", "level_filter": "ERROR"})
 
     must_clauses = captured_body["json"]["query"]["bool"]["must"]
@@ -2740,7 +2783,7 @@ async def test_search_elasticsearch_star_query_skips_service_filter():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({"index": "logs", "query": "*", "level_filter": "ERROR"})
 
     must_clauses = captured_body["json"]["query"]["bool"]["must"]
@@ -2925,7 +2968,7 @@ async def test_search_elasticsearch_level_filter_includes_term_queries():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({"index": "logs", "query": "*", "level_filter": "ERROR"})
 
     level_clause = next(
@@ -2954,7 +2997,7 @@ async def test_search_elasticsearch_level_filter_includes_variants():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({"index": "logs", "query": "*", "level_filter": "ERROR"})
 
     level_clause = next(
@@ -2988,7 +3031,7 @@ async def test_search_elasticsearch_message_filter():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({
             "index": "logs", "query": "*",
             "level_filter": "", "message_filter": True,
@@ -3022,7 +3065,7 @@ async def test_search_elasticsearch_exclude_noise():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._search_elasticsearch({
             "index": "logs", "query": "*",
             "level_filter": "", "exclude_noise": True,
@@ -3434,7 +3477,7 @@ def test_noise_exclusion_clauses_exist():
 async def test_get_log_context_has_noise_exclusion():
     """_get_log_context should include must_not noise exclusion clauses."""
     agent = LogAnalysisAgent()
-    # Mock requests.post to capture the query
+    # Stub the pooled ES call to capture the query
     captured_queries = []
     def mock_post(url, json=None, **kwargs):
         captured_queries.append(json)
@@ -3444,7 +3487,7 @@ async def test_get_log_context_has_noise_exclusion():
         resp.json.return_value = {"hits": {"hits": []}}
         return resp
 
-    with patch("src.agents.log_agent.requests.post", side_effect=mock_post):
+    with _patch_es(post=mock_post):
         await agent._get_log_context({
             "index": "test-*",
             "timestamp": "2026-02-21T08:00:00Z",
@@ -0,0 +1,125 @@
+"""Tests for the streaming log pattern index."""
+import random
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.agents.log_agent import LogAnalysisAgent
+from src.agents.log_pattern_index import MAX_CORRELATION_IDS, MAX_STACK_TRACES, PatternIndex
+
+
+def _logs() -> list[dict]:
+    logs = []
+    for i in range(40):
+        level = "ERROR" if i in (20, 30) else "INFO"
+        logs.append({
+            "id": f"log-{i}",
+            "timestamp": f"2026-03-01T10:00:{i:02d}Z",
+            "level": level,
+            "message": f"line {i}",
+            "service": "api" if i % 2 else "worker",
+            "trace_id": f"t{i}",
+            "stack_trace": f"trace {i % 5}" if level == "ERROR" or i < 10 else "",
+        })
+    return logs
+
+
+def _single_group(logs: list[dict]):
+    index = PatternIndex(lambda log: "all")
+    index.extend(logs)
+    assert len(index) == 1 and index.log_count == len(logs)
+    return index.groups()[0]
+
+
+@pytest.mark.parametrize("order", ["asc", "desc", "shuffled"])
+def test_preceding_context_independent_of_arrival_order(order):
+    logs = _logs()
+    if order == "desc":
+        logs.reverse()
+    elif order == "shuffled":
+        random.Random(7).shuffle(logs)
+    group = _single_group(logs)
+    assert [log["message"] for log in group.preceding_context] == ["line 17", "line 18", "line 19"]
+    assert group.first_seen == "2026-03-01T10:00:00Z"
+    assert group.last_seen == "2026-03-01T10:00:39Z"
+    assert group.per_service["api"]["count"] == 20
+    assert group.per_service["worker"]["first_seen"] == "2026-03-01T10:00:00Z"
+
+
+def test_bounded_running_state():
+    group = _single_group(_logs())
+    assert len(group.stack_traces) == MAX_STACK_TRACES
+    assert len(set(group.stack_traces)) == MAX_STACK_TRACES
+    assert list(group.correlation_ids) == [f"t{i}" for i in range(MAX_CORRELATION_IDS)]
+    assert group.sample_log_ids == [f"log-{i}" for i in range(5)]
+
+
+def test_no_context_without_error():
+    group = _single_group([log for log in _logs() if log["level"] == "INFO"])
+    assert group.preceding_context == []
+
+
+def _es_page(hits):
+    resp = MagicMock()
+    resp.raise_for_status = MagicMock()
+    resp.json.return_value = {"hits": {"hits": hits}}
+    return resp
+
+
+@pytest.mark.asyncio
+async def test_search_pages_feed_pattern_index():
+    hits = [
+        {"_id": f"h{i}", "_index": "app", "_source": {
+            "@timestamp": f"2026-03-01T10:00:{i:02d}Z",
+            "level": "ERROR" if i % 3 == 0 else "INFO",
+            "message": "ConnectionTimeout to db" if i % 2 else "Cache miss for key 42",
+            "service": "checkout",
+        }}
+        for i in range(30)
+    ]
+    streaming = LogAnalysisAgent()
+    params = {"index": "app", "query": "*", "level_filter": ""}
+    pages = [_es_page(hits[:20]), _es_page(hits[15:])]
+    with patch("src.agents.log_agent.http_clients.request", side_effect=pages):
+        await streaming._search_elasticsearch(params)
+        assert streaming._pattern_index.log_count == 20
+        await streaming._search_elasticsearch(params)
+    assert streaming._pattern_index.log_count == len(streaming._raw_logs) == 30
+
+    batch = LogAnalysisAgent()
+    expected = batch._parse_patterns_from_logs([batch._extract_log_entry(h) for h in hits])
+    streamed = streaming._summarize_patterns(streaming._pattern_index)
+    assert streamed == expected
+    assert {p["pattern_key"] for p in streamed} >= {"ConnectionTimeout"}
+
+
+@pytest.mark.asyncio
+async def test_refetched_raw_logs_rebuild_pattern_index():
+    def hits(prefix, message, n):
+        return [
+            {"_id": f"{prefix}{i}", "_index": "app", "_source": {
+                "@timestamp": f"2026-03-01T10:00:{i:02d}Z", "level": "ERROR",
+                "message": message, "service": "checkout",
+            }}
+            for i in range(n)
+        ]
+
+    agent = LogAnalysisAgent()
+    params = {"index": "app", "query": "*", "level_filter": ""}
+    pages = [_es_page(hits("a", "ConnectionTimeout to db", 12)),
+             _es_page(hits("b", "Cache miss for key 42", 5))]
+    with patch("src.agents.log_agent.http_clients.request", side_effect=pages):
+        await agent._search_elasticsearch(params)
+        first = agent._summarize_patterns(agent._sync_pattern_index())
+        assert [p["frequency"] for p in first] == [12]
+
+        # Re-fetch: the old logs are dropped and a new search repopulates.
+        agent._raw_logs = []
+        await agent._search_elasticsearch(params)
+        second = agent._summarize_patterns(agent._sync_pattern_index())
+
+    assert agent._pattern_index.log_count == len(agent._raw_logs) == 5
+    assert second == LogAnalysisAgent()._parse_patterns_from_logs(agent._raw_logs)
+
+    agent._raw_logs = agent._raw_logs[:2]
+    assert agent._sync_pattern_index().log_count == 2
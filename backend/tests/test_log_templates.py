@@ -0,0 +1,83 @@
+"""Tests for the shared Drain-style template miner."""
+import pytest
+
+from src.utils.log_templates import (
+    APP_LOG_MASKS,
+    SYSLOG_MASKS,
+    WILDCARD,
+    TemplateMiner,
+    compile_masks,
+)
+
+
+def test_syslog_masks_single_pass():
+    miner = TemplateMiner(SYSLOG_MASKS)
+    assert miner.mask("BGP peer 192.168.1.1 down after 3600 seconds on GigabitEthernet0/1") == \
+        "BGP peer <IP> down after <NUM> seconds on <IFACE>"
+    assert miner.mask("pool 0xdeadbeef slot 7") == "pool <HEX> slot 7"
+
+
+def test_app_masks_keep_rule_priority():
+    miner = TemplateMiner(APP_LOG_MASKS)
+    assert miner.mask("at 2025-12-26T14:00:33Z to 10.244.0.1:55050") == "at <TIMESTAMP> to <IP:PORT>"
+    assert miner.mask('GET /api/v1/orders/12 "some value" id 550e8400-e29b-41d4-a716-446655440000') == \
+        'GET /<PATH> "<STR>" id <UUID>'
+
+
+def test_compile_masks_rejects_capturing_groups():
+    with pytest.raises(ValueError):
+        compile_masks(((r"\d", r"(\d+)", "<NUM>"),))
+
+
+def test_similar_messages_share_a_stable_cluster():
+    miner = TemplateMiner(SYSLOG_MASKS)
+    first = miner.add("Login accepted for alice on console")
+    second = miner.add("Login accepted for bob on console")
+    assert second is first
+    assert first.template == f"Login accepted for {WILDCARD} on console"
+    # The id was fixed when the cluster was created.
+    assert first.template_id == TemplateMiner(SYSLOG_MASKS).add(
+        "Login accepted for alice on console").template_id
+    assert first.size == 2
+
+
+def test_dissimilar_or_different_length_messages_split():
+    miner = TemplateMiner(SYSLOG_MASKS)
+    a = miner.add("Interface eth0 changed state to up")
+    b = miner.add("Interface eth0 changed state to administratively down")
+    c = miner.add("Power supply 2 failed on chassis")
+    assert len({a.template_id, b.template_id, c.template_id}) == 3
+    assert miner.cluster_count == 3
+
+
+def test_exact_repeats_hit_the_cache():
+    masked = []
+    plain = TemplateMiner(SYSLOG_MASKS)
+    miner = TemplateMiner(cache_size=2, masker=lambda m: masked.append(m) or plain.mask(m))
+    cluster = miner.add("Link down on eth0")
+    assert miner.add("Link down on eth0") is cluster
+    assert cluster.size == 2
+    assert masked == ["Link down on eth0"]
+
+
+def test_cluster_count_is_capped_lru():
+    miner = TemplateMiner(SYSLOG_MASKS, max_clusters=2)
+    keep = miner.add("Power supply failed on chassis")
+    miner.add("Fan tray removed")
+    miner.add("Power supply failed on chassis")
+    miner.add("Temperature alarm raised on slot")
+    assert miner.cluster_count == 2
+    assert miner.add("Power supply failed on chassis") is keep
+    # The evicted cluster is rebuilt, not served from the message cache.
+    fan = miner.add("Fan tray removed")
+    assert fan.size == 1 and miner.cluster_count == 2
+
+
+def test_caches_are_bounded():
+    miner = TemplateMiner(SYSLOG_MASKS, cache_size=3)
+    for i in range(10):
+        miner.add(f"event {i} word{i} happened")
+    assert len(miner._cache) == 3
+    assert len(miner._masked) == 3
+    miner.clear()
+    assert miner.cluster_count == 0 and not miner._cache
@@ -0,0 +1,127 @@
+"""Tests for the day-partitioned metric history store and its rollups."""
+import sqlite3
+import time
+
+import pytest
+
+from src.network.metric_history_store import auto_step, to_micros
+from src.network.topology_store import TopologyStore
+
+DAY = 86400
+T0 = 1_700_006_400.0  # 2023-11-15T00:00:00Z
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TopologyStore(db_path=str(tmp_path / "test.db"))
+
+
+def _tables(store, pattern):
+    conn = store._conn()
+    try:
+        return sorted(r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name GLOB ?", (pattern,)))
+    finally:
+        store._return_conn(conn)
+
+
+def test_samples_partitioned_by_day_and_read_in_order(store):
+    samples = [("device", "d1", "latency_ms", float(i), T0 - DAY + i * 3600) for i in range(48)]
+    store.metric_history.append(samples[::-1])
+    store.append_metrics([("device", "d2", "latency_ms", 9.0)])
+
+    assert _tables(store, "mh_raw_2023*") == ["mh_raw_20231114", "mh_raw_20231115"]
+    rows = store.query_metric_history("device", "d1", "latency_ms", since="2023-11-14T12:00:00")
+    assert [r["value"] for r in rows] == [float(i) for i in range(12, 48)]
+    assert rows[0]["recorded_at"] == "2023-11-14T12:00:00+00:00"
+    bounded = store.query_metric_history("device", "d1", "latency_ms",
+                                         since="2023-11-15T00:00:00", until="2023-11-15T02:00:00+00:00")
+    assert [r["value"] for r in bounded] == [24.0, 25.0]
+    assert store.query_metric_history("device", "nope", "latency_ms", since="2000-01-01") == []
+
+
+def test_rollups_fold_minutes_and_hours(store):
+    # 10s samples over two hours, values 0..719
+    store.metric_history.append(
+        [("device", "d1", "cpu_pct", float(i), T0 + i * 10) for i in range(720)])
+    # Late sample lands in an existing bucket
+    store.metric_history.append([("device", "d1", "cpu_pct", 1000.0, T0 + 5)])
+
+    minutes = store.query_metric_history("device", "d1", "cpu_pct", since=T0, resolution="1m")
+    assert len(minutes) == 120
+    assert minutes[0]["count"] == 7 and minutes[0]["max"] == 1000.0 and minutes[0]["min"] == 0.0
+    assert minutes[1]["value"] == pytest.approx(sum(range(6, 12)) / 6)
+
+    hours = store.query_metric_history("device", "d1", "cpu_pct", since=T0, resolution="1h")
+    assert [h["count"] for h in hours] == [361, 360]
+    assert hours[1]["value"] == pytest.approx(sum(range(360, 720)) / 360)
+
+    merged = store.metric_history.rollup("device", "d1", "cpu_pct", T0, step=600)
+    assert len(merged) == 12 and merged[0]["count"] == 61
+    assert merged[1]["recorded_at"] == "2023-11-15T00:10:00+00:00"
+
+
+
+def test_resent_sample_replaces_instead_of_double_counting(store):
+    batch = [("device", "d1", "cpu_pct", float(i), T0 + i * 10) for i in range(12)]
+    store.metric_history.append(batch)
+    # An outage retry re-sends part of the batch with a corrected value
+    store.metric_history.append(batch[3:5] + [("device", "d1", "cpu_pct", 50.0, T0 + 2 * 10)])
+
+    minutes = store.query_metric_history("device", "d1", "cpu_pct", since=T0, resolution="1m")
+    assert [m["count"] for m in minutes] == [6, 6]
+    assert minutes[0]["max"] == 50.0
+    assert minutes[0]["value"] == pytest.approx((0 + 1 + 50 + 3 + 4 + 5) / 6)
+    hours = store.query_metric_history("device", "d1", "cpu_pct", since=T0, resolution="1h")
+    assert [h["count"] for h in hours] == [12]
+    assert len(store.query_metric_history("device", "d1", "cpu_pct", since=T0)) == 12
+
+def test_auto_resolution_picks_chart_sized_steps(store):
+    assert auto_step(T0, T0 + 1800) == 0
+    assert auto_step(T0, T0 + DAY) == 600
+    assert auto_step(T0, T0 + 7 * DAY) == 7200
+
+    store.metric_history.append(
+        [("device", "d1", "latency_ms", 1.0, T0 + i * 60) for i in range(DAY // 60)])
+    day = store.query_metric_history("device", "d1", "latency_ms", since=T0, until=T0 + DAY,
+                                     resolution="auto")
+    assert len(day) == 144 and all(p["count"] == 10 for p in day)
+    with pytest.raises(ValueError):
+        store.query_metric_history("device", "d1", "latency_ms", since=T0, resolution="5s")
+
+
+def test_latest_values_and_prune_drops_partitions(store):
+    now = time.time()
+    store.add_metric_history("d1", now - 30 * DAY, {"cpu_pct": 99.0})
+    store.add_metric_history("d2", now - 30 * DAY, {"cpu_pct": 10.0})
+    store.add_metric_history("d1", now, {"cpu_pct": 40.0, "mem_pct": 50.0})
+    latest = store.metric_history.latest("device", ["d1", "d2"], ["cpu_pct"])
+    assert sorted(v for _, _, v, _ in latest) == [10.0, 40.0]
+
+    deleted = store.prune_metric_history(older_than_days=7)
+    assert deleted == 2
+    assert len(_tables(store, "mh_raw_*")) == 1
+    assert store.aggregate_device_metrics(["d1", "d2"])["device_count"] == 1
+    # Minute rollups outlive raw samples
+    old = to_micros(now - 30 * DAY) / 1e6
+    assert store.query_metric_history("device", "d1", "cpu_pct", since=old - 60, until=old + 60) == []
+    assert store.query_metric_history("device", "d1", "cpu_pct", since=old - 60, until=old + 60,
+                                      resolution="1m")[0]["value"] == 99.0
+
+
+def test_legacy_table_is_migrated(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE metric_history (id INTEGER PRIMARY KEY AUTOINCREMENT, entity_type TEXT, "
+                 "entity_id TEXT, metric TEXT, value REAL, recorded_at TEXT)")
+    conn.executemany("INSERT INTO metric_history (entity_type, entity_id, metric, value, recorded_at) "
+                     "VALUES (?,?,?,?,?)",
+                     [("device", "d1", "latency_ms", 1.5, "2023-11-15T00:00:00+00:00"),
+                      ("device", "d1", "latency_ms", 2.5, "2023-11-15T00:00:10+00:00")])
+    conn.commit()
+    conn.close()
+
+    store = TopologyStore(db_path=path)
+    rows = store.query_metric_history("device", "d1", "latency_ms", since="2000-01-01")
+    assert [r["value"] for r in rows] == [1.5, 2.5]
+    assert _tables(store, "metric_history") == []
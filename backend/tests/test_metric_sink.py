@@ -0,0 +1,67 @@
+"""Tests for the monitor's write-behind metric sink."""
+import asyncio
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.network.metric_sink import MetricSink
+from src.network.monitor import NetworkMonitor
+from src.network.topology_store import TopologyStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TopologyStore(db_path=os.path.join(str(tmp_path), "sink.db"))
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_one_batch_and_coalesces_statuses(store):
+    sink = MetricSink(store)
+    with patch.object(store, "write_monitor_batch", wraps=store.write_monitor_batch) as write:
+        for i in range(200):
+            sink.put_status(f"d{i}", "up", 1.0, 0.0, "icmp")
+            sink.put_metric("device", f"d{i}", "latency_ms", 1.0)
+        sink.put_status("d0", "down", 0.0, 1.0, "icmp")
+        assert store.get_device_status("d0") is None  # nothing written yet
+        assert await sink.flush() == 400
+    write.assert_called_once()
+    assert store.get_device_status("d0")["status"] == "down"
+    assert len(store.query_metric_history("device", "d7", "latency_ms", since="2000-01-01")) == 1
+    assert await sink.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_writer_flushes_on_size_threshold_and_stop(store):
+    sink = MetricSink(store, flush_interval=60, max_pending=10)
+    sink.start()
+    for i in range(10):
+        sink.put_metric("device", "d1", "latency_ms", float(i))
+    await asyncio.sleep(0.2)
+    assert sink.flush_count == 1 and sink.pending == 0
+
+    sink.put_status("d1", "up", 1.0, 0.0, "icmp")
+    await sink.stop()
+    assert store.get_device_status("d1")["status"] == "up"
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows(store):
+    sink = MetricSink(store)
+    sink.put_status("d1", "up", 1.0, 0.0, "icmp")
+    sink.put_metric("device", "d1", "latency_ms", 1.0)
+    with patch.object(store, "write_monitor_batch", side_effect=RuntimeError("locked")):
+        assert await sink.flush() == 0
+    sink.put_status("d1", "down", 0.0, 1.0, "icmp")
+    assert sink.pending == 2
+    await sink.flush()
+    assert store.get_device_status("d1")["status"] == "down"
+
+
+@pytest.mark.asyncio
+async def test_monitor_prunes_on_coarse_schedule(store):
+    monitor = NetworkMonitor(store, MagicMock(), MagicMock())
+    with patch.object(store, "prune_metric_history") as prune:
+        await monitor._prune_pass()
+        await monitor._prune_pass()
+    prune.assert_called_once_with(older_than_days=7)
@@ -1,3 +1,7 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import numpy as np
 import pytest
 from src.agents.metrics_agent import MetricsAgent
 
@@ -163,21 +167,103 @@ def test_parse_final_response_includes_all_time_series():
     assert result["correlated_signals"] == []
 
 
+def _matrix(values, pod="api-0", start=0):
+    return [{"metric": {"pod": pod}, "values": [[start + i * 60, str(v)] for i, v in enumerate(values)]}]
+
+
 def test_spike_not_flagged_if_cyclical():
     from src.agents.metrics_agent import MetricsAgent
     agent = MetricsAgent.__new__(MetricsAgent)
 
-    current = [{"timestamp": i, "value": 100 + (50 if 10 <= i <= 12 else 0)} for i in range(24)]
-    previous = [{"timestamp": i, "value": 100 + (50 if 10 <= i <= 12 else 0)} for i in range(24)]
-    spikes = agent._detect_spikes_with_baseline(current, previous, threshold=2.0)
-    assert len(spikes) == 0
+    current = [100 + (50 if 10 <= i <= 12 else 0) for i in range(24)]
+    agent._matrix_cache = {"q": _matrix(current)}
+    agent._seasonal_cache = {"q": _matrix(current, start=-86400)}
+    assert agent._matrix_spikes("q", threshold=2.0) == []
 
 
 def test_spike_flagged_if_novel():
     from src.agents.metrics_agent import MetricsAgent
     agent = MetricsAgent.__new__(MetricsAgent)
 
-    current = [{"timestamp": i, "value": 100 + (200 if 10 <= i <= 12 else 0)} for i in range(24)]
-    previous = [{"timestamp": i, "value": 100} for i in range(24)]
-    spikes = agent._detect_spikes_with_baseline(current, previous, threshold=2.0)
+    current = [100 + (200 if 10 <= i <= 12 else 0) for i in range(24)]
+    agent._matrix_cache = {"q": _matrix(current)}
+    agent._seasonal_cache = {"q": _matrix([100] * 24, start=-86400)}
+    spikes = agent._matrix_spikes("q", threshold=2.0)
     assert len(spikes) > 0
+    assert spikes[0]["series"] == {"pod": "api-0"}
+
+
+@pytest.mark.parametrize("points", [30, 180])
+def test_matrix_spikes_match_global_baseline_by_default(points):
+    from src.agents.metrics_agent import MetricsAgent
+    agent = MetricsAgent.__new__(MetricsAgent)
+    agent._seasonal_cache = {}
+
+    rng = np.random.default_rng(points)
+    values = [float(v) for v in rng.normal(100, 15, points)]
+    values[points // 2] = 400.0
+    agent._matrix_cache = {"q": _matrix(values)}
+    expected = agent._detect_spikes(
+        [{"timestamp": i * 60.0, "value": v} for i, v in enumerate(values)], 2.0,
+    )
+    spikes = agent._matrix_spikes("q", threshold=2.0)
+    assert expected
+    assert [{k: v for k, v in s.items() if k != "series"} for s in spikes] == expected
+
+
+def test_matrix_spikes_flat_series_stay_quiet():
+    from src.agents.metrics_agent import MetricsAgent
+    agent = MetricsAgent.__new__(MetricsAgent)
+    agent._seasonal_cache = {}
+
+    # Tight noise with periodic small bumps: MAD alone would flag every
+    # bump, but CV < 0.2 switches to mean + stddev, as _detect_spikes does.
+    values = [104.0 if i % 10 == 0 else 100.0 + (i % 2) * 0.1 for i in range(180)]
+    agent._matrix_cache = {"q": _matrix(values)}
+    points = [{"timestamp": i * 60.0, "value": v} for i, v in enumerate(values)]
+    assert agent._detect_spikes(points, 3.0) == []
+    assert agent._matrix_spikes("q", threshold=3.0) == []
+    assert agent._matrix_spikes("q", threshold=3.0, rolling_window=60) == []
+
+
+def test_matrix_spikes_rolling_baseline_is_opt_in():
+    from src.agents.metrics_agent import MetricsAgent
+    agent = MetricsAgent.__new__(MetricsAgent)
+    agent._seasonal_cache = {}
+
+    # Level shift: the whole-range baseline is too wide to see the spike
+    # after it; the rolling baseline flags the step, then only the spike.
+    shifted = [10.0 + (i % 5) for i in range(90)] + [100.0 + (i % 5) for i in range(90)]
+    shifted[170] = 200.0
+    agent._matrix_cache = {"q": _matrix(shifted)}
+    assert agent._matrix_spikes("q", threshold=4.0) == []
+    rolling = agent._matrix_spikes("q", threshold=4.0, rolling_window=60)
+    assert [s["spike_start"] for s in rolling] == [90 * 60, 170 * 60]
+
+
+@pytest.mark.asyncio
+async def test_query_offset_baseline_is_instant_query_at_exact_time():
+    agent = MetricsAgent.__new__(MetricsAgent)
+    agent.agent_name = "metrics_agent"
+    agent.breadcrumbs = []
+    agent.prometheus_url = "http://prom:9090"
+
+    calls = []
+
+    async def fake_request(backend, method, url, params=None, timeout=None):
+        calls.append((url, params))
+        value = "150" if len(calls) == 1 else "100"
+        resp = MagicMock()
+        resp.json.return_value = {"data": {"result": [{"value": [params["time"], value]}]}}
+        return resp
+
+    cache = MagicMock()
+    with patch("src.agents.metrics_agent.http_clients.request", side_effect=fake_request), \
+            patch("src.agents.metrics_agent.get_range_cache", return_value=cache):
+        result = json.loads(await agent._query_offset({"query": "up", "offset_hours": 24}))
+
+    (now_url, now_params), (base_url, base_params) = calls
+    assert now_url == base_url == "http://prom:9090/api/v1/query"
+    assert now_params["time"] - base_params["time"] == pytest.approx(24 * 3600)
+    assert not cache.mock_calls
+    assert result["baseline_value"] == 100.0 and result["deviation_percent"] == 50.0
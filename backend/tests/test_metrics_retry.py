@@ -1,11 +1,15 @@
-"""Tests for MetricsStore retry queue on failed writes."""
+"""Tests for MetricsStore batched writes and retry backlog on failed writes."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
 
 import pytest
+import pytest_asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 
-@pytest.fixture
-def mock_store():
+@pytest_asyncio.fixture
+async def mock_store():
     """Create a MetricsStore with mocked InfluxDB client."""
     with patch("src.network.metrics_store.InfluxDBClientAsync") as MockClient:
         mock_client = MagicMock()
@@ -23,23 +27,34 @@ def mock_store():
             bucket="test-bucket",
         )
         store._mock_write_api = mock_write_api
+        # Park the background retry loop; tests drive it explicitly.
+        store.RETRY_BASE_DELAY = 3600
         yield store
+        if store._retry_task is not None:
+            store._retry_task.cancel()
+
+
+def _written_lines(write_mock) -> list[str]:
+    lines = []
+    for call in write_mock.await_args_list:
+        lines.extend(call.kwargs["record"].split("\n"))
+    return lines
 
 
 class TestRetryQueue:
     @pytest.mark.asyncio
     async def test_successful_write_does_not_queue(self, mock_store):
-        """A successful write should not add to the retry queue."""
+        """A successful write should not add to the retry backlog."""
         mock_store._mock_write_api.write = AsyncMock()
         await mock_store.write_device_metric("dev-1", "cpu_pct", 55.0)
-        assert len(mock_store._retry_queue) == 0
+        assert mock_store.backlog_size == 0
 
     @pytest.mark.asyncio
     async def test_failed_write_queues_point(self, mock_store):
-        """A failed write should add the point to the retry queue."""
+        """A failed write should add the point to the retry backlog."""
         mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("timeout"))
         await mock_store.write_device_metric("dev-1", "cpu_pct", 55.0)
-        assert len(mock_store._retry_queue) == 1
+        assert mock_store.backlog_size == 1
 
     @pytest.mark.asyncio
     async def test_flush_retry_queue_drains_on_success(self, mock_store):
@@ -49,13 +64,13 @@ class TestRetryQueue:
         await mock_store.write_device_metric("dev-1", "cpu_pct", 10.0)
         await mock_store.write_device_metric("dev-1", "cpu_pct", 20.0)
         await mock_store.write_device_metric("dev-1", "cpu_pct", 30.0)
-        assert len(mock_store._retry_queue) == 3
+        assert mock_store.backlog_size == 3
 
         # Now fix the write API
         mock_store._mock_write_api.write = AsyncMock()
         flushed = await mock_store.flush_retry_queue()
         assert flushed == 3
-        assert len(mock_store._retry_queue) == 0
+        assert mock_store.backlog_size == 0
 
     @pytest.mark.asyncio
     async def test_flush_retry_queue_keeps_failures(self, mock_store):
@@ -63,35 +78,156 @@ class TestRetryQueue:
         mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("down"))
         await mock_store.write_device_metric("dev-1", "cpu_pct", 10.0)
         await mock_store.write_device_metric("dev-1", "cpu_pct", 20.0)
-        assert len(mock_store._retry_queue) == 2
+        assert mock_store.backlog_size == 2
 
         # Flush still fails
         flushed = await mock_store.flush_retry_queue()
         assert flushed == 0
-        assert len(mock_store._retry_queue) == 2
+        assert mock_store.backlog_size == 2
 
     @pytest.mark.asyncio
-    async def test_retry_queue_maxlen(self, mock_store):
-        """Queue silently drops oldest items when maxlen (1000) is exceeded."""
-        assert mock_store._retry_queue.maxlen == 1000
-
+    async def test_backlog_overflow_drops_oldest_and_counts(self, mock_store):
+        """Overflowing the backlog drops the oldest points and counts them."""
+        mock_store.MAX_BACKLOG_POINTS = 1000
         mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("down"))
         for i in range(1005):
             await mock_store.write_device_metric("dev-1", f"metric_{i}", float(i))
 
-        # Should be capped at 1000
-        assert len(mock_store._retry_queue) == 1000
+        assert mock_store.backlog_size == 1000
+        assert mock_store.dropped_points == 5
 
     @pytest.mark.asyncio
     async def test_flush_empty_queue(self, mock_store):
         """Flushing an empty queue returns 0."""
         flushed = await mock_store.flush_retry_queue()
         assert flushed == 0
-        assert len(mock_store._retry_queue) == 0
+        assert mock_store.backlog_size == 0
 
     @pytest.mark.asyncio
     async def test_link_metric_failure_queues(self, mock_store):
         """write_link_metric failures also enqueue."""
         mock_store._mock_write_api.write = AsyncMock(side_effect=IOError("disk full"))
         await mock_store.write_link_metric("sw1", "sw2", bps_in=100.0)
-        assert len(mock_store._retry_queue) == 1
+        assert mock_store.backlog_size == 1
+
+
+class TestBatchedWrites:
+    @pytest.mark.asyncio
+    async def test_write_points_chunks_by_batch_size(self, mock_store):
+        mock_store.WRITE_BATCH_SIZE = 100
+        written = await mock_store.write_points([f"m,t=a v={i}i" for i in range(250)])
+        assert written == 250
+        assert mock_store._mock_write_api.write.await_count == 3
+        assert len(_written_lines(mock_store._mock_write_api.write)) == 250
+
+    @pytest.mark.asyncio
+    async def test_failed_write_returns_without_backing_off(self, mock_store):
+        mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("down"))
+        with patch("src.network.metrics_store.asyncio.sleep", new=AsyncMock()) as sleep:
+            assert await mock_store.write_points(["m v=1i", "m v=2i"]) == 0
+        assert mock_store._mock_write_api.write.await_count == 1
+        sleep.assert_not_awaited()
+        assert mock_store.backlog_size == 2
+        assert mock_store._retry_task is not None and not mock_store._retry_task.done()
+
+    @pytest.mark.asyncio
+    async def test_retry_task_backs_off_until_backlog_lands(self, mock_store):
+        mock_store.RETRY_BASE_DELAY = 0.01
+        mock_store.RETRY_MAX_DELAY = 0.04
+        mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("down"))
+        waits = []
+        real_wait_for = asyncio.wait_for
+
+        async def wait_for(aw, timeout):
+            waits.append(timeout)
+            if len(waits) == 4:
+                mock_store._mock_write_api.write.side_effect = None
+            return await real_wait_for(aw, timeout)
+
+        with patch("src.network.metrics_store.asyncio.wait_for", new=wait_for):
+            await mock_store.write_points(["m v=1i"])
+            await real_wait_for(mock_store._retry_task, 5)
+        assert mock_store.backlog_size == 0
+        assert 0.005 <= waits[0] <= 0.01 and 0.01 <= waits[1] <= 0.02
+        assert all(w <= 0.04 for w in waits)
+        assert _written_lines(mock_store._mock_write_api.write)[-1] == "m v=1i"
+
+    @pytest.mark.asyncio
+    async def test_fresh_write_success_wakes_backlog_resend(self, mock_store):
+        mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("down"))
+        assert await mock_store.write_points(["m v=1i", "m v=2i"]) == 0
+        assert mock_store.backlog_size == 2
+
+        mock_store._mock_write_api.write = AsyncMock()
+        # Only the fresh batch is written in the caller's call...
+        assert await mock_store.write_points(["m v=3i"]) == 1
+        # ...the backlog follows from the retry task, without the hour-long backoff.
+        await asyncio.wait_for(mock_store._retry_task, 5)
+        assert mock_store.backlog_size == 0
+        assert sorted(_written_lines(mock_store._mock_write_api.write)) == ["m v=1i", "m v=2i", "m v=3i"]
+
+    @pytest.mark.asyncio
+    async def test_backlog_not_resent_while_writes_keep_failing(self, mock_store):
+        mock_store._mock_write_api.write = AsyncMock(side_effect=ConnectionError("down"))
+        await mock_store.write_points(["m v=1i"])
+        mock_store._mock_write_api.write.reset_mock()
+
+        assert await mock_store.write_points(["m v=2i"]) == 0
+        # One attempt for the new chunk; the spilled chunk is left alone.
+        assert mock_store._mock_write_api.write.await_count == 1
+        assert mock_store.backlog_size == 2
+
+    @pytest.mark.asyncio
+    async def test_in_flight_writes_are_bounded(self, mock_store):
+        mock_store.WRITE_BATCH_SIZE = 1
+        mock_store._write_slots = asyncio.Semaphore(2)
+        active = peak = 0
+
+        async def slow_write(**_):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+        mock_store._mock_write_api.write = AsyncMock(side_effect=slow_write)
+        assert await mock_store.write_points([f"m v={i}i" for i in range(8)]) == 8
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_write_flows_matches_point_line_protocol(self, mock_store):
+        from src.network.flow_columns import FlowBatch, empty_columns, ip_to_int
+        from src.network.metrics_store import FlowRecord
+
+        start = datetime(2024, 3, 5, 12, 0, tzinfo=timezone.utc)
+        flow = FlowRecord(
+            src_ip="10.0.0.1", dst_ip="172.16.4.9", src_port=51000, dst_port=443,
+            protocol=6, bytes=1500, packets=3, start_time=start,
+            end_time=start + timedelta(seconds=2), src_as=64512, dst_as=15169,
+            exporter_ip="192.168.1.1",
+        )
+        cols = empty_columns(1)
+        for name in ("src_port", "dst_port", "protocol", "bytes", "packets", "src_as", "dst_as"):
+            cols[name] = getattr(flow, name)
+        cols["src_ip"] = ip_to_int(flow.src_ip)
+        cols["dst_ip"] = ip_to_int(flow.dst_ip)
+        cols["start"] = int(flow.start_time.timestamp())
+        cols["end"] = int(flow.end_time.timestamp())
+
+        await mock_store.write_flow(flow)
+        expected = mock_store._mock_write_api.write.await_args.kwargs["record"]
+        mock_store._mock_write_api.write.reset_mock()
+
+        await mock_store.write_flows([flow], [FlowBatch(cols, "192.168.1.1")])
+        assert _written_lines(mock_store._mock_write_api.write) == [expected, expected]
+
+    @pytest.mark.asyncio
+    async def test_write_link_metrics_single_request(self, mock_store):
+        await mock_store.write_link_metrics([
+            ("sw1", "sw2", {"bytes": 100, "packets": 2}),
+            ("sw 3", "sw4", {"bytes": 5}),
+        ])
+        assert mock_store._mock_write_api.write.await_count == 1
+        lines = _written_lines(mock_store._mock_write_api.write)
+        assert lines[0].startswith("link_traffic,dst_device=sw2,src_device=sw1 bytes=100,packets=2 ")
+        assert lines[1].startswith("link_traffic,dst_device=sw4,src_device=sw\\ 3 bytes=5 ")
@@ -31,7 +31,7 @@ class TestMonitorBroadcast:
         monitor.adapters = MagicMock()
         monitor.adapters.all_instances.return_value = {}
         monitor.adapters.device_bindings.return_value = {}
-        with patch("src.network.monitor.async_ping", new=None):
+        with patch.object(monitor.icmp, "ping_many", AsyncMock(return_value={})):
             await monitor._collect_cycle()
         callback.assert_awaited_once()
         msg = callback.call_args[0][0]
@@ -54,7 +54,7 @@ class TestMonitorBroadcast:
         monitor.adapters.all_instances.return_value = {}
         monitor.adapters.device_bindings.return_value = {}
         monitor._latest_alerts = [{"key": "a1"}, {"key": "a2"}]
-        with patch("src.network.monitor.async_ping", new=None):
+        with patch.object(monitor.icmp, "ping_many", AsyncMock(return_value={})):
             await monitor._collect_cycle()
         msg = callback.call_args[0][0]
         assert msg["data"]["active_alerts"] == 2
@@ -73,7 +73,7 @@ class TestMonitorBroadcast:
         monitor.adapters = MagicMock()
         monitor.adapters.all_instances.return_value = {}
         monitor.adapters.device_bindings.return_value = {}
-        with patch("src.network.monitor.async_ping", new=None):
+        with patch.object(monitor.icmp, "ping_many", AsyncMock(return_value={})):
             await monitor._collect_cycle()
         # Should not raise — just no broadcast
 
@@ -92,6 +92,6 @@ class TestMonitorBroadcast:
         monitor.adapters = MagicMock()
         monitor.adapters.all_instances.return_value = {}
         monitor.adapters.device_bindings.return_value = {}
-        with patch("src.network.monitor.async_ping", new=None):
+        with patch.object(monitor.icmp, "ping_many", AsyncMock(return_value={})):
             await monitor._collect_cycle()
         # Should not raise
@@ -195,13 +195,14 @@ class TestAdapterPassConcurrency:
         for i in range(3):
             adapter = MagicMock()
 
-            async def _slow_get_interfaces(_i=i):
+            async def _slow_refresh(_i=i):
                 call_log.append((f"adapter_{_i}_start", time.monotonic()))
                 await asyncio.sleep(DELAY)
                 call_log.append((f"adapter_{_i}_end", time.monotonic()))
-                return []
+                return {}
 
-            adapter.get_interfaces = _slow_get_interfaces
+            adapter.snapshot_due.return_value = True
+            adapter.schedule_refresh = lambda _f=_slow_refresh: asyncio.ensure_future(_f())
             adapter.vendor = MagicMock()
             adapter.vendor.value = "mock"
             reg.register(f"inst_{i}", adapter)
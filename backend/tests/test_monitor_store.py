@@ -73,14 +73,8 @@ class TestMetricHistory:
         assert rows[0]["value"] == 2.5
 
     def test_prune_old_data(self, store):
-        store.append_metric("device", "d1", "latency_ms", 2.5)
-        # Manually backdate the row
-        conn = store._conn()
-        try:
-            conn.execute("UPDATE metric_history SET recorded_at='2020-01-01T00:00:00'")
-            conn.commit()
-        finally:
-            conn.close()
+        # A sample recorded 2020-01-01T00:00:00Z
+        store.add_metric_history("d1", 1577836800.0, {"latency_ms": 2.5})
         store.prune_metric_history(older_than_days=1)
         rows = store.query_metric_history("device", "d1", "latency_ms", since="2000-01-01")
         assert len(rows) == 0
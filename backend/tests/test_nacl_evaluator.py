@@ -1,6 +1,11 @@
 import pytest
-from src.agents.network.nacl_evaluator import nacl_evaluator, _evaluate_rules
+from src.agents.network.nacl_evaluator import nacl_evaluator, _result
 from src.network.models import NACLRule, NACLDirection, PolicyAction
+from src.network.policy_index import NACLPolicy
+
+
+def _evaluate_rules(rules, src_ip, dst_ip, port, protocol):
+    return _result(NACLPolicy(rules).evaluate(NACLDirection.INBOUND, src_ip, dst_ip, port, protocol))
 
 
 def test_evaluate_rules_allow():
@@ -1,13 +1,21 @@
 """Tests for the NetworkMonitor collection engine."""
 import os
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, patch
 
 from src.network.topology_store import TopologyStore
 from src.network.knowledge_graph import NetworkKnowledgeGraph
 from src.network.models import Device, DeviceType, Subnet
 from src.network.adapters.registry import AdapterRegistry
 from src.network.monitor import NetworkMonitor
+from src.network.icmp_engine import EchoStats
+
+
+def _ping_many(rtt=None):
+    """Fake ICMPEngine.ping_many: every target answers with ``rtt`` (None = silent)."""
+    async def ping_many(addresses, **kwargs):
+        return {a: EchoStats(a, sent=3, rtts=[] if rtt is None else [rtt] * 3) for a in addresses}
+    return AsyncMock(side_effect=ping_many)
 
 
 @pytest.fixture
@@ -36,13 +44,9 @@ class TestProbePass:
         store.add_device(Device(id="r1", name="R1", device_type=DeviceType.ROUTER, management_ip="10.0.0.1"))
         kg.load_from_store()
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock) as mock_ping:
-            mock_result = MagicMock()
-            mock_result.is_alive = True
-            mock_result.avg_rtt = 2.5
-            mock_result.packet_loss = 0.0
-            mock_ping.return_value = mock_result
+        with patch.object(monitor.icmp, "ping_many", _ping_many(2.5)):
             await monitor._probe_pass()
+        await monitor.metric_sink.flush()
 
         status = store.get_device_status("r1")
         assert status is not None
@@ -53,13 +57,9 @@ class TestProbePass:
         store.add_device(Device(id="r1", name="R1", device_type=DeviceType.ROUTER, management_ip="10.0.0.1"))
         kg.load_from_store()
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock) as mock_ping:
-            mock_result = MagicMock()
-            mock_result.is_alive = False
-            mock_result.avg_rtt = 0
-            mock_result.packet_loss = 1.0
-            mock_ping.return_value = mock_result
+        with patch.object(monitor.icmp, "ping_many", _ping_many(None)):
             await monitor._probe_pass()
+        await monitor.metric_sink.flush()
 
         status = store.get_device_status("r1")
         assert status["status"] == "down"
@@ -69,13 +69,9 @@ class TestProbePass:
         store.add_device(Device(id="r1", name="R1", device_type=DeviceType.ROUTER, management_ip="10.0.0.1"))
         kg.load_from_store()
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock) as mock_ping:
-            mock_result = MagicMock()
-            mock_result.is_alive = True
-            mock_result.avg_rtt = 150.0  # > 100ms threshold
-            mock_result.packet_loss = 0.0
-            mock_ping.return_value = mock_result
+        with patch.object(monitor.icmp, "ping_many", _ping_many(150.0)):
             await monitor._probe_pass()
+        await monitor.metric_sink.flush()
 
         status = store.get_device_status("r1")
         assert status["status"] == "degraded"
@@ -85,7 +81,7 @@ class TestProbePass:
         store.add_device(Device(id="r1", name="R1", device_type=DeviceType.ROUTER, management_ip=""))
         kg.load_from_store()
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock) as mock_ping:
+        with patch.object(monitor.icmp, "ping_many", _ping_many(1.0)) as mock_ping:
             await monitor._probe_pass()
             mock_ping.assert_not_called()
 
@@ -96,12 +92,7 @@ class TestCollectCycle:
         store.add_device(Device(id="r1", name="R1", device_type=DeviceType.ROUTER, management_ip="10.0.0.1"))
         kg.load_from_store()
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock) as mock_ping:
-            mock_result = MagicMock()
-            mock_result.is_alive = True
-            mock_result.avg_rtt = 2.0
-            mock_result.packet_loss = 0.0
-            mock_ping.return_value = mock_result
+        with patch.object(monitor.icmp, "ping_many", _ping_many(2.0)):
             await monitor._collect_cycle()
 
         assert store.get_device_status("r1") is not None
@@ -111,12 +102,7 @@ class TestCollectCycle:
         store.add_device(Device(id="r1", name="R1", device_type=DeviceType.ROUTER, management_ip="10.0.0.1"))
         kg.load_from_store()
 
-        with patch("src.network.monitor.async_ping", new_callable=AsyncMock) as mock_ping:
-            mock_result = MagicMock()
-            mock_result.is_alive = True
-            mock_result.avg_rtt = 2.0
-            mock_result.packet_loss = 0.0
-            mock_ping.return_value = mock_result
+        with patch.object(monitor.icmp, "ping_many", _ping_many(2.0)):
             await monitor._collect_cycle()
 
         history = store.query_metric_history("device", "r1", "latency_ms", since="2000-01-01")
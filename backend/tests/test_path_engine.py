@@ -0,0 +1,84 @@
+"""Tests for the cached cost graph and batched path queries."""
+import random
+
+import networkx as nx
+import pytest
+
+from src.network.path_engine import PathEngine, TopologyGraph, edge_cost
+
+
+def _legacy_cost_graph(graph):
+    cost_graph = nx.DiGraph()
+    for u, v, data in graph.edges(data=True):
+        cost = edge_cost(data)
+        if not cost_graph.has_edge(u, v) or cost < cost_graph[u][v]["weight"]:
+            cost_graph.add_edge(u, v, weight=cost)
+    return cost_graph
+
+
+def _random_topology(seed=5, nodes=60, edges=180):
+    rng = random.Random(seed)
+    graph = TopologyGraph()
+    for _ in range(edges):
+        u, v = rng.sample(range(nodes), 2)
+        graph.add_edge(f"n{u}", f"n{v}", confidence=rng.choice((0.5, 0.7, 0.9, 1.0)),
+                       edge_type=rng.choice(("layer3_link", "tunnel_to", "peered_to")))
+    return graph
+
+
+def _same_costs(engine):
+    expected = _legacy_cost_graph(engine.graph)
+    actual = engine.cost_graph()
+    return ({(u, v): d["weight"] for u, v, d in actual.edges(data=True)}
+            == {(u, v): d["weight"] for u, v, d in expected.edges(data=True)})
+
+
+def test_cost_graph_is_cached_and_patched_per_edge():
+    graph = _random_topology()
+    engine = PathEngine(graph)
+    engine.k_shortest_paths("n1", "n2")
+    engine.k_shortest_paths("n3", "n4")
+    assert engine.rebuilds == 1
+
+    graph.add_edge("n1", "n2", confidence=1.0, edge_type="layer2_link")
+    graph.remove_node("n7")
+    key = next(iter(graph["n3"]))
+    for data in graph["n3"][key].values():
+        data["confidence"] = 0.0
+    engine.invalidate_edge("n3", key)
+    assert _same_costs(engine)
+    assert engine.k_shortest_paths("n1", "n2", k=1) == [["n1", "n2"]]
+    assert engine.rebuilds == 1
+
+    graph.clear()
+    graph.add_edge("n2", "n1", confidence=1.0)
+    assert engine.k_shortest_paths("n1", "n2") == []
+    assert engine.k_shortest_paths("n2", "n1") == [["n2", "n1"]]
+    assert engine.rebuilds == 2
+
+
+def test_many_to_many_matches_per_pair_queries():
+    graph = _random_topology(seed=9)
+    engine = PathEngine(graph)
+    nodes = sorted(graph.nodes)[:12] + ["missing"]
+    pairs = [(s, d) for s in nodes for d in nodes]
+    batched = engine.k_shortest_paths_many(pairs, k=1)
+    for (src, dst), paths in batched.items():
+        single = engine.k_shortest_paths(src, dst, k=1)
+        assert bool(paths) == bool(single)
+        if paths and src != dst:
+            cost = nx.path_weight(engine.cost_graph(), paths[0], "weight")
+            assert cost == pytest.approx(nx.path_weight(engine.cost_graph(), single[0], "weight"))
+    k3 = engine.k_shortest_paths_many(pairs[:20], k=3)
+    assert k3 == {p: engine.k_shortest_paths(*p, k=3) for p in pairs[:20]}
+
+
+def test_long_shortest_path_falls_back_to_enumeration():
+    graph = TopologyGraph()
+    chain = [f"c{i}" for i in range(6)]
+    for a, b in zip(chain, chain[1:]):
+        graph.add_edge(a, b, confidence=1.0)
+    graph.add_edge("c0", "c5", confidence=0.1)
+    engine = PathEngine(graph)
+    assert engine.k_shortest_paths_many([("c0", "c5")], k=1)[("c0", "c5")] == [chain]
+    assert engine.k_shortest_paths_many([("c0", "c5")], k=1, max_depth=3)[("c0", "c5")] == [["c0", "c5"]]
@@ -0,0 +1,152 @@
+"""Tests for the compiled firewall / NACL policy index."""
+import asyncio
+import ipaddress
+import os
+import random
+
+from src.agents.network.nacl_evaluator import nacl_evaluator
+from src.network.adapters.base import FirewallAdapter
+from src.network.adapters.mock_adapter import MockFirewallAdapter
+from src.network.models import (
+    NACL, FirewallRule, NACLDirection, NACLRule, PolicyAction, VerdictMatchType,
+)
+from src.network.policy_index import NACLPolicy, PolicyIndex
+from src.network.topology_store import TopologyStore
+
+_PATTERNS = ["10.0.0.0/8", "10.1.0.0/16", "10.1.2.0/24", "10.1.2.3", "192.168.1.0/24",
+             "172.16.5.5/32", "2001:db8::/32", "2001:db8::5", "web-servers", "any"]
+_IPS = ["10.1.2.3", "10.1.2.9", "10.9.9.9", "192.168.1.7", "172.16.5.5", "8.8.8.8",
+        "2001:db8::5", "2001:db9::1", "not-an-ip"]
+
+
+def _legacy_first_match(rules, src, dst, port, protocol, wildcards, any_flow):
+    for rule in sorted(rules, key=lambda r: r.order):
+        proto = rule.protocol.lower()
+        proto_match = (wildcards is None or proto in wildcards or proto == protocol.lower()
+                       or (any_flow and protocol.lower() == "any"))
+        if (FirewallAdapter._match_ip(None, src, rule.src_ips)
+                and FirewallAdapter._match_ip(None, dst, rule.dst_ips)
+                and FirewallAdapter._match_port(port, rule.ports) and proto_match):
+            return rule
+    return None
+
+
+def _legacy_nacl_walk(rules, src, dst, port, protocol):
+    def ip_in(ip, cidr):
+        if cidr == "0.0.0.0/0":
+            return True
+        try:
+            return ipaddress.ip_address(ip) in ipaddress.ip_network(cidr, strict=False)
+        except ValueError:
+            return False
+
+    for rule in sorted(rules, key=lambda r: r.rule_number):
+        if rule.protocol != "-1" and rule.protocol != protocol:
+            continue
+        if not ip_in(src, rule.cidr) and not ip_in(dst, rule.cidr):
+            continue
+        if rule.protocol != "-1" and not (rule.port_range_from <= port <= rule.port_range_to):
+            continue
+        return rule
+    return None
+
+
+def _random_rules(rng, count):
+    rules = []
+    for i in range(count):
+        rules.append(FirewallRule(
+            id=f"r{i}", device_id="fw", rule_name=f"r{i}",
+            src_ips=rng.sample(_PATTERNS, rng.randrange(0, 3)),
+            dst_ips=rng.sample(_PATTERNS, rng.randrange(0, 3)),
+            ports=rng.sample([22, 53, 80, 443, 8080], rng.randrange(0, 3)),
+            protocol=rng.choice(["tcp", "udp", "any", "ANY", "-1", "*", "all"]),
+            action=rng.choice([PolicyAction.ALLOW, PolicyAction.DENY]),
+            order=rng.randrange(0, 40),
+        ))
+    return rules
+
+
+def test_first_match_agrees_with_linear_scan():
+    rng = random.Random(11)
+    configs = [(frozenset({"any"}), True), (frozenset({"-1", "all", "any"}), False),
+               (frozenset({"any", "*"}), False), (None, True)]
+    for _ in range(20):
+        rules = _random_rules(rng, 60)
+        for wildcards, any_flow in configs:
+            index = PolicyIndex(rules, wildcards, any_flow)
+            flows = [(rng.choice(_IPS), rng.choice(_IPS), rng.choice([22, 80, 443, 9999]),
+                      rng.choice(["tcp", "UDP", "any"])) for _ in range(60)]
+            expected = [_legacy_first_match(rules, *f, wildcards, any_flow) for f in flows]
+            assert [index.first_match(*f) for f in flows] == expected
+            assert index.first_match_many(flows) == expected
+
+
+def test_port_ranges_and_zone_buckets():
+    rules = [
+        FirewallRule.model_construct(id="a", device_id="fw", src_zone="trust", dst_zone="dmz",
+                                     src_ips=[], dst_ips=[], ports=[22, (8000, 9000)],
+                                     protocol="tcp", order=0),
+        FirewallRule(id="b", device_id="fw", src_zone="trust", dst_zone="untrust", order=1),
+        FirewallRule(id="c", device_id="fw", src_zone="dmz", dst_zone="untrust", order=2),
+    ]
+    index = PolicyIndex(rules)
+    assert index.first_match("10.0.0.1", "10.0.0.2", 8443).id == "a"
+    assert index.first_match("10.0.0.1", "10.0.0.2", 7000).id == "b"
+    assert [r.id for r in index.rules_for_zones("trust")] == ["a", "b"]
+    assert [r.id for r in index.rules_for_zones(zone_dst="untrust")] == ["b", "c"]
+    assert [r.id for r in index.rules_for_zones("trust", "untrust")] == ["b"]
+
+
+def test_adapter_batch_matches_single_flows_and_recompiles():
+    rule = FirewallRule(id="web", device_id="fw", rule_name="web", dst_ips=["10.0.0.0/24"],
+                        ports=[443], action=PolicyAction.ALLOW)
+    adapter = MockFirewallAdapter(rules=[rule])
+    flows = [("1.1.1.1", "10.0.0.5", 443, "tcp"), ("1.1.1.1", "10.0.1.5", 443, "tcp")]
+
+    async def scenario():
+        batch = await adapter.simulate_flows(flows)
+        single = [await adapter.simulate_flow(*f) for f in flows]
+        return batch, single
+
+    batch, single = asyncio.run(scenario())
+    assert batch == single
+    assert [v.match_type for v in batch] == [VerdictMatchType.EXACT, VerdictMatchType.IMPLICIT_DENY]
+
+    # Tests and adapters replace the snapshot wholesale; the index follows
+    adapter._rules_cache = []
+    assert asyncio.run(adapter.simulate_flow(*flows[0])).match_type == VerdictMatchType.IMPLICIT_DENY
+
+
+def test_nacl_policy_matches_rule_walk(tmp_path):
+    rng = random.Random(3)
+    rules = [
+        NACLRule(id=f"n{i}", nacl_id="acl", direction=rng.choice(list(NACLDirection)),
+                 rule_number=rng.randrange(1, 200),
+                 protocol=rng.choice(["tcp", "udp", "-1"]),
+                 cidr=rng.choice(["0.0.0.0/0", "10.0.0.0/8", "10.1.2.0/24", "192.168.0.0/16", "::/0", "bad"]),
+                 port_range_from=rng.choice([0, 80, 443]), port_range_to=rng.choice([443, 65535]),
+                 action=rng.choice([PolicyAction.ALLOW, PolicyAction.DENY]))
+        for i in range(80)
+    ]
+    policy = NACLPolicy(rules)
+    for _ in range(300):
+        src, dst = rng.choice(_IPS), rng.choice(_IPS)
+        port, proto = rng.choice([22, 80, 443]), rng.choice(["tcp", "udp"])
+        for direction in NACLDirection:
+            expected = _legacy_nacl_walk([r for r in rules if r.direction == direction], src, dst, port, proto)
+            assert policy.evaluate(direction, src, dst, port, proto) is expected
+
+    store = TopologyStore(db_path=os.path.join(str(tmp_path), "nacl.db"))
+    store.add_nacl(NACL(id="acl", name="acl"))
+    store.add_nacl_rule(NACLRule(id="in", nacl_id="acl", cidr="10.0.0.0/8", port_range_from=443, port_range_to=443))
+    store.add_nacl_rule(NACLRule(id="out", nacl_id="acl", direction=NACLDirection.OUTBOUND, protocol="-1"))
+    state = {"nacls_in_path": [{"device_id": "acl"}], "src_ip": "10.0.0.1",
+             "dst_ip": "10.0.0.2", "port": 443, "protocol": "tcp"}
+    assert nacl_evaluator(state, store=store)["nacl_verdicts"][0]["action"] == "allow"
+    assert store.get_nacl_policy("acl") is store.get_nacl_policy("acl")
+    store.add_nacl_rule(NACLRule(id="block", nacl_id="acl", rule_number=10, cidr="10.0.0.1/32",
+                                 action=PolicyAction.DENY))
+    assert nacl_evaluator(state, store=store)["nacl_verdicts"][0]["action"] == "deny"
+    # Re-adding the NACL cascades away its rules; the policy must follow.
+    store.add_nacl(NACL(id="acl", name="acl"))
+    assert nacl_evaluator(state, store=store)["nacl_verdicts"][0]["inbound"]["matched_rule_id"] == "implicit_deny"
@@ -18,10 +18,14 @@ class TestPostgresAdapter:
     @patch("src.database.adapters.postgres.asyncpg")
     async def test_connect(self, mock_asyncpg, pg_adapter):
         mock_conn = AsyncMock()
-        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+        mock_asyncpg.create_pool = AsyncMock(return_value=mock_conn)
         await pg_adapter.connect()
         assert pg_adapter._connected is True
-        mock_asyncpg.connect.assert_called_once()
+        mock_asyncpg.create_pool.assert_called_once()
+        kwargs = mock_asyncpg.create_pool.call_args.kwargs
+        assert kwargs["min_size"] == 1
+        assert kwargs["max_size"] == 4
+        assert kwargs["server_settings"] == {"application_name": "debugduck-db-monitor"}
 
     @pytest.mark.asyncio
     async def test_health_check_not_connected(self, pg_adapter):
@@ -36,11 +40,13 @@ class TestPostgresAdapter:
             "active": 12, "idle": 5, "max": 100,
             "ratio": 0.94, "tps": 150.0, "deadlocks": 0, "uptime": 86400,
         })
-        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+        mock_asyncpg.create_pool = AsyncMock(return_value=mock_conn)
         await pg_adapter.connect()
         stats = await pg_adapter._fetch_performance_stats()
         assert isinstance(stats, PerfSnapshot)
         assert stats.connections_active == 12
+        # Our own pool's sessions are filtered out by application_name.
+        assert mock_conn.fetchrow.call_args.args[1] == "debugduck-db-monitor"
 
     @pytest.mark.asyncio
     @patch("src.database.adapters.postgres.asyncpg")
@@ -50,7 +56,7 @@ class TestPostgresAdapter:
             {"pid": 1001, "query": "SELECT 1", "duration_ms": 500,
              "state": "active", "usename": "app", "datname": "testdb", "waiting": False},
         ])
-        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+        mock_asyncpg.create_pool = AsyncMock(return_value=mock_conn)
         await pg_adapter.connect()
         queries = await pg_adapter._fetch_active_queries()
         assert len(queries) == 1
@@ -61,7 +67,7 @@ class TestPostgresAdapter:
     async def test_execute_diagnostic_query(self, mock_asyncpg, pg_adapter):
         mock_conn = AsyncMock()
         mock_conn.fetch = AsyncMock(return_value=[{"col": "val"}])
-        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+        mock_asyncpg.create_pool = AsyncMock(return_value=mock_conn)
         await pg_adapter.connect()
         result = await pg_adapter.execute_diagnostic_query("SELECT 1")
         assert result.error is None
@@ -0,0 +1,170 @@
+"""Tests for SO_REUSEPORT multi-process receivers."""
+import asyncio
+import socket
+import struct
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from src.network.collectors.syslog_listener import SyslogListener
+from src.network.collectors.trap_listener import SNMPTrapListener
+from src.network.flow_columns import empty_columns
+from src.network.flow_receiver import FlowReceiver
+from src.network.receiver_pool import (
+    ReceiverWorkerPool,
+    _WorkerSink,
+    publish_worker_events,
+    worker_count,
+)
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT not supported",
+)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _send_from_many_sources(port: int, payloads: list[bytes]) -> None:
+    # Distinct source ports so the kernel spreads datagrams across workers.
+    for data in payloads:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+            s.sendto(data, ("127.0.0.1", port))
+
+
+async def _wait_for(predicate, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met before timeout")
+        await asyncio.sleep(0.05)
+
+
+def _v5_packet(count: int) -> bytes:
+    header = struct.pack("!HHIIIIBBh", 5, count, 1000, 1709600000, 0, 1, 0, 0, 0)
+    record = struct.pack(
+        "!IIIHHIIIIHHBBBBHHBBH",
+        0x0A000001, 0x0A000002, 0, 1, 2, 10, 1000, 0, 0,
+        12345, 443, 0, 0x18, 6, 0, 0, 0, 24, 24, 0,
+    )
+    return header + record * count
+
+
+def _buffered_flows(receiver) -> int:
+    return sum(int(b.columns["flows"].sum()) for b in receiver.aggregator._buffer.batches)
+
+
+def test_worker_count_env(monkeypatch):
+    monkeypatch.setenv("SYSLOG_LISTENER_WORKERS", "3")
+    assert worker_count("SYSLOG_LISTENER_WORKERS") == 3
+    monkeypatch.setenv("SYSLOG_LISTENER_WORKERS", "lots")
+    assert worker_count("SYSLOG_LISTENER_WORKERS") == 0
+    assert SyslogListener(MagicMock(), MagicMock(), workers=2)._workers == 2
+
+
+def test_pool_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        ReceiverWorkerPool("netconf", 1, 1, lambda batch: None)
+
+
+@pytest.mark.asyncio
+async def test_worker_sink_drains_parsed_syslog_events():
+    sink = _WorkerSink("syslog")
+    proto = sink.protocol_factory()
+    proto.datagram_received(b"<134>Mar  9 12:34:56 r1 sshd[42]: login ok", ("10.0.0.7", 514))
+    proto.datagram_received(b"garbage", ("10.0.0.7", 514))
+    await asyncio.sleep(0)
+    events = sink.drain()
+    assert [e["device_ip"] for e in events] == ["10.0.0.7"]
+    assert sink.stats() == {"received": 2, "errors": 1}
+    assert sink.drain() == []
+
+
+@pytest.mark.asyncio
+async def test_worker_events_get_device_ids_in_parent():
+    bus = MagicMock()
+    bus.publish = AsyncMock()
+    store = MagicMock()
+    store.get_device_by_ip.return_value = MagicMock(device_id="dev-1")
+    listener = SNMPTrapListener(bus, store, workers=0)
+    publish_worker_events(
+        [{"device_ip": "10.0.0.1", "device_id": None}], store, listener._publish,
+    )
+    await asyncio.sleep(0)
+    bus.publish.assert_awaited_once()
+    channel, event = bus.publish.await_args[0]
+    assert channel == "traps" and event["device_id"] == "dev-1"
+
+
+def test_flow_worker_payload_round_trip():
+    receiver = FlowReceiver(AsyncMock(), MagicMock(), workers=0)
+    cols = empty_columns(3)
+    cols["bytes"] = 100
+    receiver._ingest_worker_batch([("192.0.2.1", cols.tobytes())])
+    _, batches = receiver.aggregator._buffer.drain()
+    assert len(batches) == 1 and batches[0].exporter_ip == "192.0.2.1"
+    assert batches[0].columns["bytes"].tolist() == [100, 100, 100]
+    assert batches[0].columns.flags.writeable
+
+
+@pytest.mark.asyncio
+async def test_syslog_listener_with_workers_merges_stats():
+    bus = MagicMock()
+    bus.publish = AsyncMock()
+    store = MagicMock()
+    store.get_device_by_ip.return_value = None
+    listener = SyslogListener(bus, store, port=_free_port(), workers=2)
+    await listener.start()
+    try:
+        assert listener.is_running
+        _send_from_many_sources(
+            listener._port,
+            [f"<134>Mar  9 12:34:56 r1 app: msg {i}".encode() for i in range(20)] + [b"junk"],
+        )
+        await _wait_for(lambda: listener.stats["received"] == 21 and bus.publish.await_count == 20)
+        assert listener.stats["errors"] == 1
+    finally:
+        await listener.stop()
+    assert listener.stats == {"received": 21, "errors": 1}
+    assert not listener.is_running
+
+
+@pytest.mark.asyncio
+async def test_flow_receiver_with_workers_feeds_aggregator():
+    receiver = FlowReceiver(AsyncMock(), MagicMock(), workers=2)
+    port = _free_port()
+    await receiver.start(ports={"netflow": port})
+    try:
+        _send_from_many_sources(port, [_v5_packet(5) for _ in range(8)])
+        await _wait_for(lambda: receiver.stats["received"] == 40)
+        await _wait_for(lambda: _buffered_flows(receiver) == 40)
+        assert receiver.stats == {"received": 40, "workers": 2}
+        # Identical flows arrive merged: at most one row per worker batch.
+        assert len(receiver.aggregator._buffer) < 40
+    finally:
+        receiver._flush_task.cancel()
+        for pool in receiver._pools:
+            await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_flow_worker_sink_ships_merged_rows():
+    sink = _WorkerSink("flow", batch_max=10)
+    proto = sink.protocol_factory()
+    proto.datagram_received(_v5_packet(6), ("192.0.2.1", 2055))
+    assert not sink.wake.is_set()
+    proto.datagram_received(_v5_packet(6), ("192.0.2.1", 2055))
+    assert sink.wake.is_set()
+
+    [(exporter, data)] = sink.drain()
+    receiver = FlowReceiver(AsyncMock(), MagicMock(), workers=0)
+    receiver._ingest_worker_batch([(exporter, data)])
+    [batch] = receiver.aggregator._buffer.batches
+    assert len(batch) == 1
+    assert batch.columns["flows"].tolist() == [12]
+    assert batch.columns["bytes"].tolist() == [12 * 1000]
+    assert await receiver.aggregator.flush() == 12
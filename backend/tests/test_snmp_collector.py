@@ -151,40 +151,19 @@ async def test_snmp_get_populates_interfaces(monkeypatch):
     collector = SNMPCollector(metrics_store=None)
     monkeypatch.setattr(collector, "_walk_interfaces", mock_walk)
 
-    # Mock the pysnmp imports and get_cmd so _snmp_get doesn't fail
+    # Mock the shared engine's GET so _snmp_get doesn't need pysnmp
     mock_val = MagicMock()
     mock_val.__float__ = MagicMock(return_value=42.0)
-    mock_var_bind = [(MagicMock(), mock_val)]
-
-    async def mock_get_cmd(*args, **kwargs):
-        return (None, None, None, mock_var_bind)
-
-    mock_engine = MagicMock()
-    mock_engine.close_dispatcher = MagicMock()
-    mock_target = MagicMock()
-
-    async def mock_create(*args, **kwargs):
-        return mock_target
-
-    mock_target.create = mock_create
-
-    # Seed module-level names (may not exist when pysnmp is not installed)
-    for attr, val in [
-        ("_PYSNMP_AVAILABLE", True),
-        ("SnmpEngine", MagicMock(return_value=mock_engine)),
-        ("get_cmd", mock_get_cmd),
-        ("CommunityData", MagicMock()),
-        ("UdpTransportTarget", mock_target),
-        ("ContextData", MagicMock()),
-        ("ObjectType", MagicMock()),
-        ("ObjectIdentity", MagicMock()),
-    ]:
-        if not hasattr(snmp_mod, attr):
-            setattr(snmp_mod, attr, None)
-        monkeypatch.setattr(snmp_mod, attr, val)
+
+    async def mock_get(target, oids):
+        return {oid: mock_val for oid in oids}
+
+    monkeypatch.setattr(snmp_mod, "_PYSNMP_AVAILABLE", True)
+    monkeypatch.setattr(collector._engine, "get", mock_get)
 
     cfg = SNMPDeviceConfig(device_id="dev-walk", ip="10.0.0.1")
     result = await collector._snmp_get(cfg)
+    assert result["mem_total"] == 42.0
     assert len(result["interfaces"]) == 2
     assert result["interfaces"][1]["ifDescr"] == "GigabitEthernet0/0"
 
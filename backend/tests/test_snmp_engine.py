@@ -0,0 +1,149 @@
+"""Tests for the shared SNMP engine (multi-OID GET, multi-column GETBULK)."""
+import asyncio
+
+import pytest
+
+import src.network.snmp_collector as snmp_mod
+import src.network.collectors.snmp_collector as proto_mod
+from src.network.collectors.models import (
+    DeviceInstance, DeviceProfile, MetadataFieldDef, MetricDefinition, MetricSymbol,
+    MetricTagDef, PingConfig, ProtocolConfig, SNMPCredentials,
+)
+from src.network.snmp_collector import SNMPCollector, SNMPDeviceConfig
+from src.network.snmp_engine import SNMPEngine, SNMPTarget
+
+
+class EndOfMibView:
+    pass
+
+
+class FakeAgent(SNMPEngine):
+    """Engine whose transport is an in-memory MIB, sorted like a real agent."""
+
+    def __init__(self, mib, max_oids=None, delay=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.mib = mib
+        self.order = sorted(mib, key=lambda o: tuple(int(a) for a in o.split(".")))
+        self.max_oids = max_oids
+        self.delay = delay
+        self.pdus = []
+
+    def _next(self, oid):
+        key = tuple(int(a) for a in oid.split("."))
+        for candidate in self.order:
+            if tuple(int(a) for a in candidate.split(".")) > key:
+                return candidate, self.mib[candidate]
+        return oid, EndOfMibView()
+
+    async def _send_get(self, session, oids):
+        self.pdus.append(("get", session.target.ip, list(oids)))
+        await asyncio.sleep(self.delay)
+        if self.max_oids and len(oids) > self.max_oids:
+            return None, "tooBig", 0, []
+        return None, None, 0, [(oid, self.mib.get(oid, EndOfMibView())) for oid in oids]
+
+    async def _send_bulk(self, session, oids, repetitions):
+        self.pdus.append(("bulk", session.target.ip, list(oids)))
+        await asyncio.sleep(self.delay)
+        cursors, var_binds = list(oids), []
+        for _ in range(repetitions):
+            for i, oid in enumerate(cursors):
+                cursors[i], value = self._next(oid)
+                var_binds.append((cursors[i], value))
+        return None, None, 0, var_binds
+
+
+IF_MIB = {
+    **{f"1.3.6.1.2.1.2.2.1.2.{i}": f"Gi0/{i}" for i in (1, 2, 3)},
+    **{f"1.3.6.1.2.1.2.2.1.8.{i}": 1 for i in (1, 2, 3)},
+    **{f"1.3.6.1.2.1.2.2.1.10.{i}": 1000 * i for i in (1, 2, 3)},
+    "1.3.6.1.2.1.1.3.0": 360000,
+    "1.3.6.1.4.1.2021.4.5.0": 1000,
+    "1.3.6.1.4.1.2021.4.6.0": 250,
+    "1.3.6.1.2.1.4.22.1.2.7.10.0.0.1": "aa:bb:cc:dd:ee:01",
+    "1.3.6.1.2.1.4.22.1.2.7.10.0.0.2": "aa:bb:cc:dd:ee:02",
+    "1.3.6.1.2.1.4.22.1.3.7.10.0.0.1": "10.0.0.1",
+}
+
+
+@pytest.mark.asyncio
+async def test_get_packs_oids_and_splits_on_too_big():
+    scalars = {f"1.3.6.1.4.1.9.1.{i}.0": i for i in range(40)}
+    agent = FakeAgent(scalars, max_oids=8)
+    values = await agent.get(SNMPTarget("10.0.0.1"), list(scalars) + ["1.3.6.1.4.1.9.2.0"])
+    assert values == scalars  # missing OID is dropped
+
+    limit = agent.device_stats("10.0.0.1")["10.0.0.1:161"]["max_oids_per_pdu"]
+    assert 4 <= limit <= 8
+    agent.pdus.clear()
+    await agent.get(SNMPTarget("10.0.0.1"), list(scalars))
+    # Learned limit: no more tooBig round trips
+    assert len(agent.pdus) == -(-40 // limit)
+
+
+@pytest.mark.asyncio
+async def test_bulk_walk_advances_columns_independently():
+    agent = FakeAgent(IF_MIB)
+    rows = await agent.bulk_walk(
+        SNMPTarget("10.0.0.1"),
+        {"ifDescr": "1.3.6.1.2.1.2.2.1.2", "ifInOctets": "1.3.6.1.2.1.2.2.1.10",
+         "missing": "1.3.6.1.2.1.2.2.1.99"},
+        max_repetitions=2,
+    )
+    assert rows["ifDescr"] == {"1": "Gi0/1", "2": "Gi0/2", "3": "Gi0/3"}
+    assert rows["ifInOctets"] == {"1": 1000, "2": 2000, "3": 3000}
+    assert rows["missing"] == {}
+    assert len(agent.pdus) == 2  # all three columns per PDU
+
+
+@pytest.mark.asyncio
+async def test_global_inflight_limit_and_stats():
+    agent = FakeAgent(IF_MIB, delay=0.02, max_inflight=2)
+    await asyncio.gather(*(agent.get(SNMPTarget(f"10.0.0.{i}"), ["1.3.6.1.2.1.1.3.0"]) for i in range(6)))
+    stats = agent.device_stats()
+    assert len(stats) == 6
+    assert all(s["requests"] == 1 and s["avg_rtt_ms"] >= 15 for s in stats.values())
+
+
+@pytest.mark.asyncio
+async def test_collectors_use_shared_engine(monkeypatch):
+    agent = FakeAgent(IF_MIB)
+    monkeypatch.setattr(snmp_mod, "_PYSNMP_AVAILABLE", True)
+    collector = SNMPCollector(metrics_store=None, engine=agent)
+    cfg = SNMPDeviceConfig(device_id="sw1", ip="10.0.0.9")
+
+    data = await collector._snmp_get(cfg)
+    assert data["mem_total"] == 1000 and data["mem_avail"] == 250
+    assert data["interfaces"][2] == {"ifDescr": "Gi0/2", "ifOperStatus": 1, "ifInOctets": 2000}
+    arp = await collector.walk_arp_table(cfg)
+    assert [(e["ip"], e["mac"]) for e in arp] == [("10.0.0.1", "aa:bb:cc:dd:ee:01"),
+                                                  ("10.0.0.2", "aa:bb:cc:dd:ee:02")]
+
+    monkeypatch.setattr(proto_mod, "PYSNMP_AVAILABLE", True)
+    proto = proto_mod.SNMPProtocolCollector(engine=agent)
+    device = DeviceInstance(
+        management_ip="10.0.0.9", hostname="sw1",
+        protocols=[ProtocolConfig(protocol="snmp", priority=5, snmp=SNMPCredentials())],
+        ping_config=PingConfig(enabled=False),
+    )
+    profile = DeviceProfile(
+        name="p", vendor="test", device_type="switch",
+        metrics=[
+            MetricDefinition(symbol=MetricSymbol(OID="1.3.6.1.2.1.1.3.0", name="sysUpTime")),
+            MetricDefinition(
+                table=MetricSymbol(OID="1.3.6.1.2.1.2.2", name="ifTable"),
+                symbols=[MetricSymbol(OID="1.3.6.1.2.1.2.2.1.10", name="ifInOctets")],
+                metric_tags=[MetricTagDef(tag="interface", column=MetricSymbol(
+                    OID="1.3.6.1.2.1.2.2.1.2", name="ifDescr"))],
+            ),
+        ],
+        metadata_fields={"mem": MetadataFieldDef(symbol=MetricSymbol(
+            OID="1.3.6.1.4.1.2021.4.5.0", name="memTotalReal"))},
+    )
+    agent.pdus.clear()
+    data = await proto.collect(device, profile)
+    assert data.uptime_seconds == 3600
+    assert data.interface_metrics["Gi0/3"] == {"ifInOctets": 3000.0}
+    assert data.metadata["mem"] == "1000"
+    assert "snmp_rtt_ms" in data.custom_metrics
+    assert sum(1 for kind, *_ in agent.pdus if kind == "get") == 1
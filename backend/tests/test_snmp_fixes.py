@@ -1,71 +1,53 @@
-"""Tests for SNMP engine cleanup and walk timeout."""
+"""Tests for shared SNMP engine reuse and walk timeout."""
 import asyncio
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch
 
-# Ensure the module-level names exist for patching even when pysnmp
-# is not installed.  We set them to MagicMock sentinels before importing
-# the module under test.
 import src.network.snmp_collector as snmp_mod
-
-# If pysnmp is not installed, the module-level names won't exist.
-# Seed them so patch() targets are valid.
-for _name in (
-    "SnmpEngine", "bulk_cmd", "CommunityData", "UdpTransportTarget",
-    "ContextData", "ObjectType", "ObjectIdentity", "UsmUserData", "get_cmd",
-):
-    if not hasattr(snmp_mod, _name):
-        setattr(snmp_mod, _name, MagicMock())
+from src.network.snmp_engine import SNMPEngine
 
 
 @pytest.mark.asyncio
-async def test_walk_interfaces_closes_engine():
+async def test_walk_interfaces_reuses_shared_engine():
     from src.network.snmp_collector import SNMPCollector, SNMPDeviceConfig
 
-    collector = SNMPCollector.__new__(SNMPCollector)
+    engine = SNMPEngine()
+    collector = SNMPCollector(metrics_store=None, engine=engine)
     cfg = SNMPDeviceConfig(
         device_id="d1", ip="10.0.0.1", community="public",
         version="2c", port=161,
     )
 
-    mock_engine = MagicMock()
-    mock_engine.close_dispatcher = MagicMock()
+    sessions = []
+
+    async def fake_bulk(session, oids, repetitions):
+        sessions.append(session)
+        # Truthy err_indication so the walk ends immediately
+        return "noSuchInstance", None, None, []
 
     with patch.object(snmp_mod, "_PYSNMP_AVAILABLE", True), \
-         patch.object(snmp_mod, "SnmpEngine", return_value=mock_engine), \
-         patch.object(snmp_mod, "UdpTransportTarget", return_value=MagicMock()), \
-         patch.object(snmp_mod, "CommunityData", return_value=MagicMock()), \
-         patch.object(snmp_mod, "ContextData", return_value=MagicMock()), \
-         patch.object(snmp_mod, "ObjectType", return_value=MagicMock()), \
-         patch.object(snmp_mod, "ObjectIdentity", return_value=MagicMock()), \
-         patch.object(snmp_mod, "bulk_cmd", new_callable=AsyncMock) as mock_bulk:
-        # Return a truthy err_indication so the walk loop exits immediately
-        mock_bulk.return_value = ("noSuchInstance", None, None, [])
+         patch.object(engine, "_send_bulk", fake_bulk):
         await collector._walk_interfaces(cfg)
-        mock_engine.close_dispatcher.assert_called_once()
+        await collector._walk_interfaces(cfg)
+    assert len(sessions) == 2 and sessions[0] is sessions[1]
+    assert engine.device_stats("10.0.0.1")["10.0.0.1:161"]["errors"] == 2
 
 
 @pytest.mark.asyncio
-async def test_walk_interfaces_closes_engine_on_error():
+async def test_walk_interfaces_survives_transport_error():
     from src.network.snmp_collector import SNMPCollector, SNMPDeviceConfig
 
-    collector = SNMPCollector.__new__(SNMPCollector)
+    engine = SNMPEngine()
+    collector = SNMPCollector(metrics_store=None, engine=engine)
     cfg = SNMPDeviceConfig(
         device_id="d1", ip="10.0.0.1", community="public",
         version="2c", port=161,
     )
 
-    mock_engine = MagicMock()
     with patch.object(snmp_mod, "_PYSNMP_AVAILABLE", True), \
-         patch.object(snmp_mod, "SnmpEngine", return_value=mock_engine), \
-         patch.object(snmp_mod, "UdpTransportTarget", return_value=MagicMock()), \
-         patch.object(snmp_mod, "CommunityData", return_value=MagicMock()), \
-         patch.object(snmp_mod, "ContextData", return_value=MagicMock()), \
-         patch.object(snmp_mod, "ObjectType", return_value=MagicMock()), \
-         patch.object(snmp_mod, "ObjectIdentity", return_value=MagicMock()), \
-         patch.object(snmp_mod, "bulk_cmd", side_effect=Exception("timeout")):
-        await collector._walk_interfaces(cfg)
-        mock_engine.close_dispatcher.assert_called_once()
+         patch.object(engine, "_send_bulk", side_effect=Exception("timeout")):
+        assert await collector._walk_interfaces(cfg) == {}
+    assert engine.device_stats()["10.0.0.1:161"]["timeouts"] == 1
 
 
 @pytest.mark.asyncio
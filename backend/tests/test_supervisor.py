@@ -123,3 +123,187 @@ def test_update_phase():
     )
     supervisor._update_phase(state)
     assert state.phase == DiagnosticPhase.METRICS_ANALYZED
+
+
+@pytest.mark.asyncio
+async def test_streaming_dispatch_launches_agents_as_others_finish(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("DIAGNOSTIC_DISPATCH_MODE", "streaming")
+    monkeypatch.setenv("DIAGNOSTIC_PLANNER_MODE", "deterministic")
+    monkeypatch.delenv("MOCK_AGENTS", raising=False)
+
+    supervisor = SupervisorAgent()
+    supervisor._agents = {
+        name: object for name in ("log_agent", "metrics_agent", "k8s_agent", "tracing_agent")
+    }
+    delays = {"log_agent": 0.01, "metrics_agent": 0.3, "k8s_agent": 0.01, "tracing_agent": 0.01}
+    finished: list[str] = []
+
+    async def fake_dispatch(agent_name, state, event_emitter=None):
+        await asyncio.sleep(delays[agent_name])
+        finished.append(agent_name)
+        return {"overall_confidence": 0, "evidence_pins": []}
+
+    monkeypatch.setattr(supervisor, "_dispatch_agent", fake_dispatch)
+    monkeypatch.setattr(supervisor, "_check_prerequisites", lambda name, state: None)
+    monkeypatch.setattr(supervisor, "_update_state_with_result", AsyncMock())
+    monkeypatch.setattr(supervisor, "_enrich_reasoning_chain", AsyncMock())
+    finish = AsyncMock()
+    monkeypatch.setattr(supervisor, "_finish_diagnosis", finish)
+
+    emitter = MagicMock()
+    emitter.emit = AsyncMock()
+    captured = {}
+    await supervisor.run(
+        {"session_id": "s-stream", "service_name": "svc", "trace_id": "t1", "namespace": "prod"},
+        emitter,
+        on_state_created=lambda st: captured.setdefault("state", st),
+    )
+    state = captured["state"]
+
+    # The planner's first pick is log + metrics; k8s + tracing launch when
+    # log finishes and complete while the slow metrics agent is still going.
+    assert finished == ["log_agent", "k8s_agent", "tracing_agent", "metrics_agent"]
+    assert set(state.agents_completed) == set(delays)
+    assert state.diagnosis_stop_reason == "planner_empty"
+    finish.assert_awaited_once()
+    assert [t["agent"] for t in state.critical_path] == ["metrics_agent"]
+    assert state.critical_path[0]["elapsed_s"] >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_streaming_dispatch_with_legacy_planner(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("DIAGNOSTIC_DISPATCH_MODE", "streaming")
+    monkeypatch.delenv("DIAGNOSTIC_PLANNER_MODE", raising=False)
+    monkeypatch.delenv("MOCK_AGENTS", raising=False)
+
+    supervisor = SupervisorAgent()
+    supervisor._agents = {name: object for name in ("log_agent", "metrics_agent", "k8s_agent")}
+    delays = {"log_agent": 0.01, "metrics_agent": 0.2, "k8s_agent": 0.01}
+    dispatched: list[str] = []
+    finished: list[str] = []
+
+    async def fake_dispatch(agent_name, state, event_emitter=None):
+        dispatched.append(agent_name)
+        await asyncio.sleep(delays[agent_name])
+        finished.append(agent_name)
+        return {"overall_confidence": 0, "evidence_pins": []}
+
+    monkeypatch.setattr(supervisor, "_dispatch_agent", fake_dispatch)
+    monkeypatch.setattr(supervisor, "_check_prerequisites", lambda name, state: None)
+    monkeypatch.setattr(supervisor, "_update_state_with_result", AsyncMock())
+    monkeypatch.setattr(supervisor, "_enrich_reasoning_chain", AsyncMock())
+    finish = AsyncMock()
+    monkeypatch.setattr(supervisor, "_finish_diagnosis", finish)
+
+    emitter = MagicMock()
+    emitter.emit = AsyncMock()
+    captured = {}
+    await supervisor.run(
+        {"session_id": "s-legacy", "service_name": "svc", "namespace": "prod"},
+        emitter,
+        on_state_created=lambda st: captured.setdefault("state", st),
+    )
+    state = captured["state"]
+
+    # The legacy phase rules gate metrics + k8s on the log agent; each
+    # agent runs once and the fast k8s agent does not wait for metrics.
+    assert dispatched[0] == "log_agent"
+    assert sorted(dispatched) == sorted(delays)
+    assert finished == ["log_agent", "k8s_agent", "metrics_agent"]
+    assert state.diagnosis_stop_reason == "planner_empty"
+    finish.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_streaming_skips_repo_confirmation_while_change_agent_in_flight(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("DIAGNOSTIC_DISPATCH_MODE", "streaming")
+    monkeypatch.setenv("DIAGNOSTIC_PLANNER_MODE", "deterministic")
+    monkeypatch.delenv("MOCK_AGENTS", raising=False)
+
+    supervisor = SupervisorAgent()
+    supervisor._agents = {name: object for name in ("log_agent", "metrics_agent", "change_agent")}
+    delays = {"log_agent": 0.01, "metrics_agent": 0.05, "change_agent": 0.2}
+
+    async def fake_dispatch(agent_name, state, event_emitter=None):
+        await asyncio.sleep(delays[agent_name])
+        return {"overall_confidence": 0, "evidence_pins": []}
+
+    monkeypatch.setattr(supervisor, "_dispatch_agent", fake_dispatch)
+    monkeypatch.setattr(supervisor, "_check_prerequisites", lambda name, state: None)
+    monkeypatch.setattr(supervisor, "_update_state_with_result", AsyncMock())
+    monkeypatch.setattr(supervisor, "_enrich_reasoning_chain", AsyncMock())
+    confirm = AsyncMock()
+    monkeypatch.setattr(supervisor, "_request_repo_confirmation", confirm)
+    monkeypatch.setattr(supervisor, "_finish_diagnosis", AsyncMock())
+
+    emitter = MagicMock()
+    emitter.emit = AsyncMock()
+    captured = {}
+    await supervisor.run(
+        {"session_id": "s-change", "service_name": "svc", "repo_url": "https://github.com/o/r"},
+        emitter,
+        on_state_created=lambda st: captured.setdefault("state", st),
+    )
+    state = captured["state"]
+
+    # change_agent launched once log finished and was still running when
+    # metrics completed, so it is not asked about again.
+    confirm.assert_not_awaited()
+    assert state.agents_completed.count("change_agent") == 1
+
+
+@pytest.mark.asyncio
+async def test_streaming_repo_confirmation_does_not_block_completions(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv("DIAGNOSTIC_DISPATCH_MODE", "streaming")
+    monkeypatch.delenv("DIAGNOSTIC_PLANNER_MODE", raising=False)
+    monkeypatch.delenv("MOCK_AGENTS", raising=False)
+
+    supervisor = SupervisorAgent()
+    supervisor._agents = {
+        name: object for name in ("log_agent", "metrics_agent", "k8s_agent", "change_agent")
+    }
+    delays = {"log_agent": 0.01, "metrics_agent": 0.01, "k8s_agent": 0.1}
+    applied: list[str] = []
+
+    async def fake_dispatch(agent_name, state, event_emitter=None):
+        await asyncio.sleep(delays[agent_name])
+        return {"overall_confidence": 0, "evidence_pins": []}
+
+    async def record_result(state, agent_name, result, event_emitter=None):
+        applied.append(agent_name)
+
+    async def slow_confirmation(state, event_emitter):
+        await asyncio.sleep(0.3)  # the user takes a while to answer
+        applied.append("repo_confirmation")
+
+    monkeypatch.setattr(supervisor, "_dispatch_agent", fake_dispatch)
+    monkeypatch.setattr(supervisor, "_check_prerequisites", lambda name, state: None)
+    monkeypatch.setattr(supervisor, "_update_state_with_result", record_result)
+    monkeypatch.setattr(supervisor, "_enrich_reasoning_chain", AsyncMock())
+    monkeypatch.setattr(supervisor, "_request_repo_confirmation", slow_confirmation)
+    finish = AsyncMock()
+    monkeypatch.setattr(supervisor, "_finish_diagnosis", finish)
+
+    emitter = MagicMock()
+    emitter.emit = AsyncMock()
+    captured = {}
+    await supervisor.run(
+        {"session_id": "s-confirm", "service_name": "svc", "namespace": "prod"},
+        emitter,
+        on_state_created=lambda st: captured.setdefault("state", st),
+    )
+    state = captured["state"]
+
+    # k8s lands while the confirmation is still waiting on the user, and
+    # the run only finishes once the confirmation has settled.
+    assert applied == ["log_agent", "metrics_agent", "k8s_agent", "repo_confirmation"]
+    assert state.agents_completed.count("change_agent") == 1
+    finish.assert_awaited_once()
@@ -80,3 +80,14 @@ class TestSyslogAggregator:
         for i in range(20):
             agg.add(f"10.0.{i}.1", f"unique message {i}", "info", "local0")
         assert len(agg._groups) <= 5
+
+    def test_template_widens_without_splitting_group(self):
+        """Messages differing in one word share a group whose template generalises."""
+        agg = SyslogAggregator()
+        agg.add("10.0.0.1", "Login accepted for alice on console", "info", "auth")
+        agg.add("10.0.0.1", "Login accepted for bob on console", "info", "auth")
+
+        groups = agg.get_groups()
+        assert len(groups) == 1
+        assert groups[0]["count"] == 2
+        assert groups[0]["template"] == "Login accepted for <*> on console"
@@ -193,3 +193,70 @@ async def test_list_events_filters_by_sequence(repo):
 
     none_after = await repo.list_events(run_id, after_sequence=5)
     assert none_after == []
+
+
+@pytest.mark.asyncio
+async def test_append_event_group_commit_keeps_per_run_order(repo):
+    wf_id = await repo.create_workflow(name="wf", description=None, created_by=None)
+    v_id = await repo.create_version(wf_id, 1, "{}", "{}")
+    runs = [
+        await repo.create_run(
+            workflow_version_id=v_id, inputs_json="{}", idempotency_key=f"k{i}"
+        )
+        for i in range(3)
+    ]
+    # Seed one run with existing history so its counter starts from the DB.
+    await repo.append_event(runs[0], type="run.started")
+
+    calls = [
+        repo.append_event(run_id, type="tick", payload_json=json.dumps({"i": i}))
+        for i in range(50)
+        for run_id in runs
+    ]
+    results = await asyncio.gather(*calls)
+
+    for run_id in runs:
+        events = await repo.list_events(run_id)
+        ticks = [json.loads(e["payload_json"])["i"] for e in events if e["type"] == "tick"]
+        assert ticks == list(range(50))
+        assert [e["sequence"] for e in events] == list(range(1, len(events) + 1))
+    assert len({event_id for event_id, _ in results}) == len(results)
+
+
+@pytest.mark.asyncio
+async def test_failed_row_does_not_fail_its_batch(repo):
+    wf_id = await repo.create_workflow(name="wf", description=None, created_by=None)
+    v_id = await repo.create_version(wf_id, 1, "{}", "{}")
+    run_id = await repo.create_run(
+        workflow_version_id=v_id, inputs_json="{}", idempotency_key="k"
+    )
+    results = await asyncio.gather(
+        repo.append_event(run_id, type="a"),
+        repo.append_event("no-such-run", type="b"),
+        repo.create_step_run(run_id, "node-a", attempt=1),
+        repo.append_event(run_id, type="c"),
+        return_exceptions=True,
+    )
+    assert results[0][1] == 1
+    assert isinstance(results[1], Exception)
+    assert isinstance(results[2], str)
+    assert results[3][1] == 2
+    assert [e["type"] for e in await repo.list_events(run_id)] == ["a", "c"]
+    assert len(await repo.list_step_runs(run_id)) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_sequence_counter_is_reseeded_for_single_append(repo, db_path):
+    wf_id = await repo.create_workflow(name="wf", description=None, created_by=None)
+    v_id = await repo.create_version(wf_id, 1, "{}", "{}")
+    run_id = await repo.create_run(
+        workflow_version_id=v_id, inputs_json="{}", idempotency_key="k"
+    )
+    await repo.append_event(run_id, type="a")
+    # Another replica takes the run over and appends behind our counter.
+    other = WorkflowRepository(db_path)
+    await other.append_event(run_id, type="b")
+
+    _event_id, sequence = await repo.append_event(run_id, type="c")
+    assert sequence == 3
+    assert [e["type"] for e in await repo.list_events(run_id)] == ["a", "b", "c"]
@@ -0,0 +1,142 @@
+"""Cross-investigation Prometheus range-query cache."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.tools.range_query_cache import RangeQueryCache, align_range
+
+STEP = 60
+CHUNK = 10  # points per chunk -> 600s chunks
+NOW = 100_000.0
+
+
+class FakeProm:
+    """Two series whose value at each grid point is the timestamp."""
+
+    def __init__(self):
+        self.calls: list[tuple[float, float]] = []
+
+    async def fetch(self, start, end):
+        self.calls.append((start, end))
+        await asyncio.sleep(0)
+        points = [[t, str(t)] for t in range(int(start), int(end) + 1, STEP)]
+        return {"status": "success", "data": {"resultType": "matrix", "result": [
+            {"metric": {"pod": "a"}, "values": points},
+            {"metric": {"pod": "b"}, "values": points},
+        ]}}
+
+
+def _cache(**kwargs) -> RangeQueryCache:
+    kwargs.setdefault("chunk_points", CHUNK)
+    kwargs.setdefault("clock", lambda: NOW)
+    return RangeQueryCache(**kwargs)
+
+
+def _timestamps(resp: dict) -> list[float]:
+    return [p[0] for p in resp["data"]["result"][0]["values"]]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[str, str] = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def pipeline(self, transaction=False):
+        redis = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def setex(self, key, ttl, value):
+                self.ops.append((key, value))
+
+            async def execute(self):
+                redis.data.update(self.ops)
+
+        return _Pipe()
+
+
+def test_align_range_snaps_to_step():
+    assert align_range(125.0, 3599.9, 60) == (120, 3540)
+
+
+@pytest.mark.asyncio
+async def test_repeat_query_is_served_from_cache():
+    prom, cache = FakeProm(), _cache()
+    first = await cache.query_range("http://p", "up", 12_030, 18_000, STEP, prom.fetch)
+    second = await cache.query_range("http://p", "up", 12_000, 18_010, STEP, prom.fetch)
+    assert first == second
+    assert _timestamps(first) == list(range(12_000, 18_001, STEP))
+    assert len(first["data"]["result"]) == 2
+    # One run covering the whole chunks, then nothing.
+    assert prom.calls == [(12_000, 18_540)]
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_fetches_only_missing_tail():
+    prom, cache = FakeProm(), _cache()
+    await cache.query_range("http://p", "up", 12_000, 17_940, STEP, prom.fetch)
+    resp = await cache.query_range("http://p", "up", 13_200, 19_140, STEP, prom.fetch)
+    assert prom.calls[1] == (18_000, 19_140)
+    assert _timestamps(resp) == list(range(13_200, 19_141, STEP))
+
+
+@pytest.mark.asyncio
+async def test_chunks_near_now_are_not_stored():
+    prom, cache = FakeProm(), _cache()
+    end = NOW - 30
+    await cache.query_range("http://p", "up", NOW - 3600, end, STEP, prom.fetch)
+    await cache.query_range("http://p", "up", NOW - 3600, end, STEP, prom.fetch)
+    # Second call only refetches the still-filling chunk.
+    assert len(prom.calls) == 2
+    assert prom.calls[1][0] == (end // 600) * 600
+
+
+@pytest.mark.asyncio
+async def test_error_response_passes_through_uncached():
+    cache = _cache()
+    calls = []
+
+    async def failing(start, end):
+        calls.append(start)
+        return {"status": "error", "error": "bad query"}
+
+    for _ in range(2):
+        resp = await cache.query_range("http://p", "up{", 0, 1200, STEP, failing)
+        assert resp == {"status": "error", "error": "bad query"}
+    assert len(calls) == 2 and len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    prom, cache = FakeProm(), _cache()
+    results = await asyncio.gather(*(
+        cache.query_range("http://p", "up", 0, 5_940, STEP, prom.fetch) for _ in range(10)
+    ))
+    assert len(prom.calls) == 1
+    assert all(r == results[0] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_caches():
+    redis, prom = FakeRedis(), FakeProm()
+    await _cache(redis_client=redis).query_range("http://p", "up", 0, 5_940, STEP, prom.fetch)
+    other = _cache(redis_client=redis)
+    resp = await other.query_range("http://p", "up", 0, 5_940, STEP, prom.fetch)
+    assert len(prom.calls) == 1
+    assert _timestamps(resp) == list(range(0, 5_941, STEP))
+    assert other.hits == 10
+
+
+@pytest.mark.asyncio
+async def test_lru_is_bounded_and_keyed_by_source():
+    prom, cache = FakeProm(), _cache(max_chunks=3)
+    await cache.query_range("http://p", "up", 0, 5_940, STEP, prom.fetch)
+    assert len(cache) == 3
+    await cache.query_range("http://other", "up", 5_400, 5_940, STEP, prom.fetch)
+    assert len(prom.calls) == 2
@@ -5,6 +5,9 @@
 handle with ``update_dag`` and ``append_event``) but records every call in
 memory instead of touching Postgres. Use it anywhere a test wants to assert
 "the executor emitted X" without paying the per-test DB round-trip cost.
+
+``FakeRedis`` stands in for a ``redis.asyncio`` client where only ``xadd``
+and non-transactional pipelines are used, and counts round trips.
 """
 from __future__ import annotations
 
@@ -38,3 +41,31 @@ class FakeOutboxWriter:
     async def transaction(self, run_id: str) -> AsyncIterator[_FakeTx]:
         self.transactions_started += 1
         yield _FakeTx(self, run_id)
+
+
+class _FakePipeline:
+    def __init__(self, client: "FakeRedis") -> None:
+        self._client = client
+        self._queued: list[tuple[str, dict]] = []
+
+    def xadd(self, key, fields) -> None:
+        self._queued.append((key, fields))
+
+    async def execute(self) -> list:
+        self._client.round_trips += 1
+        self._client.entries.extend(self._queued)
+        return [b"0-0"] * len(self._queued)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.entries: list[tuple[str, dict]] = []
+        self.round_trips = 0
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        assert transaction is False
+        return _FakePipeline(self)
+
+    async def xadd(self, key, fields) -> None:
+        self.round_trips += 1
+        self.entries.append((key, fields))
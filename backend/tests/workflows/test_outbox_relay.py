@@ -24,6 +24,8 @@ from src.workflows.outbox_relay import (
     _sse_subscribers,
 )
 
+from ._fakes import FakeRedis
+
 
 _TEST_RUN_ID = f"relay-test-{uuid4().hex}"
 _TEST_RUN_ID_BATCH = f"relay-batch-{uuid4().hex}"
@@ -32,6 +34,7 @@ _TEST_RUN_ID_MULTI = f"relay-multi-{uuid4().hex}"
 _TEST_RUN_ID_MULTI_FAIL = f"relay-multi-fail-{uuid4().hex}"
 _TEST_RUN_ID_REDIS = f"relay-redis-{uuid4().hex}"
 _TEST_RUN_ID_SSE = f"relay-sse-{uuid4().hex}"
+_TEST_RUN_IDS_PARALLEL = [f"relay-par-{i}-{uuid4().hex}" for i in range(4)]
 
 _ALL_TEST_RUN_IDS = [
     _TEST_RUN_ID,
@@ -41,6 +44,7 @@ _ALL_TEST_RUN_IDS = [
     _TEST_RUN_ID_MULTI_FAIL,
     _TEST_RUN_ID_REDIS,
     _TEST_RUN_ID_SSE,
+    *_TEST_RUN_IDS_PARALLEL,
 ]
 
 
@@ -319,3 +323,115 @@ async def test_run_forever_drains_then_cancels_cleanly():
         await task
 
     assert [e["seq"] for e in sink.events] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_relay_hands_redis_sink_the_whole_batch():
+    rows = [
+        (run_id, seq, "k", {"seq": seq})
+        for run_id in _TEST_RUN_IDS_PARALLEL
+        for seq in range(1, 4)
+    ]
+    await _seed(rows)
+    client = FakeRedis()
+
+    drained = await OutboxRelay(sink=RedisStreamSink(client), batch=100).drain_once()
+
+    assert drained == len(rows)
+    assert client.round_trips == 1
+    for run_id in _TEST_RUN_IDS_PARALLEL:
+        key = f"investigation:{run_id}:events"
+        assert [f["seq"] for k, f in client.entries if k == key] == ["1", "2", "3"]
+        assert await _fetch_relayed_at(run_id) == [(1, True), (2, True), (3, True)]
+
+
+class _SlowSink(FakeSink):
+    """Yields between emits so runs interleave if delivered concurrently."""
+
+    async def emit(self, kind, payload, *, run_id, seq) -> None:
+        await asyncio.sleep(0)
+        await super().emit(kind, payload, run_id=run_id, seq=seq)
+
+
+@pytest.mark.asyncio
+async def test_runs_delivered_in_parallel_with_per_run_order():
+    await _seed([
+        (run_id, seq, "k", {})
+        for run_id in _TEST_RUN_IDS_PARALLEL
+        for seq in range(1, 6)
+    ])
+    sink = _SlowSink()
+
+    assert await OutboxRelay(sink=sink, batch=100).drain_once() == 20
+
+    order = [e["run_id"] for e in sink.events]
+    assert len(set(order[: len(_TEST_RUN_IDS_PARALLEL)])) == len(_TEST_RUN_IDS_PARALLEL)
+    for run_id in _TEST_RUN_IDS_PARALLEL:
+        assert [e["seq"] for e in sink.events if e["run_id"] == run_id] == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_relays_share_outbox_without_duplicates():
+    await _seed([
+        (run_id, seq, "k", {})
+        for run_id in _TEST_RUN_IDS_PARALLEL
+        for seq in range(1, 26)
+    ])
+    sink = _SlowSink()
+    relays = [OutboxRelay(sink=sink, batch=7) for _ in range(3)]
+
+    for _ in range(100):
+        counts = await asyncio.gather(*(r.drain_once() for r in relays))
+        if not any(counts) and len(sink.events) == 100:
+            break
+
+    assert len(sink.events) == 100
+    for run_id in _TEST_RUN_IDS_PARALLEL:
+        assert [e["seq"] for e in sink.events if e["run_id"] == run_id] == list(range(1, 26))
+
+
+@pytest.mark.asyncio
+async def test_tail_of_run_waits_while_head_is_claimed_elsewhere():
+    await _seed([(_TEST_RUN_ID, seq, "k", {}) for seq in (1, 2, 3)])
+    sink = FakeSink()
+
+    async with get_session() as holder:
+        async with holder.begin():
+            await holder.execute(
+                text(
+                    "SELECT id FROM investigation_outbox "
+                    "WHERE run_id = :r AND seq = 1 FOR UPDATE"
+                ),
+                {"r": _TEST_RUN_ID},
+            )
+            assert await OutboxRelay(sink=sink, batch=100).drain_once() == 0
+
+    assert sink.events == []
+    assert await OutboxRelay(sink=sink, batch=100).drain_once() == 3
+    assert [e["seq"] for e in sink.events] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_listen_mode_wakes_on_notify():
+    sink = FakeSink()
+    relay = OutboxRelay(sink=sink, batch=100, poll_ms=30_000, listen=True)
+
+    task = asyncio.create_task(relay.run_forever())
+    try:
+        for _ in range(100):
+            if relay._listener is not None:
+                break
+            await asyncio.sleep(0.01)
+        assert relay._listener is not None
+
+        await _seed([(_TEST_RUN_ID, 1, "k", {})])
+        for _ in range(100):
+            if sink.events:
+                break
+            await asyncio.sleep(0.01)
+        assert [e["seq"] for e in sink.events] == [1]
+    finally:
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    assert relay._listener is None
@@ -0,0 +1,96 @@
+"""Outbox sinks' batch delivery, exercised without Postgres.
+
+``deliver`` hands a claimed relay batch to a sink: ``emit_many`` when the
+sink has one, otherwise ``_emit_per_run`` (runs in parallel, seq order
+within a run). The relay-side claim/mark logic lives in
+``test_outbox_relay.py``.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from src.workflows.outbox_relay import (
+    MultiSink,
+    OutboxEvent,
+    RedisStreamSink,
+    _emit_per_run,
+    deliver,
+)
+
+from ._fakes import FakeRedis
+
+_RUN_IDS = ["run-a", "run-b", "run-c"]
+
+
+def _events(seqs=range(1, 4)) -> list[OutboxEvent]:
+    return [OutboxEvent(run_id, seq, "k", {"seq": seq}) for run_id in _RUN_IDS for seq in seqs]
+
+
+class _RecordingSink:
+    """Yields before each emit so runs interleave if delivered concurrently."""
+
+    def __init__(self, fail_run: str | None = None) -> None:
+        self.events: list[tuple[str, int]] = []
+        self._fail_run = fail_run
+
+    async def emit(self, kind, payload, *, run_id, seq) -> None:
+        await asyncio.sleep(0)
+        if run_id == self._fail_run:
+            raise RuntimeError(f"sink down for {run_id}")
+        self.events.append((run_id, seq))
+
+
+@pytest.mark.asyncio
+async def test_emit_per_run_runs_in_parallel_with_per_run_order():
+    sink = _RecordingSink()
+
+    await deliver(sink, _events())
+
+    assert {run_id for run_id, _ in sink.events[: len(_RUN_IDS)]} == set(_RUN_IDS)
+    for run_id in _RUN_IDS:
+        assert [seq for r, seq in sink.events if r == run_id] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_emit_per_run_settles_every_run_before_raising():
+    sink = _RecordingSink(fail_run="run-b")
+
+    with pytest.raises(RuntimeError, match="run-b"):
+        await _emit_per_run(sink, _events())
+
+    assert sorted(sink.events) == [(r, s) for r in ("run-a", "run-c") for s in (1, 2, 3)]
+
+
+@pytest.mark.asyncio
+async def test_redis_sink_emit_many_pipelines_in_one_round_trip():
+    client = FakeRedis()
+
+    await deliver(RedisStreamSink(client), _events())
+
+    assert client.round_trips == 1
+    for run_id in _RUN_IDS:
+        key = f"investigation:{run_id}:events"
+        assert [f["seq"] for k, f in client.entries if k == key] == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_multi_sink_emit_many_uses_inner_batching():
+    client = FakeRedis()
+    good = _RecordingSink()
+    multi = MultiSink([RedisStreamSink(client), good])
+
+    await multi.emit_many(_events(seqs=(1, 2)))
+
+    assert client.round_trips == 1
+    assert sorted(good.events) == [(r, s) for r in _RUN_IDS for s in (1, 2)]
+
+
+@pytest.mark.asyncio
+async def test_multi_sink_emit_many_raises_only_when_every_sink_fails():
+    failing = _RecordingSink(fail_run="run-a")
+
+    await MultiSink([failing, _RecordingSink()]).emit_many(_events())
+    with pytest.raises(RuntimeError):
+        await MultiSink([failing, _RecordingSink(fail_run="run-c")]).emit_many(_events())